@@ -1,11 +1,37 @@
-# Import modules from this subpackage
-from . import picks, backtest, bets, spreads
+# Submodules and helpers are resolved on first attribute access (PEP 562), so importing
+# panda_picks.analysis.<module> does not drag in picks/backtest/spreads (pandas, requests).
+import importlib
+import sys
+import types
 
-# Expose specific functions if needed
-from .picks import makePicks
-from .backtest import backtest
-from .bets import adjust_spread
-from .spreads import main as create_spreads
+_SUBMODULES = {'picks', 'backtest', 'bets', 'spreads'}
+# Exported name -> (submodule, attribute)
+_EXPORTS = {
+    'makePicks': ('picks', 'makePicks'),
+    'backtest': ('backtest', 'backtest'),
+    'adjust_spread': ('bets', 'adjust_spread'),
+    'create_spreads': ('spreads', 'main'),
+}
 
 
-__all__ = ['picks', 'backtest', 'bets', 'spreads', 'makePicks', 'spreads.py']
\ No newline at end of file
+def __getattr__(name):
+    if name in _EXPORTS:
+        module, attr = _EXPORTS[name]
+        return getattr(importlib.import_module(f'{__name__}.{module}'), attr)
+    if name in _SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Loading a submodule binds it on the package; where an export shares its name
+        # (backtest) keep the exported function there, as the eager imports used to
+        if name in _EXPORTS and isinstance(value, types.ModuleType) and value.__name__ == f'{__name__}.{name}':
+            value = getattr(value, _EXPORTS[name][1])
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+__all__ = ['picks', 'backtest', 'bets', 'spreads', 'makePicks', 'adjust_spread', 'create_spreads']
@@ -1,43 +1,71 @@
 """Advanced feature engineering from advanced_stats + spreads.
 Phase 1: build team-week and matchup features with diffs, momentum, trend placeholders.
+Features are built season-wide: one advanced_stats read, windowed momentum/trend, one upsert.
 """
 from __future__ import annotations
+import logging
 import sqlite3
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, List
+import numpy as np
 import pandas as pd
+from panda_picks.db import watermarks
 from panda_picks.db.database import get_connection
 from panda_picks.utils import normalize_df_team_cols
 
 TEAM_WEEK_COLS = ["TEAM","season","week","off_composite","def_composite"]
-
-# Helper: fetch prior weeks composites for momentum/trend
-def _fetch_team_history(conn: sqlite3.Connection, season: int, team: str, current_week: int) -> pd.DataFrame:
-    q = """SELECT week, type, composite_score FROM advanced_stats
-           WHERE season=? AND TEAM=? AND week < ?"""
-    return pd.read_sql_query(q, conn, params=[season, team, current_week])
-
-def _calc_momentum_and_trend(history: pd.DataFrame, stat_type: str, current_week: int) -> Tuple[float|None,float|None]:
-    # history rows for given type only, last up to 3 weeks
-    sub = history[history['type']==stat_type].copy()
-    if sub.empty:
-        return None, None
-    sub = sub.sort_values('week').tail(3)
-    if sub.empty:
-        return None, None
-    # momentum = mean of last up to 3 composite scores
-    momentum = float(sub['composite_score'].mean()) if len(sub)>0 else None
-    # trend: slope via simple linear regression week vs composite if >=2 points
-    trend = None
-    if len(sub) >= 2:
-        x = sub['week'].values
-        y = sub['composite_score'].values
-        # slope = cov(x,y)/var(x)
-        varx = ((x - x.mean())**2).sum()
-        if varx > 0:
-            cov = ((x - x.mean())*(y - y.mean())).sum()
-            trend = float(cov/varx)
-    return momentum, trend
+COMP_COLS = ['home_off_comp','home_def_comp','away_off_comp','away_def_comp']
+PLACEHOLDER_COLS = ['pressure_mismatch','turnover_index']
+# Momentum = mean, trend = OLS slope over a team's last MOMENTUM_WINDOW prior weeks
+MOMENTUM_WINDOW = 3
+FEATURE_COLS = [
+    'season','week','Home_Team','Away_Team', *COMP_COLS,
+    'home_off_vs_away_def','home_def_vs_away_off','net_home_adv','off_comp_diff','def_comp_diff','net_composite',
+    *PLACEHOLDER_COLS,
+    'momentum_home_off','momentum_home_def','momentum_away_off','momentum_away_def',
+    'trend_home_off','trend_home_def','trend_away_off','trend_away_def',
+    'impute_flag','created_at',
+]
+
+def _load_season_stats(conn: sqlite3.Connection, season: int) -> pd.DataFrame:
+    """All offense/defense composites for a season, one row per (TEAM, type, week), sorted by week."""
+    df = pd.read_sql_query("SELECT week, type, TEAM, composite_score FROM advanced_stats WHERE season=?",
+                           conn, params=[season])
+    if df.empty:
+        return df
+    df = normalize_df_team_cols(df, ['TEAM'])
+    df['week'] = pd.to_numeric(df['week'], errors='coerce')
+    return df.dropna(subset=['week']).drop_duplicates(['TEAM','type','week']).sort_values(['TEAM','type','week'], kind='stable')
+
+def _rolling_momentum_and_trend(stats: pd.DataFrame, window: int = MOMENTUM_WINDOW) -> pd.DataFrame:
+    """Per stats row: mean and OLS slope (composite vs week) over that row and the previous window-1 rows
+    of the same team/type. Trend needs >= 2 rows with distinct weeks and no missing composite."""
+    g = stats.groupby(['TEAM','type'], sort=False)
+    # Oldest -> newest columns so the sums accumulate in week order
+    x = np.column_stack([g['week'].shift(k).to_numpy(dtype=float) for k in range(window - 1, -1, -1)])
+    y = np.column_stack([g['composite_score'].shift(k).to_numpy(dtype=float) for k in range(window - 1, -1, -1)])
+    present = ~np.isnan(x)
+    n = present.sum(axis=1)
+    has_y = ~np.isnan(y)
+    y_cnt = has_y.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        momentum = np.where(y_cnt > 0, np.where(has_y, y, 0.0).sum(axis=1) / y_cnt, np.nan)
+        x_mean = np.where(present, x, 0.0).sum(axis=1) / n
+        y_mean = np.where(present, y, 0.0).sum(axis=1) / n  # NaN if any present row lacks a composite
+        dx = np.where(present, x - x_mean[:, None], 0.0)
+        dy = np.where(present, y - y_mean[:, None], 0.0)
+        varx = (dx ** 2).sum(axis=1)
+        trend = np.where((n >= 2) & (varx > 0), (dx * dy).sum(axis=1) / varx, np.nan)
+    return stats[['TEAM','type','week']].assign(momentum=momentum, trend=trend)
+
+def _prior_history(rolled: pd.DataFrame, targets: pd.DataFrame, stat_type: str) -> pd.DataFrame:
+    """Momentum/trend for each (TEAM, week) target from the team's last stats row strictly before that week."""
+    hist = rolled[rolled['type'] == stat_type].drop(columns='type').sort_values('week', kind='stable')
+    left = targets.assign(week=targets['week'].astype(float)).sort_values('week', kind='stable')
+    if hist.empty:
+        return left.assign(momentum=np.nan, trend=np.nan)
+    return pd.merge_asof(left, hist.astype({'week': float}), on='week', by='TEAM',
+                         allow_exact_matches=False, direction='backward')
 
 def build_team_week_features(conn: sqlite3.Connection, season: int, week: int) -> pd.DataFrame:
     """Return team-level offensive & defensive composite scores for a week.
@@ -58,45 +86,51 @@ def build_team_week_features(conn: sqlite3.Connection, season: int, week: int) -
         pivot['def_composite'] = None
     return pivot[TEAM_WEEK_COLS]
 
-def _impute_and_flag(row: pd.Series, league_means: Dict[str,float], flag: int) -> Tuple[pd.Series,int]:
-    # Determine proper mean key (off_composite/def_composite) for each comp column
-    for col in ['home_off_comp','home_def_comp','away_off_comp','away_def_comp']:
-        if pd.isna(row.get(col)):
-            mean_key = 'off_composite' if 'off_' in col else 'def_composite'
-            row = row.copy()
-            row[col] = league_means.get(mean_key, 0.0)
-            flag = 1
-    return row, flag
+def _team_week_pivot(stats: pd.DataFrame, season: int) -> pd.DataFrame:
+    """Season-wide equivalent of build_team_week_features: one row per (TEAM, week)."""
+    pivot = stats.pivot_table(index=['TEAM','week'], columns='type', values='composite_score',
+                              aggfunc='first').reset_index()
+    pivot.columns.name = None
+    pivot.rename(columns={'offense':'off_composite','defense':'def_composite'}, inplace=True)
+    for col in ('off_composite','def_composite'):
+        if col not in pivot:
+            pivot[col] = np.nan
+    pivot['season'] = season
+    return pivot[TEAM_WEEK_COLS]
 
-def build_matchup_features(conn: sqlite3.Connection, season: int, week: int) -> pd.DataFrame:
-    """Create matchup-level features with diffs, momentum, trend, placeholders.
-    Columns:
-      core comps, diffs (off_comp_diff, def_comp_diff, net_composite), net_home_adv,
-      momentum_* (last 3 weeks avg), trend_* (slope), pressure_mismatch, turnover_index, impute_flag.
+def build_season_matchup_features(conn: sqlite3.Connection, season: int, weeks: Iterable[int] | None = None) -> pd.DataFrame:
+    """Create matchup-level features for many weeks at once.
+
+    advanced_stats is read once for the season and spreads once for all weeks. Momentum
+    (mean of the last 3 prior weeks) and trend (OLS slope over them) come from shifted
+    per-team/type windows; missing composites are imputed with that week's league mean
+    (impute_flag=1). Weeks without advanced stats or spreads produce no rows.
+    Columns: FEATURE_COLS (diffs, net_home_adv, momentum_*, trend_*, placeholders, impute_flag).
     """
-    team_feats = build_team_week_features(conn, season, week)
+    stats = _load_season_stats(conn, season)
+    if stats.empty:
+        return pd.DataFrame(columns=FEATURE_COLS)
+    team_feats = _team_week_pivot(stats, season)
+    wanted = sorted({int(w) for w in (weeks if weeks is not None else team_feats['week'].unique())})
+    team_feats = team_feats[team_feats['week'].isin(wanted)]
     if team_feats.empty:
-        return pd.DataFrame()
-    spreads = pd.read_sql_query("SELECT Home_Team, Away_Team FROM spreads WHERE WEEK=?", conn, params=[f"WEEK{week}"])
+        return pd.DataFrame(columns=FEATURE_COLS)
+    week_keys = [f"WEEK{w}" for w in sorted(team_feats['week'].astype(int).unique())]
+    spreads = pd.read_sql_query(
+        f"SELECT WEEK, Home_Team, Away_Team FROM spreads WHERE WEEK IN ({','.join('?' * len(week_keys))})",
+        conn, params=week_keys)
     if spreads.empty:
-        return pd.DataFrame()
-    # Normalize team codes in spreads as well
+        return pd.DataFrame(columns=FEATURE_COLS)
     spreads = normalize_df_team_cols(spreads, ['Home_Team','Away_Team'])
-
-    # League means for imputation
-    league_means = {
-        'off_composite': float(team_feats['off_composite'].mean()) if not team_feats['off_composite'].isna().all() else 0.0,
-        'def_composite': float(team_feats['def_composite'].mean()) if not team_feats['def_composite'].isna().all() else 0.0,
-    }
-
-    home = spreads.merge(team_feats, left_on='Home_Team', right_on='TEAM', how='left').rename(
-        columns={'off_composite':'home_off_comp','def_composite':'home_def_comp'}
-    )
-    away = spreads.merge(team_feats, left_on='Away_Team', right_on='TEAM', how='left').rename(
-        columns={'off_composite':'away_off_comp','def_composite':'away_def_comp'}
-    )
-    merged = home[['Home_Team','Away_Team','home_off_comp','home_def_comp']].merge(
-        away[['Home_Team','Away_Team','away_off_comp','away_def_comp']], on=['Home_Team','Away_Team'], how='left'
+    spreads['week'] = spreads['WEEK'].str.upper().str.replace('WEEK', '', regex=False).astype(int)
+
+    comps = team_feats[['TEAM','week','off_composite','def_composite']]
+    merged = spreads.drop(columns='WEEK').merge(
+        comps.rename(columns={'TEAM':'Home_Team','off_composite':'home_off_comp','def_composite':'home_def_comp'}),
+        on=['Home_Team','week'], how='left'
+    ).merge(
+        comps.rename(columns={'TEAM':'Away_Team','off_composite':'away_off_comp','def_composite':'away_def_comp'}),
+        on=['Away_Team','week'], how='left'
     )
 
     # Compute diffs
@@ -108,108 +142,111 @@ def build_matchup_features(conn: sqlite3.Connection, season: int, week: int) ->
     merged['home_off_vs_away_def'] = merged['home_off_comp'] - merged['away_def_comp']
     merged['home_def_vs_away_off'] = merged['home_def_comp'] - merged['away_off_comp']
     merged['net_home_adv'] = merged['home_off_vs_away_def'] + merged['home_def_vs_away_off']
-
-    # Initialize placeholders
-    placeholder_cols = [
-        'pressure_mismatch','turnover_index',
-        'momentum_home_off','momentum_home_def','momentum_away_off','momentum_away_def',
-        'trend_home_off','trend_home_def','trend_away_off','trend_away_def'
-    ]
-    for c in placeholder_cols:
-        merged[c] = None
-    merged['impute_flag'] = 0
-
-    # Momentum & trend calculation per team (home & away separately)
-    # Cache histories
-    cache: Dict[str,pd.DataFrame] = {}
-    def get_hist(team: str):
-        if team not in cache:
-            cache[team] = _fetch_team_history(conn, season, team, week)
-        return cache[team]
-
-    for idx, row in merged.iterrows():
-        home_team = row['Home_Team']
-        away_team = row['Away_Team']
-        h_hist = get_hist(home_team)
-        a_hist = get_hist(away_team)
-        h_off_mom, h_off_trend = _calc_momentum_and_trend(h_hist, 'offense', week)
-        h_def_mom, h_def_trend = _calc_momentum_and_trend(h_hist, 'defense', week)
-        a_off_mom, a_off_trend = _calc_momentum_and_trend(a_hist, 'offense', week)
-        a_def_mom, a_def_trend = _calc_momentum_and_trend(a_hist, 'defense', week)
-        merged.at[idx, 'momentum_home_off'] = h_off_mom
-        merged.at[idx, 'momentum_home_def'] = h_def_mom
-        merged.at[idx, 'momentum_away_off'] = a_off_mom
-        merged.at[idx, 'momentum_away_def'] = a_def_mom
-        merged.at[idx, 'trend_home_off'] = h_off_trend
-        merged.at[idx, 'trend_home_def'] = h_def_trend
-        merged.at[idx, 'trend_away_off'] = a_off_trend
-        merged.at[idx, 'trend_away_def'] = a_def_trend
-
-    # Imputation pass
-    for idx, row in merged.iterrows():
-        updated, flag = _impute_and_flag(row, league_means, int(row.get('impute_flag', 0)))
-        merged.loc[idx, ['home_off_comp','home_def_comp','away_off_comp','away_def_comp']] = [
-            updated['home_off_comp'], updated['home_def_comp'], updated['away_off_comp'], updated['away_def_comp']
-        ]
-        merged.at[idx,'impute_flag'] = flag
+    for c in PLACEHOLDER_COLS:
+        merged[c] = np.nan
+
+    # Momentum & trend from each team's prior weeks (home & away looked up separately)
+    rolled = _rolling_momentum_and_trend(stats)
+    for side, team_col in (('home','Home_Team'), ('away','Away_Team')):
+        targets = merged[[team_col,'week']].drop_duplicates().rename(columns={team_col:'TEAM'})
+        for stat_type, t in (('offense','off'), ('defense','def')):
+            hist = _prior_history(rolled, targets, stat_type).rename(
+                columns={'TEAM':team_col,'momentum':f'momentum_{side}_{t}','trend':f'trend_{side}_{t}'})
+            hist['week'] = hist['week'].astype(int)
+            merged = merged.merge(hist, on=[team_col,'week'], how='left')
+
+    # League-mean imputation per week (diffs above keep the unimputed values)
+    league = team_feats.groupby('week')[['off_composite','def_composite']].mean().fillna(0.0)
+    missing = merged[COMP_COLS].isna()
+    for col in COMP_COLS:
+        mean_key = 'off_composite' if '_off_' in col else 'def_composite'
+        merged[col] = merged[col].fillna(merged['week'].map(league[mean_key]))
+    merged['impute_flag'] = missing.any(axis=1).astype(int)
 
     merged['season'] = season
-    merged['week'] = week
     merged['created_at'] = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    return merged[FEATURE_COLS].sort_values(['week'], kind='stable').reset_index(drop=True)
+
+def store_matchup_features(conn: sqlite3.Connection, features: pd.DataFrame) -> int:
+    """Upsert matchup feature rows (any number of weeks) in one transaction; returns rows written."""
+    if features.empty:
+        return 0
+    cols = ', '.join(FEATURE_COLS)
+    stmt = f"INSERT OR REPLACE INTO matchup_features ({cols}) VALUES ({','.join('?' * len(FEATURE_COLS))})"
+    out = features[FEATURE_COLS].astype(object)
+    rows = list(out.where(features[FEATURE_COLS].notna(), None).itertuples(index=False, name=None))
+    with conn:
+        conn.executemany(stmt, rows)
+    return len(rows)
 
-    # Upsert (extended schema)
-    cur = conn.cursor()
-    cur.execute("""CREATE TABLE IF NOT EXISTS matchup_features (
-        season INTEGER, week INTEGER, Home_Team TEXT, Away_Team TEXT,
-        home_off_comp REAL, home_def_comp REAL, away_off_comp REAL, away_def_comp REAL,
-        home_off_vs_away_def REAL, home_def_vs_away_off REAL, net_home_adv REAL,
-        off_comp_diff REAL, def_comp_diff REAL, net_composite REAL,
-        pressure_mismatch REAL, turnover_index REAL,
-        momentum_home_off REAL, momentum_home_def REAL, momentum_away_off REAL, momentum_away_def REAL,
-        trend_home_off REAL, trend_home_def REAL, trend_away_off REAL, trend_away_def REAL,
-        impute_flag INTEGER, created_at TEXT,
-        PRIMARY KEY (season, week, Home_Team, Away_Team))""")
-
-    stmt = ("INSERT OR REPLACE INTO matchup_features (season, week, Home_Team, Away_Team, home_off_comp, home_def_comp, "
-            "away_off_comp, away_def_comp, home_off_vs_away_def, home_def_vs_away_off, net_home_adv, off_comp_diff, def_comp_diff, net_composite, "
-            "pressure_mismatch, turnover_index, momentum_home_off, momentum_home_def, momentum_away_off, momentum_away_def, trend_home_off, trend_home_def, trend_away_off, trend_away_def, impute_flag, created_at) "
-            "VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)")
-    rows = [(
-        season, week, r.Home_Team, r.Away_Team,
-        None if pd.isna(r.home_off_comp) else float(r.home_off_comp),
-        None if pd.isna(r.home_def_comp) else float(r.home_def_comp),
-        None if pd.isna(r.away_off_comp) else float(r.away_off_comp),
-        None if pd.isna(r.away_def_comp) else float(r.away_def_comp),
-        None if pd.isna(r.home_off_vs_away_def) else float(r.home_off_vs_away_def),
-        None if pd.isna(r.home_def_vs_away_off) else float(r.home_def_vs_away_off),
-        None if pd.isna(r.net_home_adv) else float(r.net_home_adv),
-        None if pd.isna(r.off_comp_diff) else float(r.off_comp_diff),
-        None if pd.isna(r.def_comp_diff) else float(r.def_comp_diff),
-        None if pd.isna(r.net_composite) else float(r.net_composite),
-        None if pd.isna(r.pressure_mismatch) else float(r.pressure_mismatch),
-        None if pd.isna(r.turnover_index) else float(r.turnover_index),
-        None if pd.isna(r.momentum_home_off) else float(r.momentum_home_off),
-        None if pd.isna(r.momentum_home_def) else float(r.momentum_home_def),
-        None if pd.isna(r.momentum_away_off) else float(r.momentum_away_off),
-        None if pd.isna(r.momentum_away_def) else float(r.momentum_away_def),
-        None if pd.isna(r.trend_home_off) else float(r.trend_home_off),
-        None if pd.isna(r.trend_home_def) else float(r.trend_home_def),
-        None if pd.isna(r.trend_away_off) else float(r.trend_away_off),
-        None if pd.isna(r.trend_away_def) else float(r.trend_away_def),
-        int(r.impute_flag),
-        r.created_at
-    ) for r in merged.itertuples(index=False)]
-    if rows:
-        cur.executemany(stmt, rows)
-        conn.commit()
+def build_matchup_features(conn: sqlite3.Connection, season: int, week: int) -> pd.DataFrame:
+    """Create and store matchup-level features for one week (see build_season_matchup_features)."""
+    merged = build_season_matchup_features(conn, season, [week])
+    store_matchup_features(conn, merged)
     return merged
 
-def build_and_store_matchup_features(season: int, weeks: List[int]):
+def feature_input_hashes(conn: sqlite3.Connection, season: int, weeks: Iterable[int]) -> Dict[int, str]:
+    """Per-week fingerprint of everything a week's matchup_features rows are built from.
+
+    Covers the week's matchups (teams only -- lines and odds are not features), its
+    advanced_stats rows (composites + league means) and, per team/type, the stats rows in
+    its momentum window. A stats change in week c therefore only touches week c and the
+    later weeks whose windows still contain week c.
+    """
+    weeks = sorted({int(w) for w in weeks})
+    if not weeks:
+        return {}
+    week_keys = [f"WEEK{w}" for w in weeks]
+    matchups = watermarks.grouped_fingerprints(
+        conn, f"SELECT week_num, Home_Team, Away_Team FROM spreads WHERE WEEK IN ({','.join('?' * len(week_keys))})",
+        week_keys)
+    stats = _load_season_stats(conn, season)
+    if stats.empty:
+        return {w: watermarks.combine(matchups.get(w, watermarks.EMPTY)) for w in weeks}
+    row_hash = pd.util.hash_pandas_object(
+        stats[['TEAM','type','week','composite_score']].astype({'week': float, 'composite_score': float}),
+        index=False).to_numpy()
+    # Window hash at each row = hashes of that row and the MOMENTUM_WINDOW-1 rows before it
+    # (stats is sorted by TEAM, type, week, so each team/type is a contiguous block)
+    pos = np.arange(len(stats))
+    in_group = stats.groupby(['TEAM','type'], sort=False).cumcount().to_numpy()
+    window = stats[['TEAM','type','week']].astype({'week': float}).assign(**{
+        f'h{k}': np.where(in_group >= k, row_hash[np.maximum(pos - k, 0)], np.uint64(0)) for k in range(MOMENTUM_WINDOW)})
+    h_cols = [f'h{k}' for k in range(MOMENTUM_WINDOW)]
+    groups = stats[['TEAM','type']].drop_duplicates()
+    targets = groups.merge(pd.DataFrame({'week': np.array(weeks, dtype=float)}), how='cross').sort_values('week')
+    hist = pd.merge_asof(targets, window.sort_values('week', kind='stable'), on='week', by=['TEAM','type'],
+                         allow_exact_matches=False, direction='backward')
+    hist[h_cols] = hist[h_cols].fillna(0).astype('uint64')
+    stats_week = stats['week'].to_numpy(dtype=float)
+    out = {}
+    for w in weeks:
+        same_week = np.sort(row_hash[stats_week == w])
+        window_rows = hist[hist['week'] == w].sort_values(['TEAM','type'])[h_cols].to_numpy(dtype='uint64')
+        out[w] = watermarks.combine(matchups.get(w, watermarks.EMPTY),
+                                    watermarks.bytes_fingerprint(same_week.tobytes()),
+                                    watermarks.bytes_fingerprint(window_rows.tobytes()))
+    return out
+
+def build_and_store_matchup_features(season: int, weeks: List[int], incremental: bool = False):
+    """Build all requested weeks from one advanced_stats read and upsert them together.
+    Returns one frame per requested week (empty for weeks without data).
+
+    Input hashes (see feature_input_hashes) are recorded either way; with
+    ``incremental=True`` only weeks whose inputs changed since the last build are
+    rebuilt and unchanged weeks return empty frames.
+    """
     conn = get_connection()
     try:
-        out = []
-        for w in weeks:
-            out.append(build_matchup_features(conn, season, w))
-        return out
+        hashes = feature_input_hashes(conn, season, weeks)
+        build_weeks = sorted(hashes)
+        if incremental:
+            build_weeks = watermarks.stale_weeks(conn, 'matchup_features', season, hashes)
+            logging.info(f"matchup_features: {len(build_weeks)}/{len(hashes)} weeks changed {build_weeks}")
+        features = build_season_matchup_features(conn, season, build_weeks) if build_weeks else pd.DataFrame()
+        store_matchup_features(conn, features)
+        watermarks.record(conn, 'matchup_features', season, {w: hashes[w] for w in build_weeks})
+        by_week = dict(tuple(features.groupby('week'))) if not features.empty else {}
+        return [by_week.get(int(w), pd.DataFrame()).reset_index(drop=True) for w in weeks]
     finally:
         conn.close()
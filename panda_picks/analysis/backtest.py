@@ -1,10 +1,12 @@
 import pandas as pd
 import sqlite3
-from itertools import combinations
 import logging
 import math
 import numpy as np  # added for probability metrics
 from panda_picks.db.database import get_connection
+from panda_picks.db.migrations import GENERATED_COLUMNS, table_columns
+from panda_picks.analysis.utils import teasers
+from panda_picks.config.settings import Settings
 from panda_picks import config
 import time
 
@@ -60,163 +62,254 @@ def _bin_prob(p, bins):
             return f"{bins[i]:.2f}-{bins[i+1]:.2f}"
     return f"{bins[-2]:.2f}-{bins[-1]:.2f}"  # last bin inclusive upper
 
-def backtest():
+BACKTEST_WEEKS = [f'WEEK{i}' for i in range(1, 19)]
+TEASER_POINTS = 6
+TEASER_BET = 10
+TEASER_ODDS = teasers.TEASER_ODDS
+TEASER_SIZES = Settings.TEASER_SIZES
+PROB_BINS = [i / 10 for i in range(11)]
+_PROB_COLS_ORDER = ['WEEK','Home_Team','Away_Team','Home_Line_Close','Home_Odds_Close','Away_Odds_Close','Home_Win_Prob',
+                    'Home_Odds_Implied_Prob','Home_Spread_Implied_Prob','Home_Edge_ML','Home_Edge_Spread','Home_Win_Actual',
+                    'Game_Pick','Pick_Edge_ML','Pick_Edge_Spread','Score_Placeholder']
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def _moneyline_implied_prob_array(odds) -> np.ndarray:
+    """Column-wise _moneyline_implied_prob (NaN for missing / non-numeric odds)."""
+    o = pd.to_numeric(pd.Series(odds), errors='coerce').to_numpy(dtype=float)
+    a = np.abs(o)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(o > 0, 100 / (o + 100), a / (a + 100))
+
+
+def _spread_implied_home_win_prob_array(home_spread) -> np.ndarray:
+    """Column-wise _spread_implied_home_win_prob."""
+    sp = pd.to_numeric(pd.Series(home_spread), errors='coerce').to_numpy(dtype=float)
+    z = (0 - (-sp)) / (_DEF_MARGIN_SD * _SQRT2)
+    return 1 - 0.5 * (1 + _erf(z).astype(float))
+
+
+def _bin_labels(p, bins=PROB_BINS) -> np.ndarray:
+    """Column-wise _bin_prob; out-of-range values land in the last bin, NaN -> 'nan'."""
+    p = np.asarray(p, dtype=float)
+    labels = np.array([f"{bins[i]:.2f}-{bins[i+1]:.2f}" for i in range(len(bins) - 1)], dtype=object)
+    idx = np.searchsorted(np.asarray(bins), p, side='right') - 1
+    idx = np.where((idx < 0) | (idx >= len(labels)), len(labels) - 1, idx)
+    return np.where(np.isnan(p), 'nan', labels[idx])
+
+
+def _load_merged(conn, weeks: list[str]) -> pd.DataFrame:
+    """Picks for all backtest weeks joined to spreads, read once. Rows are week-major in `weeks` order."""
+    spreads = pd.read_sql_query("SELECT * FROM spreads", conn)
+    placeholders = ','.join('?' * len(weeks))
+    picks_df = pd.read_sql_query(f"SELECT * FROM picks WHERE WEEK IN ({placeholders})", conn, params=weeks)
+    # Generated columns cannot be inserted into picks_results; season comes from spreads
+    spreads = spreads.drop(columns=list(GENERATED_COLUMNS), errors='ignore')
+    picks_df = picks_df.drop(columns=list(GENERATED_COLUMNS) + ['season'], errors='ignore')
+    order = {w: i for i, w in enumerate(weeks)}
+    picks_df = picks_df.iloc[np.argsort(picks_df['WEEK'].map(order).to_numpy(), kind='stable')]
+    merged = pd.merge(picks_df, spreads, on=['WEEK', 'Home_Team', 'Away_Team'])
+    if 'Home_Line_Close_y' in merged.columns:
+        merged = merged.drop(columns=['Home_Line_Close_y', 'Away_Line_Close_y'])
+        merged = merged.rename(columns={'Home_Line_Close_x': 'Home_Line_Close', 'Away_Line_Close_x': 'Away_Line_Close'})
+    # Duplicated odds columns: per week, prefer picks (x) unless it is entirely NaN and spreads (y) has data
+    for base in ['Home_Odds_Close', 'Away_Odds_Close', 'Home_Odds_Open', 'Away_Odds_Open']:
+        x_col, y_col = f"{base}_x", f"{base}_y"
+        if x_col in merged.columns and y_col in merged.columns:
+            by_week = merged['WEEK']
+            use_x = (merged[x_col].notna().groupby(by_week).transform('any')
+                     | ~merged[y_col].notna().groupby(by_week).transform('any'))
+            merged[base] = merged[x_col].where(use_x, merged[y_col]).infer_objects()
+            merged = merged.drop(columns=[x_col, y_col])
+        elif x_col in merged.columns:
+            merged = merged.rename(columns={x_col: base})
+        elif y_col in merged.columns:
+            merged = merged.rename(columns={y_col: base})
+    for suffix in ['WINS', 'LOSSES', 'TIES']:
+        hx, hy = f"{suffix}_x", f"{suffix}_y"
+        if hx in merged.columns:
+            merged = merged.rename(columns={hx: f"Home_{suffix.title()}"})
+        if hy in merged.columns:
+            merged = merged.rename(columns={hy: f"Away_{suffix.title()}"})
+    return merged
+
+
+def _prepare_scores(df: pd.DataFrame) -> pd.DataFrame:
+    """Numeric scores + Score_Placeholder flag; pending games get a temporary 0-0 (ignored via the flag)."""
+    for col in ['Home_Score', 'Away_Score']:
+        df[col] = pd.to_numeric(df.get(col, np.nan), errors='coerce')
+    df['Score_Placeholder'] = df['Home_Score'].isna() | df['Away_Score'].isna()
+    df.loc[df['Score_Placeholder'], ['Home_Score', 'Away_Score']] = 0
+    return df
+
+
+def _add_probability_columns(df: pd.DataFrame) -> pd.DataFrame:
+    nan = np.full(len(df), np.nan)
+    df['Home_Win_Prob'] = pd.to_numeric(df['Home_Win_Prob'], errors='coerce')
+    df['Home_Odds_Implied_Prob'] = _moneyline_implied_prob_array(df['Home_Odds_Close']) if 'Home_Odds_Close' in df.columns else nan
+    df['Away_Odds_Implied_Prob'] = _moneyline_implied_prob_array(df['Away_Odds_Close']) if 'Away_Odds_Close' in df.columns else nan
+    df['Home_Spread_Implied_Prob'] = _spread_implied_home_win_prob_array(df['Home_Line_Close']) if 'Home_Line_Close' in df.columns else nan
+    df['Home_Edge_ML'] = df['Home_Win_Prob'] - df['Home_Odds_Implied_Prob']
+    df['Home_Edge_Spread'] = df['Home_Win_Prob'] - df['Home_Spread_Implied_Prob']
+    placeholder = df['Score_Placeholder'].to_numpy(dtype=bool)
+    home_won = (df['Home_Score'] > df['Away_Score']).to_numpy()
+    df['Home_Win_Actual'] = np.where(placeholder, np.nan, np.where(home_won, 1.0, 0.0))
+    pick_home = (df['Game_Pick'] == df['Home_Team']).to_numpy()
+    for edge, pick_edge in (('Home_Edge_ML', 'Pick_Edge_ML'), ('Home_Edge_Spread', 'Pick_Edge_Spread')):
+        e = pd.to_numeric(df[edge], errors='coerce').to_numpy(dtype=float)
+        df[pick_edge] = np.where(pick_home, e, -e)
+    return df
+
+
+def _week_probability_metrics(week: str, week_df: pd.DataFrame) -> dict | None:
+    real_week = week_df[(~week_df['Score_Placeholder']) & week_df['Home_Win_Actual'].notna()]
+    if real_week.empty:
+        return None
+    eps = 1e-6
+    p = real_week['Home_Win_Prob'].clip(eps, 1-eps)
+    brier = ((real_week['Home_Win_Prob'] - real_week['Home_Win_Actual']) ** 2).mean()
+    log_loss = -(real_week['Home_Win_Actual'] * np.log(p) + (1 - real_week['Home_Win_Actual']) * np.log(1 - p)).mean()
+    return {
+        'WEEK': week,
+        'Games': len(real_week),
+        'Brier': brier,
+        'Log_Loss': log_loss,
+        'Avg_Home_Edge_ML': real_week['Home_Edge_ML'].mean(),
+        'Avg_Pick_Edge_ML': real_week['Pick_Edge_ML'].mean()
+    }
+
+
+def _grade_week(df: pd.DataFrame) -> pd.DataFrame:
+    """Tease both lines, then Winner / Correct_Pick / Pick_Covered_Spread (None for pending games)."""
+    df['Home_Line_Close'] = pd.to_numeric(df['Home_Line_Close'], errors='coerce') + TEASER_POINTS
+    df['Away_Line_Close'] = pd.to_numeric(df['Away_Line_Close'], errors='coerce') + TEASER_POINTS
+    placeholder = df['Score_Placeholder'].to_numpy(dtype=bool)
+    home, away, pick = df['Home_Team'].to_numpy(), df['Away_Team'].to_numpy(), df['Game_Pick'].to_numpy()
+    hs, as_ = df['Home_Score'].to_numpy(dtype=float), df['Away_Score'].to_numpy(dtype=float)
+    winner = np.where(hs > as_, home, away).astype(object)
+    winner[placeholder] = None
+    df['Winner'] = winner
+    df['Correct_Pick'] = _bool_or_none(pick == winner, placeholder)
+    home_covers = hs + df['Home_Line_Close'].to_numpy(dtype=float) > as_
+    df['Pick_Covered_Spread'] = _bool_or_none(np.where(home_covers, pick == home, pick == away), placeholder)
+    return df
+
+
+def _bool_or_none(values: np.ndarray, none_mask: np.ndarray):
+    if not none_mask.any():
+        return values.astype(bool)
+    out = values.astype(bool).astype(object)
+    out[none_mask] = None
+    return out
+
+
+def _teaser_legs(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct picked teams among completed games (first-seen order) and whether each teased leg won."""
+    done = df[~df['Score_Placeholder']].drop_duplicates(subset='Game_Pick', keep='first')
+    teams = done['Game_Pick'].to_numpy()
+    is_home = teams == done['Home_Team'].to_numpy()
+    hs, as_ = done['Home_Score'].to_numpy(dtype=float), done['Away_Score'].to_numpy(dtype=float)
+    won = np.where(is_home,
+                   hs + done['Home_Line_Close'].to_numpy(dtype=float) > as_,
+                   as_ + done['Away_Line_Close'].to_numpy(dtype=float) > hs)
+    return teams, won & pd.notna(teams)
+
+
+def _score_teasers(teams: np.ndarray, won: np.ndarray, sizes=None) -> pd.DataFrame:
+    """One exported row per teaser combo (see teasers.combo_frame)."""
+    out = teasers.combo_frame(teams, won, TEASER_SIZES if sizes is None else sizes, stake=TEASER_BET)
+    if out.empty:
+        return out.drop(columns=['Hit'])
+    if not out['Hit'].any():
+        out['Winnings'] = 0  # keep integer zeros when nothing cashed, as the row-wise scorer did
+    return out.drop(columns=['Hit'])
+
+
+def _summary_rows(summary: list) -> pd.DataFrame:
+    """Per-size rows written to teaser_results when individual combos are not exported."""
+    return pd.DataFrame({
+        'Combo': [None] * len(summary),
+        'Winnings': [s.returned for s in summary],
+        'Type': [f'{s.size}-Team' for s in summary],
+    })
+
+
+def _replace_week(conn, week: str, merged_df: pd.DataFrame | None = None,
+                  teaser_df: pd.DataFrame | None = None) -> None:
+    """Replace a week's picks_results / teaser_results rows in one transaction.
+
+    The whole week is cleared first, so games (or weeks) that no longer have picks or
+    completed scores do not keep results from an earlier run.
+    """
+    with conn:
+        conn.execute("DELETE FROM picks_results WHERE week_num = ?", (int(week[4:]),))
+        conn.execute("DELETE FROM teaser_results WHERE WEEK = ?", (week,))
+        if merged_df is not None:
+            _schema_columns(conn, 'picks_results', merged_df).to_sql('picks_results', conn, if_exists='append', index=False)
+        if teaser_df is not None:
+            _schema_columns(conn, 'teaser_results', teaser_df).to_sql('teaser_results', conn, if_exists='append', index=False)
+
+
+def backtest(export_combos: bool | None = None):
+    """Grade all backtest weeks and replay the teaser strategy.
+
+    Weekly teaser totals are computed in closed form from leg outcomes. With
+    export_combos (default Settings.TEASER_EXPORT_COMBOS) every combo is also written
+    to teaser_results; otherwise one row per teaser size is written.
+    """
     print(f"[{time.strftime('%H:%M:%S')}] backtest started")
-    weeks = ['WEEK1','WEEK2','WEEK3','WEEK4','WEEK5','WEEK6','WEEK7','WEEK8','WEEK9', 'WEEK10', 'WEEK11', 'WEEK12', 'WEEK13', 'WEEK14', 'WEEK15', 'WEEK16', 'WEEK17', 'WEEK18']
-    final_results = pd.DataFrame()
+    if export_combos is None:
+        export_combos = Settings.TEASER_EXPORT_COMBOS
+    weeks = BACKTEST_WEEKS
     cumulative_profit = 0
+    total_tickets = 0
+    total_winning_tickets = 0
     initial_balance = 500  # Starting balance
     current_balance = initial_balance
 
-    # Remove redundant direct sqlite3.connect; rely on configured connection
     conn = get_connection()
 
-    probability_game_rows = []
+    merged_all = _load_merged(conn, weeks)
+    merged_all = _prepare_scores(merged_all)
+    has_probs = 'Home_Win_Prob' in merged_all.columns
+    if has_probs:
+        merged_all = _add_probability_columns(merged_all)
+
+    probability_frames = []
     weekly_prob_metrics = []
+    weeks_with_picks = set(merged_all['WEEK'])
 
     for week in weeks:
-        df = pd.read_sql_query("SELECT * FROM spreads", conn)
-        picks_df = pd.read_sql_query(f"SELECT * FROM picks WHERE WEEK = '{week}'", conn)
-        if picks_df.empty:
+        if week not in weeks_with_picks:
             logging.info(f"{week}: no picks; skipping")
+            _replace_week(conn, week)
             continue
-        merged_df = pd.merge(picks_df, df, left_on=['WEEK', 'Home_Team', 'Away_Team'],
-                             right_on=['WEEK', 'Home_Team', 'Away_Team'])
-        pd.set_option('display.max_rows', 200)
-        pd.set_option('display.max_columns', 200)
-
-        # Consolidate duplicated line columns first
-        if 'Home_Line_Close_y' in merged_df.columns:
-            merged_df = merged_df.drop(columns=['Home_Line_Close_y', 'Away_Line_Close_y'])
-            merged_df = merged_df.rename(columns={'Home_Line_Close_x': 'Home_Line_Close', 'Away_Line_Close_x': 'Away_Line_Close'})
-
-        # NEW: Consolidate duplicated odds columns (avoid KeyError 'Home_Odds_Close')
-        for base in ['Home_Odds_Close', 'Away_Odds_Close', 'Home_Odds_Open', 'Away_Odds_Open']:
-            x_col, y_col = f"{base}_x", f"{base}_y"
-            if x_col in merged_df.columns and y_col in merged_df.columns:
-                # Prefer picks (x) unless it's entirely NaN and y has data
-                if merged_df[x_col].notna().any() or not merged_df[y_col].notna().any():
-                    merged_df[base] = merged_df[x_col]
-                else:
-                    merged_df[base] = merged_df[y_col]
-                merged_df = merged_df.drop(columns=[x_col, y_col])
-            elif x_col in merged_df.columns:
-                merged_df = merged_df.rename(columns={x_col: base})
-            elif y_col in merged_df.columns:
-                merged_df = merged_df.rename(columns={y_col: base})
-            # else: column absent in both; leave missing, later guards will skip usage
-
-        # Rename win/loss/tie columns if present (guard against absence)
-        for suffix in ['WINS', 'LOSSES', 'TIES']:
-            hx, hy = f"{suffix}_x", f"{suffix}_y"
-            if hx in merged_df.columns:
-                merged_df = merged_df.rename(columns={hx: f"Home_{suffix.title()}"})
-            if hy in merged_df.columns:
-                merged_df = merged_df.rename(columns={hy: f"Away_{suffix.title()}"})
-
-        # Ensure numeric scores & add placeholder flags BEFORE probability calcs
-        for col in ['Home_Score', 'Away_Score']:
-            merged_df[col] = pd.to_numeric(merged_df.get(col, np.nan), errors='coerce')
-        merged_df['Score_Placeholder'] = merged_df['Home_Score'].isna() | merged_df['Away_Score'].isna()
-        # Assign temporary 0-0 for missing scores (will be ignored in metrics/combo logic via flag)
-        merged_df.loc[merged_df['Score_Placeholder'], ['Home_Score', 'Away_Score']] = 0
-
-        # Probability + edges
-        if 'Home_Win_Prob' in merged_df.columns:
-            # Guard: only compute implied probabilities if odds columns exist
-            if 'Home_Odds_Close' in merged_df.columns:
-                merged_df['Home_Odds_Implied_Prob'] = merged_df['Home_Odds_Close'].apply(_moneyline_implied_prob)
-            else:
-                merged_df['Home_Odds_Implied_Prob'] = math.nan
-            if 'Away_Odds_Close' in merged_df.columns:
-                merged_df['Away_Odds_Implied_Prob'] = merged_df['Away_Odds_Close'].apply(_moneyline_implied_prob)
-            else:
-                merged_df['Away_Odds_Implied_Prob'] = math.nan
-            merged_df['Home_Spread_Implied_Prob'] = merged_df['Home_Line_Close'].apply(_spread_implied_home_win_prob) if 'Home_Line_Close' in merged_df.columns else math.nan
-            merged_df['Home_Edge_ML'] = merged_df['Home_Win_Prob'] - merged_df['Home_Odds_Implied_Prob']
-            merged_df['Home_Edge_Spread'] = merged_df['Home_Win_Prob'] - merged_df['Home_Spread_Implied_Prob']
-            def _actual(row):
-                # Ignore placeholder games for actual result
-                if row.get('Score_Placeholder'):
-                    return math.nan
-                return 1.0 if row['Home_Score'] > row['Away_Score'] else 0.0
-            merged_df['Home_Win_Actual'] = merged_df.apply(_actual, axis=1)
-            merged_df['Pick_Edge_ML'] = merged_df.apply(lambda r: (r['Home_Edge_ML'] if r['Game_Pick'] == r['Home_Team'] else -r['Home_Edge_ML']) if not math.isnan(r.get('Home_Edge_ML', float('nan'))) else float('nan'), axis=1)
-            merged_df['Pick_Edge_Spread'] = merged_df.apply(lambda r: (r['Home_Edge_Spread'] if r['Game_Pick'] == r['Home_Team'] else -r['Home_Edge_Spread']) if not math.isnan(r.get('Home_Edge_Spread', float('nan'))) else float('nan'), axis=1)
-            # Ordered list of available columns (removed Simulated_Score)
-            prob_cols_order = ['WEEK','Home_Team','Away_Team','Home_Line_Close','Home_Odds_Close','Away_Odds_Close','Home_Win_Prob','Home_Odds_Implied_Prob','Home_Spread_Implied_Prob','Home_Edge_ML','Home_Edge_Spread','Home_Win_Actual','Game_Pick','Pick_Edge_ML','Pick_Edge_Spread','Score_Placeholder']
-            available_cols = [c for c in prob_cols_order if c in merged_df.columns]
-            probability_game_rows.extend(merged_df[available_cols].dropna(subset=['Home_Win_Actual']).to_dict('records'))
-            real_week = merged_df[(~merged_df['Score_Placeholder']) & merged_df['Home_Win_Actual'].notna()]
-            if not real_week.empty:
-                eps = 1e-6
-                p = real_week['Home_Win_Prob'].clip(eps, 1-eps)
-                brier = ((real_week['Home_Win_Prob'] - real_week['Home_Win_Actual']) ** 2).mean()
-                log_loss = -(real_week['Home_Win_Actual'] * np.log(p) + (1 - real_week['Home_Win_Actual']) * np.log(1 - p)).mean()
-                weekly_prob_metrics.append({
-                    'WEEK': week,
-                    'Games': len(real_week),
-                    'Brier': brier,
-                    'Log_Loss': log_loss,
-                    'Avg_Home_Edge_ML': real_week['Home_Edge_ML'].mean(),
-                    'Avg_Pick_Edge_ML': real_week['Pick_Edge_ML'].mean()
-                })
+        merged_df = merged_all[merged_all['WEEK'] == week].reset_index(drop=True)
+
+        if has_probs:
+            available_cols = [c for c in _PROB_COLS_ORDER if c in merged_df.columns]
+            probability_frames.append(merged_df[available_cols].dropna(subset=['Home_Win_Actual']))
+            metrics = _week_probability_metrics(week, merged_df)
+            if metrics:
+                weekly_prob_metrics.append(metrics)
 
         # Teaser evaluation only over completed (non-placeholder) games
-        merged_df = merged_df.apply(adjust_spread, axis=1)
-        completed_mask = ~merged_df['Score_Placeholder']
-        teams = merged_df.loc[completed_mask, 'Game_Pick'].unique()
+        merged_df = _grade_week(merged_df)
+        teams, won = _teaser_legs(merged_df)
         logging.info(f'{week} backtest (completed games: {len(teams)}, placeholders: {merged_df["Score_Placeholder"].sum()})')
 
         if len(teams) == 0:
             logging.warning(f"Week {week}: all games pending (placeholders). Skipping teaser evaluation.")
+            _replace_week(conn, week)
             continue
 
-        # Winner / grading only for completed games
-        merged_df['Winner'] = merged_df.apply(lambda x: (x['Home_Team'] if x['Home_Score'] > x['Away_Score'] else x['Away_Team']) if not x['Score_Placeholder'] else None, axis=1)
-        merged_df['Correct_Pick'] = merged_df.apply(lambda x: (x['Game_Pick'] == x['Winner']) if x['Winner'] else None, axis=1)
-        merged_df['Pick_Covered_Spread'] = merged_df.apply(lambda x: ((x['Game_Pick'] == x['Home_Team']) if (x['Home_Score'] + x['Home_Line_Close'] > x['Away_Score']) else (x['Game_Pick'] == x['Away_Team'])) if not x['Score_Placeholder'] else None, axis=1)
-
-        two_team_combos = list(combinations(teams, 2))
-        three_team_combos = list(combinations(teams, 3))
-        four_team_combos = list(combinations(teams, 4))
-
-        def calculate_teaser_winnings(combo, odds):
-            bet_amount = 10
-            correct = True
-            for team in combo:
-                team_row = merged_df[(merged_df['Game_Pick'] == team) & (completed_mask)]
-                if team_row.empty:
-                    correct = False
-                    break
-                correct = correct and check_teaser_pick(team_row.iloc[0], team)
-            return calculate_winnings(bet_amount, odds) if correct else 0
-
-        teaser_results = []
-        for combo in two_team_combos:
-            winnings = calculate_teaser_winnings(combo, -135)
-            teaser_results.append({'Combo': str(combo), 'Winnings': winnings, 'Type': '2-Team'})
-        for combo in three_team_combos:
-            winnings = calculate_teaser_winnings(combo, 140)
-            teaser_results.append({'Combo': str(combo), 'Winnings': winnings, 'Type': '3-Team'})
-        for combo in four_team_combos:
-            winnings = calculate_teaser_winnings(combo, 240)
-            teaser_results.append({'Combo': str(combo), 'Winnings': winnings, 'Type': '4-Team'})
-
-        teaser_df = pd.DataFrame(teaser_results)
-        if teaser_df.empty:
-            teaser_df = pd.DataFrame(columns=['Combo', 'Winnings', 'Type'])
-            teaser_df['Combo'] = "N/A"
-            teaser_df['Winnings'] = 0
-            teaser_df['Type'] = "N/A"
-            teaser_df['WEEK'] = week
-            total_teaser_wagered = 0
-            total_teaser_profit = 0
-        else:
-            teaser_df['WEEK'] = week
-            total_teaser_wagered = len(teaser_results) * 10
-            total_teaser_profit = teaser_df['Winnings'].sum() - total_teaser_wagered
-
+        summary = teasers.summarize(won, TEASER_SIZES, stake=TEASER_BET)
+        total_teaser_wagered = sum(s.wagered for s in summary)
+        total_teaser_profit = sum(s.returned for s in summary) - total_teaser_wagered
+        total_tickets += sum(s.tickets for s in summary)
+        total_winning_tickets += sum(s.wins for s in summary)
+        teaser_df = _score_teasers(teams, won) if export_combos else _summary_rows(summary)
+        teaser_df['WEEK'] = week
         teaser_df['Total_Amount_Wagered'] = total_teaser_wagered
         teaser_df['Weekly_Profit'] = total_teaser_profit
         cumulative_profit += total_teaser_profit
@@ -224,26 +317,18 @@ def backtest():
         teaser_df['Total_Profit_Over_All_Weeks'] = cumulative_profit
         teaser_df['Total_Balance'] = current_balance
 
-        with conn:
-            cur = conn.cursor()
-            cur.execute("DELETE FROM picks_results WHERE WEEK = ?", (week,))
-            cur.execute("DELETE FROM teaser_results WHERE WEEK = ?", (week,))
-            deprecated_cols = ['Off_Comp_Adv_sig','Def_Comp_Adv_sig','Off_Comp_Adv','Def_Comp_Adv']
-            drop_cols = [c for c in deprecated_cols if c in merged_df.columns]
-            if drop_cols:
-                merged_df = merged_df.drop(columns=drop_cols)
-            _ensure_sql_columns(conn, 'picks_results', merged_df)
-            _ensure_sql_columns(conn, 'teaser_results', teaser_df)
-        merged_df.to_sql('picks_results', conn, if_exists='append', index=False)
-        teaser_df.to_sql('teaser_results', conn, if_exists='append', index=False)
+        deprecated_cols = ['Off_Comp_Adv_sig','Def_Comp_Adv_sig','Off_Comp_Adv','Def_Comp_Adv']
+        drop_cols = [c for c in deprecated_cols if c in merged_df.columns]
+        if drop_cols:
+            merged_df = merged_df.drop(columns=drop_cols)
+        _replace_week(conn, week, merged_df, teaser_df)
 
     # Probability calibration aggregating only non-placeholder real games
-    if probability_game_rows:
-        game_df = pd.DataFrame(probability_game_rows)
+    game_df = pd.concat(probability_frames, ignore_index=True).infer_objects() if probability_frames else pd.DataFrame()
+    if not game_df.empty:
         real_games = game_df[(game_df['Home_Win_Actual'].notna()) & (~game_df.get('Score_Placeholder', False))]
         if not real_games.empty:
-            bins = [i/10 for i in range(11)]
-            real_games['Prob_Bin'] = real_games['Home_Win_Prob'].apply(lambda p: _bin_prob(p, bins) if not math.isnan(p) else 'nan')
+            real_games = real_games.assign(Prob_Bin=_bin_labels(real_games['Home_Win_Prob']))
             calib = real_games.groupby('Prob_Bin').agg(
                 Predicted_Mean=('Home_Win_Prob','mean'),
                 Actual_Freq=('Home_Win_Actual','mean'),
@@ -263,8 +348,8 @@ def backtest():
     final_results['Total_Profit'] = cumulative_profit
     final_results.to_sql('backtest_results', conn, if_exists='replace', index=False)
 
-    if final_results.shape[0] > 0:
-        win_percentage = final_results[final_results['Winnings'] > 0].shape[0] / final_results.shape[0]
+    if total_tickets > 0:
+        win_percentage = total_winning_tickets / total_tickets
         print(f"Individual Bet Win Percentage: {win_percentage * 100:.2f}%")
     else:
         print(f"[{time.strftime('%H:%M:%S')}] No bet results available to calculate win percentage.")
@@ -272,36 +357,13 @@ def backtest():
     conn.close()
     print(f"[{time.strftime('%H:%M:%S')}] backtest finished")
 
-def _ensure_sql_columns(conn, table_name: str, df: pd.DataFrame):
-    """Ensure all columns in df exist in SQLite table; add if missing."""
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-    if cur.fetchone() is None:
-        return  # table will be created automatically by to_sql
-    cur.execute(f"PRAGMA table_info({table_name})")
-    existing = {row[1] for row in cur.fetchall()}
-    add_cols = [c for c in df.columns if c not in existing]
-    if not add_cols:
-        return
-    def _col_type(series: pd.Series):
-        if pd.api.types.is_integer_dtype(series):
-            return 'INTEGER'
-        if pd.api.types.is_float_dtype(series):
-            return 'REAL'
-        if pd.api.types.is_bool_dtype(series):
-            return 'INTEGER'
-        return 'TEXT'
-    for col in add_cols:
-        col_type = _col_type(df[col])
-        logging.info(f"Altering {table_name}: adding column {col} {col_type}")
-        try:
-            cur.execute(f"ALTER TABLE {table_name} ADD COLUMN {col} {col_type}")
-        except Exception as e:
-            if 'duplicate column name' in str(e).lower():
-                logging.debug(f"(suppressed duplicate) Column {col} already exists in {table_name}")
-            else:
-                raise
-    conn.commit()
+def _schema_columns(conn, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Trim df to the columns of the migrated table (see panda_picks.db.migrations)."""
+    cols = table_columns(conn, table_name)
+    extra = [c for c in df.columns if c.lower() not in cols]
+    if extra:
+        logging.debug(f"{table_name}: not persisting columns outside schema: {extra}")
+    return df[[c for c in df.columns if c.lower() in cols]]
 
 if __name__ == "__main__":
     backtest()
\ No newline at end of file
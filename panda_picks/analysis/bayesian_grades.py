@@ -1,8 +1,10 @@
 import logging
+from dataclasses import dataclass
 import pandas as pd
 import numpy as np
 import time  # added for timing
 from panda_picks.config.settings import Settings
+from panda_picks.db import watermarks
 
 METRICS = ['OVR','OFF','DEF','PASS','PBLK','RECV','RUN','RBLK','PRSH','COV','RDEF','TACK']
 
@@ -36,35 +38,37 @@ def _extract_week_number(conn) -> int:
     return max(1, week_num)
 
 
-def recompute_blended_grades(conn):
-    start_ts = time.time()
-    logging.info("Bayes: recompute_blended_grades invoked")
-    if not Settings.USE_BAYES_GRADES:
-        logging.info("Bayes: skipping (USE_BAYES_GRADES disabled)")
-        return
-    if not _table_exists(conn, PRIOR_TABLE) or not _table_exists(conn, CURRENT_TABLE):
-        logging.warning("Bayes: prior or current table missing; aborting blend")
-        return
+def _blend_input_hash(conn, prior: pd.DataFrame, current: pd.DataFrame) -> str:
+    """Fingerprint of every blend input: both grade tables, completed scores and the Bayes knobs.
+    Line/odds updates on unplayed games leave it unchanged."""
+    scores = []
+    if _table_exists(conn, 'spreads'):
+        scores = conn.execute("SELECT WEEK, Home_Team, Away_Team, Home_Score, Away_Score FROM spreads "
+                              "WHERE Home_Score IS NOT NULL AND Away_Score IS NOT NULL").fetchall()
+    knobs = {k: getattr(Settings, k) for k in (
+        'BAYES_K_VALUES', 'BAYES_K_SCALE', 'BAYES_MAX_RAMP_WEEK', 'BAYES_CAP_WEIGHT_EARLY',
+        'BAYES_CURRENT_WEIGHT_MULTIPLIER', 'BAYES_MIN_CURRENT_WEIGHT')}
+    return watermarks.combine(watermarks.frame_fingerprint(prior), watermarks.frame_fingerprint(current),
+                              watermarks.row_fingerprint(scores), watermarks.value_fingerprint(knobs))
+
+
+@dataclass
+class BlendInputs:
+    """Blend inputs as aligned arrays: one row per prior team, one column per METRICS entry."""
+    teams: np.ndarray       # (T,) team codes in prior-table order
+    prior: np.ndarray       # (T, M) prior-season grades, NaN where missing
+    current: np.ndarray     # (T, M) current-season grades, NaN where missing
+    games: np.ndarray       # (T,) completed games per team
+    week: int
+
+
+def _read_grades(conn):
     prior = pd.read_sql_query(f"SELECT * FROM {PRIOR_TABLE}", conn)
     current = pd.read_sql_query(f"SELECT * FROM {CURRENT_TABLE}", conn)
-    logging.info(f"Bayes: loaded prior rows={len(prior)} current rows={len(current)}")
-    if prior.empty or current.empty:
-        logging.warning("Bayes: empty prior or current dataset; aborting blend")
-        return
-    # Normalize team column to Home_Team like elsewhere
-    for df in (prior, current):
-        if 'TEAM' in df.columns:
-            df.rename(columns={'TEAM':'Home_Team'}, inplace=True)
-        elif 'Team' in df.columns:
-            df.rename(columns={'Team':'Home_Team'}, inplace=True)
-    # Ensure all expected metric columns exist (add NaN where missing) to avoid KeyError when subset provided (tests)
-    for df_name, df in [('prior', prior), ('current', current)]:
-        missing = [m for m in METRICS if m not in df.columns]
-        if missing:
-            logging.debug(f"Bayes: adding missing metric cols to {df_name}: {missing}")
-        for m in missing:
-            df[m] = np.nan
-    # Determine games played per team
+    return prior, current
+
+
+def _games_played(conn) -> dict:
     games_played = {}
     try:
         if _table_exists(conn, 'spreads'):
@@ -77,70 +81,144 @@ def recompute_blended_grades(conn):
                 games_played = {k:int(v) for k,v in counts.items()}
     except Exception as e:
         logging.warning(f"Bayes: error deriving games_played ({e})")
-    current_week = _extract_week_number(conn)
-    rows = []
-    k_values = Settings.BAYES_K_VALUES
+    return games_played
+
+
+def _blend_inputs(conn, prior: pd.DataFrame, current: pd.DataFrame) -> BlendInputs:
+    """Align prior and current grades on the prior teams (left join) as float matrices."""
+    frames = []
+    for df_name, df in [('prior', prior), ('current', current)]:
+        # Normalize team column to Home_Team like elsewhere
+        if 'TEAM' in df.columns:
+            df = df.rename(columns={'TEAM':'Home_Team'})
+        elif 'Team' in df.columns:
+            df = df.rename(columns={'Team':'Home_Team'})
+        # Ensure all expected metric columns exist (NaN where missing) so subsets (tests) work
+        missing = [m for m in METRICS if m not in df.columns]
+        if missing:
+            logging.debug(f"Bayes: adding missing metric cols to {df_name}: {missing}")
+        frames.append(df.reindex(columns=['Home_Team'] + METRICS))
+    merged = frames[0].merge(frames[1], on='Home_Team', how='left', suffixes=('_PRIOR','_CUR'))
+    games_played = _games_played(conn)
+    return BlendInputs(
+        teams=merged['Home_Team'].to_numpy(),
+        prior=merged[[f'{m}_PRIOR' for m in METRICS]].apply(pd.to_numeric, errors='coerce').to_numpy(float),
+        current=merged[[f'{m}_CUR' for m in METRICS]].apply(pd.to_numeric, errors='coerce').to_numpy(float),
+        games=merged['Home_Team'].map(games_played).fillna(0).to_numpy(float),
+        week=_extract_week_number(conn),
+    )
+
+
+def blend(inputs: BlendInputs, k_scale=None):
+    """Posterior grades for every team x metric at once.
+
+    ``k_scale`` defaults to ``Settings.BAYES_K_SCALE``; pass an array of S scales to get
+    (S, T, M) results for a sweep in one call. Returns (n_eff, k, effective_k, weight, blended):
+    ``n_eff`` is (T, M) games counted per cell (0 where the current grade is missing), ``k`` the
+    (M,) base K vector, and the rest broadcast over the scale axis.
+    """
+    k = np.array([float(Settings.BAYES_K_VALUES.get(m, 5.0)) for m in METRICS])
+    scale = np.maximum(1e-6, np.asarray(Settings.BAYES_K_SCALE if k_scale is None else k_scale, dtype=float))
+    effective_k = k * scale[..., None, None]            # (..., 1, M)
+    has_cur = ~np.isnan(inputs.current)
+    n_eff = np.where(has_cur, inputs.games[:, None], 0.0)
+    denom = n_eff + effective_k
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = np.where(denom > 0, n_eff / denom, 0.0)
+    weight = weight * max(0.0, Settings.BAYES_CURRENT_WEIGHT_MULTIPLIER)
     cap_week = Settings.BAYES_MAX_RAMP_WEEK
-    early_cap = Settings.BAYES_CAP_WEIGHT_EARLY
-
-    merged = prior[['Home_Team'] + METRICS].merge(current[['Home_Team'] + METRICS], on='Home_Team', how='left', suffixes=('_PRIOR','_CUR'))
-    logging.info(f"Bayes: merging prior+current teams merged_rows={len(merged)} week={current_week}")
-    for _, r in merged.iterrows():
-        team = r['Home_Team']
-        n = games_played.get(team, 0)
-        for m in METRICS:
-            prior_val = r.get(f'{m}_PRIOR', np.nan)
-            cur_val = r.get(f'{m}_CUR', np.nan)
-            n_eff = 0 if pd.isna(cur_val) else n
-            base_k = float(k_values.get(m, 5.0))
-            effective_k = base_k * max(1e-6, Settings.BAYES_K_SCALE)
-            weight_cur = n_eff / (n_eff + effective_k) if (n_eff + effective_k) > 0 else 0.0
-            weight_cur *= max(0.0, Settings.BAYES_CURRENT_WEIGHT_MULTIPLIER)
-            if current_week <= cap_week:
-                ramp_frac = current_week / cap_week
-                max_allowed = early_cap * ramp_frac
-                if weight_cur > max_allowed:
-                    weight_cur = max_allowed
-            # Enforce minimum current season floor only after ramp period
-            if (current_week > cap_week) and (n_eff > 0) and (weight_cur < Settings.BAYES_MIN_CURRENT_WEIGHT):
-                logging.debug(f"Bayes: elevating weight floor team={team} metric={m} from {weight_cur:.4f} to floor {Settings.BAYES_MIN_CURRENT_WEIGHT:.4f}")
-                weight_cur = Settings.BAYES_MIN_CURRENT_WEIGHT
-            if weight_cur > 1:
-                weight_cur = 1.0
-            if weight_cur < 0:
-                weight_cur = 0.0
-            if pd.isna(prior_val) and pd.isna(cur_val):
-                post = np.nan
-            elif pd.isna(prior_val):
-                post = cur_val
-            elif pd.isna(cur_val) or weight_cur == 0:
-                post = prior_val
-            else:
-                post = weight_cur * cur_val + (1 - weight_cur) * prior_val
-            rows.append({
-                'Home_Team': team,
-                'Metric': m,
-                'Prior': prior_val,
-                'Current': cur_val,
-                'Games_Played': n_eff,
-                'k_value': base_k,
-                'Effective_k': effective_k,
-                'Weight_Current': weight_cur,
-                'Blended': post,
-                'Week_Number': current_week
-            })
-    blend_df = pd.DataFrame(rows)
-    if blend_df.empty:
+    if inputs.week <= cap_week:
+        # Ramp cap: current weight limited to early_cap * week / cap_week
+        weight = np.minimum(weight, Settings.BAYES_CAP_WEIGHT_EARLY * inputs.week / cap_week)
+    else:
+        # Minimum current season floor only after the ramp period
+        floor = Settings.BAYES_MIN_CURRENT_WEIGHT
+        weight = np.where((n_eff > 0) & (weight < floor), floor, weight)
+    weight = np.clip(weight, 0.0, 1.0)
+    prior, current = inputs.prior, inputs.current
+    mixed = has_cur & ~np.isnan(prior) & (weight != 0)
+    blended = np.where(mixed, weight * current + (1 - weight) * prior, np.where(np.isnan(prior), current, prior))
+    return n_eff, k, effective_k[..., 0, :], weight, blended
+
+
+def _wide_frame(teams: np.ndarray, blended: np.ndarray) -> pd.DataFrame:
+    """One row per team (sorted, duplicates averaged); all-NaN teams and metrics dropped."""
+    wide = pd.DataFrame(blended, columns=METRICS)
+    wide.insert(0, 'Home_Team', teams)
+    wide = wide.groupby('Home_Team', sort=True).mean().dropna(axis=0, how='all').dropna(axis=1, how='all')
+    return wide.reset_index()
+
+
+def blend_k_scales(conn, scales) -> pd.DataFrame:
+    """Wide blended grades for each BAYES_K_SCALE in ``scales`` (column K_Scale), computed
+    from one read of the inputs without touching the blended tables."""
+    prior, current = _read_grades(conn)
+    if prior.empty or current.empty:
+        return pd.DataFrame()
+    inputs = _blend_inputs(conn, prior, current)
+    scales = np.asarray(scales, dtype=float)
+    blended = blend(inputs, scales)[4]
+    frames = []
+    for scale, values in zip(scales, blended):
+        wide = _wide_frame(inputs.teams, values)
+        wide.insert(0, 'K_Scale', scale)
+        frames.append(wide)
+    return pd.concat(frames, ignore_index=True)
+
+
+def recompute_blended_grades(conn, incremental: bool = False):
+    """Blend prior and current grades into blended_grades / blended_grades_wide.
+
+    With ``incremental=True`` the blend is skipped when its inputs (see _blend_input_hash)
+    are unchanged since the last recompute and both output tables exist.
+    """
+    start_ts = time.time()
+    logging.info("Bayes: recompute_blended_grades invoked")
+    if not Settings.USE_BAYES_GRADES:
+        logging.info("Bayes: skipping (USE_BAYES_GRADES disabled)")
+        return
+    if not _table_exists(conn, PRIOR_TABLE) or not _table_exists(conn, CURRENT_TABLE):
+        logging.warning("Bayes: prior or current table missing; aborting blend")
+        return
+    prior, current = _read_grades(conn)
+    input_hash = _blend_input_hash(conn, prior, current)
+    if incremental:
+        if (_table_exists(conn, BLENDED_TABLE) and _table_exists(conn, BLENDED_WIDE_TABLE)
+                and not watermarks.stale_weeks(conn, BLENDED_TABLE, 0, {0: input_hash})):
+            logging.info("Bayes: inputs unchanged since last blend; skipping recompute")
+            return
+    logging.info(f"Bayes: loaded prior rows={len(prior)} current rows={len(current)}")
+    if prior.empty or current.empty:
+        logging.warning("Bayes: empty prior or current dataset; aborting blend")
+        return
+    inputs = _blend_inputs(conn, prior, current)
+    logging.info(f"Bayes: merging prior+current teams merged_rows={len(inputs.teams)} week={inputs.week}")
+    n_eff, k, effective_k, weight, blended = blend(inputs)
+    n_teams, n_metrics = blended.shape
+    if blended.size == 0:
         logging.warning("Bayes: produced 0 blended rows")
         return
-    zero_weight = (blend_df['Weight_Current'] == 0).sum()
-    avg_weight = blend_df['Weight_Current'].mean()
+    # Long version (one row per team x metric, team-major) from the same arrays as the wide one
+    blend_df = pd.DataFrame({
+        'Home_Team': np.repeat(inputs.teams, n_metrics),
+        'Metric': np.tile(METRICS, n_teams),
+        'Prior': inputs.prior.ravel(),
+        'Current': inputs.current.ravel(),
+        'Games_Played': n_eff.astype(int).ravel(),
+        'k_value': np.tile(k, n_teams),
+        'Effective_k': np.tile(effective_k, n_teams),
+        'Weight_Current': weight.ravel(),
+        'Blended': blended.ravel(),
+        'Week_Number': inputs.week,
+    })
+    zero_weight = int((weight == 0).sum())
+    avg_weight = float(weight.mean())
     logging.info(f"Bayes: writing blended_grades rows={len(blend_df)} zero_weight_rows={zero_weight} avg_weight={avg_weight:.4f}")
     blend_df.to_sql(BLENDED_TABLE, conn, if_exists='replace', index=False)
     # Wide version (one row per team)
-    wide = blend_df.pivot_table(index='Home_Team', columns='Metric', values='Blended').reset_index()
-    wide.rename_axis(None, axis=1, inplace=True)
+    wide = _wide_frame(inputs.teams, blended)
     wide.to_sql(BLENDED_WIDE_TABLE, conn, if_exists='replace', index=False)
+    watermarks.record(conn, BLENDED_TABLE, 0, {0: input_hash})
     elapsed = (time.time() - start_ts) * 1000
     logging.info(f"Bayes: wrote wide table rows={len(wide)} elapsed_ms={elapsed:.1f}")
 
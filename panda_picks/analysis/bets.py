@@ -28,7 +28,7 @@ def generate_combos(weeks=['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '1
         print(f"[{time.strftime('%H:%M:%S')}] Processing week {week}")
         conn = get_connection()
         # List of teams from the picks table
-        df = pd.read_sql_query(f"SELECT * FROM picks WHERE week = 'WEEK{week}'", conn)
+        df = pd.read_sql_query("SELECT * FROM picks WHERE week_num = ?", conn, params=[int(week)])
         teams = df['Game_Pick'].unique()
 
         # Adjust the spread for each team
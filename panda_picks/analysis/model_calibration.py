@@ -39,7 +39,7 @@ def _collect_training_frame(conn: sqlite3.Connection, season: int, through_week:
     q = (
         f"SELECT {sel_cols}, s.Home_Line_Close, s.Home_Score, s.Away_Score "
         "FROM matchup_features mf "
-        "JOIN spreads s ON s.WEEK = ('WEEK' || mf.week) AND s.Home_Team = mf.Home_Team AND s.Away_Team = mf.Away_Team "
+        "JOIN spreads s ON s.week_num = mf.week AND s.Home_Team = mf.Home_Team AND s.Away_Team = mf.Away_Team "
         "WHERE mf.season = ? AND mf.week < ? AND s.Home_Score IS NOT NULL AND s.Away_Score IS NOT NULL"
     )
     df = pd.read_sql_query(q, conn, params=[season, through_week])
@@ -11,7 +11,7 @@ from sklearn.metrics import brier_score_loss, log_loss, roc_auc_score
 from sklearn.preprocessing import StandardScaler
 
 from panda_picks.db.database import get_connection
-from panda_picks.analysis.picks import ADVANTAGE_BASE_COLUMNS
+from panda_picks.analysis.utils.advantages import compute_advantages, compute_mismatches
 
 FEATURES = [
     'Overall_Adv', 'Offense_Adv', 'Defense_Adv', 'Pass_Rush_Adv', 'Coverage_Adv',
@@ -22,24 +22,10 @@ FEATURES = [
 
 
 def _compute_advantages(df: pd.DataFrame) -> pd.DataFrame:
-    # ADVANTAGE_BASE_COLUMNS imported from picks module (list of tuples name, lambda)
-    for new_col, func in ADVANTAGE_BASE_COLUMNS:
-        if new_col not in df.columns:  # avoid recomputation collisions
-            df[new_col] = df.apply(func, axis=1)
+    # Shared vectorized spec (see analysis.utils.advantages); keep pre-existing columns
+    df = compute_advantages(df, overwrite=False)
     # Engineered mismatch features
-    if 'Pass_Block_Adv' in df.columns and 'Pass_Rush_Adv' in df.columns:
-        df['Pressure_Mismatch'] = df['Pass_Block_Adv'] - df['Pass_Rush_Adv']
-    else:
-        df['Pressure_Mismatch'] = 0.0
-    if 'Receiving_Adv' in df.columns and 'Coverage_Adv' in df.columns:
-        df['Explosive_Pass_Mismatch'] = df['Receiving_Adv'] - df['Coverage_Adv']
-    else:
-        df['Explosive_Pass_Mismatch'] = 0.0
-    if 'Run_Block_Adv' in df.columns and 'Run_Defense_Adv' in df.columns:
-        df['Script_Control_Mismatch'] = df['Run_Block_Adv'] - df['Run_Defense_Adv']
-    else:
-        df['Script_Control_Mismatch'] = 0.0
-    return df
+    return compute_mismatches(df)
 
 
 def build_dataset(conn) -> pd.DataFrame:
@@ -2,12 +2,14 @@ import pandas as pd
 import numpy as np
 import logging
 import time
-from datetime import datetime
 
+from panda_picks.db import watermarks
 from panda_picks.db.database import get_connection
+from panda_picks.db.migrations import table_columns
 from panda_picks import config
 from panda_picks.config.settings import Settings
-from panda_picks.analysis.utils.probability import calculate_win_probability
+from panda_picks.analysis.utils.probability import win_probability_array
+from panda_picks.analysis.utils.advantages import ADVANTAGE_SPEC, compute_advantages, compute_mismatches, row_functions
 # Added Bayesian blending imports
 from panda_picks.analysis.bayesian_grades import recompute_blended_grades, load_blended_wide
 # NEW: ensure prior snapshot exists automatically
@@ -34,23 +36,25 @@ LOGIT_FEATURES = [
 ]
 _LOGIT_MODEL = None  # cached model artifacts
 
-ADVANTAGE_BASE_COLUMNS = [
-    ('Overall_Adv', lambda r: r['OVR'] - r['OPP_OVR']),
-    ('Offense_Adv', lambda r: r['OFF'] - r['OPP_DEF']),
-    ('Defense_Adv', lambda r: r['DEF'] - r['OPP_OFF']),
-    ('Passing_Adv', lambda r: r['PASS'] - r['OPP_COV']),
-    ('Pass_Block_Adv', lambda r: r['PBLK'] - r['OPP_PRSH']),
-    ('Receiving_Adv', lambda r: r['RECV'] - r['OPP_COV']),
-    ('Running_Adv', lambda r: r['RUN'] - r['OPP_RDEF']),
-    ('Run_Block_Adv', lambda r: r['RBLK'] - r['OPP_RDEF']),
-    ('Run_Defense_Adv', lambda r: r['RDEF'] - r['OPP_RUN']),
-    ('Pass_Rush_Adv', lambda r: r['PRSH'] - r['OPP_PBLK']),
-    ('Coverage_Adv', lambda r: r['COV'] - r['OPP_RECV']),
-    ('Tackling_Adv', lambda r: r['TACK'] - r['OPP_RUN'])
-]
+# Legacy (name, row lambda) pairs derived from the declarative spec; prefer compute_advantages
+ADVANTAGE_BASE_COLUMNS = row_functions(ADVANTAGE_SPEC)
 
 PRIMARY_ADV_COLS = ['Overall_Adv', 'Offense_Adv', 'Defense_Adv']
 
+PICK_OUTPUT_COLS = [
+    'WEEK', 'Home_Team', 'Away_Team', 'Home_Line_Close', 'Away_Line_Close', 'Home_Odds_Close', 'Away_Odds_Close',
+    'Game_Pick', 'Overall_Adv', 'Offense_Adv', 'Defense_Adv',
+    'Overall_Adv_sig', 'Offense_Adv_sig', 'Defense_Adv_sig', 'Blended_Adv_sig',
+    'Pressure_Mismatch', 'Explosive_Pass_Mismatch', 'Script_Control_Mismatch',
+    'Off_Comp_Diff','Def_Comp_Diff','Net_Composite','Net_Composite_norm','Blended_Adv',
+    # Phase 3 additions
+    'Expected_Margin','Cover_Prob','Model_Edge','Confidence_Score',
+    'Home_Win_Prob', 'Away_Win_Prob', 'Home_ML_Implied', 'Away_ML_Implied', 'Pick_Prob', 'Pick_Implied_Prob', 'Pick_Edge', 'Pick_Cover_Prob'
+]
+
+# Integer week helper column used to process several weeks in one frame (never persisted)
+WEEK_KEY = '_week_num'
+
 # ---- Schema helpers ---- #
 
 def _round_numeric_cols(df: pd.DataFrame, decimals: int = 3) -> pd.DataFrame:
@@ -62,26 +66,6 @@ def _round_numeric_cols(df: pd.DataFrame, decimals: int = 3) -> pd.DataFrame:
         pass
     return df
 
-# ---- Schema helpers ---- #
-
-def _table_exists(conn, table_name: str) -> bool:
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=\"" + table_name + "\"")
-    return cur.fetchone() is not None
-
-def _ensure_columns(conn, table_name: str, cols_types: dict):
-    if not _table_exists(conn, table_name):
-        return
-    cur = conn.cursor()
-    cur.execute(f"PRAGMA table_info({table_name})")
-    existing = {row[1] for row in cur.fetchall()}
-    for col, col_type in cols_types.items():
-        if col not in existing:
-            logging.info(f"Altering table {table_name}: adding missing column {col} {col_type}")
-            cur.execute(f"ALTER TABLE {table_name} ADD COLUMN {col} {col_type}")
-    conn.commit()
-
-
 def _classify_significance(df: pd.DataFrame) -> pd.DataFrame:
     # Always classify the classic three
     for col in PRIMARY_ADV_COLS:
@@ -94,14 +78,18 @@ def _classify_significance(df: pd.DataFrame) -> pd.DataFrame:
             ['home significant', 'away significant'],
             default='insignificant'
         )
-    # Also classify blended if available and non-null in this dataset
+    # Also classify blended if available and non-null in this dataset (per week for multi-week frames)
     if 'Blended_Adv' in df.columns and df['Blended_Adv'].notna().any():
         bthresh = SIGNIFICANCE_THRESHOLDS.get('Blended_Adv', SIGNIFICANCE_THRESHOLDS.get('Overall_Adv', 0))
-        df['Blended_Adv_sig'] = np.select(
+        sig = np.select(
             [df['Blended_Adv'] >= bthresh, df['Blended_Adv'] <= -bthresh],
             ['home significant', 'away significant'],
             default='insignificant'
         )
+        if WEEK_KEY in df.columns:
+            has_blend = df['Blended_Adv'].notna().groupby(df[WEEK_KEY]).transform('any').to_numpy()
+            sig = np.where(has_blend, sig, None)
+        df['Blended_Adv_sig'] = sig
     return df
 
 
@@ -158,12 +146,9 @@ def _compute_probabilities(df: pd.DataFrame, conn=None) -> pd.DataFrame:
         df['Away_Win_Prob'] = 1 - df['Home_Win_Prob']
     else:
         # Fallback simple logistic preferring Blended_Adv when available per-row
-        def _adv_for_row(r):
-            bv = r.get('Blended_Adv')
-            if pd.notna(bv):
-                return float(bv)
-            return float(r.get('Overall_Adv', 0.0))
-        df['Home_Win_Prob'] = df.apply(lambda r: calculate_win_probability(_adv_for_row(r)), axis=1)
+        overall = df['Overall_Adv'] if 'Overall_Adv' in df.columns else pd.Series(0.0, index=df.index)
+        adv = df['Blended_Adv'].where(df['Blended_Adv'].notna(), overall) if 'Blended_Adv' in df.columns else overall
+        df['Home_Win_Prob'] = win_probability_array(adv)
         df['Away_Win_Prob'] = 1 - df['Home_Win_Prob']
     return df
 
@@ -172,29 +157,33 @@ def _decide_picks(df: pd.DataFrame) -> pd.DataFrame:
     """Assign Game_Pick based on one-sided significant advantages.
     Prioritize blended significance if available alongside Offense/Defense.
     """
-    pick_side = []
-    use_cols = ['Offense_Adv', 'Defense_Adv']
+    lead = df['Overall_Adv_sig'] if 'Overall_Adv_sig' in df.columns else pd.Series('insignificant', index=df.index)
     if 'Blended_Adv_sig' in df.columns:
-        use_cols = ['Blended_Adv'] + use_cols
-    else:
-        use_cols = ['Overall_Adv'] + use_cols
-    for _, row in df.iterrows():
-        signals = [row.get(f'{c}_sig', 'insignificant') for c in use_cols]
-        home_sig = any(s == 'home significant' for s in signals)
-        away_sig = any(s == 'away significant' for s in signals)
-        if home_sig and not away_sig:
-            pick_side.append(row['Home_Team'])
-        elif away_sig and not home_sig:
-            pick_side.append(row['Away_Team'])
-        else:
-            pick_side.append('No Pick')
-    df['Game_Pick'] = pick_side
+        lead = df['Blended_Adv_sig'].where(df['Blended_Adv_sig'].notna(), lead)
+    signals = [lead] + [df[f'{c}_sig'] for c in ['Offense_Adv', 'Defense_Adv'] if f'{c}_sig' in df.columns]
+    home_sig = np.logical_or.reduce([(s == 'home significant').to_numpy() for s in signals])
+    away_sig = np.logical_or.reduce([(s == 'away significant').to_numpy() for s in signals])
+    df['Game_Pick'] = np.select(
+        [home_sig & ~away_sig, away_sig & ~home_sig],
+        [df['Home_Team'], df['Away_Team']],
+        default='No Pick'
+    )
     return df
 
 
+def _pick_side_values(df: pd.DataFrame, home_col: str, away_col: str) -> np.ndarray:
+    """Select home_col/away_col per row according to Game_Pick (NaN when no side matches)."""
+    return np.select(
+        [(df['Game_Pick'] == df['Home_Team']).to_numpy(), (df['Game_Pick'] == df['Away_Team']).to_numpy()],
+        [pd.to_numeric(df[home_col], errors='coerce').to_numpy(dtype=float),
+         pd.to_numeric(df[away_col], errors='coerce').to_numpy(dtype=float)],
+        default=np.nan
+    )
+
+
 def _compute_market_and_edges(df: pd.DataFrame) -> pd.DataFrame:
     # Moneyline implied probabilities
-    df['Home_ML_Implied'], df['Away_ML_Implied'] = zip(*df.apply(lambda r: _implied_probs(r.get('Home_Odds_Close'), r.get('Away_Odds_Close')), axis=1))
+    df['Home_ML_Implied'], df['Away_ML_Implied'] = _implied_probs_array(df.get('Home_Odds_Close'), df.get('Away_Odds_Close'), len(df))
     # Edge for pick side (will compute after pick chosen, so placeholder here)
     return df
 
@@ -208,14 +197,14 @@ def _compute_cover_probabilities(df: pd.DataFrame) -> pd.DataFrame:
     df['Home_Cover_Prob'] = 1 - _norm_cdf(-home_line, mu=mean_margin, sigma=MARGIN_SD)
     df['Away_Cover_Prob'] = 1 - df['Home_Cover_Prob']  # symmetry assumption
     # Pick cover probability
-    df['Pick_Cover_Prob'] = df.apply(lambda r: r['Home_Cover_Prob'] if r['Game_Pick'] == r['Home_Team'] else (r['Away_Cover_Prob'] if r['Game_Pick'] == r['Away_Team'] else np.nan), axis=1)
+    df['Pick_Cover_Prob'] = _pick_side_values(df, 'Home_Cover_Prob', 'Away_Cover_Prob')
     return df
 
 
 def _apply_edge_filter(df: pd.DataFrame) -> pd.DataFrame:
     # After picks decided; compute pick-specific edge
-    df['Pick_Prob'] = df.apply(lambda r: r['Home_Win_Prob'] if r['Game_Pick'] == r['Home_Team'] else (r['Away_Win_Prob'] if r['Game_Pick'] == r['Away_Team'] else np.nan), axis=1)
-    df['Pick_Implied_Prob'] = df.apply(lambda r: r['Home_ML_Implied'] if r['Game_Pick'] == r['Home_Team'] else (r['Away_ML_Implied'] if r['Game_Pick'] == r['Away_Team'] else np.nan), axis=1)
+    df['Pick_Prob'] = _pick_side_values(df, 'Home_Win_Prob', 'Away_Win_Prob')
+    df['Pick_Implied_Prob'] = _pick_side_values(df, 'Home_ML_Implied', 'Away_ML_Implied')
     df['Pick_Edge'] = df['Pick_Prob'] - df['Pick_Implied_Prob']
     before = len(df)
     df = df[df['Pick_Edge'].abs() >= EDGE_MIN]
@@ -223,7 +212,7 @@ def _apply_edge_filter(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def _prepare_grades(conn):
+def _prepare_grades(conn, incremental: bool = False):
     grades = pd.read_sql_query("SELECT * FROM grades", conn)
     # Normalize team column names (handle both TEAM / Team)
     if 'TEAM' in grades.columns:
@@ -237,7 +226,7 @@ def _prepare_grades(conn):
     try:
         prior_rows = ensure_prior_populated()
         logging.info(f"Bayes: ensure_prior_populated -> {prior_rows} rows in grades_prior")
-        recompute_blended_grades(conn)
+        recompute_blended_grades(conn, incremental=incremental)
         blended = load_blended_wide(conn)
         if not blended.empty:
             metric_cols = [c for c in ['OVR','OFF','DEF','PASS','PBLK','RECV','RUN','RBLK','PRSH','COV','RDEF','TACK'] if c in grades.columns]
@@ -280,22 +269,19 @@ def _prepare_grades(conn):
 
 
 def _calculate_advantages(matchups: pd.DataFrame) -> pd.DataFrame:
-    for new_col, func in ADVANTAGE_BASE_COLUMNS:
-        matchups[new_col] = matchups.apply(func, axis=1)
+    matchups = compute_advantages(matchups)
     # Engineered interaction / mismatch features
-    matchups['Pressure_Mismatch'] = matchups['Pass_Block_Adv'] - matchups['Pass_Rush_Adv']
-    matchups['Explosive_Pass_Mismatch'] = matchups['Receiving_Adv'] - matchups['Coverage_Adv']
-    matchups['Script_Control_Mismatch'] = matchups['Run_Block_Adv'] - matchups['Run_Defense_Adv']
-    return matchups
+    return compute_mismatches(matchups)
 
 
 def _load_best_thresholds(conn):
     """Load best thresholds from threshold_tuning_results if available.
-    Ordering priority: ROI_per_Pick desc, Accuracy desc, Picks desc.
+    Only grid-search rows count: sweep rows (Sweep_Id set) were scored under other
+    K/edge/blend/max-picks settings. Ordering priority: ROI_per_Pick desc, Accuracy desc, Picks desc.
     Falls back silently if table or columns missing.
     """
     try:
-        df = pd.read_sql_query("SELECT * FROM threshold_tuning_results", conn)
+        df = pd.read_sql_query("SELECT * FROM threshold_tuning_results WHERE Sweep_Id IS NULL", conn)
         if df.empty:
             return
         sort_cols = [c for c in ['ROI_per_Pick', 'Accuracy', 'Picks'] if c in df.columns]
@@ -340,6 +326,32 @@ def _implied_probs(home_odds, away_odds):
         return (np.nan, np.nan)
     return (raw_home / total, raw_away / total)
 
+def _implied_probs_array(home_odds, away_odds, n: int):
+    """Column-wise _implied_probs: vig-free (home, away) probabilities from American odds."""
+    def _raw(odds):
+        if odds is None:
+            return np.full(n, np.nan)
+        o = pd.to_numeric(pd.Series(odds), errors='coerce').to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dec = np.where(o > 0, 1 + o / 100.0, 1 + 100.0 / np.abs(o))
+            return 1 / dec
+    raw_home, raw_away = _raw(home_odds), _raw(away_odds)
+    h_nan, a_nan = np.isnan(raw_home), np.isnan(raw_away)
+    total = raw_home + raw_away
+    home = np.full(n, np.nan)
+    away = np.full(n, np.nan)
+    both = ~h_nan & ~a_nan & (total != 0)
+    home[both] = raw_home[both] / total[both]
+    away[both] = raw_away[both] / total[both]
+    # Handle single-sided availability
+    only_away = h_nan & ~a_nan
+    home[only_away] = 1 - raw_away[only_away]
+    away[only_away] = raw_away[only_away]
+    only_home = a_nan & ~h_nan
+    home[only_home] = raw_home[only_home]
+    away[only_home] = 1 - raw_home[only_home]
+    return home, away
+
 def _norm_cdf(x, mu=0.0, sigma=1.0):
     try:
         return 0.5 * (1 + np.math.erf((x - mu) / (sigma * np.sqrt(2))))
@@ -347,12 +359,18 @@ def _norm_cdf(x, mu=0.0, sigma=1.0):
         return np.nan
 
 
-def makePicks(weeks: list[int] | list[str] | None = None):
+def makePicks(weeks: list[int] | list[str] | None = None, incremental: bool = False):
     """Generate picks for specified weeks (default all weeks 1..18).
 
+    All requested weeks are loaded with a single spreads query and scored as one frame;
+    only model gating and MAX_PICKS_PER_WEEK trimming run per week.
+
     Args:
         weeks: Optional list of week numbers (ints) or strings (e.g., ['2','3']).
                If None, processes all weeks 1..18.
+        incremental: Only rescore weeks whose inputs changed since their last run
+               (see _pick_input_hashes); other weeks keep their stored picks. Input
+               hashes are recorded for every scored week either way.
     """
     print(f"[{time.strftime('%H:%M:%S')}] makePicks started")
     logging.basicConfig(level=logging.INFO)
@@ -376,109 +394,15 @@ def makePicks(weeks: list[int] | list[str] | None = None):
     try:
         # Dynamically load tuned thresholds if available
         _load_best_thresholds(conn)
-        grades, opp_grades = _prepare_grades(conn)
-
-        for w in week_numbers:
-            w_str = str(w)
-            spreads_query = f"SELECT * FROM spreads WHERE WEEK = 'WEEK{w_str}'"
-            matchups = pd.read_sql_query(spreads_query, conn)
-            if matchups.empty:
-                logging.info(f"Week {w_str}: no spreads data; skipping")
-                continue
-            # Normalize team codes from spreads to be resilient across feeds
-            matchups = normalize_df_team_cols(matchups, ['Home_Team','Away_Team'])
-            matchups = pd.merge(matchups, grades, on='Home_Team', how='left')
-            matchups = pd.merge(matchups, opp_grades, on='Away_Team', how='left')
-
-            for col in matchups.columns:
-                if col not in ['Home_Team', 'Away_Team', 'WEEK']:
-                    matchups[col] = pd.to_numeric(matchups[col], errors='coerce')
-
-            results = _calculate_advantages(matchups.copy())
-            # Attach Phase 2 features
-            results = _attach_advanced_matchup_features(conn, results, int(w))
-            results = _classify_significance(results)
-            results = _compute_probabilities(results, conn)
-            results = _decide_picks(results)
-            results = _compute_market_and_edges(results)
-            results = results[results['Game_Pick'] != 'No Pick']
-            if results.empty:
-                logging.info(f"Week {w_str}: no confident picks after filtering")
-                continue
-            results = _apply_edge_filter(results)
-            if results.empty:
-                logging.info(f"Week {w_str}: no picks passed edge filter")
-                continue
-            # PHASE 3: fit linear margin model on prior weeks and compute model metrics
-            model_params = None
-            if Settings.MODEL_ENABLED and int(w) > Settings.MODEL_MIN_TRAIN_WEEKS:
-                try:
-                    season_now = datetime.now().year
-                    model_params = fit_margin_linear(conn, season_now, int(w), None)
-                    if model_params:
-                        logging.info(f"Week {w_str}: fitted margin model with n={model_params.n}, r2={model_params.r2:.3f}, resid_std={model_params.resid_std:.2f}")
-                    else:
-                        logging.info(f"Week {w_str}: insufficient data to fit margin model; using fallback")
-                except Exception as e:
-                    logging.info(f"Week {w_str}: model fit failed ({e}); using fallback")
-            results = compute_model_metrics(results, model_params, int(w))
-            # Apply model-edge gating only if model trained
-            if Settings.MODEL_ENABLED and model_params is not None:
-                before_model = len(results)
-                results = results[results['Model_Edge'] >= Settings.MODEL_MIN_EDGE]
-                logging.info(f"Week {w_str}: model edge gate {before_model} -> {len(results)} (MIN_EDGE={Settings.MODEL_MIN_EDGE})")
-                if results.empty:
-                    logging.info(f"Week {w_str}: no picks passed model edge gate")
-                    continue
-            # Existing cover probability (normal approx) retained as Pick_Cover_Prob for comparison
-            results = _compute_cover_probabilities(results)
-            # Prefer sorting by blended advantage if available
-            sort_adv_col = 'Blended_Adv' if 'Blended_Adv' in results.columns else 'Overall_Adv'
-            results = results.sort_values(by=['Pick_Edge', sort_adv_col], ascending=[False, False])
-            if len(results) > MAX_PICKS_PER_WEEK:
-                # Log trimmed games for diagnostics
-                trimmed = results.iloc[MAX_PICKS_PER_WEEK:][['Home_Team','Away_Team','Pick_Edge',sort_adv_col,'Game_Pick']].copy()
-                if not trimmed.empty:
-                    logging.info(
-                        "Week %s: trimmed %d games due to MAX_PICKS_PER_WEEK=%d. Trimmed list: %s",
-                        w_str, len(trimmed), MAX_PICKS_PER_WEEK,
-                        '; '.join(f"{r.Away_Team}@{r.Home_Team} pick={r.Game_Pick} edge={r.Pick_Edge:.4f} adv={getattr(r, sort_adv_col):+.1f}" for r in trimmed.itertuples())
-                    )
-                results = results.head(MAX_PICKS_PER_WEEK)
-                logging.info(f"Week {w_str}: limited to top {MAX_PICKS_PER_WEEK} picks by Pick_Edge")
-            output_cols = [
-                'WEEK', 'Home_Team', 'Away_Team', 'Home_Line_Close', 'Away_Line_Close', 'Home_Odds_Close', 'Away_Odds_Close',
-                'Game_Pick', 'Overall_Adv', 'Offense_Adv', 'Defense_Adv',
-                'Overall_Adv_sig', 'Offense_Adv_sig', 'Defense_Adv_sig', 'Blended_Adv_sig',
-                'Pressure_Mismatch', 'Explosive_Pass_Mismatch', 'Script_Control_Mismatch',
-                'Off_Comp_Diff','Def_Comp_Diff','Net_Composite','Net_Composite_norm','Blended_Adv',
-                # Phase 3 additions
-                'Expected_Margin','Cover_Prob','Model_Edge','Confidence_Score',
-                'Home_Win_Prob', 'Away_Win_Prob', 'Home_ML_Implied', 'Away_ML_Implied', 'Pick_Prob', 'Pick_Implied_Prob', 'Pick_Edge', 'Pick_Cover_Prob'
-            ]
-            for c in output_cols:
-                if c not in results.columns:
-                    results[c] = np.nan
-            results = results[output_cols]
-            # Round numeric columns before persisting to DB
-            results = _round_numeric_cols(results, 3)
-            with conn:
-                cur = conn.cursor()
-                _ensure_columns(conn, 'picks', {
-                    'Home_Win_Prob': 'REAL', 'Away_Win_Prob': 'REAL',
-                    'Home_Odds_Close': 'REAL', 'Away_Odds_Close': 'REAL',
-                    'Home_ML_Implied': 'REAL', 'Away_ML_Implied': 'REAL',
-                    'Pick_Prob': 'REAL', 'Pick_Implied_Prob': 'REAL', 'Pick_Edge': 'REAL', 'Pick_Cover_Prob': 'REAL',
-                    'Pressure_Mismatch': 'REAL', 'Explosive_Pass_Mismatch': 'REAL', 'Script_Control_Mismatch': 'REAL',
-                    'Off_Comp_Diff': 'REAL','Def_Comp_Diff': 'REAL','Net_Composite': 'REAL','Net_Composite_norm': 'REAL','Blended_Adv': 'REAL',
-                    'Blended_Adv_sig': 'TEXT',
-                    # Phase 3 columns
-                    'Expected_Margin': 'REAL','Cover_Prob': 'REAL','Model_Edge': 'REAL','Confidence_Score': 'REAL'
-                })
-                for home, away in zip(results['Home_Team'], results['Away_Team']):
-                    cur.execute("DELETE FROM picks WHERE WEEK = ? AND Home_Team = ? AND Away_Team = ?", (f"WEEK{w_str}", home, away))
-                results.to_sql('picks', conn, if_exists='append', index=False)
-            logging.info(f"Week {w_str}: inserted {len(results)} picks")
+        grades, opp_grades = _prepare_grades(conn, incremental=incremental)
+        season = Settings.SEASON
+        hashes = _pick_input_hashes(conn, season, week_numbers, grades)
+        if incremental:
+            week_numbers = watermarks.stale_weeks(conn, 'picks', season, hashes)
+            logging.info(f"Incremental: {len(week_numbers)}/{len(hashes)} weeks have changed inputs {week_numbers}")
+        if week_numbers:
+            _score_and_store_weeks(conn, week_numbers, grades, opp_grades)
+        watermarks.record(conn, 'picks', season, {w: hashes[w] for w in week_numbers})
     except Exception as e:
         logging.exception(f"makePicks failed: {e}")
     finally:
@@ -486,6 +410,171 @@ def makePicks(weeks: list[int] | list[str] | None = None):
         print(f"[{time.strftime('%H:%M:%S')}] makePicks finished")
 
 
+def _score_weeks(conn, week_numbers: list[int], grades: pd.DataFrame, opp_grades: pd.DataFrame):
+    """Score every requested week in one frame; None when no week yields a pick."""
+    # Whole requested range in one pass: load, merge, score and filter every week together
+    results = _load_matchups(conn, week_numbers, grades, opp_grades)
+    loaded_weeks = set(results[WEEK_KEY]) if not results.empty else set()
+    for w in week_numbers:
+        if w not in loaded_weeks:
+            logging.info(f"Week {w}: no spreads data; skipping")
+    if results.empty:
+        return None
+    results = _calculate_advantages(results)
+    # Attach Phase 2 features
+    results = _attach_advanced_matchup_features(conn, results, sorted(loaded_weeks))
+    results = _classify_significance(results)
+    results = _compute_probabilities(results, conn)
+    results = _decide_picks(results)
+    results = _compute_market_and_edges(results)
+    results = results[results['Game_Pick'] != 'No Pick']
+    results = _apply_edge_filter(results)
+
+    # Per-week model gating and MAX_PICKS_PER_WEEK trimming
+    week_frames = []
+    for w in sorted(loaded_weeks):
+        week_df = _finalize_week(conn, results[results[WEEK_KEY] == w].copy(), w)
+        if week_df is not None:
+            week_frames.append(week_df)
+    if not week_frames:
+        return None
+    out = pd.concat(week_frames, ignore_index=True)[PICK_OUTPUT_COLS]
+    # Round numeric columns before persisting to DB
+    out = _round_numeric_cols(out, 3)
+    out['season'] = Settings.SEASON
+    return out
+
+
+def _score_and_store_weeks(conn, week_numbers: list[int], grades: pd.DataFrame, opp_grades: pd.DataFrame) -> None:
+    """Score the requested weeks and replace their picks rows wholesale.
+
+    Every requested week is cleared, even one that now yields no picks, so games that no
+    longer qualify do not linger from an earlier run.
+    """
+    out = _score_weeks(conn, week_numbers, grades, opp_grades)
+    placeholders = ','.join('?' * len(week_numbers))
+    with conn:
+        conn.execute(f"DELETE FROM picks WHERE week_num IN ({placeholders})", list(week_numbers))
+        if out is not None:
+            out.to_sql('picks', conn, if_exists='append', index=False)
+    if out is None:
+        logging.info(f"Weeks {week_numbers}: no picks")
+        return
+    for wk, n in out.groupby('WEEK', sort=False).size().items():
+        logging.info(f"{wk}: inserted {n} picks")
+
+
+def _pick_input_hashes(conn, season: int, week_numbers: list[int], grades: pd.DataFrame) -> dict[int, str]:
+    """Per-week fingerprint of everything makePicks reads for that week.
+
+    Shared inputs (effective grades, thresholds, pick/model settings, logistic model) apply
+    to every week; per week it adds the week's spreads rows and matchup_features. With the
+    margin model enabled, a week also depends on every earlier week's training rows (scored
+    games joined to their features), so a corrected score invalidates all later weeks while
+    a line move on an unplayed game only invalidates its own week.
+    """
+    shared = watermarks.combine(
+        watermarks.frame_fingerprint(grades),
+        watermarks.value_fingerprint({
+            'thresholds': dict(SIGNIFICANCE_THRESHOLDS), 'k_prob_scale': K_PROB_SCALE, 'edge_min': EDGE_MIN,
+            'margin_k': MARGIN_K, 'margin_sd': MARGIN_SD, 'max_picks': MAX_PICKS_PER_WEEK,
+            'blend_alpha': Settings.BLEND_ALPHA, 'logit_model': _load_logit_model(conn),
+            'model': {k: getattr(Settings, k) for k in dir(Settings) if k.startswith('MODEL_')},
+        }),
+    )
+    placeholders = ','.join('?' * len(week_numbers))
+    spreads = watermarks.grouped_fingerprints(
+        conn, f"SELECT week_num, * FROM spreads WHERE week_num IN ({placeholders})", week_numbers)
+    feats = watermarks.grouped_fingerprints(
+        conn, f"SELECT week, Home_Team, Away_Team, off_comp_diff, def_comp_diff, net_composite "
+              f"FROM matchup_features WHERE season = ? AND week IN ({placeholders})", [season] + week_numbers)
+    training = {}
+    if Settings.MODEL_ENABLED:
+        # Every stored feature column except the rebuild timestamp
+        mf_cols = ', '.join(f"mf.{c}" for c in sorted(table_columns(conn, 'matchup_features')) if c != 'created_at')
+        training = watermarks.grouped_fingerprints(
+            conn, f"SELECT mf.week, {mf_cols}, s.Home_Line_Close, s.Home_Score, s.Away_Score FROM matchup_features mf "
+                  "JOIN spreads s ON s.week_num = mf.week AND s.Home_Team = mf.Home_Team AND s.Away_Team = mf.Away_Team "
+                  "WHERE mf.season = ? AND mf.week < ? AND s.Home_Score IS NOT NULL AND s.Away_Score IS NOT NULL",
+            [season, max(week_numbers)])
+    hashes = {}
+    for w in week_numbers:
+        trained_on = ''
+        if Settings.MODEL_ENABLED and w > Settings.MODEL_MIN_TRAIN_WEEKS:
+            trained_on = watermarks.combine(*(f"{c}:{training[c]}" for c in sorted(training) if c < w))
+        hashes[w] = watermarks.combine(shared, spreads.get(w, watermarks.EMPTY), feats.get(w, watermarks.EMPTY), trained_on)
+    return hashes
+
+
+def _load_matchups(conn, week_numbers: list[int], grades: pd.DataFrame, opp_grades: pd.DataFrame) -> pd.DataFrame:
+    """Load spreads for all requested weeks in one query and merge home/away grades once."""
+    placeholders = ','.join('?' * len(week_numbers))
+    matchups = pd.read_sql_query(
+        f"SELECT * FROM spreads WHERE week_num IN ({placeholders})", conn,
+        params=[int(w) for w in week_numbers]
+    )
+    if matchups.empty:
+        return matchups
+    # Normalize team codes from spreads to be resilient across feeds
+    matchups = normalize_df_team_cols(matchups, ['Home_Team','Away_Team'])
+    matchups = pd.merge(matchups, grades, on='Home_Team', how='left')
+    matchups = pd.merge(matchups, opp_grades, on='Away_Team', how='left')
+    for col in matchups.columns:
+        if col not in ['Home_Team', 'Away_Team', 'WEEK']:
+            matchups[col] = pd.to_numeric(matchups[col], errors='coerce')
+    matchups[WEEK_KEY] = matchups['week_num'].astype(int)
+    return matchups
+
+
+def _finalize_week(conn, results: pd.DataFrame, w: int) -> pd.DataFrame | None:
+    """Model gating, cover probabilities and MAX_PICKS_PER_WEEK trimming for one week's candidate picks."""
+    w_str = str(w)
+    if results.empty:
+        logging.info(f"Week {w_str}: no confident picks after significance/edge filtering")
+        return None
+    # PHASE 3: fit linear margin model on prior weeks and compute model metrics
+    model_params = None
+    if Settings.MODEL_ENABLED and int(w) > Settings.MODEL_MIN_TRAIN_WEEKS:
+        try:
+            season_now = Settings.SEASON
+            model_params = fit_margin_linear(conn, season_now, int(w), None)
+            if model_params:
+                logging.info(f"Week {w_str}: fitted margin model with n={model_params.n}, r2={model_params.r2:.3f}, resid_std={model_params.resid_std:.2f}")
+            else:
+                logging.info(f"Week {w_str}: insufficient data to fit margin model; using fallback")
+        except Exception as e:
+            logging.info(f"Week {w_str}: model fit failed ({e}); using fallback")
+    results = compute_model_metrics(results, model_params, int(w))
+    # Apply model-edge gating only if model trained
+    if Settings.MODEL_ENABLED and model_params is not None:
+        before_model = len(results)
+        results = results[results['Model_Edge'] >= Settings.MODEL_MIN_EDGE]
+        logging.info(f"Week {w_str}: model edge gate {before_model} -> {len(results)} (MIN_EDGE={Settings.MODEL_MIN_EDGE})")
+        if results.empty:
+            logging.info(f"Week {w_str}: no picks passed model edge gate")
+            return None
+    # Existing cover probability (normal approx) retained as Pick_Cover_Prob for comparison
+    results = _compute_cover_probabilities(results)
+    # Prefer sorting by blended advantage if available
+    sort_adv_col = 'Blended_Adv' if 'Blended_Adv' in results.columns else 'Overall_Adv'
+    results = results.sort_values(by=['Pick_Edge', sort_adv_col], ascending=[False, False])
+    if len(results) > MAX_PICKS_PER_WEEK:
+        # Log trimmed games for diagnostics
+        trimmed = results.iloc[MAX_PICKS_PER_WEEK:][['Home_Team','Away_Team','Pick_Edge',sort_adv_col,'Game_Pick']].copy()
+        if not trimmed.empty:
+            logging.info(
+                "Week %s: trimmed %d games due to MAX_PICKS_PER_WEEK=%d. Trimmed list: %s",
+                w_str, len(trimmed), MAX_PICKS_PER_WEEK,
+                '; '.join(f"{r.Away_Team}@{r.Home_Team} pick={r.Game_Pick} edge={r.Pick_Edge:.4f} adv={getattr(r, sort_adv_col):+.1f}" for r in trimmed.itertuples())
+            )
+        results = results.head(MAX_PICKS_PER_WEEK)
+        logging.info(f"Week {w_str}: limited to top {MAX_PICKS_PER_WEEK} picks by Pick_Edge")
+    for c in PICK_OUTPUT_COLS:
+        if c not in results.columns:
+            results[c] = np.nan
+    return results[PICK_OUTPUT_COLS]
+
+
 def generate_week_picks(week):
     """Generate picks for a specific week (refactored to reuse core logic)"""
     logger = logging.getLogger(__name__)
@@ -496,7 +585,7 @@ def generate_week_picks(week):
     try:
         _load_best_thresholds(conn)
         grades, opp_grades = _prepare_grades(conn)
-        matchups = pd.read_sql_query("SELECT * FROM spreads WHERE WEEK = ?", conn, params=[f"WEEK{week_str}"])
+        matchups = pd.read_sql_query("SELECT * FROM spreads WHERE week_num = ?", conn, params=[int(week)])
         if matchups.empty:
             logger.warning(f"Week {week_str}: no spreads data")
             return pd.DataFrame()
@@ -523,7 +612,7 @@ def generate_week_picks(week):
         model_params = None
         if Settings.MODEL_ENABLED and int(week) > Settings.MODEL_MIN_TRAIN_WEEKS:
             try:
-                season_now = datetime.now().year
+                season_now = Settings.SEASON
                 model_params = fit_margin_linear(conn, season_now, int(week), None)
                 if model_params:
                     logger.info(f"Week {week_str}: fitted margin model with n={model_params.n}, r2={model_params.r2:.3f}, resid_std={model_params.resid_std:.2f}")
@@ -547,19 +636,10 @@ def generate_week_picks(week):
         if len(merged) > MAX_PICKS_PER_WEEK:
             merged = merged.head(MAX_PICKS_PER_WEEK)
             logger.info(f"Week {week_str}: limited to top {MAX_PICKS_PER_WEEK} picks by Pick_Edge")
-        output_cols = [
-            'WEEK', 'Home_Team', 'Away_Team', 'Home_Line_Close', 'Away_Line_Close', 'Home_Odds_Close', 'Away_Odds_Close',
-            'Game_Pick', 'Overall_Adv', 'Offense_Adv', 'Defense_Adv',
-            'Overall_Adv_sig', 'Offense_Adv_sig', 'Defense_Adv_sig', 'Blended_Adv_sig',
-            'Pressure_Mismatch', 'Explosive_Pass_Mismatch', 'Script_Control_Mismatch',
-            'Off_Comp_Diff','Def_Comp_Diff','Net_Composite','Net_Composite_norm','Blended_Adv',
-            'Expected_Margin','Cover_Prob','Model_Edge','Confidence_Score',
-            'Home_Win_Prob', 'Away_Win_Prob', 'Home_ML_Implied', 'Away_ML_Implied', 'Pick_Prob', 'Pick_Implied_Prob', 'Pick_Edge', 'Pick_Cover_Prob'
-        ]
-        for c in output_cols:
+        for c in PICK_OUTPUT_COLS:
             if c not in merged.columns:
                 merged[c] = np.nan
-        picks_df = merged[output_cols]
+        picks_df = merged[PICK_OUTPUT_COLS]
 
         # Save CSV (optional)
         output_path = f"{config.DATA_DIR}/picks/WEEK{week_str}.csv"
@@ -575,37 +655,58 @@ def generate_week_picks(week):
         conn.close()
 
 
-def _attach_advanced_matchup_features(conn, df: pd.DataFrame, week_int: int) -> pd.DataFrame:
-    """Join matchup_features by Home/Away for the current season/week and compute normalization and blended advantage."""
+_FEATURE_COLS = ['Off_Comp_Diff','Def_Comp_Diff','Net_Composite','Net_Composite_norm','Blended_Adv']
+
+
+def _attach_advanced_matchup_features(conn, df: pd.DataFrame, week_int) -> pd.DataFrame:
+    """Join matchup_features by Home/Away for the current season/week(s) and compute normalization and blended advantage.
+
+    week_int may be a single week or a list of weeks; multi-week frames must carry WEEK_KEY and are
+    normalized within each week exactly as if attached one week at a time.
+    """
+    weeks = sorted({int(w) for w in week_int}) if isinstance(week_int, (list, tuple, set)) else [int(week_int)]
+    if WEEK_KEY in df.columns:
+        return _attach_features_by_week(conn, df, weeks)
+    df[WEEK_KEY] = weeks[0]
+    out = _attach_features_by_week(conn, df, weeks)
+    return out.drop(columns=[WEEK_KEY])
+
+
+def _attach_features_by_week(conn, df: pd.DataFrame, weeks: list[int]) -> pd.DataFrame:
     try:
-        season = datetime.now().year
+        season = Settings.SEASON
+        placeholders = ','.join('?' * len(weeks))
         feats = pd.read_sql_query(
-            "SELECT Home_Team, Away_Team, off_comp_diff AS Off_Comp_Diff, def_comp_diff AS Def_Comp_Diff, net_composite AS Net_Composite "
-            "FROM matchup_features WHERE season=? AND week=?",
-            conn, params=[season, week_int]
+            f"SELECT week AS {WEEK_KEY}, Home_Team, Away_Team, off_comp_diff AS Off_Comp_Diff, def_comp_diff AS Def_Comp_Diff, net_composite AS Net_Composite "
+            f"FROM matchup_features WHERE season=? AND week IN ({placeholders})",
+            conn, params=[season] + weeks
         )
         if feats.empty:
             # Add empty columns
-            for c in ['Off_Comp_Diff','Def_Comp_Diff','Net_Composite','Net_Composite_norm','Blended_Adv']:
+            for c in _FEATURE_COLS:
                 df[c] = np.nan
             return df
         # Normalize team codes
         feats = normalize_df_team_cols(feats, ['Home_Team','Away_Team'])
-        merged = df.merge(feats, on=['Home_Team','Away_Team'], how='left')
+        feats[WEEK_KEY] = feats[WEEK_KEY].astype(int)
+        df[WEEK_KEY] = df[WEEK_KEY].astype(int)
+        merged = df.merge(feats, on=[WEEK_KEY, 'Home_Team', 'Away_Team'], how='left')
         # Normalize Net_Composite within week (z-score)
-        mu = merged['Net_Composite'].mean(skipna=True)
-        sd = merged['Net_Composite'].std(skipna=True)
-        if sd and sd > 0:
-            merged['Net_Composite_norm'] = (merged['Net_Composite'] - mu) / sd
-        else:
-            merged['Net_Composite_norm'] = 0.0
+        by_week = merged.groupby(WEEK_KEY)['Net_Composite']
+        mu = by_week.transform('mean')
+        sd = by_week.transform('std')
+        merged['Net_Composite_norm'] = np.where(sd > 0, (merged['Net_Composite'] - mu) / sd, 0.0)
         # Blended advantage
         alpha = Settings.BLEND_ALPHA
         merged['Blended_Adv'] = alpha * merged['Overall_Adv'].astype(float) + (1 - alpha) * merged['Net_Composite_norm'].astype(float)
+        # Weeks without any stored features keep empty columns
+        no_feats = ~merged[WEEK_KEY].isin(set(feats[WEEK_KEY]))
+        if no_feats.any():
+            merged.loc[no_feats, _FEATURE_COLS] = np.nan
         return merged
     except Exception as e:
-        logging.warning(f"Failed to attach advanced matchup features for week {week_int}: {e}")
-        for c in ['Off_Comp_Diff','Def_Comp_Diff','Net_Composite','Net_Composite_norm','Blended_Adv']:
+        logging.warning(f"Failed to attach advanced matchup features for weeks {weeks}: {e}")
+        for c in _FEATURE_COLS:
             if c not in df.columns:
                 df[c] = np.nan
         return df
@@ -6,7 +6,7 @@ from panda_picks.data.repositories.grade_repository import GradeRepository
 from panda_picks.data.repositories.pick_repository import PickRepository
 from panda_picks.config.settings import Settings
 from panda_picks.analysis.utils.probability import calculate_win_probability
-from panda_picks.analysis.picks import ADVANTAGE_BASE_COLUMNS  # reuse existing logic for now
+from panda_picks.analysis.utils.advantages import compute_advantages
 from panda_picks.db.database import get_connection
 from panda_picks.utils import normalize_df_team_cols
 
@@ -53,7 +53,7 @@ class PickService:
     def _attach_phase2_features(self, df: pd.DataFrame, week: int) -> pd.DataFrame:
         """Join matchup_features and compute normalized Net_Composite and Blended_Adv."""
         try:
-            season = datetime.now().year
+            season = Settings.SEASON
             with get_connection() as conn:
                 feats = pd.read_sql_query(
                     "SELECT Home_Team, Away_Team, off_comp_diff AS Off_Comp_Diff, def_comp_diff AS Def_Comp_Diff, net_composite AS Net_Composite FROM matchup_features WHERE season=? AND week=?",
@@ -91,8 +91,7 @@ class PickService:
             'RUN': 'OPP_RUN', 'RBLK': 'OPP_RBLK', 'PRSH': 'OPP_PRSH', 'COV': 'OPP_COV', 'RDEF': 'OPP_RDEF', 'TACK': 'OPP_TACK'
         })
         merged = spreads_df.merge(grades_df, on='Home_Team', how='left').merge(opp, on='Away_Team', how='left')
-        for new_col, func in ADVANTAGE_BASE_COLUMNS:
-            merged[new_col] = merged.apply(func, axis=1)
+        merged = compute_advantages(merged)
         # Phase 2: attach matchup features and blended adv
         merged = self._attach_phase2_features(merged, week)
         thresholds = self.settings.ADVANTAGE_THRESHOLDS
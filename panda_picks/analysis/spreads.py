@@ -1,25 +1,54 @@
 import requests
 import pandas as pd
+import json
 import time
 import concurrent.futures
 import argparse
+from panda_picks.config.settings import Settings
+from panda_picks.data import http_cache
 from panda_picks.db.database import get_connection
 
-# Function to fetch data from the API with retry logic
-def fetch_data(week, max_retries=3):
-    url = f"https://www.pff.com/api/scoreboard/ticker?league=nfl&season=2025&week={week}"
+SEASON = Settings.SEASON
+
+def _week_url(week):
+    return f"https://www.pff.com/api/scoreboard/ticker?league=nfl&season={SEASON}&week={week}"
+
+def _week_is_final(content: bytes) -> bool:
+    """A week is final once every game has both scores and an explicit final status.
+
+    Scores without a status (pre-game 0-0, in progress) never count: final entries are
+    cached with no expiry, so anything short of a reported final keeps the normal TTL.
+    """
+    data = json.loads(content)
+    games = (data.get('weeks') or [{}])[0].get('games') or []
+    for game in games:
+        if game.get('home_score') is None or game.get('away_score') is None:
+            return False
+        status = game.get('status') or game.get('game_status')
+        if status is None or 'final' not in str(status).lower():
+            return False
+    return bool(games)
+
+# Function to fetch the week's response (through the HTTP cache) with retry logic
+def fetch_response(week, max_retries=3):
+    url = _week_url(week)
 
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, timeout=10)
+            response = http_cache.cached_get(url, 'pff_ticker', timeout=10, is_final=_week_is_final)
             response.raise_for_status()
-            return response.json()
+            return response
         except (requests.RequestException, requests.Timeout) as e:
             if attempt == max_retries - 1:
                 print(f"Failed to fetch data for week {week} after {max_retries} attempts: {e}")
                 return None
             time.sleep(1)  # Wait before retrying
 
+# Function to fetch data from the API with retry logic
+def fetch_data(week, max_retries=3):
+    response = fetch_response(week, max_retries)
+    return response.json() if response is not None else None
+
 # Function to process the data and create a DataFrame
 def process_data(data, week):
     if not data or 'weeks' not in data or not data['weeks']:
@@ -41,6 +70,7 @@ def process_data(data, week):
             continue
         processed_data.append({
             "WEEK": f"WEEK{week}",
+            "season": SEASON,
             "Home_Team": home_team,
             "Away_Team": away_team,
             "Home_Score": home_score,
@@ -61,6 +91,27 @@ def fetch_and_process(week):
     return pd.DataFrame()
 
 
+def _fetch_changed(week):
+    """(DataFrame, content hash) for a week; None when the payload already in the table is unchanged."""
+    response = fetch_response(week)
+    if response is None:
+        return pd.DataFrame(), None
+    content_hash = http_cache.response_hash(response)
+    if http_cache.payload_applied('pff_ticker', SEASON, week, content_hash):
+        return None
+    return process_data(response.json(), week), content_hash
+
+
+def _store_week(week, fetched):
+    if fetched is None:
+        print(f"WEEK{week} unchanged; skipping")
+        return
+    df, content_hash = fetched
+    _upsert_spreads(df, week)
+    if not df.empty:
+        http_cache.mark_payload_applied('pff_ticker', SEASON, week, content_hash)
+
+
 def _upsert_spreads(df: pd.DataFrame, week: int) -> None:
     if df.empty:
         print(f"No data to save for WEEK{week}")
@@ -76,11 +127,11 @@ def _upsert_spreads(df: pd.DataFrame, week: int) -> None:
         df.to_sql('spreads', conn, if_exists='append', index=False)
 
 # Main function to fetch, process, and save the data
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Fetch PFF scoreboard/ticker spreads and scores')
     parser.add_argument('--week', type=int, help='Fetch a single week (1-18)')
     parser.add_argument('--all', action='store_true', help='Fetch all weeks 1-18 in parallel')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     start_time = time.time()
     print(f"[{time.strftime('%H:%M:%S')}] spreads main started")
@@ -88,20 +139,17 @@ def main():
     if args.week and not args.all:
         # Single-week mode
         wk = int(args.week)
-        df = fetch_and_process(wk)
-        _upsert_spreads(df, wk)
+        _store_week(wk, _fetch_changed(wk))
     else:
         # Use parallel processing to fetch data for all weeks
-        all_dfs = []
         with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_week = {executor.submit(fetch_and_process, week): week for week in range(1, 19)}
+            future_to_week = {executor.submit(_fetch_changed, week): week for week in range(1, 19)}
             for future in concurrent.futures.as_completed(future_to_week):
                 week = future_to_week[future]
-                week_df = future.result()
-                if not week_df.empty:
+                fetched = future.result()
+                if fetched is None or not fetched[0].empty:
                     # Upsert per week immediately to avoid large memory builds
-                    _upsert_spreads(week_df, week)
-                    all_dfs.append(week_df)
+                    _store_week(week, fetched)
 
 
     elapsed_time = time.time() - start_time
@@ -0,0 +1,267 @@
+"""Adaptive search over significance thresholds and pick settings.
+
+A full grid (``threshold_tuning`` / ``threshold_sweep``) grows exponentially with every
+knob. This module instead searches the same space -- the three thresholds plus
+``K_PROB_SCALE``, ``EDGE_MIN``, ``BLEND_ALPHA`` and ``MAX_PICKS_PER_WEEK`` -- for the
+best ``ROI_per_Pick`` while evaluating only a small sample of configurations:
+
+* ``halving``: successive halving over weeks. Random configurations are scored on a
+  small random subset of weeks; the best ``1/eta`` survive to a subset ``eta`` times
+  larger, until the survivors are scored on every week.
+* ``surrogate``: a Gaussian-process surrogate (scikit-learn) with expected improvement,
+  seeded by random trials and refit after each new trial.
+
+Each configuration is scored with ``threshold_sweep.evaluate_shard`` on the shared base
+matrix, so results are directly comparable with sweep rows. Every trial (including
+low-budget rungs) is recorded in ``threshold_search_trials``.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import math
+import warnings
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from panda_picks.analysis.threshold_sweep import BASE_COLUMNS, build_base_matrix, evaluate_shard
+from panda_picks.config.settings import Settings
+from panda_picks.db.database import get_connection
+
+# name -> (low, high, step); values are snapped to the step so trials stay readable
+SEARCH_SPACE: Dict[str, Tuple[float, float, float]] = {
+    'overall': (0.0, 10.0, 0.25),
+    'offense': (0.0, 10.0, 0.25),
+    'defense': (0.0, 10.0, 0.25),
+    'k_prob_scale': (0.04, 0.25, 0.01),
+    'edge_min': (-0.02, 0.10, 0.005),
+    'blend_alpha': (0.0, 1.0, 0.05),
+    'max_picks': (2, 16, 1),
+}
+
+# Trial table column for each search-space name
+PARAM_COLUMNS = {
+    'overall': 'Overall_Thresh', 'offense': 'Offense_Thresh', 'defense': 'Defense_Thresh',
+    'k_prob_scale': 'K_Prob_Scale', 'edge_min': 'Edge_Min', 'blend_alpha': 'Blend_Alpha',
+    'max_picks': 'Max_Picks_Per_Week',
+}
+METRIC_COLUMNS = ['Picks', 'Evaluated_Picks', 'Accuracy', 'Profit', 'ROI_per_Pick']
+
+_WEEK = BASE_COLUMNS.index('Week')
+_HAS_RESULT = BASE_COLUMNS.index('Has_Result')
+
+
+def grid_size(space: Dict[str, Tuple[float, float, float]]) -> int:
+    """Number of points in the full grid spanned by ``space``."""
+    return math.prod(int(round((hi - lo) / step)) + 1 for lo, hi, step in space.values())
+
+
+def _to_unit(space, params: Dict) -> np.ndarray:
+    return np.array([(params[k] - lo) / (hi - lo) if hi > lo else 0.0 for k, (lo, hi, _) in space.items()])
+
+
+def _from_unit(space, u: np.ndarray) -> Dict:
+    params = {}
+    for x, (name, (lo, hi, step)) in zip(np.clip(u, 0, 1), space.items()):
+        v = lo + round(x * (hi - lo) / step) * step
+        params[name] = int(v) if name == 'max_picks' else round(float(v), 6)
+    return params
+
+
+def _sample(space, n: int, rng: np.random.Generator) -> List[Dict]:
+    return [_from_unit(space, u) for u in rng.random((n, len(space)))]
+
+
+def scored_weeks(base: np.ndarray) -> np.ndarray:
+    """Weeks with at least one graded game (only these carry signal)."""
+    return np.unique(base[base[:, _HAS_RESULT] > 0, _WEEK])
+
+
+def evaluate_config(base: np.ndarray, params: Dict, weeks: Optional[np.ndarray] = None,
+                    min_picks: int = 1) -> Dict:
+    """Metrics for one configuration on ``weeks`` (all weeks if None).
+
+    ``ROI_per_Pick`` is NaN when fewer than ``min_picks`` picks were graded, so tiny
+    samples never win the search.
+    """
+    if weeks is not None:
+        base = base[np.isin(base[:, _WEEK], weeks)]
+    out = evaluate_shard(base, params['overall'], [params['offense']], [params['defense']],
+                         params['k_prob_scale'], params['edge_min'], params['blend_alpha'], params['max_picks'])
+    if out.empty:
+        return {'Picks': 0, 'Evaluated_Picks': 0, 'Accuracy': np.nan, 'Profit': 0.0, 'ROI_per_Pick': np.nan}
+    row = out.iloc[0]
+    metrics = {c: row[c] for c in METRIC_COLUMNS}
+    if metrics['Evaluated_Picks'] < min_picks:
+        metrics['ROI_per_Pick'] = np.nan
+    return metrics
+
+
+def _rank_key(trial: Dict) -> tuple:
+    roi = trial['ROI_per_Pick']
+    return (0 if pd.isna(roi) else 1, -np.inf if pd.isna(roi) else roi, trial['Evaluated_Picks'])
+
+
+def successive_halving(base: np.ndarray, space=None, n_configs: int = 81, eta: int = 3, min_weeks: int = 2,
+                       min_picks_per_week: float = 1.0, seed: int = 0) -> List[Dict]:
+    """Successive halving with weeks as the budget; returns every trial in evaluation order."""
+    space = space or SEARCH_SPACE
+    rng = np.random.default_rng(seed)
+    weeks = rng.permutation(scored_weeks(base))
+    if len(weeks) == 0:
+        return []
+    # Halve while both the configurations and the weeks (down to min_weeks) allow it
+    rungs = 0
+    while eta ** (rungs + 1) <= n_configs and len(weeks) / eta ** (rungs + 1) >= min_weeks:
+        rungs += 1
+    budgets = [math.ceil(len(weeks) * eta ** (r - rungs)) for r in range(rungs + 1)]
+    configs = _sample(space, n_configs, rng)
+    trials = []
+    for rung, n_weeks in enumerate(budgets):
+        subset = weeks[:n_weeks]
+        scored = []
+        for params in configs:
+            metrics = evaluate_config(base, params, subset, math.ceil(min_picks_per_week * n_weeks))
+            trial = {'Trial': len(trials), 'Rung': rung, 'Weeks': int(n_weeks), **params, **metrics}
+            trials.append(trial)
+            scored.append(trial)
+        if rung == len(budgets) - 1:
+            break
+        keep = max(1, math.ceil(len(configs) / eta))
+        scored.sort(key=_rank_key, reverse=True)
+        configs = [{k: t[k] for k in space} for t in scored[:keep]]
+    return trials
+
+
+def _expected_improvement(mu: np.ndarray, sigma: np.ndarray, best: float) -> np.ndarray:
+    from scipy.stats import norm
+    sigma = np.maximum(sigma, 1e-9)
+    z = (mu - best) / sigma
+    return (mu - best) * norm.cdf(z) + sigma * norm.pdf(z)
+
+
+def surrogate_search(base: np.ndarray, space=None, n_trials: int = 60, n_init: int = 15,
+                     n_candidates: int = 2000, min_picks_per_week: float = 1.0, seed: int = 0) -> List[Dict]:
+    """Gaussian-process / expected-improvement search scored on every week."""
+    from sklearn.exceptions import ConvergenceWarning
+    from sklearn.gaussian_process import GaussianProcessRegressor
+    from sklearn.gaussian_process.kernels import ConstantKernel, Matern, WhiteKernel
+
+    space = space or SEARCH_SPACE
+    rng = np.random.default_rng(seed)
+    weeks = scored_weeks(base)
+    if len(weeks) == 0:
+        return []
+    min_picks = math.ceil(min_picks_per_week * len(weeks))
+    trials: List[Dict] = []
+    seen = set()
+
+    def record(params):
+        seen.add(tuple(params.values()))
+        metrics = evaluate_config(base, params, None, min_picks)
+        trials.append({'Trial': len(trials), 'Rung': 0, 'Weeks': len(weeks), **params, **metrics})
+
+    for params in _sample(space, min(n_init, n_trials), rng):
+        record(params)
+    kernel = (ConstantKernel(1.0) * Matern(length_scale=np.full(len(space), 0.3), length_scale_bounds=(0.05, 20.0), nu=2.5)
+              + WhiteKernel(1e-3, noise_level_bounds=(1e-6, 1.0)))
+    while len(trials) < n_trials:
+        x = np.array([_to_unit(space, t) for t in trials])
+        y = np.array([t['ROI_per_Pick'] for t in trials], dtype=float)
+        ok = ~np.isnan(y)
+        if ok.sum() < 2:
+            record(_sample(space, 1, rng)[0])
+            continue
+        # Infeasible trials (too few picks) are taught as clearly worse than anything observed
+        y = np.where(ok, y, np.nanmin(y) - max(np.nanstd(y), 0.1))
+        gp = GaussianProcessRegressor(kernel=kernel, normalize_y=True, random_state=seed)
+        with warnings.catch_warnings():
+            # Flat dimensions legitimately push length scales to their bound
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            gp.fit(x, y)
+        candidates = [p for p in _sample(space, n_candidates, rng) if tuple(p.values()) not in seen]
+        if not candidates:
+            break
+        mu, sigma = gp.predict(np.array([_to_unit(space, p) for p in candidates]), return_std=True)
+        record(candidates[int(np.argmax(_expected_improvement(mu, sigma, y[ok].max())))])
+    return trials
+
+
+def _search_id(spec_json: str, base: np.ndarray) -> str:
+    h = hashlib.sha1(spec_json.encode())
+    h.update(np.ascontiguousarray(base).tobytes())
+    return h.hexdigest()[:16]
+
+
+def _store_trials(conn, search_id: str, method: str, spec_json: str, trials: List[Dict]) -> pd.DataFrame:
+    now = datetime.utcnow().isoformat()
+    df = pd.DataFrame(trials).rename(columns=PARAM_COLUMNS)
+    if df.empty:
+        df = pd.DataFrame(columns=['Trial', 'Rung', 'Weeks', *PARAM_COLUMNS.values(), *METRIC_COLUMNS])
+    df.insert(0, 'Search_Id', search_id)
+    df.insert(1, 'Method', method)
+    df['Timestamp'] = now
+    full = df[df['Weeks'] == df['Weeks'].max()]
+    best = full.sort_values('ROI_per_Pick', ascending=False).iloc[0] if full['ROI_per_Pick'].notna().any() else None
+    cols = list(df.columns)
+    values = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    with conn:
+        conn.execute("DELETE FROM threshold_search_trials WHERE Search_Id = ?", (search_id,))
+        conn.execute("DELETE FROM threshold_searches WHERE Search_Id = ?", (search_id,))
+        conn.executemany(
+            f"INSERT INTO threshold_search_trials ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})", values)
+        conn.execute(
+            "INSERT INTO threshold_searches (Search_Id, Method, Spec, Trials, Best_Trial, Best_ROI_per_Pick, Created_At) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (search_id, method, spec_json, len(df), None if best is None else int(best['Trial']),
+             None if best is None else float(best['ROI_per_Pick']), now))
+    return df
+
+
+def run_search(method: str = 'halving', space: Optional[Dict[str, Tuple[float, float, float]]] = None,
+               seed: int = Settings.SIMULATION_SEED, min_picks_per_week: float = 1.0, **kwargs) -> pd.DataFrame:
+    """Run an adaptive search, record its trials and return them (best full-budget trial first).
+
+    ``kwargs`` go to ``successive_halving`` (n_configs, eta, min_weeks) or
+    ``surrogate_search`` (n_trials, n_init, n_candidates).
+    """
+    searches = {'halving': successive_halving, 'surrogate': surrogate_search}
+    if method not in searches:
+        raise ValueError(f"Unknown search method {method!r}; expected one of {sorted(searches)}")
+    space = dict(space or SEARCH_SPACE)
+    spec_json = json.dumps({'method': method, 'space': space, 'seed': seed,
+                            'min_picks_per_week': min_picks_per_week, **kwargs}, sort_keys=True)
+    conn = get_connection()
+    try:
+        base = build_base_matrix(conn)
+        trials = searches[method](base, space=space, seed=seed, min_picks_per_week=min_picks_per_week, **kwargs)
+        search_id = _search_id(spec_json, base)
+        df = _store_trials(conn, search_id, method, spec_json, trials)
+    finally:
+        conn.close()
+    full = df['Weeks'] == df['Weeks'].max()
+    logging.info(f"Search {search_id} ({method}): {len(df)} trials, {int(full.sum())} on all weeks, "
+                 f"vs {grid_size(space):,} grid points")
+    df = df.assign(_full=full).sort_values(['_full', 'ROI_per_Pick', 'Evaluated_Picks'],
+                                           ascending=[False, False, False], na_position='last')
+    return df.drop(columns='_full').reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    import argparse
+    ap = argparse.ArgumentParser(description='Adaptive threshold + settings search')
+    ap.add_argument('--method', choices=['halving', 'surrogate'], default='halving')
+    ap.add_argument('--configs', type=int, default=81, help='Initial configurations (halving)')
+    ap.add_argument('--eta', type=int, default=3, help='Keep 1/eta per rung (halving)')
+    ap.add_argument('--trials', type=int, default=60, help='Total trials (surrogate)')
+    ap.add_argument('--min-picks-per-week', type=float, default=1.0)
+    ap.add_argument('--seed', type=int, default=Settings.SIMULATION_SEED)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    extra = {'n_configs': args.configs, 'eta': args.eta} if args.method == 'halving' else {'n_trials': args.trials}
+    df = run_search(args.method, seed=args.seed, min_picks_per_week=args.min_picks_per_week, **extra)
+    if not df.empty:
+        print(df.head(10))
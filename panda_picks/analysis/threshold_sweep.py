@@ -0,0 +1,263 @@
+"""Parallel, resumable sweeps of significance thresholds jointly with pick settings.
+
+The sweep space is the product of the three threshold grids with ``K_PROB_SCALE``,
+``EDGE_MIN``, ``BLEND_ALPHA`` and ``MAX_PICKS_PER_WEEK`` values. It is sharded by
+(settings tuple, Overall threshold); each shard evaluates its offense x defense
+threshold plane with the broadcast masks from ``threshold_tuning``.
+
+The per-game inputs are precomputed once into a float matrix (``BASE_COLUMNS``) and
+saved as ``.npy``; worker processes memory-map it instead of receiving a pickled
+frame. Each finished shard is committed to ``threshold_tuning_results`` together with
+its marker in ``threshold_sweep_shards``, so re-running a killed sweep with the same
+spec on the same data skips finished shards.
+
+Pick logic mirrors ``picks.makePicks`` without model gating: the lead advantage is
+``Blended_Adv`` in weeks with matchup features (else ``Overall_Adv``), win
+probability is the fallback logistic, picks must clear ``|Pick_Edge| >= EDGE_MIN``
+and each week keeps the top ``MAX_PICKS_PER_WEEK`` by Pick_Edge then lead advantage.
+"""
+from __future__ import annotations
+import hashlib
+import itertools
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from panda_picks.analysis import picks
+from panda_picks.analysis.threshold_tuning import (
+    _load_base, _results_frame, _side_masks, _weights_from_arrays, threshold_range
+)
+from panda_picks.config.settings import Settings
+from panda_picks.db.database import get_connection
+
+BASE_COLUMNS = ['Overall_Adv', 'Offense_Adv', 'Defense_Adv', 'Net_Composite_norm', 'Lead_Is_Blend',
+                'Home_ML_Implied', 'Away_ML_Implied', 'Home_Odds_Close', 'Away_Odds_Close',
+                'Has_Result', 'Home_Win', 'Week']
+_COL = {c: i for i, c in enumerate(BASE_COLUMNS)}
+
+# Worker-process copy of the memory-mapped base matrix (set by _init_worker)
+_BASE: Optional[np.ndarray] = None
+
+
+def build_base_matrix(conn) -> np.ndarray:
+    """Per-game sweep inputs as a (n_games, len(BASE_COLUMNS)) float64 matrix."""
+    base = _load_base(conn)
+    if base.empty:
+        return np.empty((0, len(BASE_COLUMNS)))
+    week = pd.to_numeric(base['week_num'], errors='coerce') if 'week_num' in base.columns else \
+        pd.to_numeric(base['WEEK'].astype(str).str.extract(r'(\d+)', expand=False), errors='coerce')
+    base[picks.WEEK_KEY] = week.fillna(0).astype(int)
+    weeks = sorted(set(base[picks.WEEK_KEY]))
+    base = picks._attach_features_by_week(conn, base, weeks)
+    base['Lead_Is_Blend'] = base['Net_Composite_norm'].notna().groupby(base[picks.WEEK_KEY]).transform('any')
+    base['Home_ML_Implied'], base['Away_ML_Implied'] = picks._implied_probs_array(
+        base['Home_Odds_Close'], base['Away_Odds_Close'], len(base))
+    base['Week'] = base[picks.WEEK_KEY]
+    return np.column_stack([pd.to_numeric(base[c], errors='coerce').to_numpy(dtype=float) for c in BASE_COLUMNS])
+
+
+def evaluate_shard(base: np.ndarray, overall: float, offense_range: Sequence[float], defense_range: Sequence[float],
+                   k_prob_scale: float, edge_min: float, blend_alpha: float, max_picks: int,
+                   min_picks: int = 1) -> pd.DataFrame:
+    """Evaluate one Overall threshold against the full offense x defense plane for one settings tuple."""
+    grids = [[overall], list(offense_range), list(defense_range)]
+    n = len(base)
+    if n == 0 or not grids[1] or not grids[2]:
+        return pd.DataFrame()
+    col = lambda name: np.asarray(base[:, _COL[name]], dtype=float)
+    overall_adv = col('Overall_Adv')
+    blend = blend_alpha * overall_adv + (1 - blend_alpha) * col('Net_Composite_norm')
+    lead = np.where(col('Lead_Is_Blend') > 0, blend, overall_adv)
+    prob = 1.0 / (1 + np.exp(-k_prob_scale * np.where(np.isnan(blend), overall_adv, blend)))
+    edge_home = prob - col('Home_ML_Implied')
+    edge_away = (1 - prob) - col('Away_ML_Implied')
+
+    home_o, away_o = _side_masks(lead, np.asarray(grids[0], dtype=float))
+    home_f, away_f = _side_masks(col('Offense_Adv'), np.asarray(grids[1], dtype=float))
+    home_d, away_d = _side_masks(col('Defense_Adv'), np.asarray(grids[2], dtype=float))
+    home_sig = (home_f[:, :, None] | home_d[:, None, :] | home_o[:, :, None]).reshape(n, -1)
+    away_sig = (away_f[:, :, None] | away_d[:, None, :] | away_o[:, :, None]).reshape(n, -1)
+    pick_home = home_sig & ~away_sig
+    pick_away = away_sig & ~home_sig
+
+    pick_edge = np.where(pick_home, edge_home[:, None], np.where(pick_away, edge_away[:, None], np.nan))
+    with np.errstate(invalid='ignore'):
+        kept = ~np.isnan(pick_edge) & (np.abs(pick_edge) >= edge_min)
+    if max_picks >= 0:
+        kept &= _week_top_k(col('Week'), np.where(kept, pick_edge, -np.inf), lead, max_picks)
+
+    w_home, w_away = _weights_from_arrays(col('Has_Result') > 0, col('Home_Win') > 0, prob,
+                                          col('Home_Odds_Close'), col('Away_Odds_Close'))
+    agg = w_home @ (kept & pick_home) + w_away @ (kept & pick_away)
+    out = _results_frame(agg, grids, n, min_picks)
+    out['K_Prob_Scale'] = k_prob_scale
+    out['Edge_Min'] = edge_min
+    out['Blend_Alpha'] = blend_alpha
+    out['Max_Picks_Per_Week'] = max_picks
+    return out
+
+
+def _week_top_k(week: np.ndarray, score: np.ndarray, tiebreak: np.ndarray, k: int) -> np.ndarray:
+    """Mask of rows ranked < k within their week by score desc, then tiebreak desc (per grid column)."""
+    keep = np.ones(score.shape, dtype=bool)
+    tb = np.where(np.isnan(tiebreak), -np.inf, tiebreak)
+    for w in np.unique(week):
+        rows = np.flatnonzero(week == w)
+        if len(rows) <= k:
+            continue
+        s = score[rows]
+        order = np.lexsort((np.broadcast_to(-tb[rows, None], s.shape), -s), axis=0)
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(len(rows))[:, None], axis=0)
+        keep[rows] = rank < k
+    return keep
+
+
+def _init_worker(base_path: str) -> None:
+    global _BASE
+    _BASE = np.load(base_path, mmap_mode='r')
+
+
+def _run_shard(shard: int, params: Dict) -> tuple[int, pd.DataFrame]:
+    return shard, evaluate_shard(_BASE, **params)
+
+
+def _shard_params(spec: Dict) -> List[Dict]:
+    """Shard number -> evaluate_shard kwargs, in a stable order."""
+    return [
+        {'overall': o, 'offense_range': spec['offense_range'], 'defense_range': spec['defense_range'],
+         'k_prob_scale': k, 'edge_min': e, 'blend_alpha': a, 'max_picks': m, 'min_picks': spec['min_picks']}
+        for k, e, a, m, o in itertools.product(spec['k_prob_scales'], spec['edge_mins'], spec['blend_alphas'],
+                                                spec['max_picks'], spec['overall_range'])
+    ]
+
+
+def _sweep_id(spec_json: str, base: np.ndarray) -> str:
+    """Stable id for (spec, data): a re-run resumes only if neither changed."""
+    h = hashlib.sha1(spec_json.encode())
+    h.update(np.ascontiguousarray(base).tobytes())
+    return h.hexdigest()[:16]
+
+
+def _checkpoint(conn, sweep_id: str, shard: int, df: pd.DataFrame) -> None:
+    """Store one shard's rows and its completion marker atomically."""
+    rows = df.assign(Sweep_Id=sweep_id)
+    cols = list(rows.columns)
+    values = rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None)
+    with conn:
+        conn.executemany(
+            f"INSERT INTO threshold_tuning_results ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})", values)
+        conn.execute("INSERT INTO threshold_sweep_shards (Sweep_Id, Shard, Rows, Completed_At) VALUES (?, ?, ?, ?)",
+                     (sweep_id, shard, len(rows), datetime.utcnow().isoformat()))
+
+
+def _register(conn, sweep_id: str, spec_json: str, shards: int) -> set[int]:
+    """Record the sweep (superseding sweeps of the same spec on older data); return finished shards."""
+    with conn:
+        stale = [r[0] for r in conn.execute(
+            "SELECT Sweep_Id FROM threshold_sweeps WHERE Spec = ? AND Sweep_Id != ?", (spec_json, sweep_id))]
+        for sid in stale:
+            conn.execute("DELETE FROM threshold_tuning_results WHERE Sweep_Id = ?", (sid,))
+            conn.execute("DELETE FROM threshold_sweep_shards WHERE Sweep_Id = ?", (sid,))
+            conn.execute("DELETE FROM threshold_sweeps WHERE Sweep_Id = ?", (sid,))
+        conn.execute("INSERT OR IGNORE INTO threshold_sweeps (Sweep_Id, Spec, Shards, Created_At) VALUES (?, ?, ?, ?)",
+                     (sweep_id, spec_json, shards, datetime.utcnow().isoformat()))
+    return {r[0] for r in conn.execute("SELECT Shard FROM threshold_sweep_shards WHERE Sweep_Id = ?", (sweep_id,))}
+
+
+def run_sweep(
+    overall_range: Iterable[float] = range(1, 6),
+    offense_range: Iterable[float] = range(1, 6),
+    defense_range: Iterable[float] = range(1, 6),
+    k_prob_scales: Optional[Iterable[float]] = None,
+    edge_mins: Optional[Iterable[float]] = None,
+    blend_alphas: Optional[Iterable[float]] = None,
+    max_picks: Optional[Iterable[int]] = None,
+    min_picks: int = 1,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """Run (or resume) a sweep and return all of its rows ranked by ROI, Accuracy, Picks.
+
+    Settings lists default to the current Settings value. ``workers`` <= 1 evaluates
+    shards in-process; None uses one process per CPU.
+    """
+    spec = {
+        'overall_range': [float(v) for v in overall_range],
+        'offense_range': [float(v) for v in offense_range],
+        'defense_range': [float(v) for v in defense_range],
+        'k_prob_scales': [float(v) for v in (k_prob_scales or [Settings.K_PROB_SCALE])],
+        'edge_mins': [float(v) for v in (edge_mins or [Settings.EDGE_MIN])],
+        'blend_alphas': [float(v) for v in (blend_alphas or [Settings.BLEND_ALPHA])],
+        'max_picks': [int(v) for v in (max_picks or [Settings.MAX_PICKS_PER_WEEK])],
+        'min_picks': int(min_picks),
+    }
+    spec_json = json.dumps(spec, sort_keys=True)
+    params = _shard_params(spec)
+    conn = get_connection()
+    try:
+        base = build_base_matrix(conn)
+        sweep_id = _sweep_id(spec_json, base)
+        done = _register(conn, sweep_id, spec_json, len(params))
+        pending = [i for i in range(len(params)) if i not in done]
+        logging.info(f"Sweep {sweep_id}: {len(params)} shards, {len(done)} already done, {len(pending)} to run")
+        if pending:
+            workers = (os.cpu_count() or 1) if workers is None else workers
+            if workers <= 1 or len(pending) == 1:
+                for shard in pending:
+                    _checkpoint(conn, sweep_id, shard, evaluate_shard(base, **params[shard]))
+            else:
+                _run_parallel(conn, sweep_id, base, params, pending, min(workers, len(pending)))
+        with conn:
+            conn.execute("UPDATE threshold_sweeps SET Completed_At = COALESCE(Completed_At, ?) WHERE Sweep_Id = ?",
+                         (datetime.utcnow().isoformat(), sweep_id))
+        results = pd.read_sql_query("SELECT * FROM threshold_tuning_results WHERE Sweep_Id = ?", conn, params=[sweep_id])
+        return results.sort_values(by=['ROI_per_Pick', 'Accuracy', 'Picks'], ascending=[False, False, False])
+    finally:
+        conn.close()
+
+
+def _run_parallel(conn, sweep_id: str, base: np.ndarray, params: List[Dict], pending: List[int], workers: int) -> None:
+    fd, path = tempfile.mkstemp(prefix=f'sweep_{sweep_id}_', suffix='.npy')
+    os.close(fd)
+    try:
+        np.save(path, base)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path,)) as pool:
+            futures = [pool.submit(_run_shard, shard, params[shard]) for shard in pending]
+            for fut in as_completed(futures):
+                shard, df = fut.result()
+                _checkpoint(conn, sweep_id, shard, df)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _floats(text: str) -> List[float]:
+    return [float(v) for v in text.split(',') if v.strip()]
+
+
+if __name__ == '__main__':
+    import argparse
+    ap = argparse.ArgumentParser(description='Parallel, resumable threshold + settings sweep')
+    ap.add_argument('--step', type=float, default=1.0, help='Threshold step over --min..--max')
+    ap.add_argument('--min', dest='lo', type=float, default=1.0)
+    ap.add_argument('--max', dest='hi', type=float, default=5.0)
+    ap.add_argument('--k', type=_floats, default=None, help='Comma-separated K_PROB_SCALE values')
+    ap.add_argument('--edge-min', type=_floats, default=None, help='Comma-separated EDGE_MIN values')
+    ap.add_argument('--alpha', type=_floats, default=None, help='Comma-separated BLEND_ALPHA values')
+    ap.add_argument('--max-picks', type=lambda t: [int(v) for v in _floats(t)], default=None)
+    ap.add_argument('--workers', type=int, default=None)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    grid = threshold_range(args.lo, args.hi, args.step)
+    df = run_sweep(grid, grid, grid, args.k, args.edge_min, args.alpha, args.max_picks, workers=args.workers)
+    if not df.empty:
+        print(df.head(10))
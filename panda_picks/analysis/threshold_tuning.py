@@ -1,4 +1,3 @@
-import itertools
 import logging
 import math
 import time
@@ -8,17 +7,16 @@ import numpy as np
 import pandas as pd
 
 from panda_picks.db.database import get_connection
-from panda_picks.analysis.picks import ADVANTAGE_BASE_COLUMNS, K_PROB_SCALE
+from panda_picks.analysis.picks import K_PROB_SCALE
+from panda_picks.analysis.utils.advantages import compute_advantages
 from panda_picks.config.settings import Settings
-from panda_picks.analysis.utils.probability import calculate_win_probability
+from panda_picks.analysis.utils.probability import calculate_win_probability, win_probability_array
 
 PRIMARY_ADV_COLS = ['Overall_Adv', 'Offense_Adv', 'Defense_Adv']
 
 
 def _compute_advantages(df: pd.DataFrame) -> pd.DataFrame:
-    for new_col, func in ADVANTAGE_BASE_COLUMNS:
-        df[new_col] = df.apply(func, axis=1)
-    return df
+    return compute_advantages(df)
 
 
 def _decide_pick(row, thresholds):
@@ -55,6 +53,136 @@ def _logistic_prob(overall_adv):
     return calculate_win_probability(overall_adv)
 
 
+def _side_masks(values: np.ndarray, thresholds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(n_games, n_thresholds) home/away significance votes, as in _decide_pick (NaN -> neutral)."""
+    v = values[:, None]
+    home = v >= thresholds[None, :]
+    away = ~home & (v <= -thresholds[None, :])
+    return home, away
+
+
+def _moneyline_profit_array(odds: np.ndarray) -> np.ndarray:
+    """Column-wise _moneyline_profit for a unit stake (NaN odds stay NaN)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(odds > 0, odds / 100, 1 / (np.abs(odds) / 100))
+
+
+def _weights_from_arrays(has_result: np.ndarray, home_win: np.ndarray, prob: np.ndarray,
+                         home_odds: np.ndarray, away_odds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per-game contributions to the grid aggregates if the home / away side is picked.
+
+    Rows (see GRID_AGGREGATES): picks, evaluated picks, correct picks, priced picks,
+    moneyline profit, sum of home win prob, count of non-NaN probs.
+    """
+    has_result = np.asarray(has_result, dtype=bool)
+    home_win = np.asarray(home_win, dtype=bool)
+    prob_ok = ~np.isnan(prob)
+    shared = [np.ones(len(has_result)), has_result, None, None, None, np.where(prob_ok, prob, 0.0), prob_ok]
+    weights = []
+    for odds, won in ((home_odds, home_win), (away_odds, ~home_win)):
+        odds = np.asarray(odds, dtype=float)
+        priced = has_result & ~np.isnan(odds)
+        profit = np.where(won, _moneyline_profit_array(odds), -1.0)
+        w = list(shared)
+        w[2] = has_result & won
+        w[3] = priced
+        w[4] = np.where(priced, profit, 0.0)
+        weights.append(np.vstack(w).astype(float))
+    return weights[0], weights[1]
+
+
+def _game_weights(base: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    return _weights_from_arrays(
+        base['Has_Result'].to_numpy(dtype=bool),
+        base['Home_Win'].to_numpy() == 1,
+        win_probability_array(base['Overall_Adv']),
+        pd.to_numeric(base['Home_Odds_Close'], errors='coerce').to_numpy(dtype=float),
+        pd.to_numeric(base['Away_Odds_Close'], errors='coerce').to_numpy(dtype=float),
+    )
+
+
+def _results_frame(agg: np.ndarray, grids: list, total_games: int, min_picks: int = 1) -> pd.DataFrame:
+    """Result rows from a (7, n_points) aggregate matrix whose columns follow product(*grids) order."""
+    picks, evaluated, correct, counted, profit, prob_sum, prob_cnt = agg
+    o_idx, f_idx, d_idx = np.unravel_index(np.arange(picks.size), tuple(len(g) for g in grids))
+    keep = (picks > 0) & (picks >= min_picks) & (evaluated > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(counted > 0, profit / counted, np.nan)
+        avg_prob = np.where(prob_cnt > 0, prob_sum / prob_cnt, np.nan)
+        accuracy = correct / evaluated
+    return pd.DataFrame({
+        'Overall_Thresh': np.asarray(grids[0])[o_idx[keep]],
+        'Offense_Thresh': np.asarray(grids[1])[f_idx[keep]],
+        'Defense_Thresh': np.asarray(grids[2])[d_idx[keep]],
+        'Total_Games': total_games,
+        'Picks': picks[keep].astype(int),
+        'Evaluated_Picks': counted[keep].astype(int),
+        'Accuracy': accuracy[keep],
+        'Profit': profit[keep],
+        'ROI_per_Pick': roi[keep],
+        'Avg_Home_Win_Prob': avg_prob[keep],
+        'Timestamp': datetime.utcnow().isoformat()
+    })
+
+
+def _evaluate_grid(base: pd.DataFrame, overall_range, offense_range, defense_range, min_picks: int = 1) -> pd.DataFrame:
+    """Evaluate every threshold triple at once.
+
+    Significance masks are built once per column and threshold value, combined per
+    Overall_Adv threshold into a (games, offense, defense) boolean tensor, and
+    aggregated with one matrix product against per-game weights.
+    """
+    grids = [list(overall_range), list(offense_range), list(defense_range)]
+    if not all(grids) or base.empty:
+        return pd.DataFrame()
+    masks = [_side_masks(pd.to_numeric(base[col], errors='coerce').to_numpy(dtype=float),
+                         np.asarray(vals, dtype=float))
+             for col, vals in zip(PRIMARY_ADV_COLS, grids)]
+    (home_o, away_o), (home_f, away_f), (home_d, away_d) = masks
+    w_home, w_away = _game_weights(base)
+    n = len(base)
+    home_fd = home_f[:, :, None] | home_d[:, None, :]
+    away_fd = away_f[:, :, None] | away_d[:, None, :]
+    agg = np.empty((len(grids[0]), w_home.shape[0], len(grids[1]) * len(grids[2])))
+    for i in range(len(grids[0])):
+        home_sig = home_fd | home_o[:, i, None, None]
+        away_sig = away_fd | away_o[:, i, None, None]
+        pick_home = (home_sig & ~away_sig).reshape(n, -1)
+        pick_away = (away_sig & ~home_sig).reshape(n, -1)
+        agg[i] = w_home @ pick_home + w_away @ pick_away
+    return _results_frame(agg.transpose(1, 0, 2).reshape(w_home.shape[0], -1), grids, n, min_picks)
+
+
+def threshold_range(start: float = 0.0, stop: float = 10.0, step: float = 0.25) -> list[float]:
+    """Inclusive evenly spaced threshold values, e.g. 0.25-point steps over 0-10."""
+    return [round(start + i * step, 10) for i in range(int(math.floor((stop - start) / step + 1e-9)) + 1)]
+
+
+def _load_base(conn) -> pd.DataFrame:
+    """Spreads merged with home/opponent grades, advantages and result flags (one row per game)."""
+    spreads = pd.read_sql_query("SELECT * FROM spreads", conn)
+    grades = pd.read_sql_query("SELECT * FROM grades", conn)
+    # Standardize team column names
+    if 'TEAM' in grades.columns:
+        grades = grades.rename(columns={'TEAM': 'Home_Team'})
+    elif 'Team' in grades.columns:
+        grades = grades.rename(columns={'Team': 'Home_Team'})
+    opp_grades = grades.copy().rename(columns={
+        'Home_Team': 'Away_Team',
+        'OVR': 'OPP_OVR', 'OFF': 'OPP_OFF', 'DEF': 'OPP_DEF', 'PASS': 'OPP_PASS',
+        'PBLK': 'OPP_PBLK', 'RECV': 'OPP_RECV', 'RUN': 'OPP_RUN', 'RBLK': 'OPP_RBLK',
+        'PRSH': 'OPP_PRSH', 'COV': 'OPP_COV', 'RDEF': 'OPP_RDEF', 'TACK': 'OPP_TACK'
+    })
+    base = spreads.merge(grades, on='Home_Team', how='left').merge(opp_grades, on='Away_Team', how='left')
+    base = _compute_advantages(base)
+    # Determine outcomes (only for games with both scores present)
+    base['Home_Score'] = pd.to_numeric(base['Home_Score'], errors='coerce')
+    base['Away_Score'] = pd.to_numeric(base['Away_Score'], errors='coerce')
+    base['Has_Result'] = ~(base['Home_Score'].isna() | base['Away_Score'].isna())
+    base['Home_Win'] = (base['Has_Result'] & (base['Home_Score'] > base['Away_Score'])).astype(int)
+    return base
+
+
 def tune_thresholds(
     overall_range=range(1, 6),
     offense_range=range(1, 6),
@@ -72,84 +200,17 @@ def tune_thresholds(
     logging.info("Threshold tuning started")
     conn = get_connection()
     try:
-        spreads = pd.read_sql_query("SELECT * FROM spreads", conn)
-        grades = pd.read_sql_query("SELECT * FROM grades", conn)
-        # Standardize team column names
-        if 'TEAM' in grades.columns:
-            grades = grades.rename(columns={'TEAM': 'Home_Team'})
-        elif 'Team' in grades.columns:
-            grades = grades.rename(columns={'Team': 'Home_Team'})
-        opp_grades = grades.copy().rename(columns={
-            'Home_Team': 'Away_Team',
-            'OVR': 'OPP_OVR', 'OFF': 'OPP_OFF', 'DEF': 'OPP_DEF', 'PASS': 'OPP_PASS',
-            'PBLK': 'OPP_PBLK', 'RECV': 'OPP_RECV', 'RUN': 'OPP_RUN', 'RBLK': 'OPP_RBLK',
-            'PRSH': 'OPP_PRSH', 'COV': 'OPP_COV', 'RDEF': 'OPP_RDEF', 'TACK': 'OPP_TACK'
-        })
-        base = spreads.merge(grades, on='Home_Team', how='left').merge(opp_grades, on='Away_Team', how='left')
-        base = _compute_advantages(base)
-        # Determine outcomes (only for games with both scores present)
-        base['Home_Score'] = pd.to_numeric(base['Home_Score'], errors='coerce')
-        base['Away_Score'] = pd.to_numeric(base['Away_Score'], errors='coerce')
-        base['Home_Win'] = base.apply(lambda r: 1 if (not pd.isna(r['Home_Score']) and not pd.isna(r['Away_Score']) and r['Home_Score'] > r['Away_Score']) else 0, axis=1)
-        base['Has_Result'] = ~(base['Home_Score'].isna() | base['Away_Score'].isna())
-        results_rows = []
-        total_games = len(base)
-        for o, off, d in itertools.product(overall_range, offense_range, defense_range):
-            thresholds = {
-                'Overall_Adv': float(o),
-                'Offense_Adv': float(off),
-                'Defense_Adv': float(d)
-            }
-            df = base.copy()
-            df['Pick'] = df.apply(lambda r: _decide_pick(r, thresholds), axis=1)
-            picked = df[df['Pick'] != 'PASS']
-            if picked.empty or len(picked) < min_picks:
-                continue
-            eval_df = picked[picked['Has_Result']]
-            if eval_df.empty:
-                continue
-            eval_df['Correct'] = eval_df.apply(lambda r: r['Pick'] == (r['Home_Team'] if r['Home_Win'] == 1 else r['Away_Team']), axis=1)
-            accuracy = eval_df['Correct'].mean() if not eval_df.empty else np.nan
-            # Profit using moneyline odds
-            profits = []
-            counted = 0
-            for _, row in eval_df.iterrows():
-                if row['Pick'] == row['Home_Team']:
-                    odds = row.get('Home_Odds_Close')
-                    if pd.isna(odds):
-                        continue
-                    profit = _moneyline_profit(odds) if row['Correct'] else -1.0
-                else:
-                    odds = row.get('Away_Odds_Close')
-                    if pd.isna(odds):
-                        continue
-                    profit = _moneyline_profit(odds) if row['Correct'] else -1.0
-                profits.append(profit)
-                counted += 1
-            total_profit = sum(profits)
-            roi = total_profit / counted if counted else np.nan
-            avg_prob = picked['Overall_Adv'].apply(_logistic_prob).mean()
-            results_rows.append({
-                'Overall_Thresh': o,
-                'Offense_Thresh': off,
-                'Defense_Thresh': d,
-                'Total_Games': total_games,
-                'Picks': len(picked),
-                'Evaluated_Picks': counted,
-                'Accuracy': accuracy,
-                'Profit': total_profit,
-                'ROI_per_Pick': roi,
-                'Avg_Home_Win_Prob': avg_prob,
-                'Timestamp': datetime.utcnow().isoformat()
-            })
-        if not results_rows:
+        base = _load_base(conn)
+        results_df = _evaluate_grid(base, overall_range, offense_range, defense_range, min_picks)
+        if results_df.empty:
             logging.warning("No threshold results generated (possibly no games with scores).")
             return pd.DataFrame()
-        results_df = pd.DataFrame(results_rows)
         # Ranking metrics: sort by ROI then Accuracy then Picks (descending)
         results_df = results_df.sort_values(by=['ROI_per_Pick', 'Accuracy', 'Picks'], ascending=[False, False, False])
-        # Store
-        results_df.to_sql('threshold_tuning_results', conn, if_exists='replace', index=False)
+        # Store (replacing earlier plain grid rows; sweep rows from threshold_sweep are kept)
+        with conn:
+            conn.execute("DELETE FROM threshold_tuning_results WHERE Sweep_Id IS NULL")
+            results_df.to_sql('threshold_tuning_results', conn, if_exists='append', index=False)
         logging.info("Threshold tuning completed and results stored (threshold_tuning_results table).")
         return results_df
     finally:
@@ -157,7 +218,17 @@ def tune_thresholds(
 
 
 if __name__ == '__main__':
+    import argparse
+    ap = argparse.ArgumentParser(description='Grid search significance thresholds')
+    ap.add_argument('--step', type=float, default=None, help='Threshold step (e.g. 0.25); default integer grid 1-5')
+    ap.add_argument('--min', dest='lo', type=float, default=0.0)
+    ap.add_argument('--max', dest='hi', type=float, default=10.0)
+    args = ap.parse_args()
     logging.basicConfig(level=logging.INFO)
-    df = tune_thresholds()
+    if args.step:
+        grid = threshold_range(args.lo, args.hi, args.step)
+        df = tune_thresholds(grid, grid, grid)
+    else:
+        df = tune_thresholds()
     if not df.empty:
         print(df.head(10))
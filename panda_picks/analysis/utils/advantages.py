@@ -0,0 +1,96 @@
+"""Declarative advantage spec + column-wise evaluation.
+
+Each advantage is a (name, left, right) triple meaning ``name = left - right``.
+The spec is compiled once into column index arrays so a whole frame (one week or
+a full multi-season backtest) is evaluated as a single NumPy subtraction instead
+of a per-row ``DataFrame.apply``.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+AdvantageSpec = Sequence[Tuple[str, str, str]]
+
+# Team metric minus opponent metric (grades merged as X / OPP_X)
+ADVANTAGE_SPEC: List[Tuple[str, str, str]] = [
+    ('Overall_Adv', 'OVR', 'OPP_OVR'),
+    ('Offense_Adv', 'OFF', 'OPP_DEF'),
+    ('Defense_Adv', 'DEF', 'OPP_OFF'),
+    ('Passing_Adv', 'PASS', 'OPP_COV'),
+    ('Pass_Block_Adv', 'PBLK', 'OPP_PRSH'),
+    ('Receiving_Adv', 'RECV', 'OPP_COV'),
+    ('Running_Adv', 'RUN', 'OPP_RDEF'),
+    ('Run_Block_Adv', 'RBLK', 'OPP_RDEF'),
+    ('Run_Defense_Adv', 'RDEF', 'OPP_RUN'),
+    ('Pass_Rush_Adv', 'PRSH', 'OPP_PBLK'),
+    ('Coverage_Adv', 'COV', 'OPP_RECV'),
+    ('Tackling_Adv', 'TACK', 'OPP_RUN'),
+]
+
+# Engineered interaction features built from the advantages above
+MISMATCH_SPEC: List[Tuple[str, str, str]] = [
+    ('Pressure_Mismatch', 'Pass_Block_Adv', 'Pass_Rush_Adv'),
+    ('Explosive_Pass_Mismatch', 'Receiving_Adv', 'Coverage_Adv'),
+    ('Script_Control_Mismatch', 'Run_Block_Adv', 'Run_Defense_Adv'),
+]
+
+
+class CompiledAdvantages:
+    """Advantage spec resolved to unique input columns + index arrays."""
+
+    def __init__(self, spec: AdvantageSpec):
+        self.names: List[str] = [name for name, _, _ in spec]
+        inputs: List[str] = []
+        pos: Dict[str, int] = {}
+        for _, left, right in spec:
+            for col in (left, right):
+                if col not in pos:
+                    pos[col] = len(inputs)
+                    inputs.append(col)
+        self.inputs = inputs
+        self.left_idx = np.array([pos[left] for _, left, _ in spec], dtype=np.intp)
+        self.right_idx = np.array([pos[right] for _, _, right in spec], dtype=np.intp)
+
+    def evaluate(self, df: pd.DataFrame) -> np.ndarray:
+        """Return an (n_rows, n_advantages) float matrix. Missing inputs evaluate to NaN."""
+        values = np.full((len(df), len(self.inputs)), np.nan, dtype=float)
+        for i, col in enumerate(self.inputs):
+            if col in df.columns:
+                values[:, i] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        return values[:, self.left_idx] - values[:, self.right_idx]
+
+    def apply(self, df: pd.DataFrame, overwrite: bool = True) -> pd.DataFrame:
+        out = self.evaluate(df)
+        for i, name in enumerate(self.names):
+            if overwrite or name not in df.columns:
+                df[name] = out[:, i]
+        return df
+
+
+_COMPILED: Dict[Tuple[Tuple[str, str, str], ...], CompiledAdvantages] = {}
+
+
+def compile_spec(spec: AdvantageSpec) -> CompiledAdvantages:
+    key = tuple(tuple(t) for t in spec)
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        compiled = CompiledAdvantages(key)
+        _COMPILED[key] = compiled
+    return compiled
+
+
+def compute_advantages(df: pd.DataFrame, spec: AdvantageSpec = ADVANTAGE_SPEC, overwrite: bool = True) -> pd.DataFrame:
+    """Add one column per spec entry (left - right), in place. Returns df for chaining."""
+    return compile_spec(spec).apply(df, overwrite=overwrite)
+
+
+def compute_mismatches(df: pd.DataFrame) -> pd.DataFrame:
+    """Add engineered mismatch columns from already computed advantage columns."""
+    return compile_spec(MISMATCH_SPEC).apply(df)
+
+
+def row_functions(spec: AdvantageSpec = ADVANTAGE_SPEC) -> List[Tuple[str, Callable[[pd.Series], float]]]:
+    """Legacy (name, row -> value) pairs for callers still using DataFrame.apply(axis=1)."""
+    return [(name, (lambda r, a=left, b=right: r[a] - r[b])) for name, left, right in spec]
@@ -1,6 +1,8 @@
+import heapq
 import itertools
 import math
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
 
@@ -49,77 +51,220 @@ def _extract_pick_decimal_odds(row: pd.Series) -> float:
     return math.nan
 
 
+def _format_line(val) -> str:
+    try:
+        if val is None or (isinstance(val, float) and math.isnan(val)):
+            return 'N/A'
+        v = float(val)
+        if abs(v) < 1e-9:
+            return 'PK'
+        return f"{v:+g}"  # includes sign, removes trailing zeros
+    except Exception:
+        return 'N/A'
+
+
+def _pick_line(row: pd.Series) -> float:
+    if row.get('Game_Pick') == row.get('Home_Team'):
+        val = row.get('Home_Line_Close', math.nan)
+    elif row.get('Game_Pick') == row.get('Away_Team'):
+        val = row.get('Away_Line_Close', math.nan)
+    else:
+        return math.nan
+    return math.nan if val is None else val
+
+
+class _Legs:
+    """Per-leg pick probability, decimal odds and teaser lines, extracted once per slate."""
+
+    def __init__(self, picks_df: pd.DataFrame):
+        self.teams: List[Any] = []
+        self.probs: List[float] = []
+        self.dec_odds: List[float] = []
+        self.lines: List[Dict[str, Any]] = []
+        for _, row in picks_df.iterrows():
+            self.teams.append(row['Game_Pick'])
+            self.probs.append(_extract_pick_probability(row))
+            self.dec_odds.append(_extract_pick_decimal_odds(row))
+            current_line = _pick_line(row)
+            teaser_line = current_line + 6 if not (isinstance(current_line, float) and math.isnan(current_line)) else math.nan
+            self.lines.append({
+                'Team': row.get('Game_Pick'),
+                'Current_Line': current_line,
+                'Teaser_Line': teaser_line,
+                'Current_Line_Display': _format_line(current_line),
+                'Teaser_Line_Display': _format_line(teaser_line)
+            })
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def combined(self, idx: Sequence[int]) -> Tuple[float, float]:
+        """(combined probability, book decimal odds); NaN if any leg lacks a value."""
+        return math.prod(self.probs[i] for i in idx), math.prod(self.dec_odds[i] for i in idx)
+
+    def record(self, idx: Sequence[int], combined_prob: float, book_dec_odds: float) -> Dict[str, Any]:
+        fair_dec_odds = (1/combined_prob) if combined_prob and not math.isnan(combined_prob) and combined_prob > 0 else math.nan
+        book_implied_prob = (1/book_dec_odds) if book_dec_odds and not math.isnan(book_dec_odds) else math.nan
+        # Edge vs book using probabilities (positive => value)
+        parlay_edge = (combined_prob - book_implied_prob) if (not math.isnan(combined_prob) and not math.isnan(book_implied_prob)) else math.nan
+        return {
+            'Size': len(idx),
+            'Teams': ' / '.join(self.teams[i] for i in idx),
+            'Combined_Prob': combined_prob,
+            'Book_Dec_Odds': book_dec_odds,
+            'Book_American_Odds': decimal_to_american(book_dec_odds),
+            'Fair_Dec_Odds': fair_dec_odds,
+            'Fair_American_Odds': decimal_to_american(fair_dec_odds),
+            'Parlay_Edge': parlay_edge,
+            'Est_Payout_100': (100 * (book_dec_odds - 1)) if not math.isnan(book_dec_odds) else math.nan,
+            'Leg_Lines': [dict(self.lines[i]) for i in idx]
+        }
+
+
+def _index_combinations(n: int, min_size: int, max_size: int, sizes: Optional[Iterable[int]]) -> Iterator[Tuple[int, ...]]:
+    allowed = None if sizes is None else {int(s) for s in sizes}
+    for r in range(min_size, min(max_size, n) + 1):
+        if allowed is None or r in allowed:
+            yield from itertools.combinations(range(n), r)
+
+
+def iter_bet_combinations(picks_df: pd.DataFrame, min_size: int = 2, max_size: int = 8,
+                          sizes: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+    """Lazily yield parlay combinations (same records as generate_bet_combinations).
+
+    Legs are extracted from picks_df once; each combination only multiplies cached
+    per-leg values. ``sizes`` optionally restricts the leg counts within min..max.
+    """
+    if picks_df is None or picks_df.empty:
+        return
+    legs = _Legs(picks_df)
+    for idx in _index_combinations(len(legs), min_size, max_size, sizes):
+        yield legs.record(idx, *legs.combined(idx))
+
+
+def top_bet_combinations(picks_df: pd.DataFrame, k: int, by: str = 'Parlay_Edge', min_size: int = 2,
+                         max_size: int = 8, sizes: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    """The k best combinations by ``by`` ('Parlay_Edge' or 'Combined_Prob'), best first.
+
+    Keeps a bounded min-heap of k candidates while streaming, so memory is O(k) and full
+    records are only built for the survivors. Combinations whose key is NaN rank last;
+    ties keep generation order.
+    """
+    if by not in ('Parlay_Edge', 'Combined_Prob'):
+        raise ValueError(f"Unsupported ranking key: {by}")
+    if k <= 0 or picks_df is None or picks_df.empty:
+        return []
+    legs = _Legs(picks_df)
+    heap: List[Tuple[float, int, Tuple[int, ...], float, float]] = []
+    for seq, idx in enumerate(_index_combinations(len(legs), min_size, max_size, sizes)):
+        prob, dec = legs.combined(idx)
+        if by == 'Combined_Prob':
+            key = prob
+        else:
+            key = (prob - 1/dec) if (not math.isnan(prob) and dec and not math.isnan(dec)) else math.nan
+        if math.isnan(key):
+            key = -math.inf
+        item = (key, -seq, idx, prob, dec)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return [legs.record(idx, prob, dec) for _, _, idx, prob, dec in sorted(heap, reverse=True)]
+
+
+def _decimal_to_american_array(dec: np.ndarray) -> np.ndarray:
+    """Column-wise decimal_to_american (NaN for d <= 1 or missing)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(dec >= 2.0, (dec - 1) * 100, -100 / (dec - 1))
+    return np.where(np.isnan(dec) | (dec <= 1), np.nan, out)
+
+
+def combination_index_matrix(n: int, size: int) -> np.ndarray:
+    """All size-subsets of range(n) as a (C(n, size), size) index matrix, lexicographic order."""
+    count = math.comb(n, size)
+    flat = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(n), size)),
+                       dtype=np.intp, count=count * size)
+    return flat.reshape(count, size)
+
+
+def bet_combination_table(picks_df: pd.DataFrame, min_size: int = 2, max_size: int = 8,
+                          sizes: Optional[Iterable[int]] = None, with_teams: bool = True) -> pd.DataFrame:
+    """Evaluate every parlay combination at once as a columnar table.
+
+    Each size is enumerated as an index matrix; combined probability and book odds
+    are exp(sum(log leg values)) over its rows, so missing leg values propagate as
+    NaN. Columns: Size, Mask (bitmask of leg positions in picks_df), Teams (optional),
+    Combined_Prob, Book_Dec_Odds, Book_American_Odds, Fair_Dec_Odds,
+    Fair_American_Odds, Parlay_Edge, Est_Payout_100. Rows follow the order of
+    iter_bet_combinations; per-leg lines are available via leg_table().
+    """
+    columns = ['Size', 'Mask'] + (['Teams'] if with_teams else []) + [
+        'Combined_Prob', 'Book_Dec_Odds', 'Book_American_Odds', 'Fair_Dec_Odds',
+        'Fair_American_Odds', 'Parlay_Edge', 'Est_Payout_100']
+    if picks_df is None or picks_df.empty:
+        return pd.DataFrame(columns=columns)
+    legs = _Legs(picks_df)
+    n = len(legs)
+    if n > 63:
+        raise ValueError(f"Too many legs for an int64 Mask: {n}")
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_prob = np.log(np.asarray(legs.probs, dtype=float))
+        log_dec = np.log(np.asarray(legs.dec_odds, dtype=float))
+    bits = np.left_shift(np.int64(1), np.arange(n, dtype=np.int64))
+    names = np.array(legs.teams, dtype=object)
+    sep_names = ' / ' + names
+    allowed = None if sizes is None else {int(s) for s in sizes}
+    parts = []
+    for r in range(min_size, min(max_size, n) + 1):
+        if allowed is not None and r not in allowed:
+            continue
+        idx = combination_index_matrix(n, r)
+        part = {
+            'Size': np.full(len(idx), r, dtype=np.int64),
+            'Mask': bits[idx].sum(axis=1),
+            'Combined_Prob': np.exp(log_prob[idx].sum(axis=1)),
+            'Book_Dec_Odds': np.exp(log_dec[idx].sum(axis=1)),
+        }
+        if with_teams:
+            teams = names[idx[:, 0]]
+            for j in range(1, r):
+                teams = teams + sep_names[idx[:, j]]
+            part['Teams'] = teams
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    cols = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    prob, dec = cols['Combined_Prob'], cols['Book_Dec_Odds']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fair = np.where(prob > 0, 1 / prob, np.nan)
+        cols['Parlay_Edge'] = prob - 1 / dec
+    cols['Fair_Dec_Odds'] = fair
+    cols['Book_American_Odds'] = _decimal_to_american_array(dec)
+    cols['Fair_American_Odds'] = _decimal_to_american_array(fair)
+    cols['Est_Payout_100'] = 100 * (dec - 1)
+    return pd.DataFrame(cols, columns=columns)
+
+
+def leg_table(picks_df: pd.DataFrame) -> pd.DataFrame:
+    """Per-leg inputs used by the combination builders (row i = bit i of Mask)."""
+    if picks_df is None or picks_df.empty:
+        return pd.DataFrame(columns=['Team', 'Pick_Prob', 'Dec_Odds', 'Current_Line', 'Teaser_Line'])
+    legs = _Legs(picks_df)
+    return pd.DataFrame({
+        'Team': legs.teams,
+        'Pick_Prob': legs.probs,
+        'Dec_Odds': legs.dec_odds,
+        'Current_Line': [ll['Current_Line'] for ll in legs.lines],
+        'Teaser_Line': [ll['Teaser_Line'] for ll in legs.lines],
+    })
+
+
 def generate_bet_combinations(picks_df: pd.DataFrame, min_size: int = 2, max_size: int = 8) -> List[Dict[str, Any]]:
     """Generate all parlay combinations between min_size and max_size from picks_df.
 
     Returns list of dicts with keys:
       Size, Teams, Combined_Prob, Combined_Dec_Odds, Est_Payout_100
     Probabilities & odds gracefully degrade if inputs missing.
+    Prefer iter_bet_combinations / top_bet_combinations for large slates.
     """
-    if picks_df is None or picks_df.empty:
-        return []
-    picks = picks_df.copy()
-    combos: List[Dict[str, Any]] = []
-    max_size = min(max_size, len(picks))
-
-    def _format_line(val):
-        try:
-            if val is None or (isinstance(val, float) and math.isnan(val)):
-                return 'N/A'
-            v = float(val)
-            if abs(v) < 1e-9:
-                return 'PK'
-            return f"{v:+g}"  # includes sign, removes trailing zeros
-        except Exception:
-            return 'N/A'
-
-    for r in range(min_size, max_size + 1):
-        for indices in itertools.combinations(picks.index, r):
-            rows = picks.loc[list(indices)]
-            team_names = [row['Game_Pick'] for _, row in rows.iterrows()]
-            probs = []
-            odds_list = []
-            leg_lines = []
-            for _, row in rows.iterrows():
-                p = _extract_pick_probability(row)
-                if not math.isnan(p):
-                    probs.append(p)
-                o = _extract_pick_decimal_odds(row)
-                if not math.isnan(o):
-                    odds_list.append(o)
-                # Line extraction
-                current_line = math.nan
-                if row.get('Game_Pick') == row.get('Home_Team'):
-                    current_line = row.get('Home_Line_Close', math.nan)
-                elif row.get('Game_Pick') == row.get('Away_Team'):
-                    current_line = row.get('Away_Line_Close', math.nan)
-                teaser_line = current_line + 6 if not (isinstance(current_line, float) and math.isnan(current_line)) else math.nan
-                leg_lines.append({
-                    'Team': row.get('Game_Pick'),
-                    'Current_Line': current_line,
-                    'Teaser_Line': teaser_line,
-                    'Current_Line_Display': _format_line(current_line),
-                    'Teaser_Line_Display': _format_line(teaser_line)
-                })
-            combined_prob = math.prod(probs) if probs and len(probs) == r else math.nan
-            book_dec_odds = math.prod(odds_list) if odds_list and len(odds_list) == r else math.nan
-            fair_dec_odds = (1/combined_prob) if combined_prob and not math.isnan(combined_prob) and combined_prob > 0 else math.nan
-            fair_american = decimal_to_american(fair_dec_odds)
-            book_american = decimal_to_american(book_dec_odds)
-            # Edge vs book using probabilities (positive => value)
-            book_implied_prob = (1/book_dec_odds) if book_dec_odds and not math.isnan(book_dec_odds) else math.nan
-            parlay_edge = (combined_prob - book_implied_prob) if (not math.isnan(combined_prob) and not math.isnan(book_implied_prob)) else math.nan
-            est_payout = (100 * (book_dec_odds - 1)) if not math.isnan(book_dec_odds) else math.nan
-            combos.append({
-                'Size': r,
-                'Teams': ' / '.join(team_names),
-                'Combined_Prob': combined_prob,
-                'Book_Dec_Odds': book_dec_odds,
-                'Book_American_Odds': book_american,
-                'Fair_Dec_Odds': fair_dec_odds,
-                'Fair_American_Odds': fair_american,
-                'Parlay_Edge': parlay_edge,
-                'Est_Payout_100': est_payout,
-                'Leg_Lines': leg_lines
-            })
-    return combos
+    return list(iter_bet_combinations(picks_df, min_size, max_size))
@@ -30,3 +30,9 @@ def simulate_score(advantage: float, rng: np.random.Generator | None = None) ->
     away_pts = total - home_pts
     return int(max(0, round(home_pts))), int(max(0, round(away_pts)))
 
+
+
+def win_probability_array(advantage) -> np.ndarray:
+    """Vectorized calculate_win_probability for a Series/array of advantages (NaN stays NaN)."""
+    x = np.asarray(advantage, dtype=float)
+    return 1.0 / (1 + np.exp(-Settings.K_PROB_SCALE * x))
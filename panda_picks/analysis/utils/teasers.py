@@ -0,0 +1,101 @@
+"""Closed-form teaser / parlay accounting.
+
+A k-leg ticket pays only when every leg wins, so for one week with M graded legs
+of which N won there are C(M, k) tickets and exactly C(N, k) winners. Wagered
+amount, returns and profit per size follow directly from those two counts; no
+combination needs to be enumerated. ``combo_frame`` materializes the individual
+tickets and is only meant for exports (e.g. the ``teaser_results`` table), since
+its size grows combinatorially with the slate.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from itertools import combinations
+from math import comb
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:  # annotations only; pandas is imported where it is used
+    import pandas as pd
+
+# Legs -> American odds for a 6-point NFL teaser (5-8 legs follow common book tables)
+TEASER_ODDS: Dict[int, int] = {2: -135, 3: 140, 4: 240, 5: 400, 6: 600, 7: 800, 8: 1000}
+DEFAULT_TEASER_SIZES = (2, 3, 4)
+
+
+def win_profit(stake: float, odds: float) -> float:
+    """Profit (excluding stake) of a winning ticket at American odds."""
+    if odds > 0:
+        return stake * (odds / 100)
+    return stake / (abs(odds) / 100)
+
+
+@dataclass(frozen=True)
+class SizeSummary:
+    """Aggregate result of betting every k-leg combination of a week's legs."""
+    size: int
+    odds: float
+    stake: float
+    tickets: int
+    wins: int
+
+    @property
+    def losses(self) -> int:
+        return self.tickets - self.wins
+
+    @property
+    def wagered(self) -> float:
+        return self.tickets * self.stake
+
+    @property
+    def payout(self) -> float:
+        """Total return (stake + profit) of one winning ticket."""
+        return self.stake + win_profit(self.stake, self.odds)
+
+    @property
+    def returned(self) -> float:
+        return self.wins * self.payout
+
+    @property
+    def profit(self) -> float:
+        return self.wins * win_profit(self.stake, self.odds) - self.losses * self.stake
+
+
+def active_sizes(n_legs: int, sizes: Iterable[int] = DEFAULT_TEASER_SIZES,
+                 odds: Mapping[int, float] = TEASER_ODDS) -> List[int]:
+    """Sizes that can be bet with n_legs legs and have a price."""
+    return [k for k in sizes if k in odds and k <= n_legs]
+
+
+def summarize(won: Sequence[bool], sizes: Iterable[int] = DEFAULT_TEASER_SIZES, stake: float = 10.0,
+              odds: Mapping[int, float] = TEASER_ODDS) -> List[SizeSummary]:
+    """Per-size ticket/win counts from the leg outcome vector, in O(len(sizes))."""
+    won = np.asarray(won, dtype=bool)
+    m, n = len(won), int(won.sum())
+    return [SizeSummary(size=k, odds=odds[k], stake=stake, tickets=comb(m, k), wins=comb(n, k))
+            for k in active_sizes(m, sizes, odds)]
+
+
+def combo_frame(teams: Sequence, won: Sequence[bool], sizes: Iterable[int] = DEFAULT_TEASER_SIZES,
+                stake: float = 10.0, odds: Mapping[int, float] = TEASER_ODDS) -> pd.DataFrame:
+    """Materialize every ticket as a row (Combo, Winnings, Hit, Type) for export.
+
+    Winnings is the total return of a winning ticket and 0.0 otherwise. Row count is
+    sum(C(M, k)); use ``summarize`` when only totals are needed.
+    """
+    import pandas as pd  # only the export path needs pandas; keeps UI imports light
+    teams = np.asarray(teams, dtype=object)
+    won = np.asarray(won, dtype=bool)
+    frames = []
+    for s in summarize(won, sizes, stake, odds):
+        idx = np.array(list(combinations(range(len(teams)), s.size)), dtype=np.intp)
+        hit = won[idx].all(axis=1)
+        frames.append(pd.DataFrame({
+            'Combo': [str(tuple(teams[i] for i in c)) for c in idx],
+            'Winnings': np.where(hit, s.payout, 0.0),
+            'Hit': hit,
+            'Type': f'{s.size}-Team',
+        }))
+    if not frames:
+        return pd.DataFrame(columns=['Combo', 'Winnings', 'Hit', 'Type'])
+    return pd.concat(frames, ignore_index=True)
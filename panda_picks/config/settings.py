@@ -1,4 +1,5 @@
 import os
+from datetime import date
 from pathlib import Path
 from typing import Dict, Any
 
@@ -11,6 +12,12 @@ except Exception:
     pass
 
 
+def _current_season(today: date | None = None) -> int:
+    """NFL season year: a season starts in September and its playoffs run into February."""
+    today = today or date.today()
+    return today.year if today.month >= 3 else today.year - 1
+
+
 class Settings:
     """Central application settings.
     Values can be overridden via environment variables where practical.
@@ -24,6 +31,20 @@ class Settings:
     DATA_DIR: Path = BASE_DIR / "data"
     DATABASE_PATH: Path = BASE_DIR / "database" / "nfl_data.db"
 
+    # Season every fetch, pick and migration backfill is keyed on
+    SEASON: int = int(os.getenv("PP_SEASON", _current_season()))
+
+    # SQLite connection pool & pragmas (applied once per pooled connection)
+    DB_POOL_ENABLED: bool = os.getenv("PP_DB_POOL_ENABLED", "true").lower() in ("1","true","yes","on")
+    DB_BUSY_TIMEOUT_S: float = float(os.getenv("PP_DB_BUSY_TIMEOUT_S", 5.0))
+    DB_PRAGMAS: Dict[str, Any] = {
+        "journal_mode": os.getenv("PP_DB_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("PP_DB_SYNCHRONOUS", "NORMAL"),
+        "cache_size": int(os.getenv("PP_DB_CACHE_SIZE", -65536)),  # negative => KiB (64 MiB)
+        "mmap_size": int(os.getenv("PP_DB_MMAP_SIZE", 268435456)),  # 256 MiB
+        "temp_store": os.getenv("PP_DB_TEMP_STORE", "MEMORY"),
+    }
+
     # Advantage thresholds (can be tuned & updated at runtime)
     ADVANTAGE_THRESHOLDS: Dict[str, float] = {
         "Overall_Adv": float(os.getenv("PP_OVERALL_THRESH", 2.0)),
@@ -52,6 +73,35 @@ class Settings:
     # Max picks constraint
     MAX_PICKS_PER_WEEK: int = int(os.getenv("PP_MAX_PICKS_PER_WEEK", 8))
 
+    # Backtest teaser strategy: leg counts to bet (2-8) and whether every combo is written to teaser_results
+    TEASER_SIZES: tuple[int, ...] = tuple(int(s) for s in os.getenv("PP_TEASER_SIZES", "2,3,4").split(',') if s.strip())
+    TEASER_EXPORT_COMBOS: bool = os.getenv("PP_TEASER_EXPORT_COMBOS", "true").lower() in ("1","true","yes","on")
+
+    # Advanced stats scraping: requests in flight and spacing between requests to one host
+    SCRAPE_CONCURRENCY: int = int(os.getenv("PP_SCRAPE_CONCURRENCY", 4))
+    SCRAPE_MIN_INTERVAL_S: float = float(os.getenv("PP_SCRAPE_MIN_INTERVAL_S", 1.0))
+    # Shared on-disk HTTP cache (panda_picks.data.http_cache); entries are revalidated after a per-source TTL (seconds)
+    HTTP_CACHE_ENABLED: bool = os.getenv("PP_HTTP_CACHE_ENABLED", "true").lower() in ("1","true","yes","on")
+    HTTP_CACHE_DIR: Path = Path(os.getenv("PP_HTTP_CACHE_DIR", DATA_DIR / "http_cache"))
+    HTTP_CACHE_TTLS: Dict[str, float] = {
+        "pff_ticker": float(os.getenv("PP_HTTP_TTL_PFF_TICKER_S", 300)),
+        "pff_grades": float(os.getenv("PP_HTTP_TTL_PFF_GRADES_S", 3600)),
+        "sumersports": float(os.getenv("PP_HTTP_TTL_SUMERSPORTS_S", 3600)),
+    }
+    # Record/replay of raw responses (panda_picks.data.replay): 'live' | 'record' | 'replay'
+    HTTP_MODE: str = os.getenv("PP_HTTP_MODE", "live")
+    HTTP_FIXTURE_DIR: Path = Path(os.getenv("PP_HTTP_FIXTURE_DIR", DATA_DIR / "fixtures" / "http"))
+    HTTP_FIXTURE_SET: str = os.getenv("PP_HTTP_FIXTURE_SET", "default")
+    # Base URL of a stand-in server (panda_picks.data.standin_server); external requests are rerouted to it
+    HTTP_STANDIN_URL: str = os.getenv("PP_HTTP_STANDIN_URL", "")
+    # Pipeline stages run concurrently when independent (panda_picks.pipeline)
+    PIPELINE_WORKERS: int = int(os.getenv("PP_PIPELINE_WORKERS", 4))
+    # Reruns skip stages/weeks already completed with identical inputs; fetches expire after N hours
+    PIPELINE_RESUME: bool = os.getenv("PP_PIPELINE_RESUME", "true").lower() in ("1","true","yes","on")
+    PIPELINE_FETCH_MAX_AGE_H: float = float(os.getenv("PP_PIPELINE_FETCH_MAX_AGE_H", 6))
+    # Pipeline runs rebuild only weeks whose upstream rows changed (input_watermarks)
+    INCREMENTAL_RECOMPUTE: bool = os.getenv("PP_INCREMENTAL_RECOMPUTE", "true").lower() in ("1","true","yes","on")
+
     # Phase 2 blending alpha (Overall_Adv vs Net_Composite_norm)
     BLEND_ALPHA: float = float(os.getenv("PP_BLEND_ALPHA", 0.6))
 
@@ -1,8 +1,22 @@
-# Import from modules in this subpackage
-from . import advanced_stats
+# Submodules and helpers are resolved on first attribute access (PEP 562); the scrapers
+# import requests/BeautifulSoup/pandas, which callers of the repositories do not need.
+import importlib
 
-# Expose specific functions
-from .advanced_stats import main as get_advanced_stats
+_SUBMODULES = {'advanced_stats', 'get_pff_grades', 'grades_migration'}
+# Exported name -> (submodule, attribute)
+_EXPORTS = {
+    'get_advanced_stats': ('advanced_stats', 'main'),
+    'getGrades': ('get_pff_grades', 'getGrades'),
+}
 
 
-__all__ = ['advanced_stats', 'getGrades', 'get_advanced_stats']
\ No newline at end of file
+def __getattr__(name):
+    if name in _EXPORTS:
+        module, attr = _EXPORTS[name]
+        return getattr(importlib.import_module(f'{__name__}.{module}'), attr)
+    if name in _SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['advanced_stats', 'getGrades', 'get_advanced_stats']
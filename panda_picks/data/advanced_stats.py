@@ -1,13 +1,19 @@
 """Advanced NFL stats collection & composite scoring (week-aware).
 Minimal clean implementation supporting Phase 0-1.
+
+``AdvancedStatsCollector`` scrapes one week at a time; ``AsyncStatsCollector`` collects many
+weeks in one run (concurrent fetches through one shared session, per-host rate limiting,
+one batched write).
 """
 from __future__ import annotations
+import asyncio
 import requests, pandas as pd, numpy as np, sqlite3, logging, os, random, re, time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
+from panda_picks.data import http_cache, replay
+
 try:
     from panda_picks.db.database import get_connection
 except ImportError:  # fallback
@@ -17,11 +23,15 @@ except ImportError:  # fallback
         return sqlite3.connect(db_path)
 
 log_file = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'panda_picks.log')
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s %(levelname)s %(name)s - %(message)s',
-                    handlers=[logging.FileHandler(log_file), logging.StreamHandler()])
 logger = logging.getLogger('advanced_stats')
 
+
+def _ensure_logging():
+    """Configure file + console logging on first collection run (not at import)."""
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(levelname)s %(name)s - %(message)s',
+                        handlers=[logging.FileHandler(log_file), logging.StreamHandler()])
+
 WEIGHTS = {
     'offense': {
         'epa_per_play': 30,
@@ -82,6 +92,233 @@ COLUMN_MAPPING = {  # only map what we expect; unknown cols retained
     'Comp%':'Comp %', 'INT%':'Int %', 'Sack%':'Sack %'
 }
 
+def scrape_url(kind: str, season: int, week: int) -> Optional[str]:
+    """Page holding ``kind`` stats for a season/week.
+
+    The sumersports team pages are season-to-date and take no week parameter, so every
+    week maps to the same URL; collectors fetch each distinct URL once per run.
+    """
+    return SCRAPE_URLS.get(kind)
+
+
+def _table_frame(headers: List[str], cells) -> Optional[pd.DataFrame]:
+    rows = [row for row in cells if len(row) == len(headers)] if len(headers) > 2 else []
+    if not rows:
+        return None
+    return pd.DataFrame(np.array(rows, dtype=object), columns=headers)
+
+
+def _parse_stats_table_bs4(html: str) -> Optional[pd.DataFrame]:
+    """Pure-Python fallback for ``parse_stats_table`` when lxml is not installed."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table')
+    if not table: return None
+    headers = [th.get_text(strip=True) for th in table.find_all('th')]
+    if not headers:  # fallback first row
+        first_tr = table.find('tr')
+        if first_tr:
+            headers = [td.get_text(strip=True) for td in first_tr.find_all('td')]
+    return _table_frame(headers, ([td.get_text(strip=True) for td in tr.find_all('td')]
+                                  for tr in table.find_all('tr')))
+
+
+def parse_stats_table(html: str) -> Optional[pd.DataFrame]:
+    """First HTML table on the page as a raw string frame (None if no usable rows).
+
+    Parsed with lxml (libxml2); cell text matches BeautifulSoup's ``get_text(strip=True)``.
+    """
+    try:
+        from lxml import etree
+    except ImportError:
+        return _parse_stats_table_bs4(html)
+    root = etree.HTML(html) if html and html.strip() else None
+    table = next(root.iter('table'), None) if root is not None else None
+    if table is None: return None
+
+    def text(el) -> str:
+        if not len(el):  # leaf cell (most stat values): skip the itertext generator
+            return (el.text or '').strip()
+        return ''.join(t.strip() for t in el.itertext())
+
+    headers = [text(th) for th in table.iter('th')]
+    if not headers:  # fallback first row
+        first_tr = next(table.iter('tr'), None)
+        if first_tr is not None:
+            headers = [text(td) for td in first_tr.iter('td')]
+    return _table_frame(headers, ([text(td) for td in tr.iter('td')] for tr in table.iter('tr')))
+
+
+def coerce_numeric(frame: pd.DataFrame) -> pd.DataFrame:
+    """Strip ``%`` from every cell in one pass and turn each column that fully parses into float64.
+
+    Columns with any unparseable cell keep their (percent-stripped) strings; empty cells become NaN.
+    """
+    if frame.empty or not len(frame.columns):
+        return frame
+    stripped = pd.Series(frame.astype(str).to_numpy().ravel()).str.replace('%', '', regex=False)
+    numbers = pd.to_numeric(stripped, errors='coerce').to_numpy(dtype=float).reshape(frame.shape)
+    text = stripped.to_numpy(dtype=object).reshape(frame.shape)
+    parsed = ~(np.isnan(numbers) & (text != ''))
+    out = pd.DataFrame(numbers, index=frame.index)
+    for i in np.flatnonzero(~parsed.all(axis=0)):
+        out[i] = text[:, i]
+    out.columns = frame.columns
+    return out
+
+
+def _referrer(url: str) -> str:
+    p = urlparse(url)
+    return f"{p.scheme}://{p.netloc}/"
+
+
+_KEY_COLUMNS = ('season', 'week', 'type', 'TEAM')
+_BASE_COLUMNS = _KEY_COLUMNS + ('composite_score', 'z_score', 'last_updated')
+
+
+def _sql_values(series: pd.Series) -> np.ndarray:
+    """Column as an object array ready for sqlite: numbers as float, NaN/NaT/None as None."""
+    if pd.api.types.is_numeric_dtype(series):
+        arr = series.to_numpy(dtype=float)
+        out = arr.astype(object)
+        out[np.isnan(arr)] = None
+        return out
+    out = series.to_numpy(dtype=object, copy=True)
+    out[series.isna().to_numpy()] = None
+    return out
+
+
+def metric_columns(df: pd.DataFrame) -> List[str]:
+    """Scraped numeric metric columns of a stats frame (everything but keys/composites)."""
+    return [c for c in df.columns if c not in _BASE_COLUMNS and pd.api.types.is_numeric_dtype(df[c])]
+
+
+def _metric_ids(conn: sqlite3.Connection, names: List[str]) -> Dict[str, int]:
+    """``stat_metrics`` ids for ``names``, registering unseen metrics."""
+    known = dict(conn.execute("SELECT name, metric_id FROM stat_metrics"))
+    missing = [n for n in names if n not in known]
+    if missing:
+        conn.executemany("INSERT OR IGNORE INTO stat_metrics (name) VALUES (?)", [(n,) for n in missing])
+        known = dict(conn.execute("SELECT name, metric_id FROM stat_metrics"))
+    return known
+
+
+def write_advanced_stats(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """Upsert stats rows of any number of weeks/kinds in one transaction.
+
+    Keys, composites and timestamps go to ``advanced_stats``; every numeric scraped metric
+    goes to ``advanced_stats_raw`` as (season, week, type, TEAM, metric_id, value), replacing
+    the metric set previously stored for those rows. Columns are converted once each
+    (NaN -> NULL, missing metric values are not stored). Returns the number of rows written.
+    """
+    if df.empty:
+        return 0
+    base = [_sql_values(df[c]) if c in df.columns else np.full(len(df), None, dtype=object) for c in _BASE_COLUMNS]
+    metrics = metric_columns(df)
+    values = df[metrics].to_numpy(dtype=float)
+    rows, cols = np.nonzero(~np.isnan(values))
+    keys = base[:len(_KEY_COLUMNS)]
+    for attempt in (0, 1):
+        try:
+            with conn:
+                conn.executemany(f"INSERT OR REPLACE INTO advanced_stats ({','.join(_BASE_COLUMNS)}) "
+                                 f"VALUES ({','.join('?' * len(_BASE_COLUMNS))})", zip(*base))
+                conn.executemany("DELETE FROM advanced_stats_raw WHERE season = ? AND week = ? AND type = ? AND TEAM = ?",
+                                 zip(*keys))
+                if len(rows):
+                    ids = _metric_ids(conn, metrics)
+                    metric_id = np.array([ids[m] for m in metrics], dtype=object)
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO advanced_stats_raw (season, week, type, TEAM, metric_id, value) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        zip(*(k[rows] for k in keys), metric_id[cols], values[rows, cols].tolist()))
+            return len(df)
+        except sqlite3.OperationalError:
+            if attempt:
+                raise
+            from panda_picks.db.migrations import migrate
+            migrate(conn)  # tables missing (fresh or dropped database): bring the schema up to date once
+    return 0
+
+
+def load_metrics(conn: sqlite3.Connection, season: int, weeks: Optional[List[int]] = None,
+                 kinds: Optional[List[str]] = None, metrics: Optional[List[str]] = None) -> pd.DataFrame:
+    """Scraped metrics pivoted wide: one row per (season, week, type, TEAM), one column per metric.
+
+    Only the requested weeks/kinds/metrics are read from ``advanced_stats_raw``; with
+    ``metrics`` the columns come back in that order (absent metrics as all-NaN columns) and
+    rows holding none of them are omitted.
+    """
+    sql = ("SELECT r.week, r.type, r.TEAM, m.name, r.value FROM advanced_stats_raw r "
+           "JOIN stat_metrics m ON m.metric_id = r.metric_id WHERE r.season = ?")
+    params: list = [int(season)]
+    for column, values in (('r.week', weeks), ('r.type', kinds), ('m.name', metrics)):
+        if values is not None:
+            sql += f" AND {column} IN ({','.join('?' * len(values))})"
+            params.extend(values)
+    raw = pd.read_sql_query(sql, conn, params=params)
+    wide = raw.set_index(['week', 'type', 'TEAM', 'name'])['value'].unstack('name')
+    wide.columns.name = None
+    if metrics is not None:
+        wide = wide.reindex(columns=list(metrics))
+    wide = wide.reset_index()
+    wide.insert(0, 'season', int(season))
+    return wide.sort_values(['week', 'type', 'TEAM'], kind='stable', ignore_index=True)
+
+
+def _normalize(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    norm = df.copy()
+    for c in cols:
+        if c in df.columns:
+            mx, mn = df[c].max(), df[c].min()
+            norm[c] = 0.5 if mx == mn else (df[c]-mn)/(mx-mn)
+    return norm
+
+
+def composite_scores(stats_df: pd.DataFrame, kind: str) -> pd.DataFrame:
+    """Weighted composite (``WEIGHTS[kind]`` over min-max normalised metrics) and its z-score."""
+    if stats_df.empty: return stats_df
+    weights = WEIGHTS.get(kind, {})
+    cols = [c for c in weights if c in stats_df.columns]
+    if not cols:
+        stats_df['composite_score']=0; stats_df['z_score']=0; return stats_df
+    norm = _normalize(stats_df, cols)
+    inverse = {'int_rate','sack_rate','Int %','Sack %'}
+    for c in cols:
+        if kind=='offense' and c in inverse:
+            norm[c] = 1 - norm[c]
+        elif kind=='defense' and c not in inverse:
+            norm[c] = 1 - norm[c]
+    comp_cols=[]
+    for c in cols:
+        wc = f"{c}_w"; norm[wc]=norm[c]*weights[c]; comp_cols.append(wc)
+    out = stats_df.copy()
+    out['composite_score'] = norm[comp_cols].sum(axis=1)
+    mu = out['composite_score'].mean(); sd = out['composite_score'].std()
+    out['z_score'] = (out['composite_score']-mu)/sd if sd>0 else 0
+    out['last_updated'] = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    return out
+
+
+def recompute_composites(conn: sqlite3.Connection, season: int, weeks: Optional[List[int]] = None) -> int:
+    """Rebuild composites from stored metrics (e.g. after changing ``WEIGHTS``) without rescraping.
+
+    Reads only the weighted metrics of each kind. Returns the number of rows updated.
+    """
+    frames = []
+    for kind, weights in WEIGHTS.items():
+        wide = load_metrics(conn, season, weeks, [kind], list(weights))
+        frames += [composite_scores(frame, kind) for _, frame in wide.groupby('week', sort=True)]
+    if not frames:
+        return 0
+    out = pd.concat(frames, ignore_index=True)
+    cols = ['composite_score', 'z_score', 'last_updated', *_KEY_COLUMNS]
+    with conn:
+        conn.executemany("UPDATE advanced_stats SET composite_score = ?, z_score = ?, last_updated = ? "
+                         "WHERE season = ? AND week = ? AND type = ? AND TEAM = ?", zip(*(_sql_values(out[c]) for c in cols)))
+    return len(out)
+
+
 class AdvancedStatsCollector:
     def __init__(self, season: int, week: Optional[int] = None):
         self.season = season
@@ -100,8 +337,7 @@ class AdvancedStatsCollector:
         return s
 
     def _referrer(self, url: str) -> str:
-        p = urlparse(url)
-        return f"{p.scheme}://{p.netloc}/"
+        return _referrer(url)
 
     def scrape_team_data(self, kind: str, retries: int = 3) -> Optional[pd.DataFrame]:
         url = SCRAPE_URLS.get(kind)
@@ -111,31 +347,18 @@ class AdvancedStatsCollector:
             try:
                 self.session.headers['Referer'] = self._referrer(url)
                 time.sleep(0.5 + random.random())
-                r = self.session.get(url, timeout=15)
+                r = http_cache.cached_get(url, 'sumersports', session=self.session, timeout=15)
                 r.raise_for_status()
-                soup = BeautifulSoup(r.text, 'html.parser')
-                table = soup.find('table')
-                if not table: continue
-                headers = [th.get_text(strip=True) for th in table.find_all('th')]
-                if not headers:  # fallback first row
-                    first_tr = table.find('tr')
-                    if first_tr:
-                        headers = [td.get_text(strip=True) for td in first_tr.find_all('td')]
-                rows = []
-                for tr in table.find_all('tr'):
-                    tds = tr.find_all('td')
-                    if len(tds) == len(headers) and len(headers) > 2:
-                        rows.append([td.get_text(strip=True) for td in tds])
-                if not rows:
+                df = parse_stats_table(r.text)
+                if df is None:
                     continue
-                df = pd.DataFrame(rows, columns=headers)
                 return self._clean(df, kind)
             except Exception as e:
                 logger.warning(f"{kind} scrape attempt {attempt+1} failed: {e}")
         logger.error(f"Failed to scrape {kind} stats")
         return None
 
-    def _clean(self, df: pd.DataFrame, kind: str) -> pd.DataFrame:
+    def _clean(self, df: pd.DataFrame, kind: str, week: Optional[int] = None) -> pd.DataFrame:
         if df.empty: return df
         out = df.copy()
         for src,dst in COLUMN_MAPPING.items():
@@ -160,111 +383,25 @@ class AdvancedStatsCollector:
         out['TEAM'] = mapped
         out.drop(columns=[team_col, 'team'], errors='ignore', inplace=True)
         # numeric conversions (% handling)
-        for c in list(out.columns):
-            if c == 'TEAM': continue
-            if out[c].astype(str).str.contains('%').any():
-                out[c] = out[c].astype(str).str.replace('%','', regex=False)
-            out[c] = pd.to_numeric(out[c], errors='ignore')
+        is_stat = out.columns != 'TEAM'
+        out = pd.concat([coerce_numeric(out.loc[:, is_stat]), out.loc[:, ~is_stat]], axis=1)  # TEAM stays last
         out['season'] = self.season
-        out['week'] = self.week
+        out['week'] = self.week if week is None else week
         out['type'] = kind
         return out
 
     def normalize_dataframe(self, df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
-        norm = df.copy()
-        for c in cols:
-            if c in df.columns:
-                mx, mn = df[c].max(), df[c].min()
-                norm[c] = 0.5 if mx == mn else (df[c]-mn)/(mx-mn)
-        return norm
+        return _normalize(df, cols)
 
     def calculate_composite_scores(self, stats_df: pd.DataFrame, kind: str) -> pd.DataFrame:
-        if stats_df.empty: return stats_df
-        weights = WEIGHTS.get(kind, {})
-        cols = [c for c in weights if c in stats_df.columns]
-        if not cols:
-            stats_df['composite_score']=0; stats_df['z_score']=0; return stats_df
-        norm = self.normalize_dataframe(stats_df, cols)
-        inverse = {'int_rate','sack_rate','Int %','Sack %'}
-        for c in cols:
-            if kind=='offense' and c in inverse:
-                norm[c] = 1 - norm[c]
-            elif kind=='defense' and c not in inverse:
-                norm[c] = 1 - norm[c]
-        comp_cols=[]
-        for c in cols:
-            wc = f"{c}_w"; norm[wc]=norm[c]*weights[c]; comp_cols.append(wc)
-        out = stats_df.copy()
-        out['composite_score'] = norm[comp_cols].sum(axis=1)
-        mu = out['composite_score'].mean(); sd = out['composite_score'].std()
-        out['z_score'] = (out['composite_score']-mu)/sd if sd>0 else 0
-        out['last_updated'] = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-        return out
+        return composite_scores(stats_df, kind)
 
     def save_composite_scores(self, df: pd.DataFrame) -> bool:
         try:
-            cur = self.conn.cursor()
-            cur.execute("CREATE TABLE IF NOT EXISTS advanced_stats (season INTEGER, week INTEGER, type TEXT, TEAM TEXT, composite_score REAL, z_score REAL, last_updated TEXT, PRIMARY KEY (season, week, type, TEAM))")
-            base = {'season','week','type','TEAM','composite_score','z_score','last_updated'}
-            df_db = df.copy()
-            # Sanitize additional column names (only letters, numbers, underscore)
-            import re
-            name_map = {}
-            existing_safe = set(base)
-            def make_safe(c: str) -> str:
-                safe = re.sub(r'[^A-Za-z0-9_]', '_', c)
-                safe = re.sub(r'_+', '_', safe).strip('_')
-                if not safe:
-                    safe = 'col'
-                orig = safe
-                i = 1
-                while safe in existing_safe:
-                    safe = f"{orig}_{i}"; i += 1
-                existing_safe.add(safe)
-                return safe
-            for col in list(df_db.columns):
-                if col in base: continue
-                safe = make_safe(col)
-                name_map[col] = safe
-                if safe != col:
-                    df_db[safe] = df_db[col]
-            # Add new columns to table if needed
-            cur.execute("PRAGMA table_info(advanced_stats)")
-            existing_cols = {r[1] for r in cur.fetchall()}
-            for col, safe in name_map.items():
-                if safe not in existing_cols:
-                    series = df_db[col] if col in df_db.columns else df_db[safe]
-                    if pd.api.types.is_float_dtype(series) or pd.api.types.is_integer_dtype(series):
-                        col_type = 'REAL'
-                    else:
-                        col_type = 'TEXT'
-                    try:
-                        cur.execute(f'ALTER TABLE advanced_stats ADD COLUMN "{safe}" {col_type}')
-                    except Exception:
-                        pass
-            self.conn.commit()
-            # Refresh columns
-            cur.execute("PRAGMA table_info(advanced_stats)")
-            existing_cols = {r[1] for r in cur.fetchall()}
-            insert_cols = [c for c in base] + [safe for safe in name_map.values() if safe in existing_cols]
-            placeholders = ','.join(['?']*len(insert_cols))
-            stmt = f"INSERT OR REPLACE INTO advanced_stats ({','.join(insert_cols)}) VALUES ({placeholders})"
-            rows = []
-            for _, r in df_db.iterrows():
-                vals = []
-                for c in insert_cols:
-                    v = r.get(c)
-                    if pd.isna(v):
-                        vals.append(None)
-                    else:
-                        if isinstance(v,(np.floating,np.integer)):
-                            vals.append(float(v))
-                        else:
-                            vals.append(v)
-                rows.append(tuple(vals))
-            cur.executemany(stmt, rows)
-            self.conn.commit()
-            logger.info(f"Saved {len(rows)} {df['type'].iloc[0] if len(df)>0 else ''} composite rows (week={self.week})")
+            saved = write_advanced_stats(self.conn, df)
+            weeks = sorted(df['week'].dropna().unique().tolist()) if 'week' in df.columns else []
+            kinds = sorted(df['type'].dropna().unique().tolist()) if 'type' in df.columns else []
+            logger.info(f"Saved {saved} {'/'.join(map(str, kinds))} composite rows (weeks={weeks})")
             return True
         except Exception as e:
             logger.error(f"save_composite_scores error: {e}")
@@ -282,9 +419,153 @@ class AdvancedStatsCollector:
             self.save_composite_scores(cdf)
         return raw, comp
 
+class AsyncStatsCollector(AdvancedStatsCollector):
+    """Collect several weeks in one run.
+
+    Every (week, kind) page is requested through one shared ``requests.Session`` on worker
+    threads driven by asyncio: at most ``max_concurrency`` requests are in flight, and
+    request starts to the same host are spaced ``min_interval_s`` apart (jittered 0.5-1.5x,
+    like the sequential collector's sleep). Identical URLs are fetched once, through the shared
+    HTTP cache when enabled (fresh cache hits skip the rate limiter). The composite frames of
+    all weeks are written with a single ``save_composite_scores`` call.
+
+    A page whose content hash matches the payload already written for a (week, kind) is not
+    parsed again; those keys map to ``None`` in ``collect``'s result and are not rewritten.
+    """
+
+    def __init__(self, season: int, weeks: List[int], kinds: Tuple[str, ...] = ('offense', 'defense'),
+                 max_concurrency: int = 4, min_interval_s: float = 1.0, retries: int = 3):
+        self.season = season
+        self.weeks = list(weeks)
+        self.week = None
+        self.kinds = tuple(kinds)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_interval_s = float(min_interval_s)
+        self.retries = retries
+        self.conn = None  # opened by the writer only
+        self.session = self._create_session()
+        self.cache = http_cache.default_cache()
+        self._hashes: Dict[Tuple[int, str], str] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+
+    def __exit__(self, *exc):
+        self.session.close()
+
+    async def _wait_for_host(self, host: str) -> None:
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_slot.get(host, 0.0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_slot[host] = loop.time() + self.min_interval_s * (0.5 + random.random())
+
+    def _get(self, url: str):
+        headers = {'Referer': _referrer(url)}
+        if self.cache is not None:
+            return self.cache.fetch(url, 'sumersports', session=self.session, timeout=15, headers=headers)
+        return replay.send(self.session, url, 'sumersports', timeout=15, headers=headers)
+
+    async def _fetch_table(self, url: str, kind: str, limit: asyncio.Semaphore,
+                           skip_hash: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """(table, content hash); the table is None when the page matches ``skip_hash`` or failed."""
+        for attempt in range(self.retries):
+            try:
+                r = self.cache.lookup(url, 'sumersports') if self.cache is not None else None
+                if r is None:
+                    async with limit:
+                        await self._wait_for_host(urlparse(url).netloc)
+                        r = await asyncio.to_thread(self._get, url)
+                r.raise_for_status()
+                text = r.text
+                content_hash = http_cache.text_hash(text)
+                if skip_hash is not None and content_hash == skip_hash:
+                    return None, content_hash
+                df = await asyncio.to_thread(parse_stats_table, text)
+                if df is not None:
+                    return df, content_hash
+            except Exception as e:
+                logger.warning(f"{kind} scrape attempt {attempt+1} failed for {url}: {e}")
+        logger.error(f"Failed to scrape {kind} stats from {url}")
+        return None, None
+
+    async def collect(self) -> Dict[Tuple[int, str], Optional[pd.DataFrame]]:
+        """Composite frames keyed by (week, kind); unchanged keys map to None, failed ones are absent."""
+        limit = asyncio.Semaphore(self.max_concurrency)
+        jobs = {(w, k): scrape_url(k, self.season, w) for w in self.weeks for k in self.kinds}
+        applied = {k: http_cache.applied_payloads(f'sumersports:{k}', self.season) for k in self.kinds}
+        pages: Dict[str, str] = {}
+        previous: Dict[str, set] = {}
+        for (w, k), url in jobs.items():
+            if url:
+                pages.setdefault(url, k)
+                previous.setdefault(url, set()).add(applied[k].get(w))
+        # Skip parsing a page only if every (week, kind) it feeds already holds the same payload
+        results = await asyncio.gather(*(
+            self._fetch_table(url, k, limit, next(iter(previous[url])) if len(previous[url]) == 1 else None)
+            for url, k in pages.items()))
+        raw = dict(zip(pages, results))
+        frames: Dict[Tuple[int, str], Optional[pd.DataFrame]] = {}
+        for (w, k), url in jobs.items():
+            table, content_hash = raw.get(url, (None, None))
+            if content_hash is not None and applied[k].get(w) == content_hash:
+                frames[(w, k)] = None
+                continue
+            if table is None:
+                continue
+            self._hashes[(w, k)] = content_hash
+            cleaned = self._clean(table, k, week=w)
+            if not cleaned.empty:
+                frames[(w, k)] = self.calculate_composite_scores(cleaned, k)
+        return frames
+
+    def write(self, frames: Dict[Tuple[int, str], Optional[pd.DataFrame]]) -> bool:
+        """Single batched write of every collected frame; records the written payload hashes."""
+        changed = {key: f for key, f in frames.items() if f is not None}
+        if not changed:
+            return False
+        self.conn = get_connection()
+        try:
+            ok = self.save_composite_scores(pd.concat(changed.values(), ignore_index=True))
+        finally:
+            self.conn.close()
+            self.conn = None
+        if ok:
+            for w, k in changed:
+                http_cache.mark_payload_applied(f'sumersports:{k}', self.season, w, self._hashes.get((w, k)))
+        return ok
+
+    def run(self) -> Dict[Tuple[int, str], Optional[pd.DataFrame]]:
+        frames = asyncio.run(self.collect())
+        self.write(frames)
+        return frames
+
+
+def collect_weeks(season: int, weeks: List[int], max_concurrency: Optional[int] = None,
+                  min_interval_s: Optional[float] = None) -> Dict[Tuple[int, str], Optional[pd.DataFrame]]:
+    """Collect and store advanced stats for many weeks in one concurrent run.
+
+    Keys whose page is unchanged since it was last written map to None (nothing rewritten).
+    """
+    from panda_picks.config.settings import Settings
+    _ensure_logging()
+    logger.info(f"Advanced stats run season={season} weeks={weeks}")
+    with AsyncStatsCollector(season, weeks,
+                             max_concurrency=Settings.SCRAPE_CONCURRENCY if max_concurrency is None else max_concurrency,
+                             min_interval_s=Settings.SCRAPE_MIN_INTERVAL_S if min_interval_s is None else min_interval_s) as c:
+        frames = c.run()
+    missing = sorted({w for w in weeks} - {w for w, _ in frames})
+    if missing:
+        logger.warning(f"No advanced stats collected for weeks {missing}")
+    return frames
+
+
 def main(season: Optional[int]=None, week: Optional[int]=None):
-    season_v = season if season is not None else datetime.now().year
+    from panda_picks.config.settings import Settings
+    season_v = season if season is not None else Settings.SEASON
     week_v = week if week is not None else 1
+    _ensure_logging()
     logger.info(f"Advanced stats run season={season_v} week={week_v}")
     try:
         with AdvancedStatsCollector(season_v, week_v) as c:
@@ -1,33 +1,28 @@
 import requests
 import pandas as pd
 from panda_picks import config
+from panda_picks.config.settings import Settings
+from panda_picks.data import http_cache
 from panda_picks.db import database as db
 import os
+import sys
 from dotenv import load_dotenv
 import logging
 from pathlib import Path
-from datetime import datetime
 import re
-from typing import List, Optional
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('panda_picks.log'),
-        logging.StreamHandler()
-    ]
-)
+from typing import Callable, Dict, List, Optional
+
 logger = logging.getLogger('pff_grades')
 
 # Load environment variables
 load_dotenv()
 
 # Environment configuration
-DEFAULT_SEASON = datetime.utcnow().year
+DEFAULT_SEASON = Settings.SEASON
 PFF_SEASON = int(os.getenv('PFF_SEASON', DEFAULT_SEASON))
-PFF_FORCE_MANUAL_COOKIES = os.getenv('PFF_FORCE_MANUAL_COOKIES', 'true').lower() in ('1','true','yes','on')
+PFF_FORCE_MANUAL_COOKIES = os.getenv('PFF_FORCE_MANUAL_COOKIES', 'false').lower() in ('1','true','yes','on')
+PFF_HEADLESS = os.getenv('PFF_HEADLESS', 'false').lower() in ('1','true','yes','on')
+PFF_COOKIES_FILE = os.getenv('PFF_COOKIES_FILE', 'cookies.txt')
 FULL_SEASON_WEEKS_PARAM = '1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18'
 
 def _parse_weeks(week_spec: str) -> List[int]:
@@ -101,7 +96,47 @@ headers = {
     "Referer": "https://premium.pff.com/",
 }
 
+CookieProvider = Callable[[], Optional[Dict[str, str]]]
+
+_cookies: Optional[Dict[str, str]] = None
+_cookie_callback: Optional[CookieProvider] = None
+_logging_ready = False
+
+
+def _ensure_logging():
+    """Configure file + console logging on first fetch (not at import)."""
+    global _logging_ready
+    if not _logging_ready:
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.FileHandler('panda_picks.log'),
+                logging.StreamHandler()
+            ]
+        )
+        _logging_ready = True
+
+
+def parse_cookie_header(cookie_string: str) -> Dict[str, str]:
+    """'a=1; b=2' -> {'a': '1', 'b': '2'} (pairs without '=' are ignored)."""
+    cookies_dict = {}
+    for pair in (cookie_string or '').split(';'):
+        if '=' in pair:
+            name, value = pair.strip().split('=', 1)
+            cookies_dict[name] = value
+    return cookies_dict
+
+
+def _interactive() -> bool:
+    return not PFF_HEADLESS and sys.stdin is not None and sys.stdin.isatty()
+
+
 def manual_cookie_capture():
+    """Prompt for a Cookie header. Returns None without prompting when not attached to a terminal."""
+    if not _interactive():
+        logger.info('Not an interactive session; skipping manual cookie capture')
+        return None
     print("\n" + "="*80)
     print("MANUAL COOKIE CAPTURE")
     print("="*80)
@@ -114,14 +149,10 @@ def manual_cookie_capture():
     print("7. Paste below:")
     cookies_input = input("Paste cookies here: ")
     try:
-        cookies_dict = {}
-        for pair in cookies_input.split(';'):
-            if '=' in pair:
-                name, value = pair.strip().split('=',1)
-                cookies_dict[name] = value
-        with open('cookies.txt','w') as f:
+        cookies_dict = parse_cookie_header(cookies_input)
+        with open(PFF_COOKIES_FILE,'w') as f:
             f.write('; '.join([f"{k}={v}" for k,v in cookies_dict.items()]))
-        logger.info('Cookies captured and saved to cookies.txt')
+        logger.info(f'Cookies captured and saved to {PFF_COOKIES_FILE}')
         return cookies_dict
     except Exception as e:
         logger.error(f"Error parsing cookies: {e}")
@@ -131,45 +162,86 @@ def load_cookies_from_file(file_path: str):
     logger.info(f"Loading cookies from {file_path}")
     with open(file_path,'r') as f:
         cookie_string = f.read().strip()
-    return dict(item.split('=',1) for item in cookie_string.split('; '))
+    return parse_cookie_header(cookie_string)
+
+def env_cookies() -> Optional[Dict[str, str]]:
+    """Cookie header from the ``PFF_COOKIES`` environment variable."""
+    return parse_cookie_header(os.getenv('PFF_COOKIES', '')) or None
+
+def file_cookies() -> Optional[Dict[str, str]]:
+    """Cookie header saved in ``PFF_COOKIES_FILE`` (default ``cookies.txt``)."""
+    path = Path(PFF_COOKIES_FILE)
+    if not path.exists():
+        return None
+    return load_cookies_from_file(str(path)) or None
+
+def set_cookie_provider(provider: Optional[CookieProvider]):
+    """Register a callback returning a cookie dict (e.g. from a secrets store); tried before env/file.
+
+    Clears cached cookies so the next fetch asks the new provider.
+    """
+    global _cookie_callback, _cookies
+    _cookie_callback = provider
+    _cookies = None
 
 def get_cookies(force_manual: bool | None = None):
+    """First non-empty result of: callback, ``PFF_COOKIES``, cookies file, manual capture.
+
+    Manual capture only prompts on an interactive terminal (and not with ``PFF_HEADLESS``),
+    so scheduled runs never block; ``force_manual`` moves it to the front of the chain.
+    """
     if force_manual is None:
         force_manual = PFF_FORCE_MANUAL_COOKIES
-    path = Path('cookies.txt')
-    if force_manual or not path.exists():
-        return manual_cookie_capture()
-    try:
-        return load_cookies_from_file(str(path))
-    except Exception as e:
-        logger.warning(f"Failed reading cookies file: {e}; falling back to manual capture")
-        return manual_cookie_capture()
+    chain = [('manual', manual_cookie_capture)] if force_manual else []
+    if _cookie_callback is not None:
+        chain.append(('callback', _cookie_callback))
+    chain += [('env', env_cookies), ('file', file_cookies), ('manual', manual_cookie_capture)]
+    tried = set()
+    for name, provider in chain:
+        if name in tried:
+            continue
+        tried.add(name)
+        try:
+            found = provider()
+        except Exception as e:
+            logger.warning(f"Cookie provider {name} failed: {e}")
+            continue
+        if found:
+            logger.info(f"Using PFF cookies from {name}")
+            return found
+    logger.warning("No PFF cookies available (set PFF_COOKIES, save a cookies file or register a provider)")
+    return None
 
-logger.info("Initializing cookies")
-try:
-    cookies = get_cookies()
-except Exception as e:
-    logger.critical(f"Cookie initialization failed: {e}")
-    cookies = None
+def _session_cookies(refresh: bool = False):
+    """Cookies for this process, resolved on first use; ``refresh`` re-resolves after a 401."""
+    global _cookies
+    if _cookies is None or refresh:
+        _cookies = get_cookies(force_manual=True if refresh else None)
+    return _cookies
 
-def fetch_pff_grades(season: int | None = None):
-    global cookies
+def _fetch_grades_response(season: int | None = None):
+    _ensure_logging()
     target_url = build_pff_url(season)
     logger.info(f"Requesting PFF grades: {target_url}")
     try:
-        resp = requests.get(target_url, headers=headers, cookies=cookies)
+        cookies = _session_cookies()
+        resp = http_cache.cached_get(target_url, 'pff_grades', headers=headers, cookies=cookies)
         logger.info(f"Status {resp.status_code}")
         if resp.status_code == 401:
-            logger.warning("401 Unauthorized; refreshing cookies via manual capture")
-            cookies = get_cookies(force_manual=True)
-            resp = requests.get(target_url, headers=headers, cookies=cookies)
-            logger.info(f"Retry status {resp.status_code}")
+            logger.warning("401 Unauthorized; refreshing cookies")
+            refreshed = _session_cookies(refresh=True)
+            if refreshed and refreshed != cookies:
+                resp = http_cache.cached_get(target_url, 'pff_grades', headers=headers, cookies=refreshed)
+                logger.info(f"Retry status {resp.status_code}")
         resp.raise_for_status()
-        return resp.json()
+        return resp
     except requests.RequestException as e:
         logger.error(f"Fetch error: {e}")
         raise Exception(f"Error fetching PFF data: {e}")
 
+def fetch_pff_grades(season: int | None = None):
+    return _fetch_grades_response(season).json()
+
 def process_grades(data):
     logger.info("Processing PFF grades JSON")
     teams = data.get('team_overview', [])
@@ -211,9 +283,15 @@ def save_grades_to_csv(df: pd.DataFrame, path: Path):
 
 def getGrades(season: int | None = None):
     try:
-        raw = fetch_pff_grades(season)
-        df = process_grades(raw)
+        resp = _fetch_grades_response(season)
+        content_hash = http_cache.response_hash(resp)
+        season_key = season or PFF_SEASON
+        if config.TEAM_GRADES_CSV.exists() and http_cache.payload_applied('pff_grades', season_key, 0, content_hash):
+            logger.info("PFF grades payload unchanged; keeping the existing grades CSV")
+            return True
+        df = process_grades(resp.json())
         save_grades_to_csv(df, config.TEAM_GRADES_CSV)
+        http_cache.mark_payload_applied('pff_grades', season_key, 0, content_hash)
         return True
     except Exception as e:
         logger.error(f"getGrades failure: {e}")
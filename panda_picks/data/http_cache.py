@@ -0,0 +1,200 @@
+"""On-disk HTTP cache with conditional revalidation, shared by the external fetchers.
+
+Each URL maps to ``<key>.body`` (raw payload) and ``<key>.json`` (ETag, Last-Modified,
+fetch time, content hash) under ``Settings.HTTP_CACHE_DIR``. ``HttpCache.fetch``:
+
+- serves the stored body without touching the network while it is younger than the
+  source's TTL (``Settings.HTTP_CACHE_TTLS``), or forever once marked final (``is_final``),
+  e.g. a week whose games are all scored;
+- otherwise sends ``If-None-Match`` / ``If-Modified-Since`` and keeps the stored body on
+  ``304 Not Modified``;
+- stores 200 responses only; errors pass through uncached.
+
+Consumers hash the payload (``response_hash``, which also works with the cache disabled),
+record the hash of the payload they last wrote (``input_watermarks``, consumer
+``http:<source>``) and skip parsing and DB writes when it has not changed
+(``payload_applied`` / ``mark_payload_applied``). Dropping the tables forgets those
+hashes, so a rebuilt database is always written again.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import requests
+
+from panda_picks.config.settings import Settings
+from panda_picks.data import replay
+from panda_picks.db import watermarks
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    content_hash: Optional[str] = None
+    from_cache: bool = False  # body came from disk (fresh hit or 304)
+    revalidated: bool = False  # a conditional request was answered 304
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class HttpCache:
+    def __init__(self, root: Optional[Path] = None, ttls: Optional[Dict[str, float]] = None):
+        self.root = Path(root or Settings.HTTP_CACHE_DIR)
+        self.ttls = dict(Settings.HTTP_CACHE_TTLS if ttls is None else ttls)
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.root / f"{key}.json", self.root / f"{key}.body"
+
+    def _load(self, url: str):
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            return meta, body_path.read_bytes()
+        except (OSError, ValueError):
+            return None, None
+
+    def _write(self, path: Path, data: bytes) -> None:
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _save(self, url: str, meta: dict, body: Optional[bytes]) -> None:
+        meta_path, body_path = self._paths(url)
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            if body is not None:
+                self._write(body_path, body)
+            self._write(meta_path, json.dumps(meta).encode())
+
+    def _fresh(self, meta: dict, source: str, now: float) -> bool:
+        return bool(meta.get('final')) or now - meta.get('fetched_at', 0) < self.ttls.get(source, 0)
+
+    def lookup(self, url: str, source: str) -> Optional[CachedResponse]:
+        """The stored response if it can be served without a request, else None."""
+        meta, body = self._load(url)
+        if meta is None or not self._fresh(meta, source, time.time()):
+            return None
+        return CachedResponse(url, 200, body, meta.get('headers', {}), meta.get('content_hash'), from_cache=True)
+
+    def fetch(self, url: str, source: str, session=None, headers: Optional[Dict[str, str]] = None,
+              timeout: float = 15, is_final: Optional[Callable[[bytes], bool]] = None, **kwargs) -> CachedResponse:
+        """GET ``url`` through the cache (``session`` defaults to the ``requests`` module)."""
+        meta, body = self._load(url)
+        now = time.time()
+        if meta is not None and self._fresh(meta, source, now):
+            return CachedResponse(url, 200, body, meta.get('headers', {}), meta.get('content_hash'), from_cache=True)
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+        resp = replay.send(session, url, source, headers=request_headers, timeout=timeout, **kwargs)
+        if resp.status_code == 304 and meta is not None:
+            meta['fetched_at'] = now
+            self._save(url, meta, None)
+            return CachedResponse(url, 200, body, meta.get('headers', {}), meta.get('content_hash'),
+                                  from_cache=True, revalidated=True)
+        content = resp.content
+        kept_headers = {k: v for k, v in resp.headers.items() if k.lower() in ('content-type', 'etag', 'last-modified')}
+        if resp.status_code != 200:
+            return CachedResponse(url, resp.status_code, content, kept_headers)
+        content_hash = watermarks.bytes_fingerprint(content)
+        final = False
+        if is_final is not None:
+            try:
+                final = bool(is_final(content))
+            except Exception:
+                final = False
+        self._save(url, {'url': url, 'source': source, 'fetched_at': now, 'etag': resp.headers.get('ETag'),
+                         'last_modified': resp.headers.get('Last-Modified'), 'content_hash': content_hash,
+                         'final': final, 'headers': kept_headers}, content)
+        return CachedResponse(url, 200, content, kept_headers, content_hash)
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.root.glob('*'):
+                if path.suffix in ('.json', '.body'):
+                    path.unlink(missing_ok=True)
+
+
+_default: Optional[HttpCache] = None
+
+
+def default_cache() -> Optional[HttpCache]:
+    """Process-wide cache, or None when ``PP_HTTP_CACHE_ENABLED`` is off or responses are being recorded."""
+    global _default
+    if not Settings.HTTP_CACHE_ENABLED or replay.mode() == 'record':
+        return None
+    if _default is None:
+        _default = HttpCache()
+    return _default
+
+
+def cached_get(url: str, source: str, session=None, **kwargs):
+    """``HttpCache.fetch`` on the default cache; a plain GET when caching is disabled."""
+    cache = default_cache()
+    if cache is None:
+        kwargs.pop('is_final', None)
+        return replay.send(session, url, source, **kwargs)
+    return cache.fetch(url, source, session=session, **kwargs)
+
+
+def response_hash(resp) -> str:
+    """Content hash of a cached or plain ``requests`` response."""
+    cached = getattr(resp, 'content_hash', None)
+    return cached if isinstance(cached, str) else watermarks.bytes_fingerprint(resp.content)
+
+
+def text_hash(text: str) -> str:
+    return watermarks.bytes_fingerprint(text.encode('utf-8'))
+
+
+def applied_payloads(source: str, season: int) -> Dict[int, str]:
+    """Week -> content hash of the payloads already parsed and written for ``source``."""
+    from panda_picks.db.database import get_connection
+    conn = get_connection()
+    try:
+        return watermarks.stored(conn, f"http:{source}", season)
+    finally:
+        conn.close()
+
+
+def payload_applied(source: str, season: int, week: int, content_hash: Optional[str]) -> bool:
+    """True if the payload with ``content_hash`` was already parsed and written for this key."""
+    return bool(content_hash) and applied_payloads(source, season).get(int(week)) == content_hash
+
+
+def mark_payload_applied(source: str, season: int, week: int, content_hash: Optional[str]) -> None:
+    """Record ``content_hash`` as written; call only after the parsed rows are stored."""
+    if not content_hash:
+        return
+    from panda_picks.db.database import get_connection
+    conn = get_connection()
+    try:
+        watermarks.record(conn, f"http:{source}", season, {int(week): content_hash})
+    finally:
+        conn.close()
@@ -0,0 +1,142 @@
+"""Record/replay transport for the external fetchers (PFF ticker, PFF grades, SumerSports).
+
+Every network request made through ``http_cache`` goes through ``send``, which behaves per
+``Settings.HTTP_MODE``:
+
+- ``live``: a normal GET (optionally rerouted to a stand-in server, see ``route``);
+- ``record``: a live GET whose 200 responses are also written to the fixture store
+  (conditional headers are dropped and the HTTP cache is bypassed so full bodies arrive);
+- ``replay``: served from the fixture store without any network access; unrecorded URLs
+  raise ``requests.ConnectionError`` so fetchers take their normal failure path.
+
+Fixtures live in ``<HTTP_FIXTURE_DIR>/<HTTP_FIXTURE_SET>/``: ``manifest.json`` (format
+version, per-URL source, status, headers, content hash, recording time) and one
+``<source>/<key>.body`` per response. Named sets let several captures (e.g. one per week)
+sit side by side; ``standin_server`` serves a set over HTTP with injected latency/failures.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from panda_picks.config.settings import Settings
+from panda_picks.db import watermarks
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MODES = ('live', 'record', 'replay')
+_CONDITIONAL = ('If-None-Match', 'If-Modified-Since')
+
+
+def fixture_key(url: str) -> str:
+    """Scheme-independent key for a URL, so stand-in (http) and live (https) requests match."""
+    parts = urlsplit(url)
+    return hashlib.sha1(f"{parts.netloc}{parts.path}?{parts.query}".encode()).hexdigest()
+
+
+class FixtureStore:
+    def __init__(self, root: Optional[Path] = None, name: Optional[str] = None):
+        self.path = Path(root or Settings.HTTP_FIXTURE_DIR) / (name or Settings.HTTP_FIXTURE_SET)
+        self._lock = threading.Lock()
+        self._manifest: Optional[dict] = None
+
+    @property
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            try:
+                manifest = json.loads((self.path / 'manifest.json').read_text())
+            except (OSError, ValueError):
+                manifest = {'format': FORMAT_VERSION, 'entries': {}}
+            if manifest.get('format') != FORMAT_VERSION:
+                raise ValueError(f"Fixture set {self.path} has format {manifest.get('format')}, "
+                                 f"expected {FORMAT_VERSION}")
+            self._manifest = manifest
+        return self._manifest
+
+    def save(self, url: str, source: str, status_code: int, content: bytes, headers: Dict[str, str]) -> None:
+        key = fixture_key(url)
+        body_path = self.path / source / f"{key}.body"
+        with self._lock:
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(content)
+            self.manifest['entries'][key] = {
+                'url': url, 'source': source, 'status': status_code, 'headers': headers,
+                'content_hash': watermarks.bytes_fingerprint(content), 'file': f"{source}/{key}.body",
+                'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+            }
+            tmp = self.path / 'manifest.json.tmp'
+            tmp.write_text(json.dumps(self.manifest, indent=1, sort_keys=True))
+            tmp.replace(self.path / 'manifest.json')
+
+    def load(self, url: str):
+        """(manifest entry, body) for ``url``, or (None, None) if it was never recorded."""
+        entry = self.manifest['entries'].get(fixture_key(url))
+        if entry is None:
+            return None, None
+        return entry, (self.path / entry['file']).read_bytes()
+
+    def __len__(self) -> int:
+        return len(self.manifest['entries'])
+
+
+_stores: Dict[Path, FixtureStore] = {}
+
+
+def default_store() -> FixtureStore:
+    path = Path(Settings.HTTP_FIXTURE_DIR) / Settings.HTTP_FIXTURE_SET
+    if path not in _stores:
+        _stores[path] = FixtureStore(Settings.HTTP_FIXTURE_DIR, Settings.HTTP_FIXTURE_SET)
+    return _stores[path]
+
+
+def mode() -> str:
+    value = (Settings.HTTP_MODE or 'live').lower()
+    if value not in MODES:
+        raise ValueError(f"PP_HTTP_MODE must be one of {MODES}, got {value!r}")
+    return value
+
+
+def route(url: str) -> str:
+    """Rewrite ``url`` onto ``Settings.HTTP_STANDIN_URL`` (``<base>/<host><path>?<query>``) when set."""
+    base = Settings.HTTP_STANDIN_URL
+    if not base:
+        return url
+    parts = urlsplit(url)
+    return f"{base.rstrip('/')}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else '')
+
+
+def replay_response(url: str, entry: dict, body: bytes, headers: Optional[Dict[str, str]] = None):
+    """A stored fixture as a response, honouring the request's conditional headers."""
+    from panda_picks.data.http_cache import CachedResponse
+    stored = {k.lower(): v for k, v in entry.get('headers', {}).items()}
+    request = {k.lower(): v for k, v in (headers or {}).items()}
+    etag, modified = stored.get('etag'), stored.get('last-modified')
+    if (etag and request.get('if-none-match') == etag) or (modified and request.get('if-modified-since') == modified):
+        return CachedResponse(url, 304, b'', entry.get('headers', {}))
+    return CachedResponse(url, entry.get('status', 200), body, entry.get('headers', {}), entry.get('content_hash'))
+
+
+def send(session, url: str, source: str, headers: Optional[Dict[str, str]] = None, **kwargs):
+    """The single network GET behind every fetcher (``session`` defaults to ``requests``)."""
+    current = mode()
+    if current == 'replay':
+        entry, body = default_store().load(url)
+        if entry is None:
+            raise requests.ConnectionError(f"No recorded response for {url} in {default_store().path}")
+        return replay_response(url, entry, body, headers)
+    if current == 'record':
+        headers = {k: v for k, v in (headers or {}).items() if k not in _CONDITIONAL}
+    resp = (session or requests).get(route(url), headers=headers, **kwargs)
+    if current == 'record' and resp.status_code == 200:
+        kept = {k: v for k, v in resp.headers.items() if k.lower() in ('content-type', 'etag', 'last-modified')}
+        default_store().save(url, source, resp.status_code, resp.content, kept)
+        logger.info(f"Recorded {source} response for {url}")
+    return resp
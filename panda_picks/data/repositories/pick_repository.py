@@ -1,34 +1,11 @@
 import pandas as pd
 from panda_picks.db.database import get_connection
-import logging
+from panda_picks.db.migrations import table_columns
 import numpy as np
 
 
 class PickRepository:
-    """Data access for picks table."""
-
-    _EXTRA_COL_TYPES = {
-        'Home_Win_Prob': 'REAL', 'Away_Win_Prob': 'REAL',
-        'Home_ML_Implied': 'REAL', 'Away_ML_Implied': 'REAL',
-        'Pick_Prob': 'REAL', 'Pick_Implied_Prob': 'REAL', 'Pick_Edge': 'REAL',
-        'Timestamp': 'TEXT',
-        # Phase 2 advanced features
-        'Pressure_Mismatch': 'REAL', 'Explosive_Pass_Mismatch': 'REAL', 'Script_Control_Mismatch': 'REAL',
-        'Off_Comp_Diff': 'REAL','Def_Comp_Diff': 'REAL','Net_Composite': 'REAL','Net_Composite_norm': 'REAL','Blended_Adv': 'REAL',
-        'Blended_Adv_sig': 'TEXT'
-    }
-
-    def _ensure_columns(self, conn):
-        cur = conn.cursor()
-        cur.execute("PRAGMA table_info(picks)")
-        existing = {row[1] for row in cur.fetchall()}
-        for col, col_type in self._EXTRA_COL_TYPES.items():
-            if col not in existing:
-                try:
-                    cur.execute(f"ALTER TABLE picks ADD COLUMN {col} {col_type}")
-                except Exception as e:
-                    logging.warning(f"Could not add column {col} to picks: {e}")
-        conn.commit()
+    """Data access for picks table (columns come from ``panda_picks.db.migrations``)."""
 
     def _round_numeric_cols(self, df: pd.DataFrame, decimals: int = 3) -> pd.DataFrame:
         try:
@@ -44,12 +21,10 @@ class PickRepository:
             return
         week_key = f"WEEK{week}"
         with get_connection() as conn:
-            self._ensure_columns(conn)
             cur = conn.cursor()
-            # Limit to existing columns in picks table (avoid Home_Score, Away_Score etc.)
-            cur.execute("PRAGMA table_info(picks)")
-            existing_cols = [row[1] for row in cur.fetchall()]
-            filtered_df = picks_df[[c for c in picks_df.columns if c in existing_cols]].copy()
+            # Limit to columns of the migrated picks table (avoid Home_Score, Away_Score etc.)
+            existing_cols = table_columns(conn, 'picks')
+            filtered_df = picks_df[[c for c in picks_df.columns if c.lower() in existing_cols]].copy()
             if 'WEEK' in filtered_df.columns:
                 # ensure correct WEEK formatting
                 filtered_df['WEEK'] = filtered_df['WEEK'].apply(lambda _: week_key)
@@ -63,4 +38,4 @@ class PickRepository:
 
     def get_week_picks(self, week: int) -> pd.DataFrame:
         with get_connection() as conn:
-            return pd.read_sql_query("SELECT * FROM picks WHERE WEEK = ?", conn, params=[f"WEEK{week}"])
+            return pd.read_sql_query("SELECT * FROM picks WHERE week_num = ?", conn, params=[int(week)])
@@ -23,7 +23,7 @@ class PickResultsRepository:
     def get_scored_basic(self) -> List[BasicScoredRow]:
         """All scored rows (real completed games). Excludes placeholder temporary scores."""
         try:
-            conn = get_connection(); cur = conn.cursor()
+            conn = get_connection(read_only=True); cur = conn.cursor()
             has_flag = self._has_placeholder_flag(conn)
             base_sql = """
                 SELECT WEEK, Home_Team, Away_Team, Game_Pick, Home_Score, Away_Score, Home_Line_Close, Away_Line_Close
@@ -40,7 +40,7 @@ class PickResultsRepository:
     def get_scored_extended(self) -> List[ExtendedScoredRow]:
         """Scored rows including Pick_Covered_Spread and Correct_Pick flags (excludes placeholders)."""
         try:
-            conn = get_connection(); cur = conn.cursor()
+            conn = get_connection(read_only=True); cur = conn.cursor()
             has_flag = self._has_placeholder_flag(conn)
             base_sql = """
                 SELECT WEEK, Home_Team, Away_Team, Game_Pick, Home_Score, Away_Score,
@@ -58,7 +58,7 @@ class PickResultsRepository:
     def get_recent(self, limit: int = 30) -> List[BasicScoredRow]:
         """Recent rows including pending & placeholder. Placeholder scores masked as NULL to show pending state."""
         try:
-            conn = get_connection(); cur = conn.cursor()
+            conn = get_connection(read_only=True); cur = conn.cursor()
             has_flag = self._has_placeholder_flag(conn)
             if has_flag:
                 cur.execute(f"""
@@ -67,14 +67,14 @@ class PickResultsRepository:
                            CASE WHEN Score_Placeholder=1 THEN NULL ELSE Away_Score END AS Away_Score,
                            Home_Line_Close, Away_Line_Close
                     FROM picks_results
-                    ORDER BY CAST(REPLACE(UPPER(WEEK),'WEEK','') AS INTEGER) DESC, Home_Team, Away_Team
+                    ORDER BY week_num DESC, Home_Team, Away_Team
                     LIMIT {int(limit)}
                 """)
             else:
                 cur.execute(f"""
                     SELECT WEEK, Home_Team, Away_Team, Game_Pick, Home_Score, Away_Score, Home_Line_Close, Away_Line_Close
                     FROM picks_results
-                    ORDER BY CAST(REPLACE(UPPER(WEEK),'WEEK','') AS INTEGER) DESC, Home_Team, Away_Team
+                    ORDER BY week_num DESC, Home_Team, Away_Team
                     LIMIT {int(limit)}
                 """)
             rows = cur.fetchall(); conn.close(); return rows
@@ -84,7 +84,7 @@ class PickResultsRepository:
     def get_upcoming_join(self) -> List[UpcomingJoinRow]:
         """Join picks with any existing scored rows and optionally spreads. Placeholder scores masked as NULL."""
         try:
-            conn = get_connection(); cur = conn.cursor()
+            conn = get_connection(read_only=True); cur = conn.cursor()
             has_flag = self._has_placeholder_flag(conn)
             cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='spreads' LIMIT 1")
             has_spreads = cur.fetchone() is not None
@@ -145,14 +145,14 @@ class PickResultsRepository:
     def get_scored_for_fallback_join(self) -> List[BasicScoredRow]:
         """Original fallback join; excludes placeholder if flag present."""
         try:
-            conn = get_connection(); cur = conn.cursor()
+            conn = get_connection(read_only=True); cur = conn.cursor()
             has_flag = self._has_placeholder_flag(conn)
             base_sql = """
                 SELECT TRIM(p.WEEK) as WK,
                        p.Home_Team, p.Away_Team, p.Game_Pick,
                        s.Home_Score, s.Away_Score, s.Home_Line_Close, s.Away_Line_Close
                 FROM picks p
-                JOIN spreads s ON TRIM(p.WEEK)=TRIM(s.WEEK) AND p.Home_Team=s.Home_Team AND p.Away_Team=s.Away_Team
+                JOIN spreads s ON p.week_num=s.week_num AND p.Home_Team=s.Home_Team AND p.Away_Team=s.Away_Team
                 WHERE s.Home_Score IS NOT NULL AND s.Away_Score IS NOT NULL
             """
             if has_flag:
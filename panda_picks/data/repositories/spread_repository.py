@@ -7,7 +7,7 @@ class SpreadRepository:
 
     def get_by_week(self, week: int) -> pd.DataFrame:
         with get_connection() as conn:
-            return pd.read_sql_query("SELECT * FROM spreads WHERE WEEK = ?", conn, params=[f"WEEK{week}"])
+            return pd.read_sql_query("SELECT * FROM spreads WHERE week_num = ?", conn, params=[int(week)])
 
     def get_all(self) -> pd.DataFrame:
         with get_connection() as conn:
@@ -0,0 +1,134 @@
+"""Local stand-in HTTP server for the external data sources, backed by a recorded fixture set.
+
+A request for ``/<host><path>?<query>`` is answered with the fixture recorded for
+``https://<host><path>?<query>`` (see ``replay.route``, which rewrites fetcher URLs when
+``PP_HTTP_STANDIN_URL`` points here). Each response is delayed by ``latency_s`` plus a
+uniform ``jitter_s`` and fails with ``503`` at ``failure_rate``; a fixed ``seed`` makes the
+failure sequence reproducible. ETag / Last-Modified revalidation is honoured (``304``).
+
+Run standalone::
+
+    python -m panda_picks.data.standin_server --set default --port 8765 --latency-ms 80 --failure-rate 0.1
+    PP_HTTP_STANDIN_URL=http://127.0.0.1:8765 python -m panda_picks.main --weeks 5
+"""
+from __future__ import annotations
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from panda_picks.data.replay import FixtureStore, replay_response
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: '_Server'
+
+    def do_GET(self):
+        stand_in = self.server.stand_in
+        delay, fail = stand_in._draw()
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            stand_in._count('failed')
+            self._reply(503, b'stand-in injected failure', {'Content-Type': 'text/plain'})
+            return
+        url = f"https:/{self.path}"
+        entry, body = stand_in.store.load(url)
+        if entry is None:
+            stand_in._count('missing')
+            self._reply(404, f"no fixture for {url}".encode(), {'Content-Type': 'text/plain'})
+            return
+        resp = replay_response(url, entry, body, dict(self.headers))
+        stand_in._count('not_modified' if resp.status_code == 304 else 'served')
+        self._reply(resp.status_code, resp.content, resp.headers)
+
+    def _reply(self, status: int, body: bytes, headers: dict) -> None:
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    stand_in: 'StandInServer'
+
+
+class StandInServer:
+    """Serve a ``FixtureStore`` on localhost; use as a context manager or ``start``/``stop``."""
+
+    def __init__(self, store: Optional[FixtureStore] = None, host: str = '127.0.0.1', port: int = 0,
+                 latency_s: float = 0.0, jitter_s: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = 0):
+        self.store = store or FixtureStore()
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.failure_rate = failure_rate
+        self.stats = {'served': 0, 'not_modified': 0, 'failed': 0, 'missing': 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.stand_in = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self):
+        with self._lock:
+            delay = self.latency_s + (self._rng.uniform(0, self.jitter_s) if self.jitter_s else 0.0)
+            return delay, self._rng.random() < self.failure_rate
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def start(self) -> 'StandInServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve recorded PFF/SumerSports responses locally')
+    parser.add_argument('--fixtures', type=Path, help='Fixture root (default PP_HTTP_FIXTURE_DIR)')
+    parser.add_argument('--set', dest='name', help='Fixture set name (default PP_HTTP_FIXTURE_SET)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Fixed delay added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra uniform random delay')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests answered 503')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    server = StandInServer(FixtureStore(args.fixtures, args.name), port=args.port, latency_s=args.latency_ms / 1000,
+                           jitter_s=args.jitter_ms / 1000, failure_rate=args.failure_rate, seed=args.seed)
+    print(f"Serving {len(server.store)} recorded responses from {server.store.path} at {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(f"Stand-in stats: {server.stats}")
+
+
+if __name__ == '__main__':
+    main()
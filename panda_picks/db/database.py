@@ -1,14 +1,174 @@
+import atexit
+import os
 import sqlite3
+import sys
+import threading
 import time
+from pathlib import Path
 from panda_picks import config
-
-
-import pandas as pd
-
-
-def get_connection():
-    """Get a connection to the database."""
-    return sqlite3.connect(config.DATABASE_PATH)
+from panda_picks.config.settings import Settings
+from panda_picks.db.migrations import migrate, reset_column_cache
+
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection that returns to the per-thread pool on close().
+
+    Callers keep the usual ``conn = get_connection(); ...; conn.close()`` shape.
+    The same thread asking for the same database gets the same connection back,
+    so nested helpers share it; uncommitted work is rolled back only when the
+    outermost holder closes (mirroring what a real close would have discarded).
+
+    Each checkout is a token naming the frame that took it. A ``with`` entered
+    straight off ``get_connection()`` in that frame owns the checkout and releases
+    it on exit (after the usual commit/rollback); a later ``close()`` from the same
+    frame is then a no-op, so ``with conn: ...; conn.close()`` releases once.
+    """
+    _pooled = False
+    _file_id = None
+    _fresh = None  # token of a checkout not used yet; a `with` entered now owns it
+
+    @property
+    def _checkouts(self) -> int:
+        return len(self._holders) if self._pooled else 0
+
+    def _checkout(self, token: int) -> None:
+        self._holders.append(token)
+        self._released.discard(token)
+        self._fresh = token
+
+    def _release(self, token: int, scoped: bool = False) -> None:
+        if token in self._holders:
+            # Last occurrence: the most recent checkout taken by that frame
+            del self._holders[len(self._holders) - 1 - self._holders[::-1].index(token)]
+            if scoped:
+                self._released.add(token)
+        elif token in self._released:
+            self._released.discard(token)  # already released by its with-block
+            return
+        elif self._holders:
+            self._holders.pop()  # closed by a frame other than the one that checked it out
+        if not self._holders:
+            self._released.clear()
+            if self.in_transaction:
+                self.rollback()
+
+    def cursor(self, *args, **kwargs):
+        self._fresh = None
+        return super().cursor(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        self._fresh = None
+        return super().execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._fresh = None
+        return super().executemany(*args, **kwargs)
+
+    def executescript(self, *args, **kwargs):
+        self._fresh = None
+        return super().executescript(*args, **kwargs)
+
+    def __enter__(self):
+        if self._pooled:
+            token = id(sys._getframe(1))
+            self._scopes.append(token if self._fresh == token else None)
+            self._fresh = None
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        result = super().__exit__(*exc)
+        if self._pooled and self._scopes:
+            token = self._scopes.pop()
+            if token is not None:
+                self._release(token, scoped=True)
+        return result
+
+    def close(self):
+        if not self._pooled:
+            return super().close()
+        self._fresh = None
+        self._release(id(sys._getframe(1)))
+
+    def _discard(self):
+        self._pooled = False
+        try:
+            super().close()
+        except sqlite3.Error:
+            pass
+
+
+_pool = threading.local()
+
+
+def _file_id(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _open(path, read_only):
+    if read_only:
+        target, uri = Path(path).resolve().as_uri() + '?mode=ro', True
+    else:
+        target, uri = str(path), False
+    conn = sqlite3.connect(target, timeout=Settings.DB_BUSY_TIMEOUT_S, uri=uri, factory=PooledConnection)
+    for name, value in Settings.DB_PRAGMAS.items():
+        if value is None or value == '':
+            continue
+        if read_only and name in ('journal_mode', 'synchronous'):
+            continue  # both write to / depend on the writer side
+        try:
+            conn.execute(f"PRAGMA {name}={value}")
+        except sqlite3.Error:
+            pass
+    if read_only:
+        conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+def get_connection(read_only: bool = False):
+    """Get a connection to the database.
+
+    Connections are pooled per thread and per (path, read_only) and configured
+    once with ``Settings.DB_PRAGMAS``. ``read_only=True`` opens the file with
+    ``mode=ro`` + ``query_only`` (used by UI queries). Set
+    ``PP_DB_POOL_ENABLED=false`` to get a fresh connection on every call.
+    """
+    path = str(config.DATABASE_PATH)
+    if not Settings.DB_POOL_ENABLED:
+        return _open(path, read_only)
+    conns = getattr(_pool, 'conns', None)
+    if conns is None:
+        conns = _pool.conns = {}
+    key = (path, read_only)
+    conn = conns.get(key)
+    if conn is not None and conn._file_id != _file_id(path):
+        # Database file was deleted/replaced underneath us (e.g. tests, rebuilds)
+        conn._discard()
+        conn = None
+    if conn is None:
+        conn = _open(path, read_only)
+        conn._pooled = True
+        conn._holders, conn._released, conn._scopes = [], set(), []
+        conn._file_id = _file_id(path)
+        conns[key] = conn
+    conn._checkout(id(sys._getframe(1)))
+    return conn
+
+
+def close_pooled_connections():
+    """Really close every pooled connection owned by the calling thread."""
+    conns = getattr(_pool, 'conns', None) or {}
+    for conn in conns.values():
+        conn._discard()
+    conns.clear()
+
+
+# Close cleanly at interpreter exit so WAL/SHM side files are checkpointed & removed
+atexit.register(close_pooled_connections)
 
 def store_grades_data():
     """Store team grades data in the database from a CSV file."""
@@ -26,6 +186,7 @@ def store_grades_data():
             raise FileNotFoundError(f"Grades CSV file not found: {csv_path}")
 
         # Load the data
+        import pandas as pd
         grades_df = pd.read_csv(csv_path)
 
         # Connect to the database using absolute path
@@ -54,6 +215,8 @@ def drop_tables():
     # drop all tables
     cursor.execute('DROP TABLE IF EXISTS grades')
     cursor.execute('DROP TABLE IF EXISTS advanced_stats')
+    cursor.execute('DROP TABLE IF EXISTS advanced_stats_raw')
+    cursor.execute('DROP TABLE IF EXISTS stat_metrics')
     cursor.execute('DROP TABLE IF EXISTS spreads')
     cursor.execute('DROP TABLE IF EXISTS picks')
     cursor.execute('DROP TABLE IF EXISTS backtest_results')
@@ -61,259 +224,27 @@ def drop_tables():
     cursor.execute('DROP TABLE IF EXISTS teaser_results')
     cursor.execute('DROP TABLE IF EXISTS excluded_teams')  # newly added
     cursor.execute('DROP TABLE IF EXISTS matchup_features')
-
-
+    cursor.execute('DROP TABLE IF EXISTS threshold_tuning_results')
+    cursor.execute('DROP TABLE IF EXISTS threshold_sweeps')
+    cursor.execute('DROP TABLE IF EXISTS threshold_sweep_shards')
+    cursor.execute('DROP TABLE IF EXISTS threshold_searches')
+    cursor.execute('DROP TABLE IF EXISTS threshold_search_trials')
+    cursor.execute('DROP TABLE IF EXISTS input_watermarks')
+    cursor.execute('DROP TABLE IF EXISTS pipeline_runs')
+    cursor.execute('DROP TABLE IF EXISTS schema_version')
 
     conn.commit()
+    reset_column_cache(conn)
     conn.close()
 
 def create_tables():
+    """Create or upgrade the schema to the latest version (see ``panda_picks.db.migrations``)."""
     conn = get_connection()
-    cursor = conn.cursor()
-    # Create grades table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS grades (        
-         TEAM TEXT,
-         OVR REAL,
-         OFF REAL,
-         PASS REAL,
-         RUN REAL,
-         RECV REAL,
-         PBLK REAL,
-         RBLK REAL,
-         DEF REAL,
-         RDEF REAL,
-         TACK REAL,
-         PRSH REAL,
-         COV REAL,
-         WINS INTEGER,
-         LOSSES INTEGER,
-         TIES INTEGER,
-         PTS_SCORED INTEGER,
-         PTS_ALLOWED INTEGER,
-         LAST_UPDATED TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-         PRIMARY KEY (TEAM)
-)
-                   ''')
-
-    # Prior season grades snapshot (single row per team, no week dimension)
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS grades_prior (
-         TEAM TEXT PRIMARY KEY,
-         OVR REAL,
-         OFF REAL,
-         PASS REAL,
-         RUN REAL,
-         RECV REAL,
-         PBLK REAL,
-         RBLK REAL,
-         DEF REAL,
-         RDEF REAL,
-         TACK REAL,
-         PRSH REAL,
-         COV REAL,
-         WINS INTEGER,
-         LOSSES INTEGER,
-         TIES INTEGER,
-         PTS_SCORED INTEGER,
-         PTS_ALLOWED INTEGER,
-         SOURCE TEXT,
-         CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-
-    # Weekly snapshots of current season grades (audit trail)
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS grades_snapshots (
-         Season INTEGER,
-         Week TEXT,
-         TEAM TEXT,
-         OVR REAL,
-         OFF REAL,
-         PASS REAL,
-         RUN REAL,
-         RECV REAL,
-         PBLK REAL,
-         RBLK REAL,
-         DEF REAL,
-         RDEF REAL,
-         TACK REAL,
-         PRSH REAL,
-         COV REAL,
-         WINS INTEGER,
-         LOSSES INTEGER,
-         TIES INTEGER,
-         PTS_SCORED INTEGER,
-         PTS_ALLOWED INTEGER,
-         SNAPSHOT_TS TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-         PRIMARY KEY (Season, Week, TEAM)
-    )
-    ''')
-
-    # Create advanced_stats table (Phase 0 enhanced schema)
-    cursor.execute('''
-                   CREATE TABLE IF NOT EXISTS advanced_stats (
-                                                                 season INTEGER,
-                                                                 week INTEGER,
-                                                                 type TEXT,
-                                                                 TEAM TEXT,
-                                                                 composite_score REAL,
-                                                                 z_score REAL,
-                                                                 last_updated TEXT,
-                                                                 PRIMARY KEY (season, week, type, TEAM)
-                       )
-                   ''')
-
-
-    # Create spreads table
-    cursor.execute('''
-                   CREATE TABLE IF NOT EXISTS spreads (
-                                                          WEEK TEXT,
-                                                          Home_Team TEXT,
-                                                          Away_Team TEXT,
-                                                          Home_Score INTEGER,
-                                                          Away_Score INTEGER,
-                                                          Home_Odds_Close REAL,
-                                                          Away_Odds_Close REAL,
-                                                          Home_Line_Close REAL,
-                                                          Away_Line_Close REAL,
-                                                          PRIMARY KEY (WEEK, Home_Team, Away_Team)
-                       )
-                   ''')
-    
-    # matchup_features table
-    cursor.execute('''
-                   CREATE TABLE IF NOT EXISTS matchup_features (
-                                                                 season INTEGER,
-                                                                 week INTEGER,
-                                                                 Home_Team TEXT,
-                                                                 Away_Team TEXT,
-                                                                 home_off_comp REAL,
-                                                                 home_def_comp REAL,
-                                                                 away_off_comp REAL,
-                                                                 away_def_comp REAL,
-                                                                 home_off_vs_away_def REAL,
-                                                                 home_def_vs_away_off REAL,
-                                                                 net_home_adv REAL,
-                                                                 off_comp_diff REAL,
-                                                                 def_comp_diff REAL,
-                                                                 net_composite REAL,
-                                                                 pressure_mismatch REAL,
-                                                                 turnover_index REAL,
-                                                                 momentum_home_off REAL,
-                                                                 momentum_home_def REAL,
-                                                                 momentum_away_off REAL,
-                                                                 momentum_away_def REAL,
-                                                                 trend_home_off REAL,
-                                                                 trend_home_def REAL,
-                                                                 trend_away_off REAL,
-                                                                 trend_away_def REAL,
-                                                                 impute_flag INTEGER,
-                                                                 created_at TEXT,
-                                                                 PRIMARY KEY (season, week, Home_Team, Away_Team)
-                       )
-                   ''')
-
-
-    # Create picks table
-    cursor.execute('''
-                   CREATE TABLE IF NOT EXISTS picks (
-                                                        WEEK TEXT,
-                                                        Home_Team TEXT,
-                                                        Away_Team TEXT,
-                                                        Home_Line_Close REAL,
-                                                        Away_Line_Close REAL,
-                                                        Game_Pick TEXT,
-                                                        Overall_Adv REAL,
-                                                        Offense_Adv REAL,
-                                                        Defense_Adv REAL,
-                                                        Off_Comp_Adv REAL,
-                                                        Def_Comp_Adv REAL,
-                                                        Off_Comp_Adv_sig TEXT,
-                                                        Def_Comp_Adv_sig TEXT,
-                                                        Overall_Adv_sig TEXT,
-                                                        Offense_Adv_sig TEXT,
-                                                        Defense_Adv_sig TEXT,
-                                                        PRIMARY KEY (WEEK, Home_Team, Away_Team)
-                       )
-                   ''')
-
-    # Create backtest_results table
-    cursor.execute('''
-                   CREATE TABLE IF NOT EXISTS backtest_results (
-                                                                   WEEK TEXT,
-                                                                   total_wagered REAL,
-                                                                   total_spread_wins INTEGER,
-                                                                   total_spread_bets INTEGER,
-                                                                   total_ml_wins INTEGER,
-                                                                   total_ml_bets INTEGER,
-                                                                   total_profit REAL,
-                                                                   spread_win_percentage REAL,
-                                                                   ml_win_percentage REAL,
-                                                                   perfect_weeks INTEGER,
-                                                                   weekly_profit REAL,
-                                                                   PRIMARY KEY (WEEK)
-                       )
-                   ''')
-
-    # Create picks_results table
-    cursor.execute('''
-                   CREATE TABLE IF NOT EXISTS picks_results (
-                                                                WEEK TEXT,
-                                                                Home_Team TEXT,
-                                                                Away_Team TEXT,
-                                                                Home_Score INTEGER,
-                                                                Away_Score INTEGER,
-                                                                Home_Odds_Close REAL,
-                                                                Away_Odds_Close REAL,
-                                                                Home_Line_Close REAL,
-                                                                Away_Line_Close REAL,
-                                                                Game_Pick TEXT,
-                                                                Winner TEXT,
-                                                                Correct_Pick INTEGER,
-                                                                Pick_Covered_Spread INTEGER,
-                                                                Overall_Adv REAL,
-                                                                Offense_Adv REAL,
-                                                                Defense_Adv REAL,
-                                                                Off_Comp_Adv REAL,
-                                                                Def_Comp_Adv REAL,
-                                                                Overall_Adv_Sig TEXT,
-                                                                Offense_Adv_Sig TEXT,
-                                                                Defense_Adv_Sig TEXT,
-                                                                Off_Comp_Adv_Sig TEXT,
-                                                                Def_Comp_Adv_Sig TEXT,
-                                                                PRIMARY KEY (WEEK, Home_Team, Away_Team)
-                       )
-                   ''')
-
-    # create teaser_results table
-    cursor.execute('''
-                   CREATE TABLE IF NOT EXISTS teaser_results (
-                                                                 Combo TEXT,
-                                                                 Winnings REAL,
-                                                                 Type TEXT,
-                                                                 WEEK TEXT,
-                                                                 Total_Amount_Wagered REAL,
-                                                                 Weekly_Profit REAL,
-                                                                 Total_Profit REAL,
-                                                                 Total_Profit_Over_All_Weeks REAL,
-                                                                 Total_Balance REAL,
-                                                                 PRIMARY KEY (Combo, WEEK)
-                       )
-                   ''')
-
-
-    # Excluded teams (manual UI exclusions for combos)
-    cursor.execute('''
-                   CREATE TABLE IF NOT EXISTS excluded_teams (
-                                                                 WEEK TEXT,
-                                                                 Team TEXT,
-                                                                 PRIMARY KEY (WEEK, Team)
-                       )
-                   ''')
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
 
-    conn.commit()
-    conn.close()
 
 if __name__ == '__main__':
     drop_tables()
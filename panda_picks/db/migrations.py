@@ -0,0 +1,617 @@
+"""Versioned, incremental schema migrations.
+
+Each step is a ``(version, name, fn(cursor))`` entry in ``MIGRATIONS``, applied once and in
+order inside its own transaction; applied versions are recorded in ``schema_version``.
+``migrate()`` is cheap when the database is already current, so the pipeline runs against
+an existing DB instead of dropping and recreating every table. Steps must also be safe on
+legacy databases created before versioning (tables/columns may already exist).
+
+To change the schema, append a new step with the next version number; never edit a step
+that has already shipped.
+"""
+from __future__ import annotations
+import logging
+import sqlite3
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Integer week derived from the text WEEK key ('WEEK7' -> 7). Generated (VIRTUAL) so
+# writers never maintain it; it is indexable and sorts/joins numerically.
+WEEK_NUM_EXPR = "CAST(REPLACE(UPPER(WEEK),'WEEK','') AS INTEGER)"
+WEEK_KEYED_TABLES = ('spreads', 'picks', 'picks_results')
+# Columns computed by SQLite itself; they show up in SELECT * but cannot be inserted
+GENERATED_COLUMNS = ('week_num',)
+
+_SCORED = "Home_Score IS NOT NULL AND Away_Score IS NOT NULL"
+_INDEXES = [
+    # name, table, columns, partial WHERE
+    ('idx_spreads_week_num', 'spreads', 'week_num, WEEK', None),
+    ('idx_spreads_home_team', 'spreads', 'Home_Team, week_num', None),
+    ('idx_spreads_away_team', 'spreads', 'Away_Team, week_num', None),
+    ('idx_spreads_scored', 'spreads',
+     'week_num, WEEK, Home_Team, Away_Team, Home_Score, Away_Score, Home_Line_Close, Away_Line_Close', _SCORED),
+    ('idx_picks_week_num', 'picks', 'week_num', None),
+    ('idx_picks_results_week_num', 'picks_results', 'week_num', None),
+    ('idx_picks_results_home_team', 'picks_results', 'Home_Team, week_num', None),
+    ('idx_picks_results_away_team', 'picks_results', 'Away_Team, week_num', None),
+    ('idx_picks_results_scored', 'picks_results', 'week_num, Home_Team, Away_Team', _SCORED),
+    ('idx_matchup_features_week', 'matchup_features', 'week, season', None),
+]
+
+
+def _table_columns(cursor, table: str) -> Set[str]:
+    # table_xinfo (unlike table_info) also lists generated columns
+    cursor.execute(f"PRAGMA table_xinfo({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _add_columns(cursor, table: str, cols_types: Dict[str, str]) -> None:
+    existing = {c.lower() for c in _table_columns(cursor, table)}
+    for col, col_type in cols_types.items():
+        if col.lower() not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}")
+
+
+def _baseline(cursor) -> None:
+    """Core tables as they existed before versioned migrations."""
+    # Create grades table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS grades (        
+         TEAM TEXT,
+         OVR REAL,
+         OFF REAL,
+         PASS REAL,
+         RUN REAL,
+         RECV REAL,
+         PBLK REAL,
+         RBLK REAL,
+         DEF REAL,
+         RDEF REAL,
+         TACK REAL,
+         PRSH REAL,
+         COV REAL,
+         WINS INTEGER,
+         LOSSES INTEGER,
+         TIES INTEGER,
+         PTS_SCORED INTEGER,
+         PTS_ALLOWED INTEGER,
+         LAST_UPDATED TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+         PRIMARY KEY (TEAM)
+)
+                   ''')
+
+    # Prior season grades snapshot (single row per team, no week dimension)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS grades_prior (
+         TEAM TEXT PRIMARY KEY,
+         OVR REAL,
+         OFF REAL,
+         PASS REAL,
+         RUN REAL,
+         RECV REAL,
+         PBLK REAL,
+         RBLK REAL,
+         DEF REAL,
+         RDEF REAL,
+         TACK REAL,
+         PRSH REAL,
+         COV REAL,
+         WINS INTEGER,
+         LOSSES INTEGER,
+         TIES INTEGER,
+         PTS_SCORED INTEGER,
+         PTS_ALLOWED INTEGER,
+         SOURCE TEXT,
+         CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Weekly snapshots of current season grades (audit trail)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS grades_snapshots (
+         Season INTEGER,
+         Week TEXT,
+         TEAM TEXT,
+         OVR REAL,
+         OFF REAL,
+         PASS REAL,
+         RUN REAL,
+         RECV REAL,
+         PBLK REAL,
+         RBLK REAL,
+         DEF REAL,
+         RDEF REAL,
+         TACK REAL,
+         PRSH REAL,
+         COV REAL,
+         WINS INTEGER,
+         LOSSES INTEGER,
+         TIES INTEGER,
+         PTS_SCORED INTEGER,
+         PTS_ALLOWED INTEGER,
+         SNAPSHOT_TS TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+         PRIMARY KEY (Season, Week, TEAM)
+    )
+    ''')
+
+    # Create advanced_stats table (Phase 0 enhanced schema)
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS advanced_stats (
+                                                                 season INTEGER,
+                                                                 week INTEGER,
+                                                                 type TEXT,
+                                                                 TEAM TEXT,
+                                                                 composite_score REAL,
+                                                                 z_score REAL,
+                                                                 last_updated TEXT,
+                                                                 PRIMARY KEY (season, week, type, TEAM)
+                       )
+                   ''')
+
+
+    # Create spreads table
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS spreads (
+                                                          WEEK TEXT,
+                                                          Home_Team TEXT,
+                                                          Away_Team TEXT,
+                                                          Home_Score INTEGER,
+                                                          Away_Score INTEGER,
+                                                          Home_Odds_Close REAL,
+                                                          Away_Odds_Close REAL,
+                                                          Home_Line_Close REAL,
+                                                          Away_Line_Close REAL,
+                                                          PRIMARY KEY (WEEK, Home_Team, Away_Team)
+                       )
+                   ''')
+    
+    # matchup_features table
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS matchup_features (
+                                                                 season INTEGER,
+                                                                 week INTEGER,
+                                                                 Home_Team TEXT,
+                                                                 Away_Team TEXT,
+                                                                 home_off_comp REAL,
+                                                                 home_def_comp REAL,
+                                                                 away_off_comp REAL,
+                                                                 away_def_comp REAL,
+                                                                 home_off_vs_away_def REAL,
+                                                                 home_def_vs_away_off REAL,
+                                                                 net_home_adv REAL,
+                                                                 off_comp_diff REAL,
+                                                                 def_comp_diff REAL,
+                                                                 net_composite REAL,
+                                                                 pressure_mismatch REAL,
+                                                                 turnover_index REAL,
+                                                                 momentum_home_off REAL,
+                                                                 momentum_home_def REAL,
+                                                                 momentum_away_off REAL,
+                                                                 momentum_away_def REAL,
+                                                                 trend_home_off REAL,
+                                                                 trend_home_def REAL,
+                                                                 trend_away_off REAL,
+                                                                 trend_away_def REAL,
+                                                                 impute_flag INTEGER,
+                                                                 created_at TEXT,
+                                                                 PRIMARY KEY (season, week, Home_Team, Away_Team)
+                       )
+                   ''')
+
+
+    # Create picks table
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS picks (
+                                                        WEEK TEXT,
+                                                        Home_Team TEXT,
+                                                        Away_Team TEXT,
+                                                        Home_Line_Close REAL,
+                                                        Away_Line_Close REAL,
+                                                        Game_Pick TEXT,
+                                                        Overall_Adv REAL,
+                                                        Offense_Adv REAL,
+                                                        Defense_Adv REAL,
+                                                        Off_Comp_Adv REAL,
+                                                        Def_Comp_Adv REAL,
+                                                        Off_Comp_Adv_sig TEXT,
+                                                        Def_Comp_Adv_sig TEXT,
+                                                        Overall_Adv_sig TEXT,
+                                                        Offense_Adv_sig TEXT,
+                                                        Defense_Adv_sig TEXT,
+                                                        PRIMARY KEY (WEEK, Home_Team, Away_Team)
+                       )
+                   ''')
+
+    # Create backtest_results table
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS backtest_results (
+                                                                   WEEK TEXT,
+                                                                   total_wagered REAL,
+                                                                   total_spread_wins INTEGER,
+                                                                   total_spread_bets INTEGER,
+                                                                   total_ml_wins INTEGER,
+                                                                   total_ml_bets INTEGER,
+                                                                   total_profit REAL,
+                                                                   spread_win_percentage REAL,
+                                                                   ml_win_percentage REAL,
+                                                                   perfect_weeks INTEGER,
+                                                                   weekly_profit REAL,
+                                                                   PRIMARY KEY (WEEK)
+                       )
+                   ''')
+
+    # Create picks_results table
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS picks_results (
+                                                                WEEK TEXT,
+                                                                Home_Team TEXT,
+                                                                Away_Team TEXT,
+                                                                Home_Score INTEGER,
+                                                                Away_Score INTEGER,
+                                                                Home_Odds_Close REAL,
+                                                                Away_Odds_Close REAL,
+                                                                Home_Line_Close REAL,
+                                                                Away_Line_Close REAL,
+                                                                Game_Pick TEXT,
+                                                                Winner TEXT,
+                                                                Correct_Pick INTEGER,
+                                                                Pick_Covered_Spread INTEGER,
+                                                                Overall_Adv REAL,
+                                                                Offense_Adv REAL,
+                                                                Defense_Adv REAL,
+                                                                Off_Comp_Adv REAL,
+                                                                Def_Comp_Adv REAL,
+                                                                Overall_Adv_Sig TEXT,
+                                                                Offense_Adv_Sig TEXT,
+                                                                Defense_Adv_Sig TEXT,
+                                                                Off_Comp_Adv_Sig TEXT,
+                                                                Def_Comp_Adv_Sig TEXT,
+                                                                PRIMARY KEY (WEEK, Home_Team, Away_Team)
+                       )
+                   ''')
+
+    # create teaser_results table
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS teaser_results (
+                                                                 Combo TEXT,
+                                                                 Winnings REAL,
+                                                                 Type TEXT,
+                                                                 WEEK TEXT,
+                                                                 Total_Amount_Wagered REAL,
+                                                                 Weekly_Profit REAL,
+                                                                 Total_Profit REAL,
+                                                                 Total_Profit_Over_All_Weeks REAL,
+                                                                 Total_Balance REAL,
+                                                                 PRIMARY KEY (Combo, WEEK)
+                       )
+                   ''')
+
+
+    # Excluded teams (manual UI exclusions for combos)
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS excluded_teams (
+                                                                 WEEK TEXT,
+                                                                 Team TEXT,
+                                                                 PRIMARY KEY (WEEK, Team)
+                       )
+                   ''')
+
+
+def _week_columns_and_indexes(cursor) -> None:
+    """Integer week_num/season on the WEEK-keyed tables plus lookup indexes."""
+    from panda_picks.config.settings import Settings
+    season = Settings.SEASON
+    for table in WEEK_KEYED_TABLES:
+        cols = _table_columns(cursor, table)
+        if 'week_num' not in cols:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN week_num INTEGER GENERATED ALWAYS AS ({WEEK_NUM_EXPR}) VIRTUAL")
+        if 'season' not in cols:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN season INTEGER")
+            # Existing rows predate the column; the DB only ever holds the running season
+            cursor.execute(f"UPDATE {table} SET season = ? WHERE season IS NULL", (season,))
+    for name, table, columns, where in _INDEXES:
+        sql = f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+        if where:
+            sql += f" WHERE {where}"
+        cursor.execute(sql)
+
+
+# Columns written by makePicks / PickService that the baseline picks table lacks
+PICK_EXTRA_COLUMNS: Dict[str, str] = {
+    'Home_Odds_Close': 'REAL', 'Away_Odds_Close': 'REAL',
+    'Home_Win_Prob': 'REAL', 'Away_Win_Prob': 'REAL',
+    'Home_ML_Implied': 'REAL', 'Away_ML_Implied': 'REAL',
+    'Pick_Prob': 'REAL', 'Pick_Implied_Prob': 'REAL', 'Pick_Edge': 'REAL', 'Pick_Cover_Prob': 'REAL',
+    'Pressure_Mismatch': 'REAL', 'Explosive_Pass_Mismatch': 'REAL', 'Script_Control_Mismatch': 'REAL',
+    'Off_Comp_Diff': 'REAL', 'Def_Comp_Diff': 'REAL', 'Net_Composite': 'REAL', 'Net_Composite_norm': 'REAL',
+    'Blended_Adv': 'REAL', 'Blended_Adv_sig': 'TEXT',
+    'Expected_Margin': 'REAL', 'Cover_Prob': 'REAL', 'Model_Edge': 'REAL', 'Confidence_Score': 'REAL',
+    'Timestamp': 'TEXT',
+}
+
+# picks_results = picks joined with spreads plus the backtest's grading/probability columns
+PICK_RESULT_EXTRA_COLUMNS: Dict[str, str] = {
+    **PICK_EXTRA_COLUMNS,
+    'Score_Placeholder': 'INTEGER',
+    'Home_Odds_Implied_Prob': 'REAL', 'Away_Odds_Implied_Prob': 'REAL', 'Home_Spread_Implied_Prob': 'REAL',
+    'Home_Edge_ML': 'REAL', 'Home_Edge_Spread': 'REAL', 'Home_Win_Actual': 'REAL',
+    'Pick_Edge_ML': 'REAL', 'Pick_Edge_Spread': 'REAL',
+}
+
+
+def _pick_output_columns(cursor) -> None:
+    """Columns previously added ad hoc on each write (PRAGMA probing in picks/backtest/PickRepository)."""
+    _add_columns(cursor, 'picks', PICK_EXTRA_COLUMNS)
+    _add_columns(cursor, 'picks_results', PICK_RESULT_EXTRA_COLUMNS)
+
+
+# Parameters a sweep varies besides the three significance thresholds (NULL for plain tune_thresholds rows)
+SWEEP_PARAM_COLUMNS: Dict[str, str] = {
+    'Sweep_Id': 'TEXT', 'K_Prob_Scale': 'REAL', 'Edge_Min': 'REAL', 'Blend_Alpha': 'REAL',
+    'Max_Picks_Per_Week': 'INTEGER',
+}
+
+
+def _threshold_sweeps(cursor) -> None:
+    """threshold_tuning_results as a managed table plus checkpoint tables for resumable sweeps."""
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS threshold_tuning_results (
+                       Overall_Thresh REAL,
+                       Offense_Thresh REAL,
+                       Defense_Thresh REAL,
+                       Total_Games INTEGER,
+                       Picks INTEGER,
+                       Evaluated_Picks INTEGER,
+                       Accuracy REAL,
+                       Profit REAL,
+                       ROI_per_Pick REAL,
+                       Avg_Home_Win_Prob REAL,
+                       Timestamp TEXT
+                   )
+                   ''')
+    _add_columns(cursor, 'threshold_tuning_results', SWEEP_PARAM_COLUMNS)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_threshold_tuning_sweep ON threshold_tuning_results (Sweep_Id)")
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS threshold_sweeps (
+                       Sweep_Id TEXT PRIMARY KEY,
+                       Spec TEXT,
+                       Shards INTEGER,
+                       Created_At TEXT,
+                       Completed_At TEXT
+                   )
+                   ''')
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS threshold_sweep_shards (
+                       Sweep_Id TEXT,
+                       Shard INTEGER,
+                       Rows INTEGER,
+                       Completed_At TEXT,
+                       PRIMARY KEY (Sweep_Id, Shard)
+                   )
+                   ''')
+
+
+def _threshold_search_trials(cursor) -> None:
+    """Adaptive threshold search runs and their per-trial history."""
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS threshold_searches (
+                       Search_Id TEXT PRIMARY KEY,
+                       Method TEXT,
+                       Spec TEXT,
+                       Trials INTEGER,
+                       Best_Trial INTEGER,
+                       Best_ROI_per_Pick REAL,
+                       Created_At TEXT
+                   )
+                   ''')
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS threshold_search_trials (
+                       Search_Id TEXT,
+                       Method TEXT,
+                       Trial INTEGER,
+                       Rung INTEGER,
+                       Weeks INTEGER,
+                       Overall_Thresh REAL,
+                       Offense_Thresh REAL,
+                       Defense_Thresh REAL,
+                       K_Prob_Scale REAL,
+                       Edge_Min REAL,
+                       Blend_Alpha REAL,
+                       Max_Picks_Per_Week INTEGER,
+                       Picks INTEGER,
+                       Evaluated_Picks INTEGER,
+                       Accuracy REAL,
+                       Profit REAL,
+                       ROI_per_Pick REAL,
+                       Timestamp TEXT,
+                       PRIMARY KEY (Search_Id, Trial)
+                   )
+                   ''')
+
+
+def _input_watermarks(cursor) -> None:
+    """Per-week input hashes for incremental recompute (see ``panda_picks.db.watermarks``)."""
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS input_watermarks (
+                       Consumer TEXT,
+                       Season INTEGER,
+                       Week INTEGER,
+                       Input_Hash TEXT,
+                       Recorded_At TEXT,
+                       PRIMARY KEY (Consumer, Season, Week)
+                   )
+                   ''')
+
+
+def _pipeline_runs(cursor) -> None:
+    """Per-stage outcome of each ``panda_picks.pipeline.run_pipeline`` run."""
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS pipeline_runs (
+                       Run_Id TEXT,
+                       Stage TEXT,
+                       Status TEXT,
+                       Started_At TEXT,
+                       Finished_At TEXT,
+                       Wall_Seconds REAL,
+                       Rows INTEGER,
+                       Error TEXT,
+                       PRIMARY KEY (Run_Id, Stage)
+                   )
+                   ''')
+
+
+_ADVANCED_STATS_BASE = ('season', 'week', 'type', 'TEAM', 'composite_score', 'z_score', 'last_updated')
+# Legacy wide columns held SQL-safe names; scraped header each one was derived from (frozen at migration 8)
+_LEGACY_METRIC_HEADERS = {
+    'Comp': 'Comp %', 'Eckel': 'Eckel %', 'Int': 'Int %', 'Pass_Yards': 'Pass Yards', 'Rush_Yards': 'Rush Yards',
+    'Sack': 'Sack %', 'Scramble': 'Scramble %', 'Success': 'Success %', 'YAC_EPA_Att': 'YAC EPA/Att',
+}
+
+
+def _advanced_stats_raw(cursor) -> None:
+    """Long-format scraped metrics (``stat_metrics`` dictionary + ``advanced_stats_raw`` values).
+
+    Metric columns that earlier versions added to ``advanced_stats`` one ALTER at a time are
+    moved into the long table (numeric values only) and ``advanced_stats`` is rebuilt with
+    just its key, composite and timestamp columns.
+    """
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS stat_metrics (
+                       metric_id INTEGER PRIMARY KEY,
+                       name TEXT NOT NULL UNIQUE
+                   )
+                   ''')
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS advanced_stats_raw (
+                       season INTEGER,
+                       week INTEGER,
+                       type TEXT,
+                       TEAM TEXT,
+                       metric_id INTEGER NOT NULL,
+                       value REAL,
+                       PRIMARY KEY (season, week, type, TEAM, metric_id)
+                   ) WITHOUT ROWID
+                   ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_advanced_stats_raw_metric "
+                   "ON advanced_stats_raw (metric_id, season, week)")
+    legacy = sorted(_table_columns(cursor, 'advanced_stats') - set(_ADVANCED_STATS_BASE))
+    if not legacy:
+        return
+    for col in legacy:
+        name = _LEGACY_METRIC_HEADERS.get(col, col)
+        cursor.execute("INSERT OR IGNORE INTO stat_metrics (name) VALUES (?)", (name,))
+        cursor.execute(f'''
+                       INSERT OR REPLACE INTO advanced_stats_raw (season, week, type, TEAM, metric_id, value)
+                       SELECT season, week, type, TEAM, (SELECT metric_id FROM stat_metrics WHERE name = ?), "{col}"
+                       FROM advanced_stats WHERE typeof("{col}") IN ('integer', 'real')
+                       ''', (name,))
+    base = ', '.join(_ADVANCED_STATS_BASE)
+    cursor.execute('''
+                   CREATE TABLE advanced_stats_narrow (
+                       season INTEGER,
+                       week INTEGER,
+                       type TEXT,
+                       TEAM TEXT,
+                       composite_score REAL,
+                       z_score REAL,
+                       last_updated TEXT,
+                       PRIMARY KEY (season, week, type, TEAM)
+                   )
+                   ''')
+    cursor.execute(f"INSERT INTO advanced_stats_narrow ({base}) SELECT {base} FROM advanced_stats")
+    cursor.execute("DROP TABLE advanced_stats")
+    cursor.execute("ALTER TABLE advanced_stats_narrow RENAME TO advanced_stats")
+
+
+Migration = Tuple[int, str, Callable[[sqlite3.Cursor], None]]
+
+MIGRATIONS: List[Migration] = [
+    (1, 'baseline_tables', _baseline),
+    (2, 'week_num_season_indexes', _week_columns_and_indexes),
+    (3, 'pick_output_columns', _pick_output_columns),
+    (4, 'threshold_sweeps', _threshold_sweeps),
+    (5, 'threshold_search_trials', _threshold_search_trials),
+    (6, 'input_watermarks', _input_watermarks),
+    (7, 'pipeline_runs', _pipeline_runs),
+    (8, 'advanced_stats_raw', _advanced_stats_raw),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+_SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Column names per (database, table) read once after migrating; see table_columns()
+_COLUMNS_CACHE: Dict[Tuple[str, str], Set[str]] = {}
+
+
+def _db_key(conn: sqlite3.Connection) -> str:
+    row = conn.execute("PRAGMA database_list").fetchone()
+    return row[2] if row else ''
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Highest applied migration version (0 for an unversioned database)."""
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None) -> int:
+    """Apply pending migrations up to ``target`` (default: latest). Returns the resulting version."""
+    target = LATEST_VERSION if target is None else target
+    version = current_version(conn)
+    if version >= target:
+        return version
+    if conn.in_transaction:
+        conn.commit()  # matches the old create_tables, which committed whatever was pending
+    conn.execute(_SCHEMA_VERSION_DDL)
+    conn.commit()
+    for step_version, name, step in MIGRATIONS:
+        if step_version <= version or step_version > target:
+            continue
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN")
+            step(cur)
+            cur.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (step_version, name))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logging.exception(f"Schema migration {step_version} ({name}) failed")
+            raise
+        logging.info(f"Applied schema migration {step_version}: {name}")
+        version = step_version
+    reset_column_cache(conn)
+    return version
+
+
+def reset_column_cache(conn: Optional[sqlite3.Connection] = None) -> None:
+    if conn is None:
+        _COLUMNS_CACHE.clear()
+        return
+    db = _db_key(conn)
+    for key in [k for k in _COLUMNS_CACHE if k[0] == db]:
+        del _COLUMNS_CACHE[key]
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> Set[str]:
+    """Lower-cased writable column names of ``table`` (generated columns excluded), cached per database.
+
+    SQLite column names are case-insensitive, so compare with ``col.lower()``. Writers use
+    this to trim frames to the migrated schema instead of probing ``PRAGMA table_info``
+    and altering the table on every write.
+    """
+    key = (_db_key(conn), table)
+    cols = _COLUMNS_CACHE.get(key)
+    if cols is None:
+        cols = {row[1].lower() for row in conn.execute(f"PRAGMA table_xinfo({table})").fetchall() if row[6] == 0}
+        if cols:
+            _COLUMNS_CACHE[key] = cols
+    return cols
@@ -0,0 +1,101 @@
+"""Input fingerprints for incremental recompute.
+
+Each derived table (a *consumer*: ``matchup_features``, ``picks``, ``blended_grades``)
+stores, per (season, week), a hash of every upstream row that week's output was built
+from. On the next run the consumer hashes its inputs again and rebuilds only the weeks
+whose hash changed (``stale_weeks``), then records the new hashes (``record``) after its
+outputs are written -- so a crash in between only causes a redundant rebuild. Season-wide
+outputs use week 0.
+
+Hashes are built from the Python values sqlite returns (``row_fingerprint``), so they do
+not depend on the dtypes pandas would infer for a query.
+"""
+from __future__ import annotations
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping
+
+if TYPE_CHECKING:  # annotations only; pandas is imported where it is used
+    import pandas as pd
+
+_TABLE = 'input_watermarks'
+
+
+def bytes_fingerprint(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()[:20]
+
+
+def row_fingerprint(rows: Iterable[tuple]) -> str:
+    """Order-independent fingerprint of a set of rows."""
+    return bytes_fingerprint('\n'.join(sorted(repr(tuple(r)) for r in rows)).encode())
+
+
+EMPTY = row_fingerprint([])
+
+
+def value_fingerprint(value) -> str:
+    """Fingerprint of a JSON-serialisable value (settings, parameter dicts)."""
+    return bytes_fingerprint(json.dumps(value, sort_keys=True, default=str).encode())
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Fingerprint of a frame's content (row order independent)."""
+    if df is None or df.empty:
+        return EMPTY
+    import numpy as np
+    import pandas as pd
+    hashed = np.sort(pd.util.hash_pandas_object(df, index=False).to_numpy())
+    return bytes_fingerprint(','.join(map(str, df.columns)).encode() + hashed.tobytes())
+
+
+def combine(*parts: str) -> str:
+    """Fingerprint of an ordered sequence of fingerprints."""
+    return bytes_fingerprint('|'.join(parts).encode())
+
+
+def grouped_fingerprints(conn, sql: str, params: Iterable = ()) -> Dict[int, str]:
+    """Run ``sql`` and fingerprint its rows grouped by the first column (an integer week)."""
+    groups: Dict[int, List[tuple]] = {}
+    for row in conn.execute(sql, list(params)):
+        if row[0] is None:
+            continue
+        groups.setdefault(int(row[0]), []).append(row[1:])
+    return {week: row_fingerprint(rows) for week, rows in groups.items()}
+
+
+def stored(conn, consumer: str, season: int, max_age_h: float | None = None) -> Dict[int, str]:
+    """Recorded hashes; with ``max_age_h`` only those recorded within the last ``max_age_h`` hours."""
+    sql = f"SELECT Week, Input_Hash FROM {_TABLE} WHERE Consumer = ? AND Season = ?"
+    params: list = [consumer, int(season)]
+    if max_age_h is not None:
+        sql += " AND Recorded_At >= ?"
+        params.append((datetime.utcnow() - timedelta(hours=max_age_h)).isoformat())
+    return {int(w): h for w, h in conn.execute(sql, params)}
+
+
+def stale_weeks(conn, consumer: str, season: int, hashes: Mapping[int, str],
+                max_age_h: float | None = None) -> List[int]:
+    """Weeks (keys of ``hashes``) whose recorded input hash differs from the current one (or expired)."""
+    previous = stored(conn, consumer, season, max_age_h)
+    return sorted(int(w) for w, h in hashes.items() if previous.get(int(w)) != h)
+
+
+def record(conn, consumer: str, season: int, hashes: Mapping[int, str]) -> None:
+    """Remember the input hashes a consumer's outputs were just rebuilt from."""
+    if not hashes:
+        return
+    now = datetime.utcnow().isoformat()
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {_TABLE} (Consumer, Season, Week, Input_Hash, Recorded_At) VALUES (?, ?, ?, ?, ?)",
+            [(consumer, int(season), int(w), h, now) for w, h in hashes.items()])
+
+
+def clear(conn, consumer: str | None = None) -> None:
+    """Forget recorded hashes (all consumers by default) so the next run rebuilds everything."""
+    with conn:
+        if consumer is None:
+            conn.execute(f"DELETE FROM {_TABLE}")
+        else:
+            conn.execute(f"DELETE FROM {_TABLE} WHERE Consumer = ?", (consumer,))
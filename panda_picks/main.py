@@ -1,66 +1,153 @@
 # panda_picks/main.py
 import logging
-import time
 import argparse
-from panda_picks.data import get_pff_grades, advanced_stats, get_advanced_stats
-from panda_picks.analysis import picks
-from panda_picks.analysis.backtest import backtest
-from panda_picks.analysis import spreads as create_spreads  # Alias to match existing code
-from panda_picks.analysis import advanced_features
 from panda_picks.db import database as db
+from panda_picks.db import watermarks
 from panda_picks import config
+from panda_picks.config.settings import Settings
+from panda_picks.pipeline import Stage, last_run_incomplete, mark_week_done, run_pipeline, week_checkpoint
 from datetime import datetime
 
-def start(weeks: list[int] | None = None):
+def _count(sql: str, params=()) -> int:
+    conn = db.get_connection()
+    try:
+        return int(conn.execute(sql, list(params)).fetchone()[0])
+    finally:
+        conn.close()
+
+
+def _week_keys(weeks: list[int]) -> list[str]:
+    return [f'WEEK{w}' for w in weeks]
+
+
+def _table_fingerprint(table: str) -> str:
+    conn = db.get_connection()
+    try:
+        return watermarks.row_fingerprint(conn.execute(f"SELECT * FROM {table}"))
+    finally:
+        conn.close()
+
+
+def build_stages(season: int, weeks: list[int] | None, incremental: bool, resume: bool = False) -> list[Stage]:
+    """The batch pipeline as a DAG; grades, stats and spreads fetches have no mutual dependencies.
+
+    The PFF and spreads fetches have no input to fingerprint and always run (spreads skips
+    final weeks through its HTTP cache); advanced stats are checkpointed per week and reused
+    for ``Settings.PIPELINE_FETCH_MAX_AGE_H`` when resuming. Features and picks always run
+    (they are incremental on their own).
+    """
+    # Deferred so `python -m panda_picks.main --help` does not load pandas/requests/bs4
+    from panda_picks.data import get_pff_grades, advanced_stats
+    from panda_picks.analysis import picks
+    from panda_picks.analysis.backtest import backtest
+    from panda_picks.analysis import spreads as create_spreads  # Alias to match existing code
+    from panda_picks.analysis import advanced_features
+
+    target_weeks = weeks if weeks else list(range(1, 19))
+    week_marks = ','.join('?' * len(target_weeks))
+    fetch_age = Settings.PIPELINE_FETCH_MAX_AGE_H
+
+    def pff_grades():
+        if not get_pff_grades.getGrades():
+            raise RuntimeError('PFF grades fetch failed; storing the existing grades CSV')
+
+    def grades_csv_fingerprint():
+        csv_path = config.TEAM_GRADES_CSV
+        return watermarks.bytes_fingerprint(csv_path.read_bytes()) if csv_path.exists() else None
+
+    def store_grades():
+        db.store_grades_data()
+        return _count("SELECT COUNT(*) FROM grades")
+
+    def stats():
+        fingerprints = {w: watermarks.value_fingerprint({'season': season, 'week': w}) for w in target_weeks}
+        todo = week_checkpoint('advanced_stats', season, fingerprints, fetch_age) if resume else target_weeks
+        if len(todo) < len(target_weeks):
+            logging.info(f'Advanced stats already collected for weeks {sorted(set(target_weeks) - set(todo))}')
+        missing = []
+        collected = {}
+        started = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        if todo:
+            try:
+                collected = advanced_stats.collect_weeks(season, todo)
+            except Exception as e:
+                logging.exception(f"Advanced stats collection failed for weeks {todo}: {e}")
+        for w in todo:
+            # The collector logs and swallows scrape errors; a week is done once both sides were saved
+            # now or their pages are unchanged since the last write (collected as None)
+            saved = _count("SELECT COUNT(DISTINCT type) FROM advanced_stats WHERE season = ? AND week = ? "
+                           "AND last_updated >= ?", [season, w, started])
+            unchanged = sum(1 for (wk, _), frame in collected.items() if wk == w and frame is None)
+            if saved + unchanged >= 2:
+                mark_week_done('advanced_stats', season, w, fingerprints[w])
+            else:
+                missing.append(w)
+        if missing:
+            logging.warning(f'No fresh advanced stats for weeks {missing}; they are retried on the next run')
+        return _count(f"SELECT COUNT(*) FROM advanced_stats WHERE season = ? AND week IN ({week_marks})",
+                      [season, *target_weeks])
+
+    def spreads():
+        create_spreads.main([])
+        return _count(f"SELECT COUNT(*) FROM spreads WHERE WEEK IN ({week_marks})", _week_keys(target_weeks))
+
+    def features():
+        advanced_features.build_and_store_matchup_features(season, target_weeks, incremental=incremental)
+        return _count(f"SELECT COUNT(*) FROM matchup_features WHERE season = ? AND week IN ({week_marks})",
+                      [season, *target_weeks])
+
+    def make_picks():
+        picks.makePicks(weeks=weeks, incremental=incremental)
+        return _count(f"SELECT COUNT(*) FROM picks WHERE WEEK IN ({week_marks})", _week_keys(target_weeks))
+
+    def backtest_fingerprint():
+        return watermarks.combine(_table_fingerprint('picks'), _table_fingerprint('spreads'), watermarks.value_fingerprint(
+            {'teaser_sizes': Settings.TEASER_SIZES, 'export_combos': Settings.TEASER_EXPORT_COMBOS}))
+
+    def run_backtest():
+        backtest()
+        return _count("SELECT COUNT(*) FROM picks_results")
+
+    return [
+        Stage('pff_grades', pff_grades, optional=True),
+        Stage('store_grades', store_grades, deps=('pff_grades',), fingerprint=grades_csv_fingerprint),
+        Stage('advanced_stats', stats, optional=True),
+        Stage('spreads', spreads),
+        Stage('matchup_features', features, deps=('advanced_stats', 'spreads'), optional=True),
+        Stage('picks', make_picks, deps=('store_grades', 'spreads', 'matchup_features')),
+        Stage('backtest', run_backtest, deps=('picks',), fingerprint=backtest_fingerprint),
+    ]
+
+
+def start(weeks: list[int] | None = None, reset: bool = False, incremental: bool | None = None,
+          resume: bool | None = None):
+    if incremental is None:
+        incremental = Settings.INCREMENTAL_RECOMPUTE
+    if resume is None:
+        resume = Settings.PIPELINE_RESUME
     logging.basicConfig(filename=config.PROJECT_ROOT / 'panda_picks.log', level=logging.DEBUG)
     logging.info('Starting Panda Picks')
-    logging.info('Dropping Tables')
-    db.drop_tables()
-    logging.info('Creating Tables')
+    if reset:
+        logging.info('Dropping Tables')
+        db.drop_tables()
+    logging.info('Migrating schema')
     db.create_tables()
-    time.sleep(0.1)
-    logging.info('Starting PFF Grades')
-    get_pff_grades.getGrades()
-    logging.info('PFF Grades Completed')
-    time.sleep(0.1)
-    logging.info('Storing PFF Grades Data')
-    db.store_grades_data()
-    logging.info('Done Storing PFF Grades')
-    time.sleep(0.1)
-    logging.info('Starting Advanced Stats')
-    current_season = datetime.now().year
-    target_weeks = weeks if weeks else list(range(1,19))
-    for w in target_weeks:
-        try:
-            logging.info(f'Collecting advanced stats for season={current_season} week={w}')
-            get_advanced_stats(season=current_season, week=w)
-            time.sleep(0.1)
-        except Exception as e:
-            logging.exception(f"Advanced stats collection failed for week {w}: {e}")
-    logging.info('Done Advanced Stats')
-    time.sleep(0.1)
-    logging.info('Creating Spread Info')
-    create_spreads.main()
-    logging.info('Spread Info Created')
-    # Build matchup features (Phase 1)
-    try:
-        logging.info('Building matchup features')
-        advanced_features.build_and_store_matchup_features(current_season, target_weeks)
-        logging.info('Matchup features built')
-    except Exception as e:
-        logging.exception(f'Failed building matchup features: {e}')
-    time.sleep(0.1)
-    logging.info('Starting Picks')
-    picks.makePicks(weeks=weeks)
-    logging.info('Done Making Picks')
-    time.sleep(0.1)
-    logging.info('Backtesting')
-    backtest()
-    logging.info('Backtesting completed')
+    current_season = Settings.SEASON
+    stages = build_stages(current_season, weeks, incremental, resume)
+    if resume and not last_run_incomplete(stages):
+        # Only an unfinished run is resumed; after a clean run everything is refetched
+        logging.info('Last pipeline run completed; running every stage')
+        resume = False
+        stages = build_stages(current_season, weeks, incremental, resume)
+    runs = run_pipeline(stages, max_workers=Settings.PIPELINE_WORKERS, resume=resume)
+    logging.info('Pipeline stages:\n' + runs[['Stage', 'Status', 'Wall_Seconds', 'Rows']].to_string(index=False))
+    return runs
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Run Panda Picks pipeline')
     parser.add_argument('--weeks', help='Comma-separated week numbers to process (e.g. 2 or 2,3,4). If omitted, all weeks 1-18.', default=None)
+    parser.add_argument('--reset', action='store_true', help='Drop all tables before running (full rebuild).')
+    parser.add_argument('--full', action='store_true', help='Refetch and recompute everything even if inputs are unchanged (no resume, no incremental).')
     args = parser.parse_args()
     weeks_list = None
     if args.weeks:
@@ -74,4 +161,5 @@ if __name__ == '__main__':
             except ValueError:
                 pass
         weeks_list = parsed or None
-    start(weeks=weeks_list)
+    start(weeks=weeks_list, reset=args.reset, incremental=False if args.full else None,
+          resume=False if args.full else None)
@@ -0,0 +1,201 @@
+"""Dependency-ordered stage runner for the batch pipeline (``panda_picks.main.start``).
+
+Each ``Stage`` names the stages it depends on. A stage starts on the thread pool as soon
+as all of its dependencies have finished, so independent network fetches (PFF grades,
+the sumersports scrape, the spreads ticker) overlap instead of running back to back.
+Every stage outcome (status, wall time, output rows) is written to ``pipeline_runs``.
+
+A failed stage skips everything downstream of it unless it is marked ``optional`` (its
+dependants then run on whatever data is already in the database, as the sequential
+pipeline always did).
+
+Checkpoints: a stage with a ``fingerprint`` callable records a completion marker (its input
+fingerprint, in ``input_watermarks`` under ``pipeline:<stage>``) when it succeeds. With
+``resume=True`` a stage whose current fingerprint matches its marker is not run again
+(status ``cached``), so a rerun after a failure picks up at the failed stage. Callers only
+resume while a required stage of the last recorded run failed or was skipped
+(``last_run_incomplete``); after a clean run every stage runs again so new scores, lines and
+grades are fetched. Fingerprinted network fetches set ``max_age_h`` so their markers expire
+and fresh data is fetched on the next refresh. Stages that loop over weeks keep per-week markers the same way
+(``week_checkpoint`` / ``mark_week_done``), resuming at the first week that did not finish.
+"""
+from __future__ import annotations
+import logging
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+from panda_picks.db import watermarks
+from panda_picks.db.database import get_connection, close_pooled_connections
+
+if TYPE_CHECKING:  # annotations only; pandas is imported where it is used
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RUN_COLUMNS = ['Run_Id', 'Stage', 'Status', 'Started_At', 'Finished_At', 'Wall_Seconds', 'Rows', 'Error']
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[], object]  # an int return value is recorded as the stage's row count
+    deps: Tuple[str, ...] = ()
+    optional: bool = False
+    fingerprint: Optional[Callable[[], Optional[str]]] = None  # None result: always run
+    max_age_h: Optional[float] = None  # completion markers older than this are ignored
+
+
+def checkpoint_consumer(stage_name: str) -> str:
+    return f"pipeline:{stage_name}"
+
+
+def week_checkpoint(stage_name: str, season: int, fingerprints: Dict[int, str],
+                    max_age_h: Optional[float] = None) -> List[int]:
+    """Weeks of ``fingerprints`` without a current completion marker for ``stage_name``."""
+    conn = get_connection()
+    try:
+        return watermarks.stale_weeks(conn, checkpoint_consumer(stage_name), season, fingerprints, max_age_h)
+    finally:
+        conn.close()
+
+
+def mark_week_done(stage_name: str, season: int, week: int, fingerprint: str) -> None:
+    conn = get_connection()
+    try:
+        watermarks.record(conn, checkpoint_consumer(stage_name), season, {week: fingerprint})
+    finally:
+        conn.close()
+
+
+def last_run_incomplete(stages: Sequence[Stage] = ()) -> bool:
+    """True when the most recent run in ``pipeline_runs`` has a failed or skipped stage.
+
+    Outcomes of stages marked ``optional`` in ``stages`` are ignored: a fetch that keeps failing
+    (e.g. expired PFF cookies) must not keep every later run in resume mode.
+    """
+    optional = sorted(s.name for s in stages if s.optional)
+    conn = get_connection()
+    try:
+        row = conn.execute("SELECT Run_Id FROM pipeline_runs ORDER BY Finished_At DESC LIMIT 1").fetchone()
+        if row is None:
+            return False
+        return conn.execute(f"SELECT COUNT(*) FROM pipeline_runs WHERE Run_Id = ? AND Status IN ('failed', 'skipped') "
+                            f"AND Stage NOT IN ({', '.join('?' * len(optional))})",
+                            (row[0], *optional)).fetchone()[0] > 0
+    finally:
+        conn.close()
+
+
+def _check_graph(stages: Sequence[Stage]) -> None:
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {names}")
+    deps = {s.name: set(s.deps) for s in stages}
+    for name, ds in deps.items():
+        unknown = ds - deps.keys()
+        if unknown:
+            raise ValueError(f"Stage {name!r} depends on unknown stage(s) {sorted(unknown)}")
+    done: set = set()
+    while len(done) < len(deps):
+        ready = [n for n, ds in deps.items() if n not in done and ds <= done]
+        if not ready:
+            raise ValueError(f"Dependency cycle among stages {sorted(deps.keys() - done)}")
+        done.update(ready)
+
+
+def _execute(stage: Stage, resume: bool) -> dict:
+    started = datetime.utcnow()
+    t0 = time.perf_counter()
+    status, rows, error = 'ok', None, None
+    logger.info(f"Stage {stage.name} started")
+    conn = get_connection()
+    consumer = checkpoint_consumer(stage.name)
+    try:
+        fp = stage.fingerprint() if stage.fingerprint is not None else None
+        if resume and fp is not None and not watermarks.stale_weeks(conn, consumer, 0, {0: fp}, stage.max_age_h):
+            status = 'cached'
+        else:
+            result = stage.func()
+            if isinstance(result, int) and not isinstance(result, bool):
+                rows = result
+            if fp is not None:
+                watermarks.record(conn, consumer, 0, {0: fp})
+    except Exception as e:
+        status, error = 'failed', f"{type(e).__name__}: {e}"[:500]
+        logger.exception(f"Stage {stage.name} failed: {e}")
+    finally:
+        conn.close()
+        # Worker threads own their pooled connections; release them before the thread is reused
+        close_pooled_connections()
+    wall = time.perf_counter() - t0
+    logger.info(f"Stage {stage.name} {status} in {wall:.2f}s rows={rows}")
+    return {'Stage': stage.name, 'Status': status, 'Started_At': started.isoformat(),
+            'Finished_At': datetime.utcnow().isoformat(), 'Wall_Seconds': wall, 'Rows': rows, 'Error': error}
+
+
+def _skipped(stage: Stage, blocked_by: List[str]) -> dict:
+    now = datetime.utcnow().isoformat()
+    logger.warning(f"Stage {stage.name} skipped (upstream failed: {', '.join(blocked_by)})")
+    return {'Stage': stage.name, 'Status': 'skipped', 'Started_At': now, 'Finished_At': now,
+            'Wall_Seconds': 0.0, 'Rows': None, 'Error': f"upstream failed: {', '.join(blocked_by)}"}
+
+
+def _store(conn, run_id: str, record: dict) -> None:
+    with conn:
+        conn.execute(f"INSERT OR REPLACE INTO pipeline_runs ({', '.join(RUN_COLUMNS)}) VALUES "
+                     f"({', '.join('?' * len(RUN_COLUMNS))})", [run_id] + [record[c] for c in RUN_COLUMNS[1:]])
+
+
+def run_pipeline(stages: Sequence[Stage], max_workers: int = 4, run_id: Optional[str] = None,
+                 resume: bool = True) -> pd.DataFrame:
+    """Run ``stages`` in dependency order, overlapping independent ones.
+
+    ``resume`` skips stages whose completion marker matches their current fingerprint.
+    Returns one row per stage (``RUN_COLUMNS``) in completion order; the same rows are
+    written to ``pipeline_runs`` as each stage finishes.
+    """
+    import pandas as pd
+    _check_graph(stages)
+    run_id = run_id or uuid.uuid4().hex[:12]
+    by_name: Dict[str, Stage] = {s.name: s for s in stages}
+    status: Dict[str, str] = {}
+    records: List[dict] = []
+    conn = get_connection()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as pool:
+            pending = dict(by_name)
+            running = {}
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if not all(d in status for d in stage.deps):
+                        continue
+                    blocked = [d for d in stage.deps if status[d] == 'skipped'
+                               or (status[d] == 'failed' and not by_name[d].optional)]
+                    del pending[name]
+                    if blocked:
+                        record = _skipped(stage, blocked)
+                        status[name] = record['Status']
+                        records.append(record)
+                        _store(conn, run_id, record)
+                    else:
+                        running[pool.submit(_execute, stage, resume)] = name
+                if not running:
+                    continue  # skips above may have unblocked (i.e. skipped) more stages
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    record = fut.result()
+                    status[running.pop(fut)] = record['Status']
+                    records.append(record)
+                    _store(conn, run_id, record)
+    finally:
+        conn.close()
+    df = pd.DataFrame(records, columns=RUN_COLUMNS[1:])
+    df.insert(0, 'Run_Id', run_id)
+    total = sum(r['Wall_Seconds'] for r in records)
+    logger.info(f"Pipeline run {run_id}: {len(records)} stages, {total:.2f}s stage time, "
+                f"{(df['Status'] == 'cached').sum()} cached, {df['Status'].isin(['failed', 'skipped']).sum()} not run")
+    return df
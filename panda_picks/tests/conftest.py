@@ -3,3 +3,5 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+# Unit tests never read or write the shared on-disk HTTP cache unless they opt in
+os.environ.setdefault('PP_HTTP_CACHE_ENABLED', 'false')
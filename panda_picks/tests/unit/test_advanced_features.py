@@ -51,3 +51,50 @@ def test_build_team_and_matchup_features():
     finally:
         conn.close()
 
+
+
+def test_season_builder_momentum_trend_and_imputation():
+    from pathlib import Path
+    from panda_picks import config
+    from panda_picks.db.database import close_pooled_connections
+    from panda_picks.analysis.advanced_features import build_and_store_matchup_features
+    db_path = Path('temp_test_season_features.db').resolve()
+    close_pooled_connections()
+    for suffix in ('', '-wal', '-shm'):
+        Path(str(db_path) + suffix).unlink(missing_ok=True)
+    config.DATABASE_PATH = db_path
+    create_tables()
+    season = 2025
+    off = {'ARI': [10, 12, 17, 11, 20], 'GB': [5, 6, None, 9, 9]}  # GB offense missing in week 3
+    rows = []
+    for team, series in off.items():
+        for week, value in enumerate(series, start=1):
+            if value is not None:
+                rows.append((season, week, 'offense', team, value, 0.0, 'ts'))
+            rows.append((season, week, 'defense', team, 8.0 + week, 0.0, 'ts'))
+    conn = get_connection()
+    try:
+        with conn:
+            conn.executemany("INSERT INTO advanced_stats (season, week, type, TEAM, composite_score, z_score, last_updated) "
+                             "VALUES (?,?,?,?,?,?,?)", rows)
+            conn.executemany("INSERT INTO spreads (WEEK, Home_Team, Away_Team) VALUES (?,?,?)",
+                             [(f'WEEK{w}', 'ARI', 'GB') for w in range(1, 6)])
+        frames = build_and_store_matchup_features(season, [3, 5, 9])
+        assert [len(f) for f in frames] == [1, 1, 0]
+        wk3, wk5 = frames[0].iloc[0], frames[1].iloc[0]
+        # Week 5 history (abbreviated TEAM codes are normalized like spreads): ARI offense weeks 2-4
+        assert abs(wk5.momentum_home_off - (12 + 17 + 11) / 3) < 1e-9
+        assert abs(wk5.trend_home_off - (-0.5)) < 1e-9
+        # GB offense has no week 3 row -> last 3 prior rows are weeks 1, 2, 4
+        assert abs(wk5.momentum_away_off - (5 + 6 + 9) / 3) < 1e-9
+        assert abs(wk5.trend_home_def - 1.0) < 1e-9
+        # Week 3: GB offense imputed with the week's league offense mean (ARI only), diff left unimputed
+        assert wk3.impute_flag == 1 and wk5.impute_flag == 0
+        assert wk3.away_off_comp == 17 and wk3.off_comp_diff != wk3.off_comp_diff
+        stored = conn.execute("SELECT week, impute_flag FROM matchup_features ORDER BY week").fetchall()
+        assert stored == [(3, 1), (5, 0)]
+    finally:
+        conn.close()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(db_path) + suffix).unlink(missing_ok=True)
@@ -0,0 +1,105 @@
+import sqlite3
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from panda_picks import config
+from panda_picks.data.advanced_stats import composite_scores, load_metrics, recompute_composites, write_advanced_stats
+from panda_picks.db import migrations
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
+
+BASE = ['season', 'week', 'type', 'TEAM', 'composite_score', 'z_score', 'last_updated']
+
+
+def _season_frame(weeks=range(1, 19), teams=('ARZ', 'ATL', 'BLT')):
+    rows = []
+    for w in weeks:
+        for kind in ('offense', 'defense'):
+            for i, t in enumerate(teams):
+                rows.append({'epa_per_play': 0.1 * i + w / 100, 'Success %': np.nan if i == 0 else 40.0 + i + w,
+                             'Rank Note': f'r{i}', 'TEAM': t, 'season': 2025, 'week': w, 'type': kind,
+                             'composite_score': float(i), 'z_score': np.float64(i - 1), 'last_updated': '2025-10-01'})
+    return pd.DataFrame(rows)
+
+
+class TestAdvancedStatsStore(unittest.TestCase):
+    def setUp(self):
+        self.db_path = Path('temp_test_advanced_stats_store.db').resolve()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        config.DATABASE_PATH = self.db_path
+
+    def tearDown(self):
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+
+    def test_full_season_is_one_transaction_into_narrow_tables(self):
+        create_tables()
+        conn = get_connection()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        df = _season_frame()
+        self.assertEqual(write_advanced_stats(conn, df), len(df))
+        conn.set_trace_callback(None)
+        self.assertEqual(sum(s.upper() == 'COMMIT' for s in statements), 1)
+        self.assertFalse([s for s in statements if s.startswith(('ALTER', 'PRAGMA'))])
+        self.assertEqual([r[1] for r in conn.execute("PRAGMA table_info(advanced_stats)")], BASE)
+        self.assertEqual(sorted(n for n, in conn.execute("SELECT name FROM stat_metrics")), ['Success %', 'epa_per_play'])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM advanced_stats_raw").fetchone()[0], len(df) * 2 - 36)  # NaN not stored
+        # A rewrite replaces each row's metric set
+        write_advanced_stats(conn, _season_frame(weeks=[1]).drop(columns='Success %'))
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM advanced_stats_raw WHERE week = 1").fetchone()[0], 6)
+
+    def test_pivot_reads_only_requested_metrics(self):
+        create_tables()
+        conn = get_connection()
+        write_advanced_stats(conn, _season_frame(weeks=[1, 2, 3]))
+        wide = load_metrics(conn, 2025, weeks=[2, 3], kinds=['offense'], metrics=['Success %', 'missing'])
+        self.assertEqual(list(wide.columns), ['season', 'week', 'type', 'TEAM', 'Success %', 'missing'])
+        self.assertEqual(sorted(set(wide['TEAM'])), ['ATL', 'BLT'])  # ARZ has none of the requested metrics
+        self.assertEqual(len(wide), 4)
+        row = wide[(wide['week'] == 3) & (wide['TEAM'] == 'BLT')].iloc[0]
+        self.assertEqual(row['Success %'], 45.0)
+        self.assertTrue(np.isnan(wide['missing']).all())
+        week1 = load_metrics(conn, 2025, weeks=[1], kinds=['defense']).set_index('TEAM')
+        self.assertEqual(list(week1.columns[3:]), ['Success %', 'epa_per_play'])
+        self.assertTrue(np.isnan(week1.loc['ARZ', 'Success %']))
+        self.assertEqual(len(load_metrics(conn, 2024)), 0)
+
+    def test_recompute_composites_from_stored_metrics(self):
+        create_tables()
+        conn = get_connection()
+        frames = _season_frame(weeks=[1, 2])
+        write_advanced_stats(conn, frames)
+        self.assertEqual(recompute_composites(conn, 2025, weeks=[2]), 6)
+        expected = composite_scores(frames[(frames['week'] == 2) & (frames['type'] == 'defense')].drop(
+            columns=['composite_score', 'z_score']), 'defense').set_index('TEAM')['composite_score']
+        stored = dict(conn.execute("SELECT TEAM, composite_score FROM advanced_stats WHERE week = 2 AND type = 'defense'"))
+        for team, value in expected.items():
+            self.assertAlmostEqual(stored[team], value)
+        self.assertEqual(conn.execute("SELECT composite_score FROM advanced_stats WHERE week = 1 AND TEAM = 'BLT' "
+                                      "AND type = 'offense'").fetchone()[0], 2.0)  # other weeks untouched
+
+    def test_migration_moves_legacy_wide_columns(self):
+        conn = sqlite3.connect(self.db_path)
+        migrations.migrate(conn, target=7)
+        conn.execute('ALTER TABLE advanced_stats ADD COLUMN "Success" REAL')
+        conn.execute('ALTER TABLE advanced_stats ADD COLUMN "Rank_Note" TEXT')
+        conn.execute("INSERT INTO advanced_stats (season, week, type, TEAM, composite_score, Success, Rank_Note) "
+                     "VALUES (2025, 1, 'offense', 'ARZ', 1.5, 44.0, 'r1')")
+        conn.commit()
+        migrations.migrate(conn)
+        self.assertEqual([r[1] for r in conn.execute("PRAGMA table_info(advanced_stats)")], BASE)
+        self.assertEqual(conn.execute("SELECT composite_score FROM advanced_stats").fetchone()[0], 1.5)
+        wide = load_metrics(conn, 2025)
+        self.assertEqual(list(wide.columns[4:]), ['Success %'])  # header recovered; text column dropped
+        self.assertEqual(wide['Success %'].tolist(), [44.0])
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
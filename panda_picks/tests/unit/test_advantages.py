@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from panda_picks.analysis.utils.advantages import (
+    ADVANTAGE_SPEC, MISMATCH_SPEC, compute_advantages, compute_mismatches, row_functions
+)
+
+
+def _frame():
+    rng = np.random.default_rng(11)
+    metrics = ['OVR','OFF','DEF','PASS','PBLK','RECV','RUN','RBLK','PRSH','COV','RDEF','TACK']
+    data = {'Home_Team': ['A', 'B', 'C', 'D'], 'Away_Team': ['E', 'F', 'G', 'H']}
+    for m in metrics:
+        data[m] = rng.uniform(50, 90, 4)
+        data[f'OPP_{m}'] = rng.uniform(50, 90, 4)
+    df = pd.DataFrame(data)
+    df.loc[2, 'OPP_DEF'] = np.nan
+    return df
+
+
+class TestAdvantageSpec(unittest.TestCase):
+    def test_matches_row_wise_lambdas(self):
+        legacy = _frame()
+        for name, func in row_functions(ADVANTAGE_SPEC):
+            legacy[name] = legacy.apply(func, axis=1)
+        vec = compute_advantages(_frame())
+        cols = [name for name, _, _ in ADVANTAGE_SPEC]
+        pd.testing.assert_frame_equal(legacy[cols], vec[cols], check_exact=True)
+        self.assertTrue(np.isnan(vec.loc[2, 'Offense_Adv']))
+
+    def test_missing_input_column_yields_nan(self):
+        df = _frame().drop(columns=['TACK'])
+        out = compute_advantages(df)
+        self.assertTrue(out['Tackling_Adv'].isna().all())
+        self.assertTrue(out['Overall_Adv'].notna().all())
+
+    def test_overwrite_false_keeps_existing(self):
+        df = _frame()
+        df['Overall_Adv'] = 99.0
+        out = compute_advantages(df, overwrite=False)
+        self.assertTrue((out['Overall_Adv'] == 99.0).all())
+
+    def test_mismatches(self):
+        df = compute_mismatches(compute_advantages(_frame()))
+        for name, left, right in MISMATCH_SPEC:
+            np.testing.assert_allclose(df[name], df[left] - df[right])
+
+
+if __name__ == '__main__':
+    unittest.main()
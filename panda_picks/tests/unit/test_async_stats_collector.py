@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from panda_picks import config
+from panda_picks.data import advanced_stats
+from panda_picks.data.advanced_stats import AsyncStatsCollector
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
+
+TEAMS = ['Arizona Cardinals', 'Atlanta Falcons', 'Baltimore Ravens', 'Buffalo Bills']
+
+
+def _page(seed):
+    rows = ''.join(f"<tr><td>{i + 1}. {t}</td><td>{0.1 * i + seed:.2f}</td><td>{0.2 * i:.2f}</td>"
+                   f"<td>{40 + i}%</td></tr>" for i, t in enumerate(TEAMS))
+    return f"<html><table><tr><th>Team</th><th>EPA/Play</th><th>EPA/Pass</th><th>Success %</th></tr>{rows}</table></html>"
+
+
+class _FakeSession:
+    def __init__(self, delay=0.0, fail_first=()):
+        self.delay = delay
+        self.calls = []
+        self.fail_first = set(fail_first)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None, headers=None):
+        with self._lock:
+            self.calls.append((url, time.perf_counter()))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+            if url in self.fail_first:
+                self.fail_first.discard(url)
+                raise ConnectionError('reset by peer')
+        return mock.Mock(text=_page(len(url) % 3), raise_for_status=lambda: None)
+
+    def close(self):
+        pass
+
+
+class TestAsyncStatsCollector(unittest.TestCase):
+    def setUp(self):
+        self.db_path = Path('temp_test_async_stats.db').resolve()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        config.DATABASE_PATH = self.db_path
+        create_tables()
+
+    def tearDown(self):
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+
+    def _collector(self, session, weeks, **kwargs):
+        c = AsyncStatsCollector(2025, weeks, min_interval_s=kwargs.pop('min_interval_s', 0.0), **kwargs)
+        c.session = session
+        return c
+
+    def test_shared_pages_fetched_once_and_written_in_one_batch(self):
+        session = _FakeSession()
+        c = self._collector(session, [1, 2, 3])
+        with mock.patch.object(AsyncStatsCollector, 'save_composite_scores',
+                               wraps=c.save_composite_scores) as save:
+            frames = c.run()
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(sorted(frames), [(w, k) for w in (1, 2, 3) for k in ('defense', 'offense')])
+        self.assertEqual(sorted(u for u, _ in session.calls), sorted(advanced_stats.SCRAPE_URLS.values()))
+        conn = get_connection()
+        rows = conn.execute("SELECT week, type, COUNT(*) FROM advanced_stats GROUP BY week, type").fetchall()
+        self.assertEqual(sorted(rows), [(w, k, len(TEAMS)) for w in (1, 2, 3) for k in ('defense', 'offense')])
+        self.assertEqual(conn.execute("SELECT COUNT(DISTINCT TEAM) FROM advanced_stats").fetchone()[0], len(TEAMS))
+
+    def test_unchanged_pages_are_not_parsed_or_rewritten(self):
+        self._collector(_FakeSession(), [1, 2]).run()
+        c = self._collector(_FakeSession(), [1, 2])
+        with mock.patch.object(advanced_stats, 'parse_stats_table') as parse, \
+                mock.patch.object(AsyncStatsCollector, 'save_composite_scores') as save:
+            frames = c.run()
+        self.assertEqual(frames, {(w, k): None for w in (1, 2) for k in ('offense', 'defense')})
+        parse.assert_not_called()
+        save.assert_not_called()
+        frames = self._collector(_FakeSession(), [1, 2, 3]).run()  # a new week still needs the page
+        self.assertEqual([key for key, f in frames.items() if f is not None], [(3, 'offense'), (3, 'defense')])
+
+    def test_bounded_concurrency_and_per_host_spacing(self):
+        def per_week_url(kind, season, week):
+            return f"https://{kind}.example/stats?week={week}"
+
+        session = _FakeSession(delay=0.03, fail_first={'https://offense.example/stats?week=2'})
+        c = self._collector(session, [1, 2, 3, 4], max_concurrency=2, min_interval_s=0.04)
+        with mock.patch.object(advanced_stats, 'scrape_url', per_week_url):
+            frames = asyncio.run(c.collect())
+        self.assertEqual(len(frames), 8)  # the failed page was retried
+        self.assertLessEqual(session.max_in_flight, 2)
+        self.assertEqual(len(session.calls), 9)
+        for host in ('offense', 'defense'):
+            starts = sorted(t for u, t in session.calls if f'//{host}.' in u)
+            gaps = [b - a for a, b in zip(starts, starts[1:])]
+            self.assertGreaterEqual(min(gaps), 0.04 * 0.5 - 0.005)
+        first = {u.split('/')[2]: t for u, t in reversed(session.calls)}
+        self.assertLess(abs(first['offense.example'] - first['defense.example']), 0.03)  # hosts overlap
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+
+from panda_picks import config
+
+from panda_picks.analysis.backtest import (
+    PROB_BINS, TEASER_BET, TEASER_ODDS, TEASER_SIZES, _bin_labels, _bin_prob, _moneyline_implied_prob,
+    _moneyline_implied_prob_array, _score_teasers, _spread_implied_home_win_prob,
+    _spread_implied_home_win_prob_array, backtest, calculate_winnings,
+)
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
+
+
+class TestBacktestColumnHelpers(unittest.TestCase):
+    def test_array_helpers_match_scalar_versions(self):
+        odds = [-250, -110, 100, 135, None]
+        expected = [_moneyline_implied_prob(o) for o in odds]
+        np.testing.assert_array_equal(_moneyline_implied_prob_array(odds), np.array(expected, dtype=float))
+        lines = [-7.5, -3.0, 0.0, 2.5, 10.0]
+        np.testing.assert_allclose(_spread_implied_home_win_prob_array(lines),
+                                   [_spread_implied_home_win_prob(x) for x in lines])
+
+    def test_bin_labels_match_bin_prob(self):
+        probs = [0.0, 0.05, 0.1, 0.55, 0.999, 1.0, 1.2]
+        self.assertEqual(list(_bin_labels(probs)), [_bin_prob(p, PROB_BINS) for p in probs])
+        self.assertEqual(_bin_labels([np.nan])[0], 'nan')
+
+
+class TestScoreTeasers(unittest.TestCase):
+    def test_matches_combination_loop(self):
+        teams = np.array(['A', 'B', 'C', 'D', 'E'], dtype=object)
+        won = np.array([True, True, False, True, True])
+        out = _score_teasers(teams, won)
+        expected = []
+        for legs in TEASER_SIZES:
+            odds = TEASER_ODDS[legs]
+            for combo in combinations(range(len(teams)), legs):
+                pays = all(won[i] for i in combo)
+                expected.append((str(tuple(teams[i] for i in combo)),
+                                 calculate_winnings(TEASER_BET, odds) if pays else 0.0, f'{legs}-Team'))
+        self.assertEqual(list(out.itertuples(index=False, name=None)), expected)
+
+    def test_too_few_legs(self):
+        out = _score_teasers(np.array(['A'], dtype=object), np.array([True]))
+        self.assertTrue(out.empty)
+        self.assertEqual(list(out.columns), ['Combo', 'Winnings', 'Type'])
+
+
+class TestBacktestReplacesWeeks(unittest.TestCase):
+    def setUp(self):
+        self.db_path = Path('temp_test_backtest_weeks.db').resolve()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        config.DATABASE_PATH = self.db_path
+        create_tables()
+
+    def tearDown(self):
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+
+    def test_weeks_without_picks_lose_stale_results(self):
+        conn = get_connection()
+        with conn:
+            conn.execute("INSERT INTO picks_results (WEEK, Home_Team, Away_Team, Game_Pick) VALUES ('WEEK2', 'AAA', 'BBB', 'AAA')")
+            conn.execute("INSERT INTO teaser_results (WEEK, Combo, Winnings, Type) VALUES ('WEEK2', 'x', 10.0, '2-Team')")
+        backtest(export_combos=False)
+        conn = get_connection()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM picks_results").fetchone()[0], 0)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM teaser_results").fetchone()[0], 0)
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,7 @@ import os
 
 from panda_picks import config
 from panda_picks.config.settings import Settings
-from panda_picks.db.database import create_tables, get_connection
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
 from panda_picks.analysis.bayesian_grades import recompute_blended_grades
 
 
@@ -105,3 +105,85 @@ def test_bayesian_blend_after_ramp_week():
         Settings.USE_BAYES_GRADES = original_flag
         Settings.BAYES_K_VALUES = original_k
 
+
+
+def _reference_cell(prior_val, cur_val, n, m, week):
+    """Scalar blend rule per team/metric, as the vectorized path must reproduce it."""
+    n_eff = 0 if pd.isna(cur_val) else n
+    effective_k = float(Settings.BAYES_K_VALUES.get(m, 5.0)) * max(1e-6, Settings.BAYES_K_SCALE)
+    w = n_eff / (n_eff + effective_k) * max(0.0, Settings.BAYES_CURRENT_WEIGHT_MULTIPLIER)
+    if week <= Settings.BAYES_MAX_RAMP_WEEK:
+        w = min(w, Settings.BAYES_CAP_WEIGHT_EARLY * week / Settings.BAYES_MAX_RAMP_WEEK)
+    elif n_eff > 0 and w < Settings.BAYES_MIN_CURRENT_WEIGHT:
+        w = Settings.BAYES_MIN_CURRENT_WEIGHT
+    w = min(max(w, 0.0), 1.0)
+    if pd.isna(prior_val):
+        return w, cur_val
+    if pd.isna(cur_val) or w == 0:
+        return w, prior_val
+    return w, w * cur_val + (1 - w) * prior_val
+
+
+def test_vectorized_blend_matches_scalar_rule_and_sweeps():
+    import numpy as np
+    from panda_picks.analysis.bayesian_grades import METRICS, blend_k_scales
+    original_flag = Settings.USE_BAYES_GRADES
+    original_k = Settings.BAYES_K_VALUES.copy()
+    original_scale = Settings.BAYES_K_SCALE
+    original_ramp = Settings.BAYES_MAX_RAMP_WEEK
+    original_cap = Settings.BAYES_CAP_WEIGHT_EARLY
+    db_names = ('temp_test_bayes_vector_early.db', 'temp_test_bayes_vector_late.db')
+    try:
+        Settings.USE_BAYES_GRADES = True
+        Settings.BAYES_MAX_RAMP_WEEK = 5
+        Settings.BAYES_CAP_WEIGHT_EARLY = 0.75
+        Settings.BAYES_K_SCALE = 1.0
+        rng = np.random.default_rng(3)
+        teams = [f'T{i:02d}' for i in range(32)]
+        prior = pd.DataFrame(rng.uniform(40, 95, (32, len(METRICS))), columns=METRICS)
+        prior.insert(0, 'TEAM', teams)
+        current = prior.sample(frac=0.8, random_state=1).copy()
+        current[METRICS] = rng.uniform(40, 95, (len(current), len(METRICS)))
+        current = current.mask(rng.random(current.shape) < 0.1).assign(TEAM=current['TEAM'])
+        prior.loc[0, 'OVR'] = np.nan
+        for weeks, name in zip((3, 8), db_names):
+            _init_temp_db(name)
+            with get_connection() as conn:
+                prior.to_sql('grades_prior', conn, if_exists='replace', index=False)
+                current.to_sql('grades', conn, if_exists='replace', index=False)
+                games = [{'WEEK': f'WEEK{w}', 'Home_Team': teams[(w + j) % 32], 'Away_Team': teams[(w + j + 7) % 32],
+                          'Home_Score': 20, 'Away_Score': 17} for w in range(1, weeks + 1) for j in range(0, 32, 3)]
+                pd.DataFrame(games).to_sql('spreads', conn, if_exists='append', index=False)
+                played = pd.concat([pd.DataFrame(games)['Home_Team'], pd.DataFrame(games)['Away_Team']]).value_counts()
+                recompute_blended_grades(conn)
+                long_df = pd.read_sql_query("SELECT * FROM blended_grades", conn)
+                wide = pd.read_sql_query("SELECT * FROM blended_grades_wide", conn).set_index('Home_Team')
+                assert len(long_df) == 32 * len(METRICS)
+                cur_by_team = current.set_index('TEAM')
+                for r in long_df.itertuples():
+                    cur_val = cur_by_team[r.Metric].get(r.Home_Team, np.nan)
+                    prior_val = prior.set_index('TEAM').at[r.Home_Team, r.Metric]
+                    w, post = _reference_cell(prior_val, cur_val, int(played.get(r.Home_Team, 0)), r.Metric, weeks)
+                    assert math.isclose(r.Weight_Current, w, rel_tol=1e-12)
+                    assert (pd.isna(post) and pd.isna(r.Blended)) or math.isclose(r.Blended, post, rel_tol=1e-12)
+                    assert (pd.isna(post) and pd.isna(wide.at[r.Home_Team, r.Metric])) or \
+                        math.isclose(wide.at[r.Home_Team, r.Metric], post, rel_tol=1e-12)
+                # Sweep: each scale equals a full recompute at that BAYES_K_SCALE
+                sweep = blend_k_scales(conn, [0.5, 2.0])
+                assert sorted(sweep['K_Scale'].unique()) == [0.5, 2.0]
+                Settings.BAYES_K_SCALE = 2.0
+                recompute_blended_grades(conn)
+                expected = pd.read_sql_query("SELECT * FROM blended_grades_wide", conn)
+                got = sweep[sweep['K_Scale'] == 2.0].drop(columns='K_Scale').reset_index(drop=True)
+                pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+                Settings.BAYES_K_SCALE = 1.0
+    finally:
+        Settings.USE_BAYES_GRADES = original_flag
+        Settings.BAYES_K_VALUES = original_k
+        Settings.BAYES_K_SCALE = original_scale
+        Settings.BAYES_MAX_RAMP_WEEK = original_ramp
+        Settings.BAYES_CAP_WEIGHT_EARLY = original_cap
+        close_pooled_connections()
+        for name in db_names:
+            for suffix in ('', '-wal', '-shm'):
+                Path(name + suffix).resolve().unlink(missing_ok=True)
@@ -1,10 +1,9 @@
 import unittest
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
 
 from panda_picks import config
-from panda_picks.db.database import create_tables, get_connection
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
 from panda_picks.analysis.advanced_features import build_matchup_features
 from panda_picks.analysis.services.pick_service import PickService
 from panda_picks.analysis.utils.probability import calculate_win_probability
@@ -22,7 +21,7 @@ class TestBlendedAdvInPicks(unittest.TestCase):
                 pass
         config.DATABASE_PATH = self.db_path
         create_tables()
-        self.season = datetime.now().year
+        self.season = Settings.SEASON
         self.week = 1
         # Seed grades (strong home vs weaker away for 2 games)
         teams = []
@@ -80,11 +79,9 @@ class TestBlendedAdvInPicks(unittest.TestCase):
             _ = build_matchup_features(conn, self.season, self.week)
 
     def tearDown(self):
-        try:
-            if self.db_path.exists():
-                self.db_path.unlink()
-        except Exception:
-            pass
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
 
     def test_generated_picks_include_blended_columns(self):
         service = PickService()
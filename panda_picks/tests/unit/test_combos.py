@@ -0,0 +1,81 @@
+import math
+import types
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from panda_picks.analysis.utils.combos import (
+    bet_combination_table, generate_bet_combinations, iter_bet_combinations, leg_table, top_bet_combinations
+)
+
+
+def _picks(n=6):
+    rows = []
+    for i in range(n):
+        prob = 0.5 + 0.04 * i
+        rows.append({'Home_Team': f'H{i}', 'Away_Team': f'A{i}', 'Game_Pick': f'H{i}',
+                     'Home_Odds_Close': -110 - 10 * i, 'Away_Odds_Close': 100,
+                     'Pick_Prob': prob if i != 0 else math.nan,
+                     'Home_Line_Close': -1.5 - i, 'Away_Line_Close': 1.5 + i})
+    return pd.DataFrame(rows)
+
+
+class TestParlayCombos(unittest.TestCase):
+    def test_iterator_is_lazy_and_matches_list(self):
+        it = iter_bet_combinations(_picks(), 2, 8)
+        self.assertIsInstance(it, types.GeneratorType)
+        first = next(it)
+        self.assertEqual(first['Teams'], 'H0 / H1')
+        self.assertEqual(first['Leg_Lines'][0]['Teaser_Line_Display'], '+4.5')
+        self.assertEqual(len(generate_bet_combinations(_picks(), 2, 8)), 2 ** 6 - 1 - 6)
+
+    def test_sizes_filter(self):
+        sizes = {c['Size'] for c in iter_bet_combinations(_picks(), 2, 8, sizes=[3, 5])}
+        self.assertEqual(sizes, {3, 5})
+
+    def test_top_k_matches_full_sort(self):
+        full = generate_bet_combinations(_picks(), 2, 4)
+        for by in ('Combined_Prob', 'Parlay_Edge'):
+            top = top_bet_combinations(_picks(), 5, by=by, max_size=4)
+            ranked = sorted((c for c in full if not math.isnan(c[by])), key=lambda c: c[by], reverse=True)[:5]
+            self.assertEqual([c['Teams'] for c in top], [c['Teams'] for c in ranked])
+
+    def test_nan_keys_rank_last(self):
+        top = top_bet_combinations(_picks(3), 3, by='Combined_Prob', max_size=2)
+        self.assertEqual(top[0]['Teams'], 'H1 / H2')
+        self.assertTrue(all(math.isnan(c['Combined_Prob']) for c in top[1:]))
+
+    def test_unknown_rank_key(self):
+        with self.assertRaises(ValueError):
+            top_bet_combinations(_picks(), 3, by='Size')
+
+
+class TestBatchCombos(unittest.TestCase):
+    def test_table_matches_per_combo_records(self):
+        picks = _picks(7)
+        ref = pd.DataFrame(list(iter_bet_combinations(picks, 2, 8)))
+        tab = bet_combination_table(picks, 2, 8)
+        self.assertEqual(list(tab['Teams']), list(ref['Teams']))
+        for col in ('Combined_Prob', 'Book_Dec_Odds', 'Book_American_Odds', 'Fair_Dec_Odds',
+                    'Fair_American_Odds', 'Parlay_Edge', 'Est_Payout_100'):
+            np.testing.assert_allclose(tab[col].to_numpy(float), ref[col].to_numpy(float),
+                                       rtol=1e-10, atol=1e-12, equal_nan=True, err_msg=col)
+
+    def test_mask_maps_to_leg_table(self):
+        picks = _picks(5)
+        tab = bet_combination_table(picks, 3, 3, with_teams=False)
+        legs = leg_table(picks)
+        self.assertNotIn('Teams', tab.columns)
+        first = tab.iloc[0]
+        teams = [legs['Team'][i] for i in range(len(legs)) if int(first['Mask']) >> i & 1]
+        self.assertEqual(teams, ['H0', 'H1', 'H2'])
+        self.assertEqual(len(tab), 10)
+
+    def test_empty_and_filtered(self):
+        self.assertTrue(bet_combination_table(pd.DataFrame()).empty)
+        self.assertEqual(set(bet_combination_table(_picks(), sizes=[4])['Size']), {4})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+import unittest
+from pathlib import Path
+
+from panda_picks import config
+from panda_picks.db.database import get_connection, close_pooled_connections
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.db_path = Path('temp_test_connection_pool.db').resolve()
+        close_pooled_connections()
+        if self.db_path.exists():
+            self.db_path.unlink()
+        config.DATABASE_PATH = self.db_path
+        conn = get_connection()
+        conn.execute("CREATE TABLE t (a INTEGER)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            p = Path(str(self.db_path) + suffix)
+            if p.exists():
+                p.unlink()
+
+    def test_same_thread_reuses_connection_with_pragmas(self):
+        a = get_connection(); a.close()
+        b = get_connection(); b.close()
+        self.assertIs(a, b)
+        self.assertIsInstance(a, sqlite3.Connection)
+        self.assertEqual(a.execute("PRAGMA journal_mode").fetchone()[0].lower(), 'wal')
+
+    def test_other_thread_gets_own_connection(self):
+        main = get_connection(); main.close()
+        seen = []
+        t = threading.Thread(target=lambda: seen.append(get_connection()))
+        t.start(); t.join()
+        self.assertIsNot(seen[0], main)
+
+    def test_close_rolls_back_uncommitted_only_for_outermost_holder(self):
+        outer = get_connection()
+        outer.execute("INSERT INTO t VALUES (1)")
+        inner = get_connection()
+        inner.close()  # nested helper closing must not discard outer's work
+        self.assertTrue(outer.in_transaction)
+        outer.close()
+        conn = get_connection()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+        conn.close()
+
+    def test_with_block_releases_its_checkout(self):
+        with get_connection() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            with get_connection() as nested:
+                nested.execute("SELECT 1")
+            self.assertEqual(conn._checkouts, 1)
+        self.assertEqual(conn._checkouts, 0)
+        # Later uncommitted work is discarded by the outermost close, freeing the write lock
+        conn = get_connection()
+        conn.execute("INSERT INTO t VALUES (2)")
+        conn.close()
+        self.assertFalse(conn.in_transaction)
+        errors = []
+
+        def write():
+            try:
+                with get_connection() as other:
+                    other.execute("INSERT INTO t VALUES (3)")
+            except sqlite3.Error as e:
+                errors.append(e)
+            finally:
+                close_pooled_connections()
+        t = threading.Thread(target=write)
+        t.start(); t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(r[0] for r in conn.execute("SELECT a FROM t")), [1, 3])
+        # A transaction block on an already-held connection leaves the checkout alone
+        held = get_connection()
+        held.execute("SELECT 1")
+        with held:
+            held.execute("INSERT INTO t VALUES (4)")
+        self.assertEqual(held._checkouts, 1)
+        held.close()
+
+    def test_helper_with_then_close_keeps_outer_pending_write(self):
+        def helper_write():
+            h = get_connection()
+            with h:
+                h.execute("INSERT INTO t VALUES (1)")
+            h.close()  # the with-block already released this checkout
+
+        def helper_read():
+            h = get_connection()
+            h.execute("SELECT COUNT(*) FROM t").fetchone()
+            h.close()
+        outer = get_connection()
+        helper_write()
+        self.assertEqual(outer._checkouts, 1)
+        outer.execute("INSERT INTO t VALUES (2)")
+        helper_read()
+        self.assertTrue(outer.in_transaction)
+        outer.commit()
+        outer.close()
+        self.assertEqual(outer._checkouts, 0)
+        self.assertEqual(sorted(r[0] for r in outer.execute("SELECT a FROM t")), [1, 2])
+
+    def test_read_only_connection_rejects_writes(self):
+        ro = get_connection(read_only=True)
+        self.assertEqual(ro.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+        with self.assertRaises(sqlite3.DatabaseError):
+            ro.execute("INSERT INTO t VALUES (1)")
+        ro.close()
+
+    def test_replaced_database_file_gets_fresh_connection(self):
+        a = get_connection(); a.close()
+        self.db_path.unlink()
+        b = get_connection()
+        self.assertIsNot(a, b)
+        self.assertEqual(b.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0], 0)
+        b.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
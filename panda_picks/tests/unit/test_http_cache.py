@@ -0,0 +1,152 @@
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from panda_picks import config
+from panda_picks.analysis import spreads
+from panda_picks.data import http_cache
+from panda_picks.data.http_cache import HttpCache
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
+
+
+def _ticker(home_score=None, status=None):
+    game = {'home_franchise': {'abbreviation': 'PHI'}, 'away_franchise': {'abbreviation': 'DAL'},
+            'home_score': home_score, 'away_score': 20 if home_score is not None else None,
+            'point_spread': -7.5, 'home_team_money_line': -300, 'away_team_money_line': 250}
+    if status is not None:
+        game['status'] = status
+    return json.dumps({'weeks': [{'games': [game]}]}).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.hits.append((self.path, dict(self.headers)))
+        if self.path.startswith('/error'):
+            self.send_response(500)
+            self.end_headers()
+            return
+        body, version = server.pages[self.path.split('?')[0]]
+        etag = f'"v{version}"'
+        modified = f'Mon, 0{version} Sep 2025 00:00:00 GMT'
+        if self.headers.get('If-None-Match') == etag or self.headers.get('If-Modified-Since') == modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if self.path.startswith('/lm'):
+            self.send_header('Last-Modified', modified)
+        else:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _LocalServerCase(unittest.TestCase):
+    """Stand-in HTTP server serving ETag / Last-Modified pages and answering 304s."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.hits = []
+        self.server.pages = {'/etag': (b'{"a": 1}', 1), '/lm': (b'{"b": 1}', 1), '/ticker': (_ticker(), 1)}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HttpCache(Path(self.tmp.name), ttls={'fresh': 3600, 'stale': 0})
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+
+class TestHttpCache(_LocalServerCase):
+    def test_ttl_then_etag_revalidation(self):
+        first = self.cache.fetch(self.base + '/etag', 'fresh')
+        self.assertEqual((first.status_code, first.from_cache, first.json()), (200, False, {'a': 1}))
+        hit = self.cache.fetch(self.base + '/etag', 'fresh')
+        self.assertTrue(hit.from_cache)
+        self.assertEqual(len(self.server.hits), 1)  # served from disk within the TTL
+        again = self.cache.fetch(self.base + '/etag', 'stale')
+        self.assertTrue(again.revalidated)
+        self.assertEqual(self.server.hits[-1][1].get('If-None-Match'), '"v1"')
+        self.assertEqual((again.content, again.content_hash), (first.content, first.content_hash))
+        self.server.pages['/etag'] = (b'{"a": 2}', 2)
+        changed = self.cache.fetch(self.base + '/etag', 'stale')
+        self.assertFalse(changed.from_cache)
+        self.assertNotEqual(changed.content_hash, first.content_hash)
+
+    def test_last_modified_revalidation(self):
+        self.cache.fetch(self.base + '/lm', 'stale')
+        second = self.cache.fetch(self.base + '/lm', 'stale')
+        self.assertTrue(second.revalidated)
+        self.assertEqual(self.server.hits[-1][1].get('If-Modified-Since'), 'Mon, 01 Sep 2025 00:00:00 GMT')
+        self.assertEqual(second.json(), {'b': 1})
+
+    def test_final_entries_never_revalidate(self):
+        self.assertFalse(spreads._week_is_final(_ticker(home_score=0)))  # scores alone may be pre-game/live
+        self.assertFalse(spreads._week_is_final(_ticker(home_score=14, status='In Progress')))
+        self.server.pages['/ticker'] = (_ticker(home_score=27, status='Final'), 1)
+        self.cache.fetch(self.base + '/ticker', 'stale', is_final=spreads._week_is_final)
+        self.assertTrue(self.cache.fetch(self.base + '/ticker', 'stale').from_cache)
+        self.assertEqual(len(self.server.hits), 1)
+
+    def test_errors_are_not_cached(self):
+        resp = self.cache.fetch(self.base + '/error', 'fresh')
+        self.assertEqual(resp.status_code, 500)
+        with self.assertRaises(requests.HTTPError):
+            resp.raise_for_status()
+        self.cache.fetch(self.base + '/error', 'fresh')
+        self.assertEqual(len(self.server.hits), 2)
+
+
+class TestUnchangedPayloadShortCircuit(_LocalServerCase):
+    def setUp(self):
+        super().setUp()
+        self.db_path = Path('temp_test_http_cache.db').resolve()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        config.DATABASE_PATH = self.db_path
+        create_tables()
+        self.cache.ttls['pff_ticker'] = 0  # revalidate on every run
+
+    def tearDown(self):
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        super().tearDown()
+
+    def _run_spreads(self):
+        with mock.patch.object(spreads, '_week_url', lambda week: f'{self.base}/ticker?week={week}'), \
+                mock.patch.object(http_cache, 'default_cache', return_value=self.cache), \
+                mock.patch.object(spreads, 'process_data', wraps=spreads.process_data) as process:
+            spreads.main(['--week', '1'])
+        return process.call_count
+
+    def test_unchanged_week_skips_parse_and_write(self):
+        self.assertEqual(self._run_spreads(), 1)
+        conn = get_connection()
+        conn.execute("UPDATE spreads SET Home_Line_Close = 99")  # any write would overwrite this
+        conn.commit()
+        self.assertEqual(self._run_spreads(), 0)
+        self.assertEqual(self.server.hits[-1][1].get('If-None-Match'), '"v1"')
+        self.assertEqual(conn.execute("SELECT Home_Line_Close FROM spreads").fetchone()[0], 99)
+        self.server.pages['/ticker'] = (_ticker(home_score=27), 2)
+        self.assertEqual(self._run_spreads(), 1)
+        self.assertEqual(conn.execute("SELECT Home_Line_Close, Home_Score FROM spreads").fetchall(), [(-7.5, 27)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+
+# Heavy dependencies that lightweight entry points must not pull in at import time
+HEAVY = ('pandas', 'sklearn', 'scipy', 'bs4', 'requests', 'nicegui')
+
+_PROBE = '''
+import json, sys
+import {module}
+print(json.dumps({{'modules': sorted(sys.modules)}}))
+'''
+
+
+def _probe(module):
+    out = subprocess.run([sys.executable, '-c', _PROBE.format(module=module)], cwd=ROOT, capture_output=True,
+                         text=True, timeout=60, stdin=subprocess.DEVNULL, env={**os.environ, 'PYTHONPATH': str(ROOT)})
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# Asserted on what gets loaded (sys.modules), not wall-clock time, so slow CI hosts do not flake
+@pytest.mark.parametrize('module, max_modules', [
+    ('panda_picks.ui.data', 400),
+    ('panda_picks.main', 250),
+    ('panda_picks.analysis.utils.probability', 250),
+])
+def test_import_budget(module, max_modules):
+    result = _probe(module)
+    loaded = {m.split('.')[0] for m in result['modules']}
+    assert not loaded & set(HEAVY), f"{module} imports {sorted(loaded & set(HEAVY))}"
+    assert len(result['modules']) <= max_modules
+
+
+def test_cli_help_does_not_prompt():
+    out = subprocess.run([sys.executable, '-m', 'panda_picks.main', '--help'], cwd=ROOT, capture_output=True,
+                         text=True, timeout=60, stdin=subprocess.DEVNULL)
+    assert out.returncode == 0, out.stderr
+    assert '--weeks' in out.stdout
+    assert 'cookie' not in (out.stdout + out.stderr).lower()
+
+
+def test_backtest_export_is_the_function():
+    code = ('import panda_picks.analysis.backtest\n'
+            'from panda_picks.analysis import backtest\n'
+            'import types; print(isinstance(backtest, types.FunctionType))')
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, timeout=60,
+                         stdin=subprocess.DEVNULL, env={**os.environ, 'PYTHONPATH': str(ROOT)})
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == 'True'
@@ -0,0 +1,109 @@
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from panda_picks import config
+from panda_picks.db import watermarks
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
+from panda_picks.analysis.advanced_features import build_and_store_matchup_features, feature_input_hashes
+from panda_picks.analysis import picks
+from panda_picks.analysis.picks import _pick_input_hashes
+
+SEASON = 2025
+TEAMS = ['AAA', 'BBB', 'CCC', 'DDD']
+
+
+class TestWatermarks(unittest.TestCase):
+    def test_fingerprints(self):
+        self.assertEqual(watermarks.row_fingerprint([(1, 'a'), (2, None)]),
+                         watermarks.row_fingerprint([(2, None), (1, 'a')]))
+        self.assertNotEqual(watermarks.row_fingerprint([(1, 2.0)]), watermarks.row_fingerprint([(1, 2.5)]))
+        df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+        self.assertEqual(watermarks.frame_fingerprint(df), watermarks.frame_fingerprint(df.iloc[::-1]))
+        self.assertEqual(watermarks.frame_fingerprint(df.iloc[0:0]), watermarks.EMPTY)
+
+
+class TestIncrementalRecompute(unittest.TestCase):
+    def setUp(self):
+        self.db_path = Path('temp_test_incremental.db').resolve()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        config.DATABASE_PATH = self.db_path
+        create_tables()
+        stats = [(SEASON, w, typ, t, 10.0 + w + i, 0.0, 'ts')
+                 for w in range(1, 9) for i, t in enumerate(TEAMS) for typ in ('offense', 'defense')]
+        spreads = [(f'WEEK{w}', 'AAA', 'BBB', -3.0, 3.0, -150, 130) for w in range(1, 9)] + \
+                  [(f'WEEK{w}', 'CCC', 'DDD', -1.0, 1.0, -110, -110) for w in range(1, 9)]
+        self.conn = get_connection()
+        with self.conn:
+            self.conn.executemany("INSERT INTO advanced_stats (season, week, type, TEAM, composite_score, z_score, "
+                                  "last_updated) VALUES (?,?,?,?,?,?,?)", stats)
+            self.conn.executemany("INSERT INTO spreads (WEEK, Home_Team, Away_Team, Home_Line_Close, Away_Line_Close, "
+                                  "Home_Odds_Close, Away_Odds_Close) VALUES (?,?,?,?,?,?,?)", spreads)
+
+    def tearDown(self):
+        self.conn.close()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+
+    def _changed(self, before, after):
+        return sorted(w for w in after if before[w] != after[w])
+
+    def test_feature_hashes_follow_momentum_windows(self):
+        weeks = list(range(1, 9))
+        before = feature_input_hashes(self.conn, SEASON, weeks)
+        with self.conn:
+            self.conn.execute("UPDATE advanced_stats SET composite_score = 0 WHERE week = 3 AND TEAM = 'AAA' "
+                              "AND type = 'offense'")
+        # Week 3 itself plus weeks 4-6 whose 3-week windows include week 3
+        self.assertEqual(self._changed(before, feature_input_hashes(self.conn, SEASON, weeks)), [3, 4, 5, 6])
+        before = feature_input_hashes(self.conn, SEASON, weeks)
+        with self.conn:
+            self.conn.execute("UPDATE spreads SET Home_Line_Close = -7 WHERE WEEK = 'WEEK5'")
+        self.assertEqual(self._changed(before, feature_input_hashes(self.conn, SEASON, weeks)), [])
+
+    def test_incremental_build_skips_unchanged_weeks(self):
+        weeks = list(range(1, 9))
+        self.assertEqual(sum(len(f) for f in build_and_store_matchup_features(SEASON, weeks, incremental=True)), 16)
+        self.assertEqual(sum(len(f) for f in build_and_store_matchup_features(SEASON, weeks, incremental=True)), 0)
+        with self.conn:
+            self.conn.execute("UPDATE advanced_stats SET composite_score = 0 WHERE week = 7 AND TEAM = 'DDD'")
+            self.conn.execute("UPDATE matchup_features SET net_composite = NULL WHERE week = 8")
+        rebuilt = build_and_store_matchup_features(SEASON, weeks, incremental=True)
+        self.assertEqual([w for w, f in zip(weeks, rebuilt) if not f.empty], [7, 8])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM matchup_features WHERE net_composite IS NULL")
+                         .fetchone()[0], 0)
+
+    def test_pick_hashes_line_move_vs_score_fix(self):
+        grades = pd.DataFrame({'Home_Team': TEAMS, 'OVR': [80.0, 70.0, 75.0, 65.0]})
+        weeks = list(range(1, 9))
+        before = _pick_input_hashes(self.conn, SEASON, weeks, grades)
+        with self.conn:
+            self.conn.execute("UPDATE spreads SET Home_Odds_Close = -200 WHERE WEEK = 'WEEK6' AND Home_Team = 'AAA'")
+        after = _pick_input_hashes(self.conn, SEASON, weeks, grades)
+        self.assertEqual(self._changed(before, after), [6])
+        build_and_store_matchup_features(SEASON, weeks)
+        before = _pick_input_hashes(self.conn, SEASON, weeks, grades)
+        with self.conn:  # a graded week-2 game feeds the margin model for every later week
+            self.conn.execute("UPDATE spreads SET Home_Score = 21, Away_Score = 17 WHERE WEEK = 'WEEK2' AND Home_Team = 'AAA'")
+        changed = self._changed(before, _pick_input_hashes(self.conn, SEASON, weeks, grades))
+        self.assertEqual(changed[0], 2)
+        self.assertTrue(set(range(4, 9)).issubset(changed))
+        self.assertNotEqual(_pick_input_hashes(self.conn, SEASON, [1], grades.assign(OVR=0.0)),
+                            _pick_input_hashes(self.conn, SEASON, [1], grades))
+
+    def test_rescored_week_without_picks_is_cleared(self):
+        with self.conn:
+            self.conn.executemany("INSERT INTO picks (WEEK, Home_Team, Away_Team, Game_Pick) VALUES (?,?,?,?)",
+                                  [('WEEK3', 'AAA', 'BBB', 'AAA'), ('WEEK4', 'CCC', 'DDD', 'DDD')])
+        with mock.patch.object(picks, '_score_weeks', return_value=None):
+            picks._score_and_store_weeks(self.conn, [3], pd.DataFrame(), pd.DataFrame())
+        self.assertEqual(self.conn.execute("SELECT WEEK FROM picks").fetchall(), [('WEEK4',)])
+
+
+if __name__ == '__main__':
+    unittest.main()
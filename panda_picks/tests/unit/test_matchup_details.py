@@ -2,7 +2,7 @@ import unittest
 from pathlib import Path
 from uuid import uuid4
 from panda_picks import config
-from panda_picks.db.database import create_tables, get_connection
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
 from panda_picks.ui.data import get_available_weeks, get_week_matchups, get_matchup_details
 
 class TestMatchupDetails(unittest.TestCase):
@@ -25,11 +25,9 @@ class TestMatchupDetails(unittest.TestCase):
                          ('WEEK1','HOME_T','AWAY_T','HOME_T', -4.5, 4.5, 6.1, 3.2, 2.9, 1.4, 1.1))
 
     def tearDown(self):
-        try:
-            if self.db_path.exists():
-                self.db_path.unlink()
-        except Exception:
-            pass
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
 
     def test_matchup_details_with_pick(self):
         weeks = get_available_weeks()
@@ -0,0 +1,71 @@
+import sqlite3
+import unittest
+from pathlib import Path
+
+from panda_picks import config
+from panda_picks.config.settings import Settings, _current_season
+from panda_picks.db.database import create_tables, drop_tables, get_connection, close_pooled_connections
+from panda_picks.db import migrations
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.db_path = Path('temp_test_migrations.db').resolve()
+        if self.db_path.exists():
+            self.db_path.unlink()
+        config.DATABASE_PATH = self.db_path
+
+    def tearDown(self):
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+
+    def _versions(self):
+        with get_connection() as conn:
+            return [r[0] for r in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+
+    def test_fresh_database_reaches_latest_version_once(self):
+        create_tables()
+        create_tables()  # second run is a no-op
+        self.assertEqual(self._versions(), [v for v, _, _ in migrations.MIGRATIONS])
+        with get_connection() as conn:
+            cols = migrations.table_columns(conn, 'picks')
+        self.assertIn('pick_cover_prob', cols)
+        self.assertNotIn('week_num', cols)  # generated, never written
+
+    def test_existing_data_survives_rerun(self):
+        create_tables()
+        with get_connection() as conn:
+            conn.execute("INSERT INTO spreads (WEEK, Home_Team, Away_Team) VALUES ('WEEK3','A','B')")
+            conn.commit()
+        create_tables()
+        with get_connection() as conn:
+            self.assertEqual(conn.execute("SELECT week_num FROM spreads").fetchall(), [(3,)])
+
+    def test_upgrades_unversioned_legacy_database(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE picks (WEEK TEXT, Home_Team TEXT, Away_Team TEXT, Game_Pick TEXT, Pick_Prob REAL, "
+                      "PRIMARY KEY (WEEK, Home_Team, Away_Team))")
+        conn.execute("INSERT INTO picks VALUES ('WEEK2','A','B','A',0.6)")
+        conn.commit(); conn.close()
+        create_tables()
+        self.assertEqual(self._versions()[-1], migrations.LATEST_VERSION)
+        with get_connection() as conn:
+            row = conn.execute("SELECT week_num, Pick_Prob, Blended_Adv, season FROM picks").fetchone()
+        self.assertEqual(row, (2, 0.6, None, Settings.SEASON))
+
+    def test_season_rolls_over_in_march(self):
+        from datetime import date
+        self.assertEqual(_current_season(date(2026, 2, 8)), 2025)  # Super Bowl still belongs to 2025
+        self.assertEqual(_current_season(date(2026, 9, 10)), 2026)
+
+    def test_drop_tables_resets_version(self):
+        create_tables()
+        drop_tables()
+        create_tables()
+        with get_connection() as conn:
+            self.assertIn('picks', {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import importlib
+from unittest import mock
+
+import pytest
+
+from panda_picks.data import get_pff_grades as pff
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cookies(tmp_path, monkeypatch):
+    monkeypatch.setattr(pff, 'PFF_COOKIES_FILE', str(tmp_path / 'cookies.txt'))
+    monkeypatch.setattr(pff, 'PFF_FORCE_MANUAL_COOKIES', False)
+    monkeypatch.delenv('PFF_COOKIES', raising=False)
+    pff.set_cookie_provider(None)
+    yield
+    pff.set_cookie_provider(None)
+
+
+def _no_input(*_):
+    raise AssertionError('input() must not be called')
+
+
+def test_import_does_not_prompt_or_resolve_cookies():
+    with mock.patch('builtins.input', _no_input):
+        importlib.reload(pff)
+    assert pff._cookies is None
+
+
+def test_provider_order_callback_env_file(tmp_path, monkeypatch):
+    (tmp_path / 'cookies.txt').write_text('sid=file; x=1')
+    assert pff.get_cookies() == {'sid': 'file', 'x': '1'}
+    monkeypatch.setenv('PFF_COOKIES', 'sid=env')
+    assert pff.get_cookies() == {'sid': 'env'}
+    pff.set_cookie_provider(lambda: {'sid': 'vault'})
+    assert pff.get_cookies() == {'sid': 'vault'}
+    pff.set_cookie_provider(lambda: (_ for _ in ()).throw(RuntimeError('vault down')))
+    assert pff.get_cookies() == {'sid': 'env'}
+
+
+def test_headless_never_prompts(monkeypatch):
+    monkeypatch.setattr(pff.sys, 'stdin', mock.Mock(isatty=lambda: False))
+    with mock.patch('builtins.input', _no_input):
+        assert pff.get_cookies(force_manual=True) is None
+
+
+def test_unauthorized_without_new_cookies_fails_fast(monkeypatch):
+    monkeypatch.setenv('PFF_COOKIES', 'sid=stale')
+    monkeypatch.setattr(pff, 'PFF_HEADLESS', True)
+    monkeypatch.setattr(pff, '_logging_ready', True)
+    resp = mock.Mock(status_code=401)
+    resp.raise_for_status.side_effect = pff.requests.HTTPError('401 Client Error')
+    with mock.patch.object(pff.requests, 'get', return_value=resp) as get, mock.patch('builtins.input', _no_input):
+        with pytest.raises(Exception, match='401'):
+            pff.fetch_pff_grades(season=2025)
+    assert get.call_count == 1
+    assert get.call_args.kwargs['cookies'] == {'sid': 'stale'}
@@ -4,7 +4,7 @@ from pathlib import Path
 import os
 
 from panda_picks import config
-from panda_picks.db.database import create_tables, get_connection
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
 from panda_picks.analysis.services.pick_service import PickService
 from panda_picks.config.settings import Settings
 
@@ -66,11 +66,9 @@ class TestPickLimit(unittest.TestCase):
             spreads_df.to_sql('spreads', conn, if_exists='append', index=False)
 
     def tearDown(self):
-        try:
-            if self.db_path.exists():
-                self.db_path.unlink()
-        except Exception:
-            pass
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
 
     def test_max_pick_limit_enforced(self):
         """Ensure generated picks never exceed Settings.MAX_PICKS_PER_WEEK."""
@@ -3,7 +3,7 @@ from pathlib import Path
 import pandas as pd
 
 from panda_picks import config
-from panda_picks.db.database import create_tables, get_connection
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
 from panda_picks.analysis.services.pick_service import PickService
 
 class TestPickAnySignal(unittest.TestCase):
@@ -67,11 +67,9 @@ class TestPickAnySignal(unittest.TestCase):
             spreads_df.to_sql('spreads', conn, if_exists='append', index=False)
 
     def tearDown(self):
-        try:
-            if self.db_path.exists():
-                self.db_path.unlink()
-        except Exception:
-            pass
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
 
     def test_pick_created_when_any_signal(self):
         service = PickService()
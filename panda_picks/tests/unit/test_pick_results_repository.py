@@ -6,6 +6,7 @@ import pytest
 
 from panda_picks.data.repositories.pick_results_repository import PickResultsRepository
 from panda_picks.ui.grade_utils import grade_pick, ResultStatus
+from panda_picks.db.migrations import WEEK_NUM_EXPR
 
 # NOTE: We patch the database path so get_connection() points to a temp file DB.
 @pytest.fixture()
@@ -39,6 +40,8 @@ def temp_db(monkeypatch):
         Off_Comp_Adv REAL, Def_Comp_Adv REAL,
         PRIMARY KEY (WEEK, Home_Team, Away_Team)
     )''')
+    for table in ('picks_results', 'picks'):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN week_num INTEGER GENERATED ALWAYS AS ({WEEK_NUM_EXPR}) VIRTUAL")
     conn.commit()
     yield conn
     conn.close()
@@ -107,6 +110,15 @@ def test_upcoming_join_includes_unscored(temp_db):
     assert len(scored) == 1 and len(unscored) == 1
 
 
+def test_recent_orders_weeks_numerically(temp_db):
+    insert_picks_results(temp_db, [
+        (wk,'A'+wk,'B'+wk, 10,7,None,None,-3.0,None,'A'+wk,None,1,1,1,0,0,0,0,None,None,None,None,None)
+        for wk in ('WEEK2','WEEK10','WEEK9')
+    ])
+    rows = PickResultsRepository().get_recent(limit=10)
+    assert [r[0] for r in rows] == ['WEEK10', 'WEEK9', 'WEEK2']
+
+
 def test_grading_contract_with_repository(temp_db):
     # Insert mixed outcomes
     test_rows = [
@@ -0,0 +1,123 @@
+import threading
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from panda_picks import config
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
+from panda_picks.pipeline import Stage, last_run_incomplete, mark_week_done, run_pipeline, week_checkpoint
+
+
+class TestRunPipeline(unittest.TestCase):
+    def setUp(self):
+        self.db_path = Path('temp_test_pipeline.db').resolve()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        config.DATABASE_PATH = self.db_path
+        create_tables()
+
+    def tearDown(self):
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+
+    def test_independent_stages_overlap_and_deps_wait(self):
+        barrier = threading.Barrier(3, timeout=5)
+        order = []
+
+        def fetch(name):
+            def run():
+                barrier.wait()  # only returns if all three fetches are running at once
+                order.append(name)
+                return 10
+            return run
+
+        def build():
+            order.append('build')
+            with get_connection() as conn:
+                conn.execute("INSERT INTO grades (TEAM, OVR) VALUES ('AAA', 70)")
+            return 1
+
+        stages = [Stage('grades', fetch('grades')), Stage('stats', fetch('stats')), Stage('spreads', fetch('spreads')),
+                  Stage('build', build, deps=('grades', 'stats', 'spreads'))]
+        runs = run_pipeline(stages, max_workers=3, run_id='r1')
+        self.assertEqual(order[-1], 'build')
+        self.assertTrue((runs['Status'] == 'ok').all())
+        stored = pd.read_sql_query("SELECT * FROM pipeline_runs WHERE Run_Id = 'r1'", get_connection())
+        self.assertEqual(sorted(stored['Stage']), ['build', 'grades', 'spreads', 'stats'])
+        self.assertEqual(stored.set_index('Stage').loc['grades', 'Rows'], 10)
+        self.assertTrue((stored['Wall_Seconds'] >= 0).all())
+
+    def test_failures_skip_dependants_unless_optional(self):
+        def boom():
+            raise RuntimeError('401 Unauthorized')
+
+        ran = []
+        stages = [Stage('grades', boom), Stage('store', lambda: ran.append('store'), deps=('grades',)),
+                  Stage('report', lambda: ran.append('report'), deps=('store',)),
+                  Stage('stats', boom, optional=True), Stage('features', lambda: ran.append('features'), deps=('stats',))]
+        runs = run_pipeline(stages, max_workers=2).set_index('Stage')
+        self.assertEqual(ran, ['features'])
+        self.assertEqual(runs.loc['grades', 'Status'], 'failed')
+        self.assertIn('401', runs.loc['grades', 'Error'])
+        self.assertEqual(list(runs.loc[['store', 'report'], 'Status']), ['skipped', 'skipped'])
+        self.assertEqual(runs.loc['features', 'Status'], 'ok')
+
+    def test_resume_skips_completed_stages_and_weeks(self):
+        calls = []
+        inputs = {'fetch': 'v1'}
+        state = {'fail_week': 3}
+
+        def scrape():
+            todo = week_checkpoint('scrape', 2025, {w: f'w{w}' for w in (1, 2, 3, 4)})
+            for w in todo:
+                if w == state['fail_week']:
+                    raise RuntimeError(f'scrape failed at week {w}')
+                calls.append(('scrape', w))
+                mark_week_done('scrape', 2025, w, f'w{w}')
+
+        stages = [Stage('fetch', lambda: calls.append('fetch'), fingerprint=lambda: inputs['fetch']),
+                  Stage('scrape', scrape),
+                  Stage('fresh', lambda: calls.append('fresh'), fingerprint=lambda: 'x', max_age_h=0),
+                  Stage('report', lambda: calls.append('report'), deps=('fetch', 'scrape'), fingerprint=lambda: 'r')]
+        first = run_pipeline(stages, max_workers=1).set_index('Stage')
+        self.assertEqual(first.loc['report', 'Status'], 'skipped')
+        self.assertEqual(sorted(map(str, calls)), sorted(map(str, ['fetch', ('scrape', 1), ('scrape', 2), 'fresh'])))
+        calls.clear()
+        state['fail_week'] = None
+        second = run_pipeline(stages, max_workers=1).set_index('Stage')
+        self.assertEqual(second.loc['fetch', 'Status'], 'cached')
+        self.assertEqual(sorted(map(str, calls)), sorted(map(str, [('scrape', 3), ('scrape', 4), 'fresh', 'report'])))
+        calls.clear()
+        inputs['fetch'] = 'v2'
+        run_pipeline(stages, max_workers=1)
+        self.assertEqual(sorted(calls), ['fetch', 'fresh'])
+        calls.clear()
+        run_pipeline(stages, max_workers=1, resume=False)
+        self.assertEqual(sorted(map(str, calls)), sorted(map(str, ['fetch', 'fresh', 'report'])))
+
+    def test_only_an_incomplete_last_run_is_resumable(self):
+        def boom():
+            raise RuntimeError('ticker down')
+
+        flaky = [Stage('pff', boom, optional=True), Stage('grades', lambda: None, deps=('pff',))]
+        self.assertFalse(last_run_incomplete(flaky))
+        run_pipeline([Stage('grades', lambda: None), Stage('spreads', boom)], run_id='r1')
+        self.assertTrue(last_run_incomplete())
+        run_pipeline([Stage('grades', lambda: None), Stage('spreads', lambda: None)], run_id='r2')
+        self.assertFalse(last_run_incomplete())
+        # A failing optional stage does not keep later runs resuming
+        run_pipeline(flaky, run_id='r3')
+        self.assertFalse(last_run_incomplete(flaky))
+
+    def test_invalid_graphs(self):
+        with self.assertRaises(ValueError):
+            run_pipeline([Stage('a', lambda: None, deps=('missing',))])
+        with self.assertRaises(ValueError):
+            run_pipeline([Stage('a', lambda: None, deps=('b',)), Stage('b', lambda: None, deps=('a',))])
+
+
+if __name__ == '__main__':
+    unittest.main()
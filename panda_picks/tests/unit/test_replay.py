@@ -0,0 +1,90 @@
+import json
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+import requests
+
+from panda_picks import config
+from panda_picks.analysis import spreads
+from panda_picks.config.settings import Settings
+from panda_picks.data import advanced_stats, replay
+from panda_picks.data.replay import FixtureStore
+from panda_picks.data.standin_server import StandInServer
+from panda_picks.db.database import create_tables, close_pooled_connections
+
+TICKER = json.dumps({'weeks': [{'games': [
+    {'home_franchise': {'abbreviation': 'PHI'}, 'away_franchise': {'abbreviation': 'DAL'}, 'home_score': 24,
+     'away_score': 20, 'point_spread': -7.5, 'home_team_money_line': -300, 'away_team_money_line': 250}]}]}).encode()
+TEAMS = ['Arizona Cardinals', 'Atlanta Falcons', 'Baltimore Ravens']
+STATS_PAGE = ('<html><table><tr><th>Team</th><th>EPA/Play</th><th>Success %</th></tr>'
+              + ''.join(f'<tr><td>{i + 1}. {t}</td><td>0.{i}</td><td>4{i}%</td></tr>' for i, t in enumerate(TEAMS))
+              + '</table></html>').encode()
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """Fixture set standing in for the live sites: one ticker week and both stats pages."""
+    store = FixtureStore(tmp_path, 'origin')
+    store.save(spreads._week_url(1), 'pff_ticker', 200, TICKER, {'Content-Type': 'application/json', 'ETag': '"t1"'})
+    for url in advanced_stats.SCRAPE_URLS.values():
+        store.save(url, 'sumersports', 200, STATS_PAGE, {'Content-Type': 'text/html'})
+    return store
+
+
+@pytest.fixture
+def db(tmp_path):
+    close_pooled_connections()
+    config.DATABASE_PATH = Path('temp_test_replay.db').resolve()
+    create_tables()
+    yield
+    close_pooled_connections()
+    for suffix in ('', '-wal', '-shm'):
+        Path(str(config.DATABASE_PATH) + suffix).unlink(missing_ok=True)
+
+
+def _settings(tmp_path, **kwargs):
+    values = dict(HTTP_MODE='live', HTTP_FIXTURE_DIR=tmp_path, HTTP_FIXTURE_SET='captured', HTTP_STANDIN_URL='')
+    values.update(kwargs)
+    return mock.patch.multiple(Settings, **values)
+
+
+def test_record_then_replay_without_network(tmp_path, origin):
+    with StandInServer(origin) as server, _settings(tmp_path, HTTP_MODE='record', HTTP_STANDIN_URL=server.url):
+        assert spreads.fetch_data(1) == json.loads(TICKER)
+    captured = FixtureStore(tmp_path, 'captured')
+    entry, body = captured.load(spreads._week_url(1))
+    assert body == TICKER and entry['source'] == 'pff_ticker' and entry['headers']['ETag'] == '"t1"'
+    assert captured.manifest['format'] == replay.FORMAT_VERSION
+
+    with _settings(tmp_path, HTTP_MODE='replay'), mock.patch.object(requests.Session, 'send', side_effect=AssertionError):
+        assert spreads.fetch_data(1) == json.loads(TICKER)
+        assert replay.send(None, spreads._week_url(1), 'pff_ticker', headers={'If-None-Match': '"t1"'}).status_code == 304
+        with pytest.raises(requests.ConnectionError):
+            replay.send(None, spreads._week_url(2), 'pff_ticker')
+
+
+def test_standin_latency_and_seeded_failures(origin):
+    url = spreads._week_url(1)
+    with StandInServer(origin, latency_s=0.05, failure_rate=0.5, seed=7) as server:
+        with _settings(origin.path.parent, HTTP_STANDIN_URL=server.url):
+            started = time.perf_counter()
+            statuses = [replay.send(None, url, 'pff_ticker', timeout=5).status_code for _ in range(6)]
+            elapsed = time.perf_counter() - started
+        stats = dict(server.stats)
+    assert elapsed >= 6 * 0.05
+    assert set(statuses) == {200, 503}
+    assert stats['failed'] == statuses.count(503) and stats['served'] == statuses.count(200)
+    with StandInServer(origin, failure_rate=0.5, seed=7) as again, _settings(origin.path.parent, HTTP_STANDIN_URL=again.url):
+        assert [replay.send(None, url, 'pff_ticker', timeout=5).status_code for _ in range(6)] == statuses
+
+
+def test_collector_load_against_flaky_standin(origin, db):
+    with StandInServer(origin, latency_s=0.01, failure_rate=0.3, seed=3) as server, \
+            _settings(origin.path.parent, HTTP_STANDIN_URL=server.url):
+        c = advanced_stats.AsyncStatsCollector(2025, [1, 2, 3], min_interval_s=0.0, retries=6)
+        c.cache = None
+        frames = c.run()
+    assert sorted(frames) == [(w, k) for w in (1, 2, 3) for k in ('defense', 'offense')]
+    assert server.stats['served'] == 2 and server.stats['failed'] >= 1
@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from panda_picks.data import advanced_stats
+from panda_picks.data.advanced_stats import coerce_numeric, parse_stats_table
+
+PAGE = '''<html><body><table><thead><tr>
+<th><button>Team<i class="sort"></i></button></th><th>EPA/Play</th><th>Success %</th><th>Notes</th></tr></thead>
+<tbody>
+<tr><td><span>1.</span> <a href="/t/1"><img src="a.png"/>Arizona Cardinals</a></td><td>0.12</td><td><div>45.5%</div></td><td>ok</td></tr>
+<tr><td><span>2.</span> Atlanta <!-- hidden --> Falcons</td><td> -0.05 </td><td>41%</td><td></td></tr>
+<tr><td colspan="4">Updated weekly</td></tr>
+</tbody></table><table><tr><th>Other</th></tr></table></body></html>'''
+
+
+class TestStatsParsing(unittest.TestCase):
+    def test_lxml_path_matches_beautifulsoup(self):
+        fast = parse_stats_table(PAGE)
+        assert_frame_equal(fast, advanced_stats._parse_stats_table_bs4(PAGE))
+        self.assertEqual(list(fast.columns), ['Team', 'EPA/Play', 'Success %', 'Notes'])
+        self.assertEqual(fast['Team'].tolist(), ['1.Arizona Cardinals', '2.AtlantaFalcons'])
+        headerless = '<table><tr><td>Team</td><td>A</td><td>B</td></tr><tr><td>X</td><td>1</td><td>2</td></tr></table>'
+        assert_frame_equal(parse_stats_table(headerless), advanced_stats._parse_stats_table_bs4(headerless))
+        for page in ('', '<html><p>no table</p></html>', '<table><tr><th>A</th><th>B</th></tr></table>'):
+            self.assertIsNone(parse_stats_table(page))
+
+    def test_coerce_numeric_strips_percent_once_and_types_columns(self):
+        raw = pd.DataFrame({'a': ['1', '2.5'], 'pct': ['45.5%', ''], 'mixed': ['3', 'n/a'], 'dup': ['7%', '8']})
+        raw.columns = ['a', 'pct', 'mixed', 'a']
+        out = coerce_numeric(raw)
+        self.assertEqual(list(out.columns), ['a', 'pct', 'mixed', 'a'])
+        self.assertEqual(list(out.dtypes.astype(str)), ['float64', 'float64', 'object', 'float64'])
+        np.testing.assert_array_equal(out.iloc[:, 1].to_numpy(), [45.5, np.nan])
+        self.assertEqual(out['mixed'].tolist(), ['3', 'n/a'])
+        self.assertEqual(out.iloc[:, 3].tolist(), [7.0, 8.0])
+
+    def test_clean_produces_typed_frame(self):
+        collector = advanced_stats.AdvancedStatsCollector.__new__(advanced_stats.AdvancedStatsCollector)
+        collector.season, collector.week = 2025, 3
+        out = collector._clean(parse_stats_table(PAGE), 'offense')
+        self.assertEqual(out['TEAM'].tolist(), ['ARZ', 'ATL'])
+        self.assertEqual(out['epa_per_play'].tolist(), [0.12, -0.05])
+        self.assertEqual(out['Success %'].tolist(), [45.5, 41.0])
+        self.assertEqual(list(out.columns[-4:]), ['TEAM', 'season', 'week', 'type'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from itertools import combinations
+
+import numpy as np
+
+from panda_picks.analysis.utils.teasers import TEASER_ODDS, combo_frame, summarize, win_profit
+
+
+class TestClosedFormTeasers(unittest.TestCase):
+    def test_summary_matches_enumeration_for_2_to_8_legs(self):
+        won = np.array([True, False, True, True, True, False, True, True, True, True])
+        sizes = range(2, 9)
+        for s in summarize(won, sizes, stake=25.0):
+            hits = [all(won[list(c)]) for c in combinations(range(len(won)), s.size)]
+            self.assertEqual(s.tickets, len(hits))
+            self.assertEqual(s.wins, sum(hits))
+            expected = sum(win_profit(25.0, TEASER_ODDS[s.size]) if h else -25.0 for h in hits)
+            self.assertAlmostEqual(s.profit, expected, places=6)
+            self.assertAlmostEqual(s.returned - s.wagered, s.profit, places=6)
+
+    def test_sizes_without_enough_legs_or_price_are_skipped(self):
+        self.assertEqual([s.size for s in summarize([True, True, False], sizes=(2, 3, 4, 9))], [2, 3])
+
+    def test_large_slate_is_not_enumerated(self):
+        summary = summarize([True] * 30 + [False] * 30, sizes=range(2, 9), stake=1.0)
+        self.assertEqual(summary[-1].tickets, 2558620845)  # C(60, 8)
+        self.assertEqual(summary[-1].wins, 5852925)  # C(30, 8)
+
+    def test_combo_frame_totals_agree_with_summary(self):
+        teams = np.array(list('ABCDEF'), dtype=object)
+        won = np.array([True, True, False, True, True, True])
+        frame = combo_frame(teams, won, sizes=(2, 3, 4, 5), stake=10.0)
+        for s in summarize(won, sizes=(2, 3, 4, 5), stake=10.0):
+            part = frame[frame['Type'] == f'{s.size}-Team']
+            self.assertEqual(len(part), s.tickets)
+            self.assertEqual(int(part['Hit'].sum()), s.wins)
+            self.assertAlmostEqual(part['Winnings'].sum(), s.returned, places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
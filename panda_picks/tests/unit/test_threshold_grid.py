@@ -0,0 +1,78 @@
+import itertools
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from panda_picks.analysis.threshold_tuning import (
+    _decide_pick, _evaluate_grid, _logistic_prob, _moneyline_profit, threshold_range
+)
+
+
+def _base(n=40, seed=3):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Home_Team': [f'H{i}' for i in range(n)],
+        'Away_Team': [f'A{i}' for i in range(n)],
+        'Overall_Adv': rng.normal(0, 4, n),
+        'Offense_Adv': rng.normal(0, 4, n),
+        'Defense_Adv': rng.normal(0, 4, n),
+        'Home_Odds_Close': rng.choice([-200, -110, 120, 180], n).astype(float),
+        'Away_Odds_Close': rng.choice([-150, 100, 140], n).astype(float),
+        'Home_Score': rng.integers(0, 35, n).astype(float),
+        'Away_Score': rng.integers(0, 35, n).astype(float),
+    })
+    df.loc[:4, 'Home_Score'] = np.nan  # pending games
+    df.loc[5, 'Offense_Adv'] = np.nan
+    df.loc[6:8, 'Home_Odds_Close'] = np.nan
+    df['Has_Result'] = df['Home_Score'].notna() & df['Away_Score'].notna()
+    df['Home_Win'] = (df['Has_Result'] & (df['Home_Score'] > df['Away_Score'])).astype(int)
+    return df
+
+
+def _reference(base, grids, min_picks):
+    rows = []
+    for o, off, d in itertools.product(*grids):
+        th = {'Overall_Adv': float(o), 'Offense_Adv': float(off), 'Defense_Adv': float(d)}
+        pick = base.apply(lambda r: _decide_pick(r, th), axis=1)
+        picked = base[pick != 'PASS'].assign(Pick=pick[pick != 'PASS'])
+        if picked.empty or len(picked) < min_picks:
+            continue
+        ev = picked[picked['Has_Result']]
+        if ev.empty:
+            continue
+        correct = ev['Pick'] == np.where(ev['Home_Win'] == 1, ev['Home_Team'], ev['Away_Team'])
+        profits = []
+        for (_, r), ok in zip(ev.iterrows(), correct):
+            odds = r['Home_Odds_Close'] if r['Pick'] == r['Home_Team'] else r['Away_Odds_Close']
+            if pd.isna(odds):
+                continue
+            profits.append(_moneyline_profit(odds) if ok else -1.0)
+        rows.append((o, off, d, len(picked), len(profits), correct.mean(), sum(profits),
+                     sum(profits) / len(profits) if profits else np.nan,
+                     picked['Overall_Adv'].apply(_logistic_prob).mean()))
+    return pd.DataFrame(rows, columns=['Overall_Thresh', 'Offense_Thresh', 'Defense_Thresh', 'Picks', 'Evaluated_Picks',
+                                       'Accuracy', 'Profit', 'ROI_per_Pick', 'Avg_Home_Win_Prob'])
+
+
+class TestThresholdGrid(unittest.TestCase):
+    def test_matches_row_wise_decisions(self):
+        base = _base()
+        grids = ([0, 1.5, 3, 6], [2, 4], [0.0, 2.5, 5.0])
+        out = _evaluate_grid(base, *grids, min_picks=3)
+        ref = _reference(base, grids, min_picks=3)
+        self.assertTrue((out['Total_Games'] == len(base)).all())
+        pd.testing.assert_frame_equal(out[ref.columns].reset_index(drop=True), ref, check_dtype=False, rtol=1e-12)
+
+    def test_empty_grid_or_frame(self):
+        self.assertTrue(_evaluate_grid(_base(), [], [1], [1]).empty)
+        self.assertTrue(_evaluate_grid(_base().iloc[0:0], [1], [1], [1]).empty)
+
+    def test_threshold_range_inclusive(self):
+        grid = threshold_range(0, 10, 0.25)
+        self.assertEqual(len(grid), 41)
+        self.assertEqual((grid[0], grid[1], grid[-1]), (0.0, 0.25, 10.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from panda_picks import config
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
+from panda_picks.analysis.threshold_search import (
+    SEARCH_SPACE, _from_unit, evaluate_config, grid_size, run_search, successive_halving
+)
+from panda_picks.analysis.threshold_sweep import BASE_COLUMNS, evaluate_shard
+
+
+def _matrix(weeks=18, games=8, seed=4):
+    rng = np.random.default_rng(seed)
+    n = weeks * games
+    implied = rng.uniform(0.3, 0.7, n)
+    cols = {
+        'Overall_Adv': rng.normal(0, 4, n), 'Offense_Adv': rng.normal(0, 4, n), 'Defense_Adv': rng.normal(0, 4, n),
+        'Net_Composite_norm': rng.normal(0, 1, n), 'Lead_Is_Blend': np.ones(n),
+        'Home_ML_Implied': implied, 'Away_ML_Implied': 1 - implied,
+        'Home_Odds_Close': np.full(n, -120.0), 'Away_Odds_Close': np.full(n, 100.0),
+        'Has_Result': np.ones(n), 'Home_Win': (rng.random(n) < 0.5).astype(float),
+        'Week': np.repeat(np.arange(1, weeks + 1), games).astype(float),
+    }
+    return np.column_stack([cols[c] for c in BASE_COLUMNS])
+
+
+_PARAMS = {'overall': 2.0, 'offense': 3.0, 'defense': 1.5, 'k_prob_scale': 0.1, 'edge_min': 0.0,
+           'blend_alpha': 0.6, 'max_picks': 4}
+
+
+class TestSearchHelpers(unittest.TestCase):
+    def test_unit_values_snap_to_steps(self):
+        params = _from_unit(SEARCH_SPACE, np.full(len(SEARCH_SPACE), 0.513))
+        for name, (lo, hi, step) in SEARCH_SPACE.items():
+            self.assertTrue(lo <= params[name] <= hi)
+            self.assertAlmostEqual((params[name] - lo) / step, round((params[name] - lo) / step))
+        self.assertIsInstance(params['max_picks'], int)
+        self.assertEqual(grid_size({'a': (0, 1, 0.25), 'b': (2, 16, 1)}), 5 * 15)
+
+    def test_evaluate_config_matches_shard_row(self):
+        base = _matrix()
+        row = evaluate_shard(base, 2.0, [3.0], [1.5], 0.1, 0.0, 0.6, 4).iloc[0]
+        metrics = evaluate_config(base, _PARAMS)
+        self.assertEqual(metrics['Picks'], row['Picks'])
+        self.assertAlmostEqual(metrics['ROI_per_Pick'], row['ROI_per_Pick'])
+        first = evaluate_config(base, _PARAMS, weeks=np.array([1.0]))
+        self.assertLessEqual(first['Picks'], 4)
+        self.assertTrue(np.isnan(evaluate_config(base, _PARAMS, min_picks=10_000)['ROI_per_Pick']))
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+    def test_rungs_grow_weeks_and_keep_best_third(self):
+        trials = pd.DataFrame(successive_halving(_matrix(), n_configs=27, eta=3, min_weeks=2, seed=1))
+        per_rung = trials.groupby('Rung').agg(n=('Trial', 'size'), weeks=('Weeks', 'first'))
+        self.assertEqual(list(per_rung['n']), [27, 9, 3])
+        self.assertEqual(list(per_rung['weeks']), [2, 6, 18])
+        ranked = trials[trials['Rung'] == 0].sort_values('ROI_per_Pick', ascending=False, na_position='last')
+        keys = ['overall', 'offense', 'defense', 'k_prob_scale', 'edge_min', 'blend_alpha', 'max_picks']
+        promoted = trials[trials['Rung'] == 1][keys]
+        self.assertEqual(sorted(map(tuple, promoted.to_numpy())), sorted(map(tuple, ranked.head(9)[keys].to_numpy())))
+
+
+class TestRunSearch(unittest.TestCase):
+    def setUp(self):
+        self.db_path = Path('temp_test_threshold_search.db').resolve()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        config.DATABASE_PATH = self.db_path
+        create_tables()
+        rng = np.random.default_rng(8)
+        teams = [f'T{i}' for i in range(8)]
+        grades = pd.DataFrame({'TEAM': teams, **{c: rng.uniform(50, 90, 8) for c in
+                                                  ['OVR', 'OFF', 'DEF', 'PASS', 'RUN', 'RECV', 'PBLK', 'RBLK', 'RDEF', 'TACK', 'PRSH', 'COV']}})
+        spreads = pd.DataFrame([{'WEEK': f'WEEK{w}', 'Home_Team': teams[(g + w) % 8], 'Away_Team': teams[(7 - g + w) % 8],
+                                 'Home_Score': int(rng.integers(10, 30)), 'Away_Score': int(rng.integers(10, 30)),
+                                 'Home_Odds_Close': -130.0, 'Away_Odds_Close': 110.0}
+                                for w in range(1, 7) for g in range(4)])
+        with get_connection() as conn:
+            grades.to_sql('grades', conn, if_exists='append', index=False)
+            spreads.to_sql('spreads', conn, if_exists='append', index=False)
+
+    def tearDown(self):
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+
+    def test_trials_are_recorded(self):
+        for method, kwargs in (('halving', {'n_configs': 9}), ('surrogate', {'n_trials': 6, 'n_init': 3})):
+            df = run_search(method, seed=3, min_picks_per_week=0.5, **kwargs)
+            conn = get_connection()
+            stored = pd.read_sql_query("SELECT * FROM threshold_search_trials WHERE Method = ?", conn, params=[method])
+            summary = pd.read_sql_query("SELECT * FROM threshold_searches WHERE Method = ?", conn, params=[method])
+            self.assertEqual(len(stored), len(df))
+            self.assertEqual(summary['Trials'].iloc[0], len(df))
+            if df['ROI_per_Pick'].notna().any():
+                self.assertAlmostEqual(summary['Best_ROI_per_Pick'].iloc[0], df['ROI_per_Pick'].iloc[0])
+        # Re-running the same spec on the same data replaces its history
+        rerun = run_search('halving', seed=3, min_picks_per_week=0.5, n_configs=9)
+        conn = get_connection()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM threshold_searches").fetchone()[0], 2)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM threshold_search_trials WHERE Method = 'halving'")
+                         .fetchone()[0], len(rerun))
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            run_search('grid')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import itertools
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from panda_picks import config
+from panda_picks.db.database import create_tables, get_connection, close_pooled_connections
+from panda_picks.analysis import picks, threshold_sweep
+from panda_picks.analysis.threshold_sweep import BASE_COLUMNS, evaluate_shard, run_sweep
+
+
+def _matrix(n=24, seed=5):
+    rng = np.random.default_rng(seed)
+    cols = {
+        'Overall_Adv': rng.normal(0, 4, n), 'Offense_Adv': rng.normal(0, 4, n), 'Defense_Adv': rng.normal(0, 4, n),
+        'Net_Composite_norm': np.where(np.arange(n) < n // 2, rng.normal(0, 1, n), np.nan),
+        'Lead_Is_Blend': (np.arange(n) < n // 2).astype(float),
+        'Home_ML_Implied': rng.uniform(0.3, 0.7, n),
+        'Home_Odds_Close': rng.choice([-180, -120, 110, 150], n).astype(float),
+        'Away_Odds_Close': rng.choice([-150, 100, 130], n).astype(float),
+        'Has_Result': (rng.random(n) < 0.8).astype(float), 'Home_Win': (rng.random(n) < 0.5).astype(float),
+        'Week': np.repeat([1, 2], n // 2).astype(float),
+    }
+    cols['Away_ML_Implied'] = 1 - cols['Home_ML_Implied']
+    return np.column_stack([cols[c] for c in BASE_COLUMNS])
+
+
+def _reference(m, overall, offs, defs, k, edge_min, alpha, max_picks):
+    df = pd.DataFrame(m, columns=BASE_COLUMNS)
+    blend = alpha * df['Overall_Adv'] + (1 - alpha) * df['Net_Composite_norm']
+    df['Lead'] = np.where(df['Lead_Is_Blend'] > 0, blend, df['Overall_Adv'])
+    df['Prob'] = 1 / (1 + np.exp(-k * blend.fillna(df['Overall_Adv'])))
+    rows = []
+    for off, d in itertools.product(offs, defs):
+        picked = []
+        for _, r in df.iterrows():
+            votes = [(r[c] >= t, (not r[c] >= t) and r[c] <= -t)
+                     for c, t in (('Lead', overall), ('Offense_Adv', off), ('Defense_Adv', d))]
+            home, away = any(v[0] for v in votes), any(v[1] for v in votes)
+            if home == away:
+                continue
+            edge = r['Prob'] - r['Home_ML_Implied'] if home else (1 - r['Prob']) - r['Away_ML_Implied']
+            if abs(edge) >= edge_min:
+                picked.append(dict(r, Home=home, Edge=edge))
+        if not picked:
+            continue
+        p = pd.DataFrame(picked).sort_values(['Edge', 'Lead'], ascending=[False, False], kind='stable')
+        p = p.groupby('Week', group_keys=False).head(max_picks)
+        ev = p[p['Has_Result'] > 0]
+        if ev.empty:
+            continue
+        correct = np.where(ev['Home'], ev['Home_Win'] > 0, ev['Home_Win'] == 0)
+        odds = np.where(ev['Home'], ev['Home_Odds_Close'], ev['Away_Odds_Close'])
+        profit = np.where(correct, np.where(odds > 0, odds / 100, 100 / np.abs(odds)), -1.0)
+        rows.append((off, d, len(p), correct.mean(), profit.sum()))
+    return pd.DataFrame(rows, columns=['Offense_Thresh', 'Defense_Thresh', 'Picks', 'Accuracy', 'Profit'])
+
+
+class TestEvaluateShard(unittest.TestCase):
+    def test_matches_row_wise_pick_pipeline(self):
+        m = _matrix()
+        grid = [0.0, 2.0, 4.0]
+        for k, edge_min, max_picks in ((0.1, -100.0, 100), (0.2, 0.03, 4), (0.05, 0.0, 2)):
+            out = evaluate_shard(m, 2.0, grid, grid, k, edge_min, 0.6, max_picks)
+            ref = _reference(m, 2.0, grid, grid, k, edge_min, 0.6, max_picks)
+            pd.testing.assert_frame_equal(out[ref.columns].reset_index(drop=True), ref, check_dtype=False)
+            self.assertTrue((out['Max_Picks_Per_Week'] == max_picks).all())
+
+
+class TestRunSweep(unittest.TestCase):
+    def setUp(self):
+        self.db_path = Path('temp_test_threshold_sweep.db').resolve()
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        config.DATABASE_PATH = self.db_path
+        create_tables()
+        rng = np.random.default_rng(2)
+        teams = [f'T{i}' for i in range(8)]
+        grades = pd.DataFrame({'TEAM': teams, **{c: rng.uniform(50, 90, 8) for c in
+                                                  ['OVR', 'OFF', 'DEF', 'PASS', 'RUN', 'RECV', 'PBLK', 'RBLK', 'RDEF', 'TACK', 'PRSH', 'COV']}})
+        spreads = pd.DataFrame([{'WEEK': f'WEEK{w}', 'Home_Team': teams[g], 'Away_Team': teams[7 - g],
+                                 'Home_Score': int(rng.integers(10, 30)), 'Away_Score': int(rng.integers(10, 30)),
+                                 'Home_Odds_Close': -130.0, 'Away_Odds_Close': 110.0}
+                                for w in (1, 2, 3) for g in range(4)])
+        with get_connection() as conn:
+            grades.to_sql('grades', conn, if_exists='append', index=False)
+            spreads.to_sql('spreads', conn, if_exists='append', index=False)
+
+    def tearDown(self):
+        close_pooled_connections()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+
+    def _sweep(self, workers=1):
+        return run_sweep([1, 3], [1, 3], [1, 3], k_prob_scales=[0.1, 0.2], max_picks=[2, 8], workers=workers)
+
+    def test_resume_skips_finished_shards(self):
+        full = self._sweep()
+        self.assertEqual(full['Sweep_Id'].nunique(), 1)
+        sweep_id = full['Sweep_Id'].iloc[0]
+        conn = get_connection()
+        with conn:  # simulate a sweep killed before its last shard was checkpointed
+            conn.execute("DELETE FROM threshold_sweep_shards WHERE Sweep_Id = ? AND Shard = 7", (sweep_id,))
+            conn.execute("DELETE FROM threshold_tuning_results WHERE Sweep_Id = ? AND K_Prob_Scale = 0.2 "
+                         "AND Max_Picks_Per_Week = 8 AND Overall_Thresh = 3", (sweep_id,))
+        with mock.patch.object(threshold_sweep, 'evaluate_shard', wraps=threshold_sweep.evaluate_shard) as spy:
+            resumed = self._sweep()
+        self.assertEqual(spy.call_count, 1)
+        key = ['K_Prob_Scale', 'Max_Picks_Per_Week', 'Overall_Thresh', 'Offense_Thresh', 'Defense_Thresh']
+        pd.testing.assert_frame_equal(full.drop(columns='Timestamp').sort_values(key).reset_index(drop=True),
+                                      resumed.drop(columns='Timestamp').sort_values(key).reset_index(drop=True))
+
+    def test_process_pool_matches_in_process(self):
+        parallel = self._sweep(workers=2)
+        conn = get_connection()
+        with conn:
+            conn.execute("DELETE FROM threshold_sweep_shards")
+            conn.execute("DELETE FROM threshold_tuning_results")
+        serial = self._sweep(workers=1)
+        key = ['K_Prob_Scale', 'Max_Picks_Per_Week', 'Overall_Thresh', 'Offense_Thresh', 'Defense_Thresh']
+        pd.testing.assert_frame_equal(parallel.drop(columns='Timestamp').sort_values(key).reset_index(drop=True),
+                                      serial.drop(columns='Timestamp').sort_values(key).reset_index(drop=True))
+
+    def test_sweep_rows_never_become_production_thresholds(self):
+        self._sweep()
+        conn = get_connection()
+        with conn:
+            conn.execute("INSERT INTO threshold_tuning_results (Overall_Thresh, Offense_Thresh, Defense_Thresh, Picks, "
+                         "Accuracy, ROI_per_Pick) VALUES (2.5, 2.5, 2.5, 1, 0.1, -99)")
+        original = dict(picks.SIGNIFICANCE_THRESHOLDS)
+        try:
+            picks._load_best_thresholds(conn)
+            self.assertEqual([picks.SIGNIFICANCE_THRESHOLDS[k] for k in ('Overall_Adv', 'Offense_Adv', 'Defense_Adv')],
+                             [2.5, 2.5, 2.5])
+        finally:
+            picks.SIGNIFICANCE_THRESHOLDS.update(original)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ from typing import List, Dict, Any
 from .grade_utils import grade_pick, ResultStatus
 from .week_utils import week_sort_key, format_week_standard, extract_week_number
 from panda_picks.data.repositories.pick_results_repository import PickResultsRepository
+from panda_picks.analysis.utils import teasers as _teasers
 from .pick_enricher import PickEnricher
 
 # Centralized color palette (updated to match branding banner)
@@ -24,7 +25,7 @@ _pick_enricher = PickEnricher()
 
 def get_total_picks() -> int:
     try:
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM picks")
         result = cursor.fetchone()[0]
@@ -52,7 +53,7 @@ def get_win_rate() -> str:
 
 def get_upcoming_games() -> int:
     try:
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM spreads WHERE Home_Score IS NULL")
         result = cursor.fetchone()[0]
@@ -108,7 +109,7 @@ def get_upcoming_picks():
 
 def get_team_grades():
     try:
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cursor = conn.cursor()
         cursor.execute("SELECT TEAM, OVR, OFF, DEF FROM grades")
         rows = cursor.fetchall()
@@ -122,7 +123,7 @@ def get_team_grades():
 
 def get_spreads_data():
     try:
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cursor = conn.cursor()
         cursor.execute("SELECT WEEK, Home_Team, Away_Team, Home_Line_Close FROM spreads")
         rows = cursor.fetchall()
@@ -135,7 +136,7 @@ def get_spreads_data():
 
 def run_backtest(strategy: str):
     try:
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cursor = conn.cursor()
         query = "SELECT Home_Team, Away_Team, Home_Score, Away_Score, Home_Line_Close FROM spreads WHERE Home_Score IS NOT NULL"
         cursor.execute(query)
@@ -190,7 +191,7 @@ def run_backtest(strategy: str):
 
 def get_all_team_names():
     try:
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cursor = conn.cursor()
         cursor.execute("SELECT DISTINCT TEAM FROM grades ORDER BY TEAM")
         teams = [row[0] for row in cursor.fetchall()]
@@ -201,7 +202,7 @@ def get_all_team_names():
 
 def get_team_details(team_name: str):
     try:
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cursor = conn.cursor()
         cursor.execute("SELECT OVR, OFF, DEF FROM grades WHERE TEAM = ?", (team_name,))
         grades = cursor.fetchone()
@@ -209,17 +210,17 @@ def get_team_details(team_name: str):
             SELECT WEEK, Home_Team, Away_Team, Home_Score, Away_Score
             FROM spreads
             WHERE (Home_Team = ? OR Away_Team = ?) AND Home_Score IS NOT NULL
-            ORDER BY WEEK DESC LIMIT 5
+            ORDER BY week_num DESC LIMIT 5
         """, (team_name, team_name))
         recent_results = cursor.fetchall()
         cursor.execute("""
             SELECT WEEK, Home_Team, Away_Team
             FROM spreads
             WHERE (Home_Team = ? OR Away_Team = ?) AND Home_Score IS NULL
-            ORDER BY WEEK ASC LIMIT 5
+            ORDER BY week_num ASC LIMIT 5
         """, (team_name, team_name))
         upcoming_schedule = cursor.fetchall()
-        cursor.execute("SELECT Home_Team, Away_Team, Home_Score, Away_Score, Home_Line_Close, Away_Line_Close FROM spreads WHERE Home_Score IS NOT NULL AND (Home_Team = ? OR Away_Team = ?)", (team_name, team_name))
+        cursor.execute("SELECT Home_Team, Away_Team, Home_Score, Away_Score, Home_Line_Close, Away_Line_Close FROM spreads WHERE Home_Score IS NOT NULL AND Away_Score IS NOT NULL AND (Home_Team = ? OR Away_Team = ?)", (team_name, team_name))
         all_games = cursor.fetchall()
         ats_wins = 0
         ats_losses = 0
@@ -304,7 +305,7 @@ def get_week_picks_for_combos(week: str):
         if wk_num is None:
             return []
         week_key = f"WEEK{wk_num}"
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cursor = conn.cursor()
         cursor.execute("""
              SELECT p.WEEK, p.Home_Team, p.Away_Team, p.Game_Pick,
@@ -361,10 +362,10 @@ def get_week_picks_for_combos(week: str):
 
 def get_available_weeks():
     try:
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cur = conn.cursor()
-        cur.execute("SELECT DISTINCT WEEK FROM spreads ORDER BY CAST(REPLACE(UPPER(WEEK),'WEEK','') AS INTEGER)")
-        weeks = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT DISTINCT week_num, WEEK FROM spreads ORDER BY week_num")
+        weeks = [row[1] for row in cur.fetchall()]
         conn.close()
         return weeks
     except Exception:
@@ -374,7 +375,7 @@ def get_week_matchups(week: str):
     try:
         if not week:
             return []
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cur = conn.cursor()
         cur.execute("""
             SELECT WEEK, Home_Team, Away_Team, Home_Line_Close, Home_Odds_Close, Away_Odds_Close
@@ -398,7 +399,7 @@ def get_week_matchups(week: str):
 
 def get_matchup_details(week: str, home: str, away: str):
     try:
-        conn = get_connection()
+        conn = get_connection(read_only=True)
         cur = conn.cursor()
         # Spread row
         cur.execute("SELECT * FROM spreads WHERE WEEK=? AND Home_Team=? AND Away_Team=?", (week, home, away))
@@ -457,8 +458,8 @@ def get_teaser_weekly_profit_and_balance(start_balance: float = 1000.0, stake_pe
     Applies +6 exactly once per leg (no double adjustment). Leg considered win if (picked_score + base_line + 6) > opp_score.
     Push (equality) treated as loss for simplicity.
     Returns dict with weeks, weekly_profit, rolling_balance, detail (per week leg and size stats), weekly_wagered, cumulative_roi.
+    Combo wins/losses per size are counted in closed form (C(legs,k) tickets, C(winning legs,k) winners).
     """
-    import itertools
     try:
         rows = _pick_results_repo.get_scored_extended()
         if not rows:
@@ -467,7 +468,7 @@ def get_teaser_weekly_profit_and_balance(start_balance: float = 1000.0, stake_pe
         by_week = defaultdict(list)
         for wk, home, away, pick, h_score, a_score, h_line, a_line, pick_cov, correct_pick in rows:
             by_week[wk].append((home, away, pick, h_score, a_score, h_line, a_line))
-        static_odds = {2: -135, 3: 140, 4: 240}
+        static_odds = _teasers.TEASER_ODDS
         weeks_sorted = sorted(by_week.keys(), key=week_sort_key)
         weeks=[]; weekly_profit=[]; rolling=[]; balance=start_balance; detail={}; weekly_wagered_list=[]; cumulative_roi=[]
         for wk in weeks_sorted:
@@ -496,31 +497,15 @@ def get_teaser_weekly_profit_and_balance(start_balance: float = 1000.0, stake_pe
             week_profit = 0.0; detail[wk] = {'legs': leg_summary}
             if not legs:
                 weeks.append(wk); weekly_profit.append(0.0); balance += 0.0; rolling.append(round(balance,2)); weekly_wagered_list.append(0.0); cumulative_roi.append(round(((balance-start_balance)/start_balance)*100,2)); continue
-            try:
-                import math as _math
-                M=len(legs); N=sum(1 for l in legs if l['won'])
-                active_sizes=[k for k in sizes if k<=M and k in static_odds]
-                total_combos_cnt=sum(_math.comb(M,k) for k in active_sizes)
-                winning_combos_cnt=sum(_math.comb(N,k) for k in active_sizes if N>=k)
-            except Exception:
-                total_combos_cnt=0; winning_combos_cnt=0; M=len(legs); N=sum(1 for l in legs if l['won']); active_sizes=[]
-            weekly_amount_wagered_for_week=0.0
-            from itertools import combinations as _comb
-            for size in sizes:
-                if size not in static_odds or len(legs) < size: continue
-                wins_count=0; loss_count=0; size_profit=0.0
-                all_combos=list(_comb(legs, size))
-                weekly_amount_wagered_for_week += len(all_combos) * stake_per_combo
-                for combo in all_combos:
-                    if all(l['won'] for l in combo):
-                        am=static_odds[size]
-                        profit = stake_per_combo * (am/100.0) if am>0 else stake_per_combo * (100.0/abs(am))
-                        size_profit += profit; wins_count += 1
-                    else:
-                        size_profit -= stake_per_combo; loss_count += 1
-                if wins_count or loss_count:
-                    week_profit += size_profit
-                    detail[wk][size] = {'wins': wins_count, 'losses': loss_count, 'profit': round(size_profit,2)}
+            M=len(legs); N=sum(1 for l in legs if l['won'])
+            summary = _teasers.summarize([l['won'] for l in legs], sizes, stake=stake_per_combo, odds=static_odds)
+            active_sizes=[s.size for s in summary]
+            total_combos_cnt=sum(s.tickets for s in summary)
+            winning_combos_cnt=sum(s.wins for s in summary)
+            weekly_amount_wagered_for_week=float(sum(s.wagered for s in summary))
+            for s in summary:
+                week_profit += s.profit
+                detail[wk][s.size] = {'wins': s.wins, 'losses': s.losses, 'profit': round(s.profit,2)}
             detail[wk]['summary'] = {
                 'legs': M, 'winning_legs': N, 'active_sizes': active_sizes,
                 'winning_combos': winning_combos_cnt, 'total_combos': total_combos_cnt,
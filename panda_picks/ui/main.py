@@ -100,4 +100,10 @@ if __name__ in {'__main__','__mp_main__'}:
     if os.getenv('PANDA_PICKS_NO_UI') == '1':
         print('Panda Picks UI loaded (server not started due to PANDA_PICKS_NO_UI=1).')
     else:
+        # Bring an existing DB up to the current schema (week_num column / indexes) before read-only queries
+        try:
+            from panda_picks.db.database import create_tables
+            create_tables()
+        except Exception as e:
+            print(f'Schema check skipped: {e}')
         ui.run(port=8001)
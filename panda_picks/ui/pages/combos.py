@@ -2,7 +2,7 @@ from nicegui import ui
 import math
 import pandas as pd
 from ..data import get_week_picks_for_combos
-from panda_picks.analysis.utils.combos import generate_bet_combinations
+from panda_picks.analysis.utils.combos import iter_bet_combinations, top_bet_combinations
 from panda_picks.data.repositories.excluded_teams_repository import ExcludedTeamsRepository
 
 def register(router):
@@ -18,6 +18,9 @@ def register(router):
                 # Exclude teams control allows manually removing picks for the selected week
                 exclude_select = ui.select([], value=[], label='Exclude Teams', multiple=True).classes('w-1/6')
                 stake_input = ui.number(label='Stake per Combo', value=100, format='%.0f').classes('w-1/6')
+                # Optional bounded top-K: only the displayed combos are built
+                top_k_input = ui.number(label='Show Top (0 = all)', value=0, format='%.0f').classes('w-1/6')
+                rank_select = ui.select(['Combined_Prob', 'Parlay_Edge'], value='Combined_Prob', label='Rank By').classes('w-1/6')
                 ui.button('Refresh', icon='refresh', on_click=lambda: update_table()).classes('q-ml-md')
                 export_btn = ui.button('Export CSV', icon='download').props('outline')
         summary_card = ui.card().classes('w-full shadow-sm q-pa-md')
@@ -110,10 +113,13 @@ def register(router):
                     ui.label('Not enough picks for combinations after exclusions.').classes('q-pa-md')
                 return
 
-            # generate combos up to 8 legs (previously limited to 5)
-            combos = generate_bet_combinations(picks_df, 2, 8)
+            # generate combos up to 8 legs (previously limited to 5), only for the selected sizes
             selected_sizes = set(int(s) for s in (size_multiselect.value or []))
-            combos = [c for c in combos if c['Size'] in selected_sizes]
+            top_k = int(top_k_input.value or 0)
+            if top_k > 0:
+                combos = top_bet_combinations(picks_df, top_k, by=rank_select.value, min_size=2, max_size=8, sizes=selected_sizes)
+            else:
+                combos = list(iter_bet_combinations(picks_df, 2, 8, sizes=selected_sizes))
             if not combos:
                 update_summary([], stake)
                 with table_container:
@@ -176,6 +182,8 @@ def register(router):
         week_select.on('update:model-value', lambda e: update_table())
         size_multiselect.on('update:model-value', lambda e: update_table())
         stake_input.on('update:model-value', lambda e: update_table())
+        top_k_input.on('update:model-value', lambda e: update_table())
+        rank_select.on('update:model-value', lambda e: update_table())
         # Persist exclusions then refresh
         def on_exclusions_change(_):
             if _suppress_exclusion_event['flag']:
@@ -1,8 +1,14 @@
 """Utility functions for the Panda Picks package."""
+import importlib
 
-# Re-export normalizer helpers for convenience
-try:
-    from .team_normalizer import normalize_team, normalize_df_team_cols  # noqa: F401
-except Exception:
-    # Optional at import time if CSV missing; tests can still import directly
-    pass
+# Re-export normalizer helpers for convenience (resolved on first use, PEP 562)
+_EXPORTS = {
+    'normalize_team': 'team_normalizer',
+    'normalize_df_team_cols': 'team_normalizer',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f'{__name__}.{_EXPORTS[name]}'), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
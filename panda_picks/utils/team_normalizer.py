@@ -1,25 +1,15 @@
 from __future__ import annotations
-from typing import Dict, Iterable
-import pandas as pd
-import os
+import csv
+from typing import TYPE_CHECKING, Dict, Iterable
 from panda_picks import config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Build a normalization map from known abbreviations and aliases to canonical full team names
-# Primary source: NFL_translations.csv (Abrev -> TEAM)
+# Primary source: NFL_translations.csv (Abrev -> TEAM), read on first use rather than at import
 _ABBREV_TO_TEAM: Dict[str, str] = {}
-try:
-    if config.NFL_TRANSLATIONS_CSV.exists():
-        df = pd.read_csv(config.NFL_TRANSLATIONS_CSV)
-        # Expect columns Abrev, TEAM
-        if 'Abrev' in df.columns and 'TEAM' in df.columns:
-            for r in df.itertuples(index=False):
-                ab = str(getattr(r, 'Abrev')).strip().upper()
-                team = str(getattr(r, 'TEAM')).strip()
-                if ab:
-                    _ABBREV_TO_TEAM[ab] = team
-except Exception:
-    # Best effort only
-    pass
+_translations_loaded = False
 
 # Common alias corrections across feeds
 _ALIAS_TO_TEAM: Dict[str, str] = {
@@ -39,9 +29,26 @@ _ALIAS_TO_TEAM: Dict[str, str] = {
     'KC': 'Kansas City Chiefs', 'KAN': 'Kansas City Chiefs',
     'LA': '',  # ambiguous, leave blank so we don't map incorrectly
 }
-# Merge CSV map (upper-case keys) into alias map but don't overwrite explicit aliases
-for k, v in list(_ABBREV_TO_TEAM.items()):
-    _ALIAS_TO_TEAM.setdefault(k.upper(), v)
+
+
+def _load_translations() -> None:
+    global _translations_loaded
+    _translations_loaded = True
+    try:
+        if config.NFL_TRANSLATIONS_CSV.exists():
+            with open(config.NFL_TRANSLATIONS_CSV, newline='', encoding='utf-8-sig') as f:
+                for row in csv.DictReader(f):
+                    # Expect columns Abrev, TEAM
+                    ab = str(row.get('Abrev') or '').strip().upper()
+                    team = str(row.get('TEAM') or '').strip()
+                    if ab and 'TEAM' in row:
+                        _ABBREV_TO_TEAM[ab] = team
+    except Exception:
+        # Best effort only
+        pass
+    # Merge CSV map (upper-case keys) into alias map but don't overwrite explicit aliases
+    for k, v in list(_ABBREV_TO_TEAM.items()):
+        _ALIAS_TO_TEAM.setdefault(k.upper(), v)
 
 # Direct name remapping (case-insensitive) for some feeds that use city only
 _NAME_CANONICAL: Dict[str, str] = {
@@ -58,6 +65,8 @@ def normalize_team(name: str | None) -> str | None:
     """
     if name is None:
         return None
+    if not _translations_loaded:
+        _load_translations()
     s = str(name).strip()
     if not s:
         return s
@@ -0,0 +1,97 @@
+"""Benchmark: Bayesian grade blending, per-cell Python loop vs team x metric arrays.
+
+Builds synthetic prior/current grades (32 teams x 12 metrics, some current grades missing)
+and times
+ 1. legacy path: iterrows over teams with an inner loop over METRICS, one dict per cell
+ 2. vectorized path: bayesian_grades.blend over the whole matrix
+for a BAYES_K_SCALE sweep, then asserts both produce identical weights and blends.
+Usage:
+  python scripts/bench_bayes.py --scales 50 --week 8 --repeat 3
+"""
+from __future__ import annotations
+import argparse, sys, os, time
+
+import numpy as np
+import pandas as pd
+
+# Add project root so 'panda_picks' is importable when running from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from panda_picks.analysis.bayesian_grades import METRICS, BlendInputs, blend
+from panda_picks.config.settings import Settings
+
+
+def synthetic_inputs(week: int, seed: int = 7) -> BlendInputs:
+    rng = np.random.default_rng(seed)
+    prior = rng.uniform(40, 95, (32, len(METRICS))).round(1)
+    current = rng.uniform(40, 95, (32, len(METRICS))).round(1)
+    current[rng.random(current.shape) < 0.1] = np.nan
+    return BlendInputs(teams=np.array([f'T{i:02d}' for i in range(32)], dtype=object), prior=prior,
+                       current=current, games=rng.integers(0, week + 1, 32).astype(float), week=week)
+
+
+def legacy(inputs: BlendInputs, k_scale: float):
+    merged = pd.DataFrame(inputs.prior, columns=[f'{m}_PRIOR' for m in METRICS])
+    merged[[f'{m}_CUR' for m in METRICS]] = inputs.current
+    merged.insert(0, 'Home_Team', inputs.teams)
+    games_played = dict(zip(inputs.teams, inputs.games))
+    cap_week = Settings.BAYES_MAX_RAMP_WEEK
+    rows = []
+    for _, r in merged.iterrows():
+        n = games_played.get(r['Home_Team'], 0)
+        for m in METRICS:
+            prior_val, cur_val = r[f'{m}_PRIOR'], r[f'{m}_CUR']
+            n_eff = 0 if pd.isna(cur_val) else n
+            effective_k = float(Settings.BAYES_K_VALUES.get(m, 5.0)) * max(1e-6, k_scale)
+            w = n_eff / (n_eff + effective_k) if (n_eff + effective_k) > 0 else 0.0
+            w *= max(0.0, Settings.BAYES_CURRENT_WEIGHT_MULTIPLIER)
+            if inputs.week <= cap_week:
+                w = min(w, Settings.BAYES_CAP_WEIGHT_EARLY * inputs.week / cap_week)
+            if inputs.week > cap_week and n_eff > 0 and w < Settings.BAYES_MIN_CURRENT_WEIGHT:
+                w = Settings.BAYES_MIN_CURRENT_WEIGHT
+            w = min(max(w, 0.0), 1.0)
+            if pd.isna(prior_val):
+                post = cur_val
+            elif pd.isna(cur_val) or w == 0:
+                post = prior_val
+            else:
+                post = w * cur_val + (1 - w) * prior_val
+            rows.append({'Home_Team': r['Home_Team'], 'Metric': m, 'Weight_Current': w, 'Blended': post})
+    df = pd.DataFrame(rows)
+    return df['Weight_Current'].to_numpy().reshape(inputs.prior.shape), df['Blended'].to_numpy(float).reshape(inputs.prior.shape)
+
+
+def _best_of(fn, repeat: int):
+    best = float('inf'); out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def run(n_scales: int, week: int, repeat: int) -> int:
+    inputs = synthetic_inputs(week)
+    scales = np.linspace(0.25, 4.0, n_scales)
+    t_legacy, ref = _best_of(lambda: [legacy(inputs, s) for s in scales], repeat)
+    t_fast, (_, _, _, weight, blended) = _best_of(lambda: blend(inputs, scales), repeat)
+    for i, (w_ref, b_ref) in enumerate(ref):
+        np.testing.assert_allclose(weight[i], w_ref, rtol=1e-12)
+        np.testing.assert_allclose(blended[i], b_ref, rtol=1e-12)
+    print(f"scales={n_scales} week={week} (32 teams x {len(METRICS)} metrics each)")
+    print(f"  iterrows + per-metric loop : {t_legacy*1000:10.2f} ms")
+    print(f"  team x metric arrays       : {t_fast*1000:10.2f} ms")
+    print(f"  speedup                    : {t_legacy / t_fast:10.1f}x (results agree)")
+    return 0
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--scales', type=int, default=50, help='Number of BAYES_K_SCALE values in the sweep')
+    ap.add_argument('--week', type=int, default=8, help='Current week (<= BAYES_MAX_RAMP_WEEK exercises the ramp cap)')
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+    sys.exit(run(args.scales, args.week, args.repeat))
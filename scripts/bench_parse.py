@@ -0,0 +1,104 @@
+"""Benchmark: sumersports table parsing, BeautifulSoup + per-column coercion vs lxml + one-shot coercion.
+
+Pages come from the recorded fixture set (``PP_HTTP_FIXTURE_SET``, recorded with
+``PP_HTTP_MODE=record``); without recordings a synthetic 32-team page with nested markup is
+used. Each page is parsed as many times as a full-season run would (18 weeks x 2 kinds by
+default) by
+ 1. legacy path: BeautifulSoup html.parser, then per-column '%' check + pd.to_numeric
+ 2. fast path: advanced_stats.parse_stats_table (lxml) + coerce_numeric
+and both results are checked for equality.
+Usage:
+  python scripts/bench_parse.py --weeks 18 --repeat 3 [--set default]
+"""
+from __future__ import annotations
+import argparse, sys, os, time, warnings
+
+import numpy as np
+import pandas as pd
+
+# Add project root so 'panda_picks' is importable when running from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from panda_picks.data import advanced_stats
+from panda_picks.data.replay import FixtureStore
+
+
+def synthetic_page(seed: int = 7, columns: int = 24) -> str:
+    rng = np.random.default_rng(seed)
+    teams = list(advanced_stats.TEAM_ABBR_MAP)
+    heads = ['Team', 'EPA/Play', 'EPA/Pass', 'EPA/Rush', 'Success %', 'Comp%', 'INT%', 'Sack%']
+    heads += [f'Metric {i}' for i in range(columns - len(heads))]
+    rows = []
+    for i, team in enumerate(teams):
+        cells = [f'<td><span class="rank">{i + 1}.</span> <a href="/teams/{i}"><img src="x.png"/>{team.title()}</a></td>']
+        for h in heads[1:]:
+            v = rng.normal(0, 1) if 'EPA' in h else rng.uniform(0, 60)
+            cells.append(f'<td><div class="cell">{v:.1f}%</div></td>' if '%' in h else f'<td>{v:.3f}</td>')
+        rows.append('<tr>' + ''.join(cells) + '</tr>')
+    header = ''.join(f'<th><button>{h}<i class="sort"></i></button></th>' for h in heads)
+    return f'<html><body><table><thead><tr>{header}</tr></thead><tbody>{"".join(rows)}</tbody></table></body></html>'
+
+
+def recorded_pages(name: str | None) -> list[str]:
+    store = FixtureStore(name=name)
+    pages = []
+    for url in advanced_stats.SCRAPE_URLS.values():
+        entry, body = store.load(url)
+        if entry is not None:
+            pages.append(body.decode('utf-8', errors='replace'))
+    return pages
+
+
+def legacy(html: str) -> pd.DataFrame:
+    df = advanced_stats._parse_stats_table_bs4(html)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        for c in list(df.columns):
+            if df[c].astype(str).str.contains('%').any():
+                df[c] = df[c].astype(str).str.replace('%', '', regex=False)
+            df[c] = pd.to_numeric(df[c], errors='ignore')
+    return df
+
+
+def fast(html: str) -> pd.DataFrame:
+    return advanced_stats.coerce_numeric(advanced_stats.parse_stats_table(html))
+
+
+def _best_of(fn, repeat: int):
+    best = float('inf'); out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def run(weeks: int, repeat: int, name: str | None) -> int:
+    pages = recorded_pages(name)
+    source = 'recorded' if pages else 'synthetic'
+    pages = pages or [synthetic_page(1), synthetic_page(2)]
+    jobs = [pages[i % len(pages)] for i in range(weeks * 2)]
+    t_legacy, ref = _best_of(lambda: [legacy(p) for p in jobs], repeat)
+    t_fast, out = _best_of(lambda: [fast(p) for p in jobs], repeat)
+    for a, b in zip(ref, out):
+        assert list(a.columns) == list(b.columns)
+        num = [c for c in a.columns if pd.api.types.is_numeric_dtype(a[c])]
+        np.testing.assert_allclose(b[num].to_numpy(float), a[num].to_numpy(float), rtol=0, atol=0)
+        assert (b.drop(columns=num).astype(str).to_numpy() == a.drop(columns=num).astype(str).to_numpy()).all()
+    print(f"pages={len(jobs)} ({source}, {len(out[0])} rows x {len(out[0].columns)} cols each)")
+    print(f"  bs4 + per-column coercion : {t_legacy*1000:10.2f} ms")
+    print(f"  lxml + one-shot coercion  : {t_fast*1000:10.2f} ms")
+    print(f"  speedup                   : {t_legacy / t_fast:10.1f}x (results agree)")
+    return 0
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--weeks', type=int, default=18, help='Weeks per run; each parses an offense and a defense page')
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--set', dest='name', help='Fixture set holding recorded sumersports pages')
+    args = ap.parse_args()
+    sys.exit(run(args.weeks, args.repeat, args.name))